@@ -1,9 +1,15 @@
 from tornado.httpserver import HTTPServer
-from tornado.ioloop import IOLoop
+from tornado.ioloop import IOLoop, PeriodicCallback
 from tornado.netutil import Resolver
 
 from Quadrant.config import quadrant_config
+from Quadrant.models.abstract.partitioning import messages_partitioning
+from Quadrant.models.general import blob_store
+from Quadrant.models.replicas import replica_set
+from Quadrant.models.users_package import presence_service
+from Quadrant.models.utils.hashing import hashing_executor
 from Quadrant.resourses import router
+from Quadrant.resourses.utils.image_pipeline import image_pipeline
 
 http_server = HTTPServer(router)
 
@@ -14,5 +20,21 @@ if quadrant_config.host_static_files_internally.value:
 
 if __name__ == "__main__":
     Resolver.configure("tornado.platform.caresresolver.CaresResolver")
+    hashing_executor.warm_up()
+    image_pipeline.warm_up()
     http_server.listen(port=quadrant_config.HttpChatServer.port.value)
+    PeriodicCallback(
+        blob_store.collect_garbage, quadrant_config.FilesConfig.blobs_gc_interval.value * 60 * 1000
+    ).start()
+    PeriodicCallback(
+        messages_partitioning.maintain,
+        quadrant_config.MessagesConfig.partitions_maintenance_interval.value * 60 * 1000
+    ).start()
+    IOLoop.current().add_callback(messages_partitioning.maintain)
+    PeriodicCallback(presence_service.maintain, quadrant_config.PresenceConfig.flush_interval.value * 1000).start()
+    if replica_set.enabled:
+        PeriodicCallback(
+            replica_set.check_lag, quadrant_config.DBConfig.replicas_lag_check_interval_ms.value
+        ).start()
+
     IOLoop.current().start()
@@ -7,9 +7,9 @@ from sys import exit
 from ConfigFramework import BaseConfig, loaders
 from ConfigFramework.variables import BoolVar, ConfigVar, IntVar
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from Quadrant.config import casters, validators
+from Quadrant.config.pool import AdaptiveOverflow, InstrumentedAsyncQueuePool
 from Quadrant.config.defaults import defaults
 
 parser = ArgumentParser()
@@ -18,6 +18,8 @@ parser.add_argument(
     default=Path(__file__).parent / "config.yaml", type=Path
 )
 parser.add_argument("--make-config", "--new-config", action="store_true", dest="create_config", default=False)
+# Every process of app must have its own worker id, so ids it generates never repeat
+parser.add_argument("--worker-id", action="store", dest="worker_id", default=None, type=int)
 
 launch_args, unknown = parser.parse_known_args()
 if not launch_args.config_path.is_file() and not launch_args.create_config:
@@ -61,19 +63,227 @@ class QuadrantConfig(BaseConfig):
         db_uri = ConfigVar("Quadrant/db/db_uri", composite_loader, validator=validators.validate_is_postgresql)
         # Number of connections to database app will be using
         pool_size = IntVar("Quadrant/db/pool_size", composite_loader, default=15, validator=lambda v: v >= 0)
+        # Number of connections app can open above pool_size when all pooled connections are in use
+        max_overflow = IntVar("Quadrant/db/max_overflow", composite_loader, default=10, validator=lambda v: v >= 0)
+        # Grows overflow up to adaptive_max_overflow while connections checkouts wait too long
+        adaptive_overflow = BoolVar("Quadrant/db/adaptive_overflow", composite_loader, default=False)
+        adaptive_max_overflow = IntVar(
+            "Quadrant/db/adaptive_max_overflow", composite_loader, default=50, validator=lambda v: v >= 0
+        )
+        # Average checkout wait in milliseconds after which overflow grows
+        adaptive_wait_threshold_ms = IntVar(
+            "Quadrant/db/adaptive_wait_threshold_ms", composite_loader, default=10, validator=lambda v: v > 0
+        )
+        # Seconds between overflow adjustments
+        adaptive_interval = IntVar(
+            "Quadrant/db/adaptive_interval", composite_loader, default=10, validator=lambda v: v > 0
+        )
+        # Read only replicas of database, some read queries are sent to them
+        replicas_uris = ConfigVar(
+            "Quadrant/db/replicas_uris", yaml_loader, default=[],
+            validator=lambda v: all(validators.validate_is_postgresql(uri) for uri in v)
+        )
+        # Number of connections to every replica
+        replicas_pool_size = IntVar(
+            "Quadrant/db/replicas_pool_size", composite_loader, default=15, validator=lambda v: v >= 0
+        )
+        # Max milliseconds replica may lag behind primary to be used
+        replicas_max_lag_ms = IntVar(
+            "Quadrant/db/replicas_max_lag_ms", composite_loader, default=1000, validator=lambda v: v > 0
+        )
+        # Milliseconds between replicas lag checks, must be lower than replicas_max_lag_ms
+        replicas_lag_check_interval_ms = IntVar(
+            "Quadrant/db/replicas_lag_check_interval_ms", composite_loader, default=200, validator=lambda v: v > 0
+        )
         # Any keyword args for sqlalchemy engine
         kwargs = ConfigVar("Quadrant/db/kwargs", yaml_loader, default={})
 
         def __post_init__(self, *args, **kwargs):
             self.kwargs.value.pop('pool_size', None)
             self.kwargs.value.pop('poolclass', None)
+            self.kwargs.value.pop('max_overflow', None)
 
             self.async_base_engine = create_async_engine(
                 self.db_uri.value,
-                poolclass=AsyncAdaptedQueuePool,
+                poolclass=InstrumentedAsyncQueuePool,
                 pool_size=self.pool_size.value,
+                max_overflow=self.max_overflow.value,
                 **self.kwargs.value
             )
+            pool: InstrumentedAsyncQueuePool = self.async_base_engine.sync_engine.pool
+            pool.metrics.listen(self.async_base_engine.sync_engine)
+
+            if self.adaptive_overflow.value:
+                pool.adaptive_overflow = AdaptiveOverflow(
+                    self.max_overflow.value, max(self.adaptive_max_overflow.value, self.max_overflow.value),
+                    self.adaptive_wait_threshold_ms.value, self.adaptive_interval.value
+                )
+
+            if self.replicas_lag_check_interval_ms.value >= self.replicas_max_lag_ms.value:
+                raise ValueError("Replicas lag must be checked more often than max lag")
+
+            self.async_replicas_engines = []
+            for replica_uri in self.replicas_uris.value:
+                replica_engine = create_async_engine(
+                    replica_uri,
+                    poolclass=InstrumentedAsyncQueuePool,
+                    pool_size=self.replicas_pool_size.value,
+                    max_overflow=self.max_overflow.value,
+                    **self.kwargs.value
+                )
+                replica_engine.sync_engine.pool.metrics.listen(replica_engine.sync_engine)
+                self.async_replicas_engines.append(replica_engine)
+
+    class CachingConfig(BaseConfig):
+        # Authorization, permissions and membership caches are invalidated only by process that commits changes,
+        # so on other processes terminated sessions, bans, revoked permissions and removed members keep working
+        # until cached entries expire. Their ttls are kept to few seconds for that reason.
+
+        # Number of authorized tokens each process keeps in memory (0 disables authorization cache)
+        auth_cache_size = IntVar(
+            "Quadrant/caching/auth_cache_size", composite_loader, default=10000, validator=lambda v: v >= 0
+        )
+        # Seconds after which cached authorization is checked in database again
+        auth_cache_ttl = IntVar(
+            "Quadrant/caching/auth_cache_ttl", composite_loader, default=5, validator=lambda v: v >= 0
+        )
+        # Number of servers which members permissions in channels each process keeps (0 disables permissions cache)
+        permissions_cache_servers = IntVar(
+            "Quadrant/caching/permissions_cache_servers", composite_loader, default=1000, validator=lambda v: v >= 0
+        )
+        # Seconds after which cached permissions are computed again
+        permissions_cache_ttl = IntVar(
+            "Quadrant/caching/permissions_cache_ttl", composite_loader, default=5, validator=lambda v: v >= 0
+        )
+        # Number of channels which members each process keeps in memory (0 disables membership index)
+        membership_cache_channels = IntVar(
+            "Quadrant/caching/membership_cache_channels", composite_loader, default=10000, validator=lambda v: v >= 0
+        )
+        # Channels with more members than that are always checked in database
+        membership_cache_max_members = IntVar(
+            "Quadrant/caching/membership_cache_max_members", composite_loader, default=10000,
+            validator=lambda v: v >= 1
+        )
+        # Seconds after which members of channel are loaded again
+        membership_cache_ttl = IntVar(
+            "Quadrant/caching/membership_cache_ttl", composite_loader, default=5, validator=lambda v: v >= 0
+        )
+        # Number of users relations lists each process keeps in memory (0 disables relations index)
+        relations_cache_lists = IntVar(
+            "Quadrant/caching/relations_cache_lists", composite_loader, default=10000, validator=lambda v: v >= 0
+        )
+        # Seconds after which relations list is loaded again
+        relations_cache_ttl = IntVar(
+            "Quadrant/caching/relations_cache_ttl", composite_loader, default=60, validator=lambda v: v >= 0
+        )
+        # Number of users public profiles kept encoded as json in memory (0 disables it)
+        serialized_users_cache_size = IntVar(
+            "Quadrant/caching/serialized_users_cache_size", composite_loader, default=50000,
+            validator=lambda v: v >= 0
+        )
+        # Query results cache regions with names of their backends, max number of results and ttl in seconds
+        regions = ConfigVar(
+            "Quadrant/caching/regions", yaml_loader, validator=lambda v: "default" in v,
+            default=defaults["Quadrant"]["caching"]["regions"]
+        )
+
+    class MessagesConfig(BaseConfig):
+        # Queues new messages and writes them with multi-row inserts instead of one transaction per message
+        batching_enabled = BoolVar("Quadrant/messages/batching_enabled", composite_loader, default=False)
+        # Max number of messages written with one insert
+        batch_max_size = IntVar(
+            "Quadrant/messages/batch_max_size", composite_loader, default=500, validator=lambda v: v >= 1
+        )
+        # Milliseconds first queued message waits for others before batch is written
+        batch_flush_interval_ms = IntVar(
+            "Quadrant/messages/batch_flush_interval_ms", composite_loader, default=5, validator=lambda v: v >= 0
+        )
+        # Number of channels which newest messages are kept in memory (0 disables messages window cache)
+        window_cache_channels = IntVar(
+            "Quadrant/messages/window_cache_channels", composite_loader, default=10000, validator=lambda v: v >= 0
+        )
+        # Number of newest messages kept for each channel
+        window_size = IntVar(
+            "Quadrant/messages/window_size", composite_loader, default=200, validator=lambda v: v >= 1
+        )
+        # Seconds after which window is loaded again, windows are updated only by messages changes of own process,
+        # so other processes see changes of channel history at most this late
+        window_cache_ttl = IntVar(
+            "Quadrant/messages/window_cache_ttl", composite_loader, default=5, validator=lambda v: v >= 0
+        )
+        # Days of messages in one partition of messages tables
+        partition_days = IntVar(
+            "Quadrant/messages/partition_days", composite_loader, default=7, validator=lambda v: v >= 1
+        )
+        # Number of partitions that are created before their period starts
+        partitions_ahead = IntVar(
+            "Quadrant/messages/partitions_ahead", composite_loader, default=2, validator=lambda v: v >= 1
+        )
+        # Days after which partitions with only older messages are dropped (0 keeps messages forever)
+        partitions_retention_days = IntVar(
+            "Quadrant/messages/partitions_retention_days", composite_loader, default=0, validator=lambda v: v >= 0
+        )
+        # Minutes between partitions creation and retention checks
+        partitions_maintenance_interval = IntVar(
+            "Quadrant/messages/partitions_maintenance_interval", composite_loader, default=10,
+            validator=lambda v: v >= 1
+        )
+
+    class IdsConfig(BaseConfig):
+        # Id of this process used in generated ids (--worker-id launch argument overrides it)
+        worker_id = IntVar("Quadrant/ids/worker_id", composite_loader, default=0, validator=lambda v: 0 <= v <= 1023)
+        # Moment from which timestamps of generated ids are counted, must never change
+        epoch = ConfigVar(
+            "Quadrant/ids/epoch", composite_loader, default="2021-01-01T00:00:00",
+            caster=datetime.fromisoformat, constant=True
+        )
+        # Milliseconds ids timestamps may run ahead of clock that moved backwards or of ids given too fast
+        # before ids generation fails
+        max_clock_drift_ms = IntVar(
+            "Quadrant/ids/max_clock_drift_ms", composite_loader, default=1000, validator=lambda v: v >= 0
+        )
+
+    class PresenceConfig(BaseConfig):
+        # Seconds without heartbeats after which user becomes offline
+        heartbeat_timeout = IntVar(
+            "Quadrant/presence/heartbeat_timeout", composite_loader, default=90, validator=lambda v: v >= 1
+        )
+        # Seconds between writes of changed users statuses to database
+        flush_interval = IntVar(
+            "Quadrant/presence/flush_interval", composite_loader, default=5, validator=lambda v: v >= 1
+        )
+
+    class FilesConfig(BaseConfig):
+        # Number of threads that write uploaded files to disk
+        io_workers = IntVar("Quadrant/files/io_workers", composite_loader, default=4, validator=lambda v: v >= 1)
+        # Minutes between removals of files contents that aren't used by any file
+        blobs_gc_interval = IntVar(
+            "Quadrant/files/blobs_gc_interval", composite_loader, default=60, validator=lambda v: v >= 1
+        )
+        # Minutes file content must stay unused before it's removed
+        blobs_gc_grace_period = IntVar(
+            "Quadrant/files/blobs_gc_grace_period", composite_loader, default=60, validator=lambda v: v >= 0
+        )
+        # Number of served files paths which validation results are kept in memory (0 disables caching)
+        stat_cache_size = IntVar(
+            "Quadrant/files/stat_cache_size", composite_loader, default=10000, validator=lambda v: v >= 0
+        )
+        # Seconds served file path validation result is kept in memory
+        stat_cache_ttl = IntVar(
+            "Quadrant/files/stat_cache_ttl", composite_loader, default=5, validator=lambda v: v >= 0
+        )
+        # Number of processes that resize images (0 means one for every cpu)
+        image_workers = IntVar(
+            "Quadrant/files/image_workers", composite_loader, default=0, validator=lambda v: v >= 0
+        )
+        # Max number of images waiting for processing, new images are rejected when it's reached
+        image_queue_size = IntVar(
+            "Quadrant/files/image_queue_size", composite_loader, default=64, validator=lambda v: v >= 1
+        )
+        # Max number of pixels of processed image, bigger images are rejected before they're decoded
+        image_max_pixels = IntVar(
+            "Quadrant/files/image_max_pixels", composite_loader, default=25_000_000, validator=lambda v: v >= 1
+        )
 
     class LoggingConfig(BaseConfig):
         logs_dir = ConfigVar(
@@ -131,6 +341,19 @@ class QuadrantConfig(BaseConfig):
             "Quadrant/security/cookie_secret", composite_loader, validator=lambda v: v != "EXAMPLE_COOKIE_SECRET"
         )
         default_host = ConfigVar("Quadrant/security/default_host", composite_loader)
+        # Scheme new passwords are hashed with: "scrypt:<n>:<r>:<p>" (memory hard) or "blake2b"
+        password_hashing_scheme = ConfigVar(
+            "Quadrant/security/password_hashing_scheme", composite_loader, default="scrypt:16384:8:1",
+            validator=lambda v: len(v) <= 32 and v.split(":")[0] in ("blake2b", "scrypt")
+        )
+        # Where passwords are hashed: "thread" or "process" pool or "inline" on event loop
+        hashing_executor = ConfigVar(
+            "Quadrant/security/hashing_executor", composite_loader, default="thread",
+            validator=lambda v: v in ("inline", "thread", "process")
+        )
+        hashing_workers = IntVar(
+            "Quadrant/security/hashing_workers", composite_loader, default=4, validator=lambda v: v >= 1
+        )
 
     class HttpChatServer:
         port = IntVar("Quadrant/http_chat_server/port", composite_loader, validator=lambda v: v in range(1, 65535+1))
@@ -143,8 +366,10 @@ class QuadrantConfig(BaseConfig):
         media_location.mkdir(exist_ok=True)
         self.uploads = (media_location / "uploads")
         self.profile_pictures = (media_location / "profile_pictures")
+        self.blobs = (media_location / "blobs")
         self.uploads.mkdir(exist_ok=True)
         self.profile_pictures.mkdir(exist_ok=True)
+        self.blobs.mkdir(exist_ok=True)
 
 
 quadrant_config = QuadrantConfig()
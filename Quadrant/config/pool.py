@@ -0,0 +1,174 @@
+from bisect import bisect_left
+from time import monotonic, perf_counter
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds of checkout latency histogram buckets in milliseconds
+CHECKOUT_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Counters of connections pool, which are kept while pool is recreated."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.overflow_adjustments = 0
+        self.checkout_wait_seconds = 0.0
+        # Last bucket counts checkouts slower than every bound
+        self.checkout_histogram = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.checkout_wait_seconds += seconds
+        self.checkout_histogram[bisect_left(CHECKOUT_BUCKETS_MS, seconds * 1000)] += 1
+
+    def listen(self, engine) -> None:
+        """
+        Counts connections opened and closed by engine pool.
+
+        :param engine: sync engine (async engine has it as sync_engine attribute).
+        :return: nothing.
+        """
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "close_detached", self._on_close)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, *_):
+        self.connects += 1
+
+    def _on_close(self, *_):
+        self.closes += 1
+
+    def _on_invalidate(self, *_):
+        self.invalidations += 1
+
+    def as_dict(self, pool: Optional["InstrumentedPoolMixin"] = None) -> dict:
+        metrics = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "closes": self.closes,
+            "invalidations": self.invalidations,
+            "overflow_adjustments": self.overflow_adjustments,
+            "checkout_wait_avg_ms": self.checkout_wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+            "checkout_histogram_ms": {
+                **{str(bound): count for bound, count in zip(CHECKOUT_BUCKETS_MS, self.checkout_histogram)},
+                "+inf": self.checkout_histogram[-1],
+            },
+        }
+
+        if pool is not None:
+            metrics.update({
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool.max_overflow,
+            })
+
+        return metrics
+
+
+class AdaptiveOverflow:
+    """
+    Grows overflow of pool while connections checkouts wait too long and shrinks it back when they don't.
+    Decision is made once per interval from average checkout wait during that interval.
+    """
+
+    def __init__(self, min_overflow: int, max_overflow: int, wait_threshold_ms: float, interval: float):
+        """
+        Initializes adaptive overflow.
+
+        :param min_overflow: overflow pool never shrinks below.
+        :param max_overflow: overflow pool never grows above.
+        :param wait_threshold_ms: average checkout wait after which overflow grows.
+        :param interval: seconds between decisions.
+        """
+        if not 0 <= min_overflow <= max_overflow:
+            raise ValueError("Invalid adaptive overflow limits")
+
+        self.min_overflow = min_overflow
+        self.max_overflow = max_overflow
+        self.wait_threshold_ms = wait_threshold_ms
+        self.interval = interval
+        self.step = max((max_overflow - min_overflow) // 5, 1)
+        self._interval_started_at = monotonic()
+        self._interval_checkouts = 0
+        self._interval_wait_seconds = 0.0
+
+    def record_checkout(self, pool: "InstrumentedPoolMixin", seconds: float) -> None:
+        self._interval_checkouts += 1
+        self._interval_wait_seconds += seconds
+
+        now = monotonic()
+        if now - self._interval_started_at < self.interval:
+            return
+
+        average_wait_ms = self._interval_wait_seconds / self._interval_checkouts * 1000
+        self._interval_started_at = now
+        self._interval_checkouts = 0
+        self._interval_wait_seconds = 0.0
+
+        max_overflow = pool.max_overflow
+        if average_wait_ms > self.wait_threshold_ms:
+            max_overflow = min(max_overflow + self.step, self.max_overflow)
+
+        elif average_wait_ms < self.wait_threshold_ms / 4:
+            # Overflow connections that are in use are closed when returned, so limit can be lowered anytime
+            max_overflow = max(max_overflow - self.step, self.min_overflow)
+
+        if max_overflow != pool.max_overflow:
+            pool.max_overflow = max_overflow
+            pool.metrics.overflow_adjustments += 1
+
+
+class InstrumentedPoolMixin:
+    """Makes queue pool measure how long connections checkouts wait and optionally adapt its overflow."""
+    metrics: PoolMetrics
+    adaptive_overflow: Optional[AdaptiveOverflow]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self.adaptive_overflow = None
+
+    @property
+    def max_overflow(self) -> int:
+        return self._max_overflow
+
+    @max_overflow.setter
+    def max_overflow(self, value: int) -> None:
+        self._max_overflow = value
+
+    def connect(self):
+        started_at = perf_counter()
+        try:
+            connection = super().connect()
+
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+
+        waited = perf_counter() - started_at
+        self.metrics.record_checkout(waited)
+        if self.adaptive_overflow is not None:
+            self.adaptive_overflow.record_checkout(self, waited)
+
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        pool.adaptive_overflow = self.adaptive_overflow
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,2 @@
+from .events_types import EventType
+from .hub import Event, EventsHub, EventsSubscriber, channel_topic, events_hub, presence_topic, user_topic
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class EventType(Enum):
+    message_created = "message_created"
+    message_edited = "message_edited"
+    message_deleted = "message_deleted"
+    user_status_updated = "user_status_updated"
+    relation_updated = "relation_updated"
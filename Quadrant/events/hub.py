@@ -0,0 +1,128 @@
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Optional, Protocol, Set, Tuple
+from uuid import UUID
+
+from tornado.log import app_log
+
+from Quadrant.resourses.utils.json_wrapper import JsonWrapper
+from .events_types import EventType
+
+
+class Event:
+    """
+    Represents event that is delivered to every subscriber of topic it was published in.
+    """
+    __slots__ = ("event_type", "payload", "_serialized")
+
+    def __init__(self, event_type: EventType, payload: Dict[str, Any]):
+        self.event_type = event_type
+        self.payload = payload
+        self._serialized: Optional[str] = None
+
+    @property
+    def serialized(self) -> str:
+        """Json representation of event that is made once no matter how many subscribers receive it."""
+        if self._serialized is None:
+            self._serialized = JsonWrapper.dumps({"event": self.event_type.value, "data": self.payload})
+
+        return self._serialized
+
+
+class EventsSubscriber(Protocol):
+    def send_event(self, event: Event) -> None:
+        """
+        Delivers event. Must not block, because it is called for every subscriber while publishing.
+
+        :param event: published event.
+        :return: nothing.
+        """
+        ...
+
+
+def channel_topic(channel_id: UUID) -> Tuple[str, UUID]:
+    """Topic of events happening in text channel."""
+    return "channel", channel_id
+
+
+def user_topic(user_id: UUID) -> Tuple[str, UUID]:
+    """Topic of events that only user itself must receive."""
+    return "user", user_id
+
+
+def presence_topic(user_id: UUID) -> Tuple[str, UUID]:
+    """Topic of users status updates that friends of user receive."""
+    return "presence", user_id
+
+
+class EventsHub:
+    """
+    In-process publish/subscribe hub that fans out events to subscribed gateway connections.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Hashable, Set[EventsSubscriber]] = defaultdict(set)
+        self._topics_of_subscriber: Dict[EventsSubscriber, Set[Hashable]] = defaultdict(set)
+
+    def subscribe(self, topic: Hashable, subscriber: EventsSubscriber) -> None:
+        self._subscribers[topic].add(subscriber)
+        self._topics_of_subscriber[subscriber].add(topic)
+
+    def unsubscribe(self, topic: Hashable, subscriber: EventsSubscriber) -> None:
+        topic_subscribers = self._subscribers.get(topic)
+        if topic_subscribers is not None:
+            topic_subscribers.discard(subscriber)
+            if not topic_subscribers:
+                del self._subscribers[topic]
+
+        subscriber_topics = self._topics_of_subscriber.get(subscriber)
+        if subscriber_topics is not None:
+            subscriber_topics.discard(topic)
+            if not subscriber_topics:
+                del self._topics_of_subscriber[subscriber]
+
+    def unsubscribe_all(self, subscriber: EventsSubscriber) -> None:
+        """
+        Removes subscriber from every topic (used when connection closes).
+
+        :param subscriber: subscriber to remove.
+        :return: nothing.
+        """
+        for topic in tuple(self._topics_of_subscriber.get(subscriber, ())):
+            self.unsubscribe(topic, subscriber)
+
+    def is_subscribed(self, topic: Hashable, subscriber: EventsSubscriber) -> bool:
+        return subscriber in self._subscribers.get(topic, ())
+
+    def subscribers_count(self, topic: Hashable) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+    def subscribers_of(self, topic: Hashable) -> Tuple[EventsSubscriber, ...]:
+        """Copy of topic subscribers, so they can unsubscribe while caller iterates over them."""
+        return tuple(self._subscribers.get(topic, ()))
+
+    def publish(self, topic: Hashable, event_type: EventType, payload: Dict[str, Any]) -> int:
+        """
+        Delivers event to every subscriber of topic.
+
+        :param topic: topic to publish in.
+        :param event_type: type of event.
+        :param payload: json serializable event data.
+        :return: number of subscribers that received event.
+        """
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return 0
+
+        event = Event(event_type, payload)
+        # Subscribers may unsubscribe while receiving event, so we iterate over a copy
+        for subscriber in tuple(subscribers):
+            try:
+                subscriber.send_event(event)
+
+            except Exception:  # noqa: one broken subscriber must not stop fan out to others
+                app_log.exception(f"Failed to deliver {event_type.value} event")
+
+        return len(subscribers)
+
+
+events_hub = EventsHub()
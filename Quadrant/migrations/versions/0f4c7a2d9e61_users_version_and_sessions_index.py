@@ -0,0 +1,29 @@
+"""Users rows versions and covering index of sessions pages
+
+Revision ID: 0f4c7a2d9e61
+Revises: 6e2b94d0a7f3
+Create Date: 2026-10-18 21:14:52.603117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f4c7a2d9e61'
+down_revision = '6e2b94d0a7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("users", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index(
+        "ix_users_sessions_user_id_is_alive_session_id", "users_sessions",
+        ["user_id", "is_alive", "session_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_users_sessions_user_id_is_alive_session_id", "users_sessions")
+    op.drop_column("users", "version")
@@ -0,0 +1,29 @@
+"""Hashing schemes of users passwords
+
+Revision ID: 3a81e5c6f2b0
+Revises: 0f4c7a2d9e61
+Create Date: 2026-10-18 21:31:08.914425
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a81e5c6f2b0'
+down_revision = '0f4c7a2d9e61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("users_auth", sa.Column("password_scheme", sa.String(32), nullable=True))
+    # Every password stored before schemes were introduced is hashed with blake2b,
+    # these hashes are upgraded to configured scheme on next login
+    op.execute("UPDATE users_auth SET password_scheme = 'blake2b' WHERE password_scheme IS NULL")
+    op.alter_column("users_auth", "password_scheme", nullable=False, server_default="blake2b")
+
+
+def downgrade():
+    # Passwords that were rehashed with other schemes won't match blake2b hashes after downgrade
+    op.drop_column("users_auth", "password_scheme")
@@ -0,0 +1,40 @@
+"""Full text search vectors of messages
+
+Revision ID: 5be0c83f1d29
+Revises: a93e6f0c4b17
+Create Date: 2026-10-18 17:24:05.918346
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5be0c83f1d29'
+down_revision = 'a93e6f0c4b17'
+branch_labels = None
+depends_on = None
+
+MESSAGES_TABLES = ("dm_messages", "group_messages")
+
+
+def upgrade():
+    for table_name in MESSAGES_TABLES:
+        # Column is added to every partition and filled for existing messages
+        op.add_column(
+            table_name,
+            sa.Column(
+                "search_vector", postgresql.TSVECTOR(),
+                sa.Computed("to_tsvector('simple', coalesce(text, ''))", persisted=True)
+            )
+        )
+        op.create_index(
+            f"ix_{table_name}_search_vector", table_name, ["search_vector"], postgresql_using="gin"
+        )
+
+
+def downgrade():
+    for table_name in MESSAGES_TABLES:
+        op.drop_index(f"ix_{table_name}_search_vector", table_name)
+        op.drop_column(table_name, "search_vector")
@@ -0,0 +1,29 @@
+"""Covering index of users relations lists
+
+Revision ID: 6e2b94d0a7f3
+Revises: 5be0c83f1d29
+Create Date: 2026-10-18 19:02:41.220874
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2b94d0a7f3'
+down_revision = '5be0c83f1d29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_users_relations_initiator_id_relation_status", "users_relations",
+        ["initiator_id", "relation_status", "relation_with_id"]
+    )
+    # New index starts with initiator_id, so it serves lookups by initiator too
+    op.drop_index("ix_users_relations_initiator_id", "users_relations")
+
+
+def downgrade():
+    op.create_index("ix_users_relations_initiator_id", "users_relations", ["initiator_id"])
+    op.drop_index("ix_users_relations_initiator_id_relation_status", "users_relations")
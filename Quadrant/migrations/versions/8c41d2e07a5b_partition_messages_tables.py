@@ -0,0 +1,83 @@
+"""Partition messages tables by message id
+
+Revision ID: 8c41d2e07a5b
+Revises: 
+Create Date: 2026-10-18 14:20:11.482913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '8c41d2e07a5b'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Messages tables and tables of their channels
+MESSAGES_TABLES = (("dm_messages", "dm_channels"), ("group_messages", "group_channels"))
+COLUMNS = "message_id, created_at, pinned, edited, text, channel_id, author_id, attached_file_id"
+# Partitions of this revision are ranges of sequence ids, later ids are partitioned by time
+PARTITION_SIZE = 10_000_000
+PARTITIONS_AHEAD = 2
+
+
+def messages_columns(table_name: str, channels_table_name: str):
+    return (
+        sa.Column(
+            "message_id", sa.BigInteger(), primary_key=True,
+            server_default=sa.text(f"nextval('{table_name}_message_id_seq')")
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("pinned", sa.Boolean(), nullable=False),
+        sa.Column("edited", sa.Boolean(), nullable=False),
+        sa.Column("text", sa.String(2000), nullable=True),
+        sa.Column(
+            "channel_id", postgresql.UUID(as_uuid=True),
+            sa.ForeignKey(f"{channels_table_name}.channel_id"), nullable=False
+        ),
+        sa.Column("author_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("attached_file_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("files.file_id"), nullable=True),
+    )
+
+
+def replace_table(table_name: str, channels_table_name: str, partitioned: bool):
+    old_table_name = f"{table_name}_old"
+    op.rename_table(table_name, old_table_name)
+    op.execute(f"ALTER TABLE {old_table_name} RENAME CONSTRAINT {table_name}_pkey TO {old_table_name}_pkey")
+    # Sequence is kept with all given ids, so messages ids never repeat
+    op.execute(f"ALTER SEQUENCE {table_name}_message_id_seq OWNED BY NONE")
+
+    if partitioned:
+        op.create_table(
+            table_name, *messages_columns(table_name, channels_table_name),
+            postgresql_partition_by="RANGE (message_id)"
+        )
+        last_message_id = op.get_bind().scalar(sa.text(f"SELECT last_value FROM {table_name}_message_id_seq"))
+        last_index = last_message_id // PARTITION_SIZE + PARTITIONS_AHEAD
+        for index in range(last_index + 1):
+            op.execute(
+                f"CREATE TABLE {table_name}_p{index} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ({index * PARTITION_SIZE}) TO ({(index + 1) * PARTITION_SIZE})"
+            )
+
+        op.create_index(f"ix_{table_name}_channel_id_message_id", table_name, ["channel_id", "message_id"])
+
+    else:
+        op.create_table(table_name, *messages_columns(table_name, channels_table_name))
+        op.create_index(f"ix_{table_name}_channel_id", table_name, ["channel_id"])
+
+    op.execute(f"INSERT INTO {table_name} ({COLUMNS}) SELECT {COLUMNS} FROM {old_table_name}")
+    op.drop_table(old_table_name)
+    op.execute(f"ALTER SEQUENCE {table_name}_message_id_seq OWNED BY {table_name}.message_id")
+
+
+def upgrade():
+    for table_name, channels_table_name in MESSAGES_TABLES:
+        replace_table(table_name, channels_table_name, partitioned=True)
+
+
+def downgrade():
+    for table_name, channels_table_name in MESSAGES_TABLES:
+        replace_table(table_name, channels_table_name, partitioned=False)
@@ -0,0 +1,40 @@
+"""Deduplicated blobs of uploaded files
+
+Revision ID: 9d15b3f7c482
+Revises: 3a81e5c6f2b0
+Create Date: 2026-10-18 21:47:26.330581
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d15b3f7c482'
+down_revision = '3a81e5c6f2b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_blobs",
+        sa.Column("content_hash", sa.String(64), primary_key=True),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("references_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("unreferenced_since", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_file_blobs_unreferenced_since", "file_blobs", ["unreferenced_since"])
+    # Files uploaded before blobs keep their own copies and have no blob
+    op.add_column(
+        "files", sa.Column("content_hash", sa.String(64), sa.ForeignKey("file_blobs.content_hash"), nullable=True)
+    )
+    op.create_index("ix_files_content_hash", "files", ["content_hash"])
+
+
+def downgrade():
+    op.drop_index("ix_files_content_hash", "files")
+    op.drop_column("files", "content_hash")
+    op.drop_index("ix_file_blobs_unreferenced_since", "file_blobs")
+    op.drop_table("file_blobs")
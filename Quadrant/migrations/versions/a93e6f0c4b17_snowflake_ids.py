@@ -0,0 +1,86 @@
+"""Generate ids in application instead of sequences
+
+Revision ID: a93e6f0c4b17
+Revises: d27f5e1a9c34
+Create Date: 2026-10-18 16:11:48.530127
+
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a93e6f0c4b17'
+down_revision = 'd27f5e1a9c34'
+branch_labels = None
+depends_on = None
+
+MESSAGES_TABLES = ("dm_messages", "group_messages")
+# Tables and their id columns that were filled from sequences
+IDS_COLUMNS = (
+    ("dm_messages", "message_id"), ("group_messages", "message_id"),
+    ("users_sessions", "session_id"), ("users_relations", "relation_id"),
+)
+# Layout of generated ids and partitions at moment of this revision (default ids epoch, partition_days
+# and partitions_ahead): milliseconds since epoch are shifted by worker id and sequence bits,
+# every partition keeps ids of PARTITION_PERIOD since epoch
+TIMESTAMP_SHIFT = 22
+EPOCH = datetime(2021, 1, 1)
+PARTITION_PERIOD = timedelta(days=7)
+PARTITIONS_AHEAD = 2
+
+
+def lowest_id_at(moment: datetime) -> int:
+    return max(int((moment - EPOCH).total_seconds() * 1000), 0) << TIMESTAMP_SHIFT
+
+
+def create_partition(table_name: str, index: int):
+    lower_bound = lowest_id_at(EPOCH + PARTITION_PERIOD * index)
+    upper_bound = lowest_id_at(EPOCH + PARTITION_PERIOD * (index + 1))
+    op.execute(
+        f"CREATE TABLE {table_name}_p{index} PARTITION OF {table_name} "
+        f"FOR VALUES FROM ({lower_bound}) TO ({upper_bound})"
+    )
+
+
+def partitions_names(table_name: str):
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT partition.relname FROM pg_inherits "
+            "JOIN pg_class AS partition ON partition.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table_name AS regclass)"
+        ),
+        {"table_name": table_name}
+    ).scalars().all()
+
+
+def upgrade():
+    for table_name in MESSAGES_TABLES:
+        # Partitions of sequence ids are kept with their messages, but aren't maintained by time anymore.
+        # Sequence ids are far below ids generated now, so they never get into these partitions
+        for partition_name in partitions_names(table_name):
+            if partition_name.startswith(f"{table_name}_p"):
+                op.rename_table(partition_name, partition_name.replace(f"{table_name}_p", f"{table_name}_legacy_p", 1))
+
+        current_index = (datetime.utcnow() - EPOCH) // PARTITION_PERIOD
+        for index in range(current_index, current_index + PARTITIONS_AHEAD + 1):
+            create_partition(table_name, index)
+
+    for table_name, column_name in IDS_COLUMNS:
+        op.alter_column(table_name, column_name, server_default=None)
+        op.execute(f"DROP SEQUENCE {table_name}_{column_name}_seq")
+
+
+def downgrade():
+    for table_name, column_name in IDS_COLUMNS:
+        sequence_name = f"{table_name}_{column_name}_seq"
+        op.execute(f"CREATE SEQUENCE {sequence_name} OWNED BY {table_name}.{column_name}")
+        op.execute(f"SELECT setval('{sequence_name}', COALESCE(MAX({column_name}), 0) + 1, false) FROM {table_name}")
+        op.alter_column(table_name, column_name, server_default=sa.text(f"nextval('{sequence_name}')"))
+
+    for table_name in MESSAGES_TABLES:
+        # Sequence continues after generated ids, so new messages go to partitions of time ranges
+        for partition_name in partitions_names(table_name):
+            if partition_name.startswith(f"{table_name}_legacy_p"):
+                op.rename_table(partition_name, partition_name.replace(f"{table_name}_legacy_p", f"{table_name}_p", 1))
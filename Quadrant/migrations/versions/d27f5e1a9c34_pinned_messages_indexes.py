@@ -0,0 +1,31 @@
+"""Partial indexes of pinned messages
+
+Revision ID: d27f5e1a9c34
+Revises: 8c41d2e07a5b
+Create Date: 2026-10-18 15:02:37.106254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd27f5e1a9c34'
+down_revision = '8c41d2e07a5b'
+branch_labels = None
+depends_on = None
+
+MESSAGES_TABLES = ("dm_messages", "group_messages")
+
+
+def upgrade():
+    for table_name in MESSAGES_TABLES:
+        op.create_index(
+            f"ix_{table_name}_pinned_channel_id_message_id", table_name, ["channel_id", "message_id"],
+            postgresql_where=sa.column("pinned").is_(True)
+        )
+
+
+def downgrade():
+    for table_name in MESSAGES_TABLES:
+        op.drop_index(f"ix_{table_name}_pinned_channel_id_message_id", table_name)
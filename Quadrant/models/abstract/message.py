@@ -2,17 +2,31 @@ from __future__ import annotations
 
 from contextlib import suppress
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, String, exc, select
-from sqlalchemy.orm import declared_attr, relationship
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Computed, DateTime, ForeignKey, Index, String, column, exc, func, select
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import declared_attr, deferred, relationship
 
+from Quadrant.config import quadrant_config
+from Quadrant.events import EventType, channel_topic, events_hub
 from Quadrant.models import users_package
 from Quadrant.models.db_init import Base
 from Quadrant.models.general import File
+from Quadrant.models.replicas import on_replica
+from Quadrant.models.utils.pagination import Keyset, KeysetPage
+from Quadrant.models.utils.snowflake import generate_snowflake, snowflake_generator
+from .messages_batcher import messages_batcher
+from .messages_window import messages_window_cache
+from .partitioning import PARTITION_BY_MESSAGE_ID
 
 MESSAGES_PER_REQUEST = 100
+SEARCH_RESULTS_PER_PAGE = 50
+# Messages are written in any language, so words are only lowercased without stemming
+SEARCH_CONFIGURATION = "simple"
 # TODO: add messages reactions
 
 
@@ -21,7 +35,8 @@ class ABCMessage(Base):
     Represents abstract message class that we inherit to create messages tables for other types of chats.
     """
     channel_id: Column
-    message_id = Column(BigInteger, primary_key=True)
+    # Ids are generated by app and ordered by time, so time ranges of messages are ranges of ids
+    message_id = Column(BigInteger, primary_key=True, autoincrement=False, default=generate_snowflake)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     pinned = Column(Boolean, default=False, nullable=False)
@@ -31,6 +46,30 @@ class ABCMessage(Base):
 
     __abstract__ = True
 
+    @declared_attr
+    def __table_args__(cls):
+        # History is always read by channel and ordered by message id, so partitions
+        # are scanned newest first and reading stops once enough messages are found
+        return (
+            Index(f"ix_{cls.__tablename__}_channel_id_message_id", "channel_id", "message_id"),
+            # Pinned messages are few, so they are found without walking through every message of channel.
+            # Condition is same as pinned only queries have, so postgres knows index can be used for them
+            Index(
+                f"ix_{cls.__tablename__}_pinned_channel_id_message_id", "channel_id", "message_id",
+                postgresql_where=column("pinned").is_(True)
+            ),
+            # Full text search looks up matching messages in this index and filters them by channel
+            Index(f"ix_{cls.__tablename__}_search_vector", "search_vector", postgresql_using="gin"),
+            PARTITION_BY_MESSAGE_ID,
+        )
+
+    @declared_attr
+    def search_vector(cls):
+        # Kept by postgres and never loaded with messages
+        return deferred(Column(
+            TSVECTOR, Computed(f"to_tsvector('{SEARCH_CONFIGURATION}', coalesce(text, ''))", persisted=True)
+        ))
+
     @declared_attr
     def channel_id(self):
         """
@@ -76,10 +115,11 @@ class ABCMessage(Base):
         :param text: message text that can be nothing (in case we have attached file) and not longer than 2000 symbols.
         :param attached_file_id: attached file instance.
         :param session: sqlalchemy session.
-        :return: new message instance if everything is correct.
+        :return: new message instance if everything is correct
+            (with batching enabled it isn't added to session and is returned once its batch is written).
         """
 
-        if not (await channel.is_member(channel.id, author, session=session)):
+        if not (await channel.is_member(channel.channel_id, author, session=session)):
             raise cls.common_exc.UserIsNotAMemberException("You're not a member of chat")
 
         # Raises exception if this participant can send a message
@@ -110,8 +150,24 @@ class ABCMessage(Base):
                 attached_file=attached_file
             )
 
-        session.add(new_message)
-        await session.commit()
+        new_message.message_id = generate_snowflake()
+        new_message.created_at = snowflake_generator.id_datetime(new_message.message_id)
+
+        if quadrant_config.MessagesConfig.batching_enabled.value:
+            # Columns defaults aren't applied to instances outside of session, so batch gets them filled
+            new_message.pinned = False
+            new_message.edited = False
+            if attached_file is not None:
+                new_message.attached_file_id = attached_file.file_id
+
+            await messages_batcher.submit(new_message, session.info.get("consistency_key"))
+
+        else:
+            session.add(new_message)
+            await session.commit()
+
+        messages_window_cache.message_added(new_message)
+        events_hub.publish(channel_topic(new_message.channel_id), EventType.message_created, new_message.as_dict())
 
         return new_message
 
@@ -127,7 +183,7 @@ class ABCMessage(Base):
         """
         query = select(cls).filter(
             cls.channel_id == channel_id,
-            message_id == message_id
+            cls.message_id == message_id
         )
         query_result = await session.execute(query)
         return query_result.scalar_one()
@@ -146,7 +202,7 @@ class ABCMessage(Base):
         """
         query = select(cls).filter(
             cls.channel_id == channel_id
-        ).order_by(cls.message_id.desc())
+        ).order_by(cls.message_id.desc()).limit(1)
 
         if select_pinned_only:
             query = query.filter(cls.pinned.is_(True))
@@ -155,18 +211,18 @@ class ABCMessage(Base):
         return query_result.scalar_one_or_none()
 
     @classmethod
-    async def get_messages_before(
-        cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False, *, session
-    ) -> Tuple[ABCMessage]:
+    def get_messages_before_query(cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False):
         """
-        Gives messages that came before specified messages on timeline. This doesn't includes a message we look from.
+        Generates query of messages that came before specified message, newest first.
 
         :param message_id: message id we want to start looking from.
         :param channel_id: channel id from which we request messages.
         :param select_pinned_only: flag that tells if we need to look up in pinned messages or not.
-        :param session: sqlalchemy session.
-        :return: messages that came before specified one.
+        :return: query.
         """
+        # Channel messages are read backwards from (channel_id, message_id) index (or its partial copy
+        # with pinned messages only), partitions with newer messages are pruned,
+        # and older ones are read only if newer don't have enough messages
         query = select(cls).filter(
             cls.channel_id == channel_id, cls.message_id < message_id
         ).limit(MESSAGES_PER_REQUEST).order_by(cls.message_id.desc())
@@ -174,22 +230,19 @@ class ABCMessage(Base):
         if select_pinned_only:
             query = query.filter(cls.pinned.is_(True))
 
-        query_result = await session.execute(query)
-        return query_result.scalars().all()
+        return query
 
     @classmethod
-    async def get_messages_after(
-        cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False, *, session
-    ) -> Tuple[ABCMessage]:
+    def get_messages_after_query(cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False):
         """
-        Gives messages that came after specified messages on timeline. This doesn't includes a message we look from.
+        Generates query of messages that came after specified message, newest first.
 
         :param message_id: message id we want to start looking from.
         :param channel_id: channel id from which we request messages.
         :param select_pinned_only: flag that tells if we need to look up in pinned messages or not.
-        :param session: sqlalchemy session.
-        :return: messages that came after specified one.
+        :return: query.
         """
+        # Partitions with messages older than message_id are pruned
         query = select(cls).filter(
             cls.channel_id == channel_id,
             cls.message_id > message_id
@@ -198,9 +251,205 @@ class ABCMessage(Base):
         if select_pinned_only:
             query = query.filter(cls.pinned.is_(True))
 
-        query_result = await session.execute(query)
+        return query
+
+    @classmethod
+    def get_messages_sent_between_query(cls, channel_id: UUID, since: datetime, until: datetime):
+        """
+        Gives query for messages sent in time range.
+
+        :param channel_id: channel id from which we request messages.
+        :param since: utc datetime of range start (included).
+        :param until: utc datetime of range end (excluded).
+        :return: sqlalchemy query.
+        """
+        # Time is encoded in ids, so range is found with primary key index and prunes partitions
+        return select(cls).filter(
+            cls.channel_id == channel_id,
+            cls.message_id >= snowflake_generator.lowest_id_at(since),
+            cls.message_id < snowflake_generator.lowest_id_at(until),
+        ).limit(MESSAGES_PER_REQUEST).order_by(cls.message_id.desc())
+
+    @classmethod
+    async def get_messages_sent_between(
+        cls, channel_id: UUID, since: datetime, until: datetime, *, session
+    ) -> List[ABCMessage]:
+        """
+        Gives newest messages sent in time range.
+
+        :param channel_id: channel id from which we request messages.
+        :param since: utc datetime of range start (included).
+        :param until: utc datetime of range end (excluded).
+        :param session: sqlalchemy session.
+        :return: list of messages.
+        """
+        query = cls.get_messages_sent_between_query(channel_id, since, until)
+        query_result = await session.execute(on_replica(query))
         return query_result.scalars().all()
 
+    @classmethod
+    def search_keyset(cls, search_query: str) -> Keyset:
+        """
+        Gives keyset ordering search results by relevance and then from newest to oldest.
+
+        :param search_query: text user searches for.
+        :return: keyset of search results rows.
+        """
+        rank = func.ts_rank(cls.search_vector, func.websearch_to_tsquery(SEARCH_CONFIGURATION, search_query))
+        return Keyset(
+            (rank, True), (cls.message_id, True),
+            row_values=lambda row: (row[1], row[0].message_id),
+            casters=(float, int)
+        )
+
+    @classmethod
+    def search_messages_query(
+        cls, search_query: str, channel_id: UUID, author_id: Optional[UUID] = None,
+        *, after: Optional[str] = None, before: Optional[str] = None
+    ):
+        """
+        Gives query for page of messages matching search query.
+
+        :param search_query: text user searches for (supports quotes, "or" and "-" for excluded words).
+        :param channel_id: channel id in which we search messages.
+        :param author_id: id of user whose messages we search (None searches messages of everyone).
+        :param after: cursor of page that goes before requested one.
+        :param before: cursor of page that goes after requested one.
+        :return: sqlalchemy query giving messages with their rank.
+        """
+        keyset = cls.search_keyset(search_query)
+        rank, _ = keyset.ordering[0]
+        query = select(cls, rank.label("rank")).filter(
+            cls.channel_id == channel_id,
+            cls.search_vector.op("@@")(func.websearch_to_tsquery(SEARCH_CONFIGURATION, search_query))
+        )
+        if author_id is not None:
+            query = query.filter(cls.author_id == author_id)
+
+        return keyset.paginate(query, SEARCH_RESULTS_PER_PAGE, after=after, before=before)
+
+    @classmethod
+    async def search_messages(
+        cls, search_query: str, channel_id: UUID, author_id: Optional[UUID] = None,
+        *, after: Optional[str] = None, before: Optional[str] = None, session
+    ) -> KeysetPage:
+        """
+        Gives page of messages matching search query, most relevant first.
+
+        :param search_query: text user searches for (supports quotes, "or" and "-" for excluded words).
+        :param channel_id: channel id in which we search messages.
+        :param author_id: id of user whose messages we search (None searches messages of everyone).
+        :param after: cursor of page that goes before requested one.
+        :param before: cursor of page that goes after requested one.
+        :param session: sqlalchemy session.
+        :return: list of messages with cursors of neighbour pages (raises ValueError if query or cursor is invalid).
+        """
+        if not search_query.strip():
+            raise ValueError("Search query is empty")
+
+        query = cls.search_messages_query(search_query, channel_id, author_id, after=after, before=before)
+        query_result = await session.execute(on_replica(query))
+        page = cls.search_keyset(search_query).make_page(
+            query_result.all(), SEARCH_RESULTS_PER_PAGE, after=after, before=before
+        )
+        return KeysetPage([message for message, _ in page], after=page.after, before=page.before)
+
+    @classmethod
+    async def get_messages_before(
+        cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False, *, session
+    ) -> Tuple[ABCMessage]:
+        """
+        Gives messages that came before specified messages on timeline. This doesn't includes a message we look from.
+
+        :param message_id: message id we want to start looking from.
+        :param channel_id: channel id from which we request messages.
+        :param select_pinned_only: flag that tells if we need to look up in pinned messages or not.
+        :param session: sqlalchemy session.
+        :return: messages that came before specified one.
+        """
+        query = cls.get_messages_before_query(message_id, channel_id, select_pinned_only)
+        query_result = await session.execute(on_replica(query))
+        return query_result.scalars().all()
+
+    @classmethod
+    async def get_messages_after(
+        cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False, *, session
+    ) -> Tuple[ABCMessage]:
+        """
+        Gives messages that came after specified messages on timeline. This doesn't includes a message we look from.
+
+        :param message_id: message id we want to start looking from.
+        :param channel_id: channel id from which we request messages.
+        :param select_pinned_only: flag that tells if we need to look up in pinned messages or not.
+        :param session: sqlalchemy session.
+        :return: messages that came after specified one.
+        """
+        query = cls.get_messages_after_query(message_id, channel_id, select_pinned_only)
+        query_result = await session.execute(on_replica(query))
+        return query_result.scalars().all()
+
+    @classmethod
+    async def get_last_message_as_dict(cls, channel_id: UUID, *, session) -> Optional[Dict[str, Any]]:
+        """
+        Gives latest message serialized with as_dict, using channel messages window if possible.
+
+        :param channel_id: channel id from which we request message.
+        :param session: sqlalchemy session.
+        :return: serialized message or None.
+        """
+        if not messages_window_cache.enabled:
+            message = await cls.get_last_message(channel_id, session=session)
+            return message.as_dict() if message is not None else None
+
+        window = await messages_window_cache.get_window(cls, channel_id, session=session)
+        return window.last()
+
+    @classmethod
+    async def get_messages_before_as_dicts(
+        cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False, *, session
+    ) -> List[Dict[str, Any]]:
+        """
+        Same as get_messages_before, but gives serialized messages and serves them from channel messages window
+        when requested range is inside of it.
+
+        :param message_id: message id we want to start looking from.
+        :param channel_id: channel id from which we request messages.
+        :param select_pinned_only: flag that tells if we need to look up in pinned messages or not.
+        :param session: sqlalchemy session.
+        :return: serialized messages that came before specified one.
+        """
+        if messages_window_cache.enabled and not select_pinned_only:
+            window = await messages_window_cache.get_window(cls, channel_id, session=session)
+            messages = window.before(message_id, MESSAGES_PER_REQUEST)
+            if messages is not None:
+                return messages
+
+        messages = await cls.get_messages_before(message_id, channel_id, select_pinned_only, session=session)
+        return [message.as_dict() for message in messages]
+
+    @classmethod
+    async def get_messages_after_as_dicts(
+        cls, message_id: int, channel_id: UUID, select_pinned_only: bool = False, *, session
+    ) -> List[Dict[str, Any]]:
+        """
+        Same as get_messages_after, but gives serialized messages and serves them from channel messages window
+        when requested range is inside of it.
+
+        :param message_id: message id we want to start looking from.
+        :param channel_id: channel id from which we request messages.
+        :param select_pinned_only: flag that tells if we need to look up in pinned messages or not.
+        :param session: sqlalchemy session.
+        :return: serialized messages that came after specified one.
+        """
+        if messages_window_cache.enabled and not select_pinned_only:
+            window = await messages_window_cache.get_window(cls, channel_id, session=session)
+            messages = window.after(message_id, MESSAGES_PER_REQUEST)
+            if messages is not None:
+                return messages
+
+        messages = await cls.get_messages_after(message_id, channel_id, select_pinned_only, session=session)
+        return [message.as_dict() for message in messages]
+
     async def delete_message_by_author(self, delete_by: users_package.User, *, session) -> None:
         """
         Deletes message that been sent by exact participant.
@@ -212,8 +461,9 @@ class ABCMessage(Base):
         if self.author_id != delete_by.id:
             raise PermissionError("User tries to edit message even if he's not an author")
 
-        session.delete(self)
+        await session.delete(self)
         await session.commit()
+        self.notify_deleted()
 
     async def edit_message(self, new_text: str, edit_by: users_package.User, *, session) -> None:
         """
@@ -234,6 +484,8 @@ class ABCMessage(Base):
         self.edited = True
         self.text = new_text
         await session.commit()
+        messages_window_cache.message_changed(self)
+        events_hub.publish(channel_topic(self.channel_id), EventType.message_edited, self.as_dict())
 
     async def pin_message(self, *, session) -> None:
         """
@@ -248,6 +500,7 @@ class ABCMessage(Base):
 
         self.pinned = True
         await session.commit()
+        messages_window_cache.message_changed(self)
 
     async def unpin_message(self, *, session) -> None:
         """
@@ -262,6 +515,28 @@ class ABCMessage(Base):
 
         self.pinned = False
         await session.commit()
+        messages_window_cache.message_changed(self)
+
+    def as_dict(self) -> dict:
+        return {
+            # Ids are above 2^53, so they're given as strings that javascript clients don't round
+            "message_id": str(self.message_id),
+            "channel_id": self.channel_id,
+            "author_id": self.author_id,
+            "created_at": self.created_at,
+            "pinned": self.pinned,
+            "edited": self.edited,
+            "text": self.text,
+            "attached_file_id": self.attached_file_id,
+        }
+
+    def notify_deleted(self) -> None:
+        """Removes deleted message from channel window and notifies channel subscribers."""
+        messages_window_cache.message_removed(self)
+        events_hub.publish(
+            channel_topic(self.channel_id), EventType.message_deleted,
+            {"message_id": str(self.message_id), "channel_id": self.channel_id}
+        )
 
     class common_exc:
         class UserIsNotAMemberException(PermissionError):
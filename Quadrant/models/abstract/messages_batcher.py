@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Type
+
+from sqlalchemy import inspect, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from tornado.log import app_log
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.db_init import Session
+from Quadrant.models.replicas import replica_set
+from Quadrant.models.utils.snowflake import generate_snowflake
+
+if TYPE_CHECKING:
+    from .message import ABCMessage
+
+# Message, consistency key of its author and future of its sender
+PendingMessage = Tuple["ABCMessage", Optional[Hashable], asyncio.Future]
+
+
+class MessagesBatcher:
+    """
+    Write-behind queue of new messages. Messages get their ids right away, wait in queue for other messages
+    of same table and are written with one multi-row insert in one transaction.
+    Message sender gets message back only when batch with it is committed, and authors of written messages
+    read from replicas that already have them.
+    """
+
+    def __init__(
+        self, max_batch_size: int, flush_interval_ms: int,
+        id_generator: Callable[[], int] = generate_snowflake, session_factory=Session
+    ):
+        """
+        Initializes batcher.
+
+        :param max_batch_size: number of queued messages after which batch is written right away.
+        :param flush_interval_ms: milliseconds first queued message waits for others.
+        :param id_generator: function giving new messages ids.
+        :param session_factory: sqlalchemy async sessions maker.
+        """
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.id_generator = id_generator
+        self.session_factory = session_factory
+
+        self._pending: Dict[Type[ABCMessage], List[PendingMessage]] = defaultdict(list)
+        self._flush_timers: Dict[Type[ABCMessage], asyncio.TimerHandle] = {}
+        self._writing: Set[asyncio.Task] = set()
+
+    async def submit(self, message: ABCMessage, consistency_key: Optional[Hashable] = None) -> ABCMessage:
+        """
+        Queues message and waits until it is written.
+
+        :param message: new message instance that isn't added to any session.
+        :param consistency_key: key of author (like session.info["consistency_key"]) whose reads must see message.
+        :return: same message with id (raises exception if it wasn't written).
+        """
+        message_class = type(message)
+        if message.message_id is None:
+            message.message_id = self.id_generator()
+
+        future = asyncio.get_event_loop().create_future()
+        batch = self._pending[message_class]
+        batch.append((message, consistency_key, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._start_writing(message_class)
+
+        elif message_class not in self._flush_timers:
+            self._flush_timers[message_class] = asyncio.get_event_loop().call_later(
+                self.flush_interval, self._start_writing, message_class
+            )
+
+        return await future
+
+    async def flush(self) -> None:
+        """Writes every queued message and waits for all batches that are being written."""
+        for message_class in tuple(self._pending):
+            self._start_writing(message_class)
+
+        if self._writing:
+            await asyncio.gather(*self._writing, return_exceptions=True)
+
+    def _start_writing(self, message_class: Type[ABCMessage]) -> None:
+        timer = self._flush_timers.pop(message_class, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(message_class, None)
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._write_batch(message_class, batch))
+        self._writing.add(task)
+        task.add_done_callback(self._writing.discard)
+
+    async def _write_batch(self, message_class: Type[ABCMessage], batch: List[PendingMessage]) -> None:
+        try:
+            await self._insert_rows(message_class, [self._message_row(message) for message, _, _ in batch])
+
+        except (IntegrityError, DataError):
+            # Some message broke constraints or has invalid values, so every message is written separately
+            # to fail only broken ones (other errors like lost connection fail whole batch)
+            await self._write_separately(message_class, batch)
+            return
+
+        except Exception as err:
+            app_log.exception("Failed to write messages batch")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+
+            return
+
+        self._mark_writes(consistency_key for _, consistency_key, _ in batch)
+        for message, _, future in batch:
+            if not future.done():
+                future.set_result(message)
+
+    async def _write_separately(self, message_class: Type[ABCMessage], batch: List[PendingMessage]) -> None:
+        for message, consistency_key, future in batch:
+            try:
+                await self._insert_rows(message_class, [self._message_row(message)])
+
+            except Exception as err:
+                if not future.done():
+                    future.set_exception(err)
+
+            else:
+                self._mark_writes((consistency_key, ))
+                if not future.done():
+                    future.set_result(message)
+
+    @staticmethod
+    def _mark_writes(consistency_keys: Iterable[Optional[Hashable]]) -> None:
+        # Batch session is shared by many authors, so their writes are marked after commit instead of by session
+        for consistency_key in set(consistency_keys):
+            if consistency_key is not None:
+                replica_set.mark_write(consistency_key)
+
+    @staticmethod
+    def _message_row(message: ABCMessage) -> Dict[str, Any]:
+        # Generated columns are filled by database
+        return {
+            column_attr.columns[0].name: getattr(message, column_attr.key)
+            for column_attr in inspect(type(message)).column_attrs
+            if column_attr.columns[0].computed is None
+        }
+
+    async def _insert_rows(self, message_class: Type[ABCMessage], rows: List[Dict[str, Any]]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(message_class.__table__).values(rows))
+            await session.commit()
+
+
+messages_batcher = MessagesBatcher(
+    quadrant_config.MessagesConfig.batch_max_size.value,
+    quadrant_config.MessagesConfig.batch_flush_interval_ms.value,
+)
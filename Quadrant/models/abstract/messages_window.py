@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Type
+from uuid import UUID
+
+from sqlalchemy import select
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from .message import ABCMessage
+
+
+class MessagesWindow:
+    """
+    Newest messages of one channel serialized with as_dict and sorted by id
+    (serialized messages have string ids, so ids are kept as ints separately).
+    Window always ends with newest message of channel, so any range that starts inside of it is complete.
+    """
+    __slots__ = ("ids", "messages", "capacity", "covers_start")
+
+    def __init__(self, messages: List[Dict[str, Any]], capacity: int, covers_start: bool):
+        """
+        Initializes window.
+
+        :param messages: serialized messages sorted by id ascending.
+        :param capacity: max number of messages window keeps.
+        :param covers_start: flag that shows that channel has no messages older than ones in window.
+        """
+        self.ids: List[int] = [int(message["message_id"]) for message in messages]
+        self.messages = messages
+        self.capacity = capacity
+        self.covers_start = covers_start
+
+    def add(self, message: Dict[str, Any]) -> None:
+        message_id = int(message["message_id"])
+        position = bisect_left(self.ids, message_id)
+
+        if position < len(self.ids) and self.ids[position] == message_id:
+            self.messages[position] = message
+            return
+
+        if position == 0 and not self.covers_start and self.ids:
+            # Message is older than window and we don't know what's between them
+            return
+
+        self.ids.insert(position, message_id)
+        self.messages.insert(position, message)
+
+        if len(self.ids) > self.capacity:
+            del self.ids[0]
+            del self.messages[0]
+            self.covers_start = False
+
+    def replace(self, message: Dict[str, Any]) -> None:
+        message_id = int(message["message_id"])
+        position = bisect_left(self.ids, message_id)
+        if position < len(self.ids) and self.ids[position] == message_id:
+            self.messages[position] = message
+
+    def remove(self, message_id: int) -> None:
+        position = bisect_left(self.ids, message_id)
+        if position < len(self.ids) and self.ids[position] == message_id:
+            del self.ids[position]
+            del self.messages[position]
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        if self.messages:
+            return self.messages[-1]
+
+        return None
+
+    def before(self, message_id: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Gives up to limit newest messages older than message_id, newest first.
+
+        :param message_id: id to look from (not included).
+        :param limit: max number of messages.
+        :return: messages or None if window doesn't have enough messages to answer.
+        """
+        end = bisect_left(self.ids, message_id)
+        if end < limit and not self.covers_start:
+            return None
+
+        return self.messages[max(end - limit, 0):end][::-1]
+
+    def after(self, message_id: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Gives up to limit newest messages that are newer than message_id, newest first.
+
+        :param message_id: id to look from (not included).
+        :param limit: max number of messages.
+        :return: messages or None if window doesn't have enough messages to answer.
+        """
+        if not self.covers_start and (not self.ids or message_id < self.ids[0]):
+            # Messages between message_id and window start might exist
+            return None
+
+        start = max(bisect_right(self.ids, message_id), len(self.ids) - limit)
+        return self.messages[start:][::-1]
+
+
+class MessagesWindowCache:
+    """
+    Keeps windows of newest messages for recently opened channels, so channel history is served from memory.
+    Windows are kept coherent by messages methods of this process, so every process has its own windows
+    and they live at most ttl seconds, which bounds how late changes made by other processes are seen.
+    """
+
+    def __init__(self, max_channels: int, window_size: int, ttl: float):
+        """
+        Initializes cache.
+
+        :param max_channels: max number of channels windows kept (least recently used are evicted).
+        :param window_size: number of newest messages kept for each channel.
+        :param ttl: seconds after which window is loaded again.
+        """
+        self.window_size = window_size
+        self._windows = TTLCache(max_channels, ttl)
+        # Windows that are being loaded and flags if their messages changed while loading
+        self._loading: Dict[Hashable, bool] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._windows.max_size > 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self._windows.hit_rate
+
+    @staticmethod
+    def _key(message_class: Type[ABCMessage], channel_id: UUID) -> Hashable:
+        return message_class.__tablename__, channel_id
+
+    async def get_window(self, message_class: Type[ABCMessage], channel_id: UUID, *, session) -> MessagesWindow:
+        """
+        Gives window of channel loading it from database if needed.
+
+        :param message_class: messages class of channel.
+        :param channel_id: channel id.
+        :param session: sqlalchemy session.
+        :return: window of newest messages.
+        """
+        key = self._key(message_class, channel_id)
+        window = self._windows.get(key)
+        if window is not None:
+            return window
+
+        self._loading[key] = False
+        query = select(message_class).filter(
+            message_class.channel_id == channel_id
+        ).order_by(message_class.message_id.desc()).limit(self.window_size)
+        query_result = await session.execute(query)
+        messages = [message.as_dict() for message in reversed(query_result.scalars().all())]
+
+        window = MessagesWindow(messages, self.window_size, covers_start=len(messages) < self.window_size)
+        changed_while_loading = self._loading.pop(key, True)
+        if not changed_while_loading:
+            self._windows.set(key, window)
+
+        return window
+
+    def _changed_window(self, message: ABCMessage) -> Optional[MessagesWindow]:
+        key = self._key(type(message), message.channel_id)
+        if key in self._loading:
+            self._loading[key] = True
+
+        return self._windows.peek(key)
+
+    def message_added(self, message: ABCMessage) -> None:
+        window = self._changed_window(message)
+        if window is not None:
+            window.add(message.as_dict())
+
+    def message_changed(self, message: ABCMessage) -> None:
+        window = self._changed_window(message)
+        if window is not None:
+            window.replace(message.as_dict())
+
+    def message_removed(self, message: ABCMessage) -> None:
+        window = self._changed_window(message)
+        if window is not None:
+            window.remove(message.message_id)
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+
+messages_window_cache = MessagesWindowCache(
+    quadrant_config.MessagesConfig.window_cache_channels.value,
+    quadrant_config.MessagesConfig.window_size.value,
+    quadrant_config.MessagesConfig.window_cache_ttl.value,
+)
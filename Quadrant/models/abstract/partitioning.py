@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from tornado.log import app_log
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.utils.snowflake import SnowflakeGenerator, snowflake_generator
+
+if TYPE_CHECKING:
+    from .message import ABCMessage
+
+# Partitioned tables are declared with this table args, partitions are created by MessagesPartitioning
+PARTITION_BY_MESSAGE_ID = {"postgresql_partition_by": "RANGE (message_id)"}
+
+
+class MessagesPartitioning:
+    """
+    Range partitioning of messages tables by message_id. Message ids are snowflakes ordered by time,
+    so every partition keeps messages of one period: queries that filter by message_id scan only partitions
+    with matching ids, vacuum works with small partitions, and old messages are removed by dropping partitions
+    instead of deleting rows. Partition with index N keeps messages sent during N-th period since ids epoch.
+    """
+
+    def __init__(
+        self, ids_generator: SnowflakeGenerator, period: timedelta, partitions_ahead: int,
+        retention: Optional[timedelta] = None
+    ):
+        """
+        Initializes partitioning.
+
+        :param ids_generator: generator of messages ids.
+        :param period: time period of messages in one partition.
+        :param partitions_ahead: number of partitions kept created after one being filled now.
+        :param retention: age after which partition with older messages is dropped (None keeps all).
+        """
+        self.ids_generator = ids_generator
+        self.period = period
+        self.partitions_ahead = partitions_ahead
+        self.retention = retention
+        self.message_classes: Dict[str, Type[ABCMessage]] = {}
+
+    def register(self, message_class: Type[ABCMessage]) -> None:
+        """
+        Makes partitions of messages table to be created with it and maintained.
+
+        :param message_class: messages model with partitioned table.
+        :return: nothing.
+        """
+        self.message_classes[message_class.__tablename__] = message_class
+        event.listen(message_class.__table__, "after_create", self._create_first_partitions)
+
+    def partition_name(self, table_name: str, index: int) -> str:
+        return f"{table_name}_p{index}"
+
+    def partition_index(self, moment: datetime) -> int:
+        return (moment - self.ids_generator.epoch) // self.period
+
+    def partition_start(self, index: int) -> datetime:
+        return self.ids_generator.epoch + self.period * index
+
+    def partition_bounds(self, index: int) -> Tuple[int, int]:
+        return (
+            self.ids_generator.lowest_id_at(self.partition_start(index)),
+            self.ids_generator.lowest_id_at(self.partition_start(index + 1)),
+        )
+
+    def create_partition_statement(self, table_name: str, index: int):
+        lower_bound, upper_bound = self.partition_bounds(index)
+        return text(
+            f"CREATE TABLE IF NOT EXISTS {self.partition_name(table_name, index)} PARTITION OF {table_name} "
+            f"FOR VALUES FROM ({lower_bound}) TO ({upper_bound})"
+        )
+
+    def upcoming_partitions(self) -> range:
+        current_index = self.partition_index(datetime.utcnow())
+        return range(current_index, current_index + self.partitions_ahead + 1)
+
+    def _create_first_partitions(self, table, connection, **_) -> None:
+        for index in self.upcoming_partitions():
+            connection.execute(self.create_partition_statement(table.name, index))
+
+    async def partitions_indexes(self, connection: AsyncConnection, table_name: str) -> List[int]:
+        """
+        Gives indexes of existing partitions of table.
+
+        :param connection: database connection.
+        :param table_name: partitioned table name.
+        :return: sorted partitions indexes.
+        """
+        result = await connection.execute(
+            text(
+                "SELECT partition.relname FROM pg_inherits "
+                "JOIN pg_class AS partition ON partition.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = CAST(:table_name AS regclass)"
+            ),
+            {"table_name": table_name}
+        )
+        prefix = f"{table_name}_p"
+        return sorted(
+            int(name[len(prefix):]) for name in result.scalars()
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+        )
+
+    async def create_partitions(self, connection: AsyncConnection, table_name: str) -> List[int]:
+        """
+        Creates partitions for messages that will be sent soon.
+
+        :param connection: database connection.
+        :param table_name: partitioned table name.
+        :return: indexes of created partitions.
+        """
+        existing = set(await self.partitions_indexes(connection, table_name))
+
+        created = []
+        for index in self.upcoming_partitions():
+            if index not in existing:
+                await connection.execute(self.create_partition_statement(table_name, index))
+                created.append(index)
+
+        return created
+
+    async def drop_expired_partitions(self, connection: AsyncConnection, table_name: str) -> List[int]:
+        """
+        Drops partitions which period has ended before retention period.
+
+        :param connection: database connection.
+        :param table_name: partitioned table name.
+        :return: indexes of dropped partitions.
+        """
+        if self.retention is None:
+            return []
+
+        expire_before = datetime.utcnow() - self.retention
+
+        dropped = []
+        for index in await self.partitions_indexes(connection, table_name):
+            if self.partition_start(index + 1) > expire_before:
+                break
+
+            partition_name = self.partition_name(table_name, index)
+            await connection.execute(text(f"ALTER TABLE {table_name} DETACH PARTITION {partition_name}"))
+            await connection.execute(text(f"DROP TABLE {partition_name}"))
+            dropped.append(index)
+
+        return dropped
+
+    async def maintain(self) -> None:
+        """
+        Creates upcoming partitions and drops expired ones for every registered table.
+
+        :return: nothing.
+        """
+        for table_name in self.message_classes:
+            async with quadrant_config.DBConfig.async_base_engine.begin() as connection:
+                created = await self.create_partitions(connection, table_name)
+                dropped = await self.drop_expired_partitions(connection, table_name)
+
+            if created or dropped:
+                app_log.info(f"Partitions of {table_name}: created {created}, dropped {dropped}")
+
+
+messages_partitioning = MessagesPartitioning(
+    snowflake_generator,
+    timedelta(days=quadrant_config.MessagesConfig.partition_days.value),
+    quadrant_config.MessagesConfig.partitions_ahead.value,
+    timedelta(days=quadrant_config.MessagesConfig.partitions_retention_days.value)
+    if quadrant_config.MessagesConfig.partitions_retention_days.value else None,
+)
@@ -0,0 +1,6 @@
+from Quadrant.config import quadrant_config
+from .backends import CacheBackend, MemoryLRUBackend, SharedMemoryBackend, register_backend
+from .orm_cache import FromCache, orm_cache
+from .regions import CacheRegion, configure_regions, invalidate_region, regions, remove_region
+
+configure_regions(quadrant_config.CachingConfig.regions.value)
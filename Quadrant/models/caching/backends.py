@@ -0,0 +1,149 @@
+from time import monotonic
+from typing import Any, Dict, Hashable, Optional, Type
+
+from Quadrant.models.utils.ttl_cache import TTLCache
+
+_missing = object()
+
+
+class CacheBackend:
+    """
+    Represents storage that keeps cached values of one region.
+    Custom backends must be registered with register_backend to be usable from config.
+    """
+    missing = _missing
+
+    def __init__(self, region_name: str, max_size: int, ttl: Optional[float]):
+        """
+        Initializes storage for region.
+
+        :param region_name: name of region that uses this backend.
+        :param max_size: max number of values region keeps.
+        :param ttl: seconds after which cached value is expired (None means it never expires).
+        """
+        self.region_name = region_name
+        self.max_size = max_size
+        self.ttl = ttl
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Gives cached value.
+
+        :param key: cache key.
+        :return: cached value or CacheBackend.missing.
+        """
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Removes every value of region."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Frees storage of region that isn't used anymore."""
+        self.clear()
+
+
+class MemoryLRUBackend(CacheBackend):
+    """
+    Keeps regions values in its own LRU storage, so regions never evict values of each other.
+    """
+
+    def __init__(self, region_name: str, max_size: int, ttl: Optional[float]):
+        super().__init__(region_name, max_size, ttl)
+        self._storage = TTLCache(max_size, ttl)
+
+    def get(self, key: Hashable) -> Any:
+        return self._storage.get(key, _missing)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._storage.set(key, value)
+
+    def delete(self, key: Hashable) -> None:
+        self._storage.pop(key)
+
+    def clear(self) -> None:
+        self._storage.clear()
+
+
+class SharedMemoryBackend(CacheBackend):
+    """
+    Keeps values of all regions using this backend in one process wide LRU storage.
+    Storage size is a sum of sizes of open regions, so busy regions can use space that idle regions don't need.
+    Each region still keeps its own ttl. Region that is created again with same name replaces old one,
+    and closed region takes its values and space away from storage.
+    """
+    _storage = TTLCache(max_size=0)
+    _regions: Dict[str, "SharedMemoryBackend"] = {}
+
+    def __init__(self, region_name: str, max_size: int, ttl: Optional[float]):
+        super().__init__(region_name, max_size, ttl)
+        previous_backend = self._regions.get(region_name)
+        if previous_backend is not None:
+            previous_backend.close()
+
+        self._regions[region_name] = self
+        self._resize_storage()
+
+    @classmethod
+    def _resize_storage(cls) -> None:
+        cls._storage.resize(sum(backend.max_size for backend in cls._regions.values()))
+
+    def get(self, key: Hashable) -> Any:
+        key = (self.region_name, key)
+        expires_at, value = self._storage.get(key, (None, _missing))
+
+        if expires_at is not None and monotonic() > expires_at:
+            self._storage.pop(key)
+            return _missing
+
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self._regions.get(self.region_name) is not self:
+            # Closed region would put values into storage of region that replaced it
+            return
+
+        expires_at = None
+        if self.ttl is not None:
+            expires_at = monotonic() + self.ttl
+
+        self._storage.set((self.region_name, key), (expires_at, value))
+
+    def delete(self, key: Hashable) -> None:
+        self._storage.pop((self.region_name, key))
+
+    def clear(self) -> None:
+        for key, _ in self._storage.items():
+            if key[0] == self.region_name:
+                self._storage.pop(key)
+
+    def close(self) -> None:
+        if self._regions.get(self.region_name) is not self:
+            return
+
+        self.clear()
+        del self._regions[self.region_name]
+        self._resize_storage()
+
+
+backends: Dict[str, Type[CacheBackend]] = {
+    "memory": MemoryLRUBackend,
+    "shared": SharedMemoryBackend,
+}
+
+
+def register_backend(name: str, backend: Type[CacheBackend]) -> None:
+    """
+    Makes backend usable in regions config.
+
+    :param name: name that is used in config.
+    :param backend: CacheBackend subclass.
+    :return: nothing.
+    """
+    backends[name] = backend
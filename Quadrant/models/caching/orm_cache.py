@@ -0,0 +1,100 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, loading
+from sqlalchemy.orm.interfaces import UserDefinedOption
+from sqlalchemy.sql import Executable
+
+from .backends import CacheBackend
+from .regions import regions
+
+
+class FromCache(UserDefinedOption):
+    """
+    Query option that makes select results to be stored in and loaded from cache region.
+    Loaded instances are merged into session without checking database, so use it only for rarely changing data
+    and invalidate cache when it changes.
+    """
+    propagate_to_loaders = False
+
+    def __init__(self, region: str = "default", cache_key: Optional[str] = None):
+        """
+        Initializes option.
+
+        :param region: name of cache region.
+        :param cache_key: additional key part that allows caching same query separately.
+        """
+        self.region = region
+        self.cache_key = cache_key
+
+    def _gen_cache_key(self, anon_map, bindparams):
+        # Option doesn't change sql, so statements with and without it are same for sqlalchemy
+        return None
+
+    def generate_cache_key(self, statement: Executable, parameters: Dict[str, Any], orm_cache: "ORMCache") -> str:
+        """
+        Gives key of statement results in region.
+
+        :param statement: sqlalchemy statement.
+        :param parameters: parameters statement being executed with.
+        :param orm_cache: cache that keeps compiled statements strings.
+        :return: string key.
+        """
+        statement_cache_key = statement._generate_cache_key()  # noqa: sqlalchemy has no public api for this
+        key = statement_cache_key.to_offline_string(orm_cache.statement_cache, statement, parameters)
+        return key + repr(self.cache_key)
+
+
+class ORMCache:
+    """
+    Session events listener that serves statements with FromCache option from cache regions.
+    """
+
+    def __init__(self):
+        self.statement_cache: Dict[Any, str] = {}
+
+    def listen_on_session(self, session_class) -> None:
+        """
+        Starts serving cached results for sessions of provided class.
+
+        :param session_class: sync session class or sessionmaker.
+        :return: nothing.
+        """
+        event.listen(session_class, "do_orm_execute", self._do_orm_execute)
+
+    def _do_orm_execute(self, orm_context: ORMExecuteState):
+        for option in orm_context.user_defined_options:
+            if not isinstance(option, FromCache):
+                continue
+
+            region = regions[option.region]
+            key = option.generate_cache_key(orm_context.statement, orm_context.parameters or {}, self)
+
+            frozen_result = region.get(key)
+            if frozen_result is CacheBackend.missing:
+                frozen_result = orm_context.invoke_statement().freeze()
+                region.set(key, frozen_result)
+
+            return loading.merge_frozen_result(
+                orm_context.session, orm_context.statement, frozen_result, load=False
+            )()
+
+        return None
+
+    def invalidate(self, statement: Executable, parameters: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Forgets cached results of statement. Statement must have FromCache option.
+
+        :param statement: same statement that was cached.
+        :param parameters: parameters statement was executed with.
+        :return: nothing.
+        """
+        for option in statement._with_options:  # noqa: sqlalchemy has no public api for this
+            if isinstance(option, FromCache):
+                key = option.generate_cache_key(statement, parameters or {}, self)
+                regions[option.region].delete(key)
+
+
+orm_cache = ORMCache()
+# AsyncSession runs everything through sync Session, so that's where we listen
+orm_cache.listen_on_session(Session)
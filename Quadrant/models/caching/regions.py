@@ -0,0 +1,105 @@
+from typing import Any, Dict, Hashable, Optional
+
+from .backends import CacheBackend, backends
+
+
+class CacheRegion:
+    """
+    Named part of cache with its own size, ttl and storage backend.
+    """
+
+    def __init__(self, name: str, backend: str = "memory", size: int = 1000, ttl: Optional[float] = 60):
+        """
+        Initializes region.
+
+        :param name: region name that is used in FromCache option.
+        :param backend: name of registered backend.
+        :param size: max number of cached results.
+        :param ttl: seconds after which cached result expires (None means it never expires).
+        """
+        try:
+            backend_class = backends[backend]
+
+        except KeyError:
+            raise ValueError(f"Unknown cache backend {backend} for region {name}")
+
+        self.name = name
+        self.backend: CacheBackend = backend_class(name, size, ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Part of queries that were served from cache."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / lookups
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Gives cached value.
+
+        :param key: cache key.
+        :return: cached value or CacheBackend.missing.
+        """
+        value = self.backend.get(key)
+        if value is CacheBackend.missing:
+            self.misses += 1
+
+        else:
+            self.hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.backend.set(key, value)
+
+    def delete(self, key: Hashable) -> None:
+        self.backend.delete(key)
+
+    def invalidate(self) -> None:
+        """Forgets every cached value of region."""
+        self.backend.clear()
+
+    def close(self) -> None:
+        """Frees storage of region once it isn't used anymore."""
+        self.backend.close()
+
+
+regions: Dict[str, CacheRegion] = {}
+
+
+def configure_regions(regions_config: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Creates regions from config.
+
+    :param regions_config: mapping of region names to keyword arguments of CacheRegion.
+    :return: nothing.
+    """
+    for name, region_config in regions_config.items():
+        if name in regions:
+            remove_region(name)
+
+        regions[name] = CacheRegion(name, **region_config)
+
+
+def invalidate_region(name: str) -> None:
+    """
+    Forgets everything cached in region.
+
+    :param name: region name.
+    :return: nothing.
+    """
+    regions[name].invalidate()
+
+
+def remove_region(name: str) -> None:
+    """
+    Removes region and frees its storage.
+
+    :param name: region name.
+    :return: nothing.
+    """
+    regions.pop(name).close()
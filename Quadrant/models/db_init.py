@@ -6,10 +6,35 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 from tornado.log import app_log
 
+from Quadrant.models.replicas import RoutingSyncSession
+
 Base = declarative_base()
 Session = sessionmaker(
     quadrant_config.DBConfig.async_base_engine,
-    expire_on_commit=False, class_=AsyncSession,
+    expire_on_commit=False, class_=AsyncSession, sync_session_class=RoutingSyncSession,
+)
+
+
+class ReadOnlySyncSession(RoutingSyncSession):
+    """Session that refuses to flush any changes, so read only session never writes by mistake."""
+
+    class exc:
+        class ReadOnlySession(RuntimeError):
+            pass
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise self.exc.ReadOnlySession("Read only session can not flush changes")
+
+        super().flush(objects)
+
+
+# Same pool as base engine, but every statement is committed on its own, so no transaction
+# is kept open between queries and connection can be returned to pool right after them
+read_only_engine = quadrant_config.DBConfig.async_base_engine.execution_options(isolation_level="AUTOCOMMIT")
+ReadOnlySession = sessionmaker(
+    read_only_engine,
+    expire_on_commit=False, class_=AsyncSession, sync_session_class=ReadOnlySyncSession,
 )
 
 
@@ -9,6 +9,7 @@ from sqlalchemy.orm import relationship, declared_attr
 
 from Quadrant.models import users_package
 from Quadrant.models.db_init import Base
+from Quadrant.models.membership_index import membership_index
 from .channel_members import DMParticipant
 from .dm_messages import DM_Message
 
@@ -153,10 +154,8 @@ class DirectMessagesChannel(Base):
         :param session: sqlalchemy session.
         :return: bool value representing if participant is a member.
         """
-        exists_query = select(DMParticipant).filter(
-            DMParticipant.user_id == user.id,
-            DMParticipant.channel_id == channel_id
-        ).exists()
-        exists_query_result = await session.execute(exists_query)
+        return await membership_index.is_member("dm", channel_id, user.id, session=session)
 
-        return (await exists_query_result.scalar()) or False
+
+membership_index.register("dm", DMParticipant.channel_id, DMParticipant.user_id)
+membership_index.register_channels("dm", DirectMessagesChannel, "channel_id")
@@ -7,6 +7,7 @@ from sqlalchemy.orm import declared_attr
 
 from Quadrant.models import users_package
 from Quadrant.models.abstract.message import ABCMessage
+from Quadrant.models.abstract.partitioning import messages_partitioning
 from .exceptions import BlockedByOtherParticipantException
 
 
@@ -16,7 +17,7 @@ class DM_Message(ABCMessage):
 
     @declared_attr
     def channel_id(self):
-        return Column(ForeignKey("dm_channels.channel_id"), index=True, nullable=False)
+        return Column(ForeignKey("dm_channels.channel_id"), nullable=False)
 
     @declared_attr
     def author_id(self):
@@ -27,3 +28,6 @@ class DM_Message(ABCMessage):
             author.id, await self.other_participant(author), session=session
         ) == users_package.UsersRelationType.blocked:
             raise BlockedByOtherParticipantException("User has been blocked by other participant")
+
+
+messages_partitioning.register(DM_Message)
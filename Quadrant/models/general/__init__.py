@@ -1 +1,3 @@
-from .files import File
\ No newline at end of file
+from .blob_store import BlobStore, blob_store
+from .file_blobs import FileBlob
+from .files import File
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.db_init import async_session
+from .file_blobs import FileBlob
+
+files_io_executor = ThreadPoolExecutor(
+    quadrant_config.FilesConfig.io_workers.value, thread_name_prefix="quadrant_files_io"
+)
+
+
+def _link(source: Path, destination: Path) -> None:
+    try:
+        os.link(source, destination)
+
+    except (FileExistsError, FileNotFoundError):
+        raise
+
+    except OSError:
+        # Filesystem doesn't support hard links
+        shutil.copyfile(source, destination)
+
+
+class BlobStore:
+    """
+    Content addressed storage of uploaded files contents.
+    Every unique content is kept once as blobs/<hash[:2]>/<hash>, and files in uploads directory
+    are hard links to it, so uploading known content takes no additional disk space.
+    """
+
+    def __init__(self, root: Path):
+        """
+        Initializes store.
+
+        :param root: directory where blobs are kept (must be on same filesystem as uploads).
+        """
+        self.root = root
+
+    def blob_path(self, content_hash: str) -> Path:
+        return self.root / content_hash[:2] / content_hash
+
+    def store_file(self, temp_path: Path, content_hash: str, destination: Path) -> bool:
+        """
+        Places file content at destination reusing blob with same content if it's stored.
+        Blocks on disk io, so must be called from files io threads.
+
+        :param temp_path: file with content, which is removed or moved.
+        :param content_hash: sha256 of content.
+        :param destination: path of file in uploads directory.
+        :return: True if content wasn't stored before.
+        """
+        blob_path = self.blob_path(content_hash)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            _link(blob_path, destination)
+            temp_path.unlink()
+            return False
+
+        except FileNotFoundError:
+            # Content is new or its blob was just collected
+            pass
+
+        os.replace(temp_path, destination)
+        blob_path.parent.mkdir(exist_ok=True)
+        try:
+            _link(destination, blob_path)
+
+        except FileExistsError:
+            # Same content was stored concurrently, this file just keeps its own copy
+            pass
+
+        return True
+
+    def remove_file(self, path: Path) -> None:
+        """
+        Removes file from uploads directory with its directory if nothing else is left there.
+        Blob of file content is removed by garbage collector once no file references it.
+        Blocks on disk io, so must be called from files io threads.
+
+        :param path: path of file in uploads directory.
+        :return: nothing.
+        """
+        path.unlink(missing_ok=True)
+        try:
+            path.parent.rmdir()
+
+        except OSError:
+            # Directory is shared with other files or is already removed
+            pass
+
+    def remove_blobs(self, content_hashes: Iterable[str]) -> None:
+        """
+        Removes blobs files. Disk space is freed when files that link to blob are removed too.
+
+        :param content_hashes: hashes of blobs.
+        :return: nothing.
+        """
+        for content_hash in content_hashes:
+            self.blob_path(content_hash).unlink(missing_ok=True)
+
+    @async_session
+    async def collect_garbage(self, *, session) -> int:
+        """
+        Removes blobs that weren't referenced by any file for blobs_gc_grace_period minutes.
+
+        :param session: sqlalchemy session.
+        :return: number of removed blobs.
+        """
+        grace_period = timedelta(minutes=quadrant_config.FilesConfig.blobs_gc_grace_period.value)
+        content_hashes = await FileBlob.delete_unreferenced(grace_period, session=session)
+        await asyncio.get_event_loop().run_in_executor(files_io_executor, self.remove_blobs, content_hashes)
+
+        return len(content_hashes)
+
+
+blob_store = BlobStore(quadrant_config.blobs)
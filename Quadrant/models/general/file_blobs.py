@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, case, delete, update
+from sqlalchemy.dialects.postgresql import insert
+
+from Quadrant.models.db_init import Base
+
+
+class FileBlob(Base):
+    """
+    Content of uploaded files stored once for every unique content.
+    Blob is referenced by every File row with same content and is removed by garbage collector
+    after it stays unreferenced for some time.
+    """
+    content_hash = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    references_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    unreferenced_since = Column(DateTime, nullable=True, index=True)
+
+    __tablename__ = "file_blobs"
+
+    @classmethod
+    async def add_reference(cls, content_hash: str, size: int, *, session) -> None:
+        """
+        Adds reference to blob creating blob record if it doesn't exist.
+        Doesn't commits changes, so reference is added in same transaction as File row.
+
+        :param content_hash: sha256 of content.
+        :param size: content size in bytes.
+        :param session: sqlalchemy session.
+        :return: nothing.
+        """
+        query = insert(cls).values(
+            content_hash=content_hash, size=size, references_count=1, created_at=datetime.utcnow()
+        ).on_conflict_do_update(
+            index_elements=[cls.content_hash],
+            set_={"references_count": cls.references_count + 1, "unreferenced_since": None}
+        )
+        await session.execute(query)
+
+    @classmethod
+    async def remove_reference(cls, content_hash: str, *, session) -> None:
+        """
+        Removes reference to blob without commiting changes.
+
+        :param content_hash: sha256 of content.
+        :param session: sqlalchemy session.
+        :return: nothing.
+        """
+        query = update(cls).where(cls.content_hash == content_hash).values(
+            references_count=cls.references_count - 1,
+            unreferenced_since=case(
+                (cls.references_count <= 1, datetime.utcnow()), else_=None
+            )
+        ).execution_options(synchronize_session=False)
+        await session.execute(query)
+
+    @classmethod
+    async def delete_unreferenced(cls, unreferenced_for: timedelta, *, session) -> List[str]:
+        """
+        Deletes records of blobs that weren't referenced for some time.
+        Blob that got new reference concurrently isn't deleted since condition is checked by same statement.
+
+        :param unreferenced_for: time after which unreferenced blob can be deleted.
+        :param session: sqlalchemy session.
+        :return: hashes of deleted blobs which files must be removed.
+        """
+        query = delete(cls).where(
+            cls.references_count <= 0,
+            cls.unreferenced_since < datetime.utcnow() - unreferenced_for
+        ).returning(cls.content_hash).execution_options(synchronize_session=False)
+        query_result = await session.execute(query)
+        deleted_hashes = list(query_result.scalars().all())
+        await session.commit()
+
+        return deleted_hashes
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 from pathlib import Path
+from typing import Awaitable, Callable, Optional
 from uuid import UUID, uuid4
 
 from pathvalidate import sanitize_filename
@@ -11,6 +13,8 @@ from sqlalchemy.dialects.postgresql import UUID as db_UUID
 from Quadrant.config import quadrant_config
 from Quadrant.models.db_init import Base
 from Quadrant.models.users_package import User
+from .blob_store import blob_store, files_io_executor
+from .file_blobs import FileBlob
 
 
 class File(Base):
@@ -18,11 +22,16 @@ class File(Base):
     filename = Column(String(256), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     uploader_id = Column(ForeignKey("users.id"), nullable=False)
+    # Content of files uploaded before blobs store has no blob
+    content_hash = Column(ForeignKey("file_blobs.content_hash"), nullable=True, index=True)
 
     __tablename__ = "files"
 
     @classmethod
-    async def create_file(cls, uploader: User, filename: str, *, session):
+    async def create_file(
+        cls, uploader: User, filename: str, content_hash: Optional[str] = None, size: int = 0,
+        save_content: Optional[Callable[[Path], Awaitable]] = None, *, session
+    ):
         """
         Creates record about file on server.
         Note: this function does not creates a new directory or file so you can change code however you would like.
@@ -30,6 +39,10 @@ class File(Base):
 
         :param uploader: user, who uploads file.
         :param filename: filename.
+        :param content_hash: sha256 of file content if file content is kept in blobs store.
+        :param size: size of file content in bytes.
+        :param save_content: coroutine function that saves file content at path of file before record is committed,
+            so every committed file has content (content is removed if record isn't committed).
         :param session: sqlalchemy session.
         :return: File instance.
         """
@@ -38,10 +51,44 @@ class File(Base):
         if len(filename) > 256:
             raise ValueError("Invalid file name")
 
-        new_file = cls(filename=filename, uploader_id=uploader.id)
-        await session.commit()
+        new_file = cls(file_id=uuid4(), filename=filename, uploader_id=uploader.id, content_hash=content_hash)
+        if save_content is not None:
+            await save_content(new_file.filepath)
+
+        try:
+            if content_hash is not None:
+                await FileBlob.add_reference(content_hash, size, session=session)
+
+            session.add(new_file)
+            await session.commit()
+
+        except BaseException:
+            await session.rollback()
+            if save_content is not None:
+                await asyncio.get_event_loop().run_in_executor(
+                    files_io_executor, blob_store.remove_file, new_file.filepath
+                )
+
+            raise
+
         return new_file
 
+    async def delete_file(self, *, session) -> None:
+        """
+        Deletes record about file, its reference to blob and file in uploads directory.
+        Disk space is freed when garbage collector removes blob that isn't referenced by other files.
+
+        :param session: sqlalchemy session.
+        :return: nothing.
+        """
+        if self.content_hash is not None:
+            await FileBlob.remove_reference(self.content_hash, session=session)
+
+        filepath = self.filepath
+        await session.delete(self)
+        await session.commit()
+        await asyncio.get_event_loop().run_in_executor(files_io_executor, blob_store.remove_file, filepath)
+
     @classmethod
     async def get_file(cls, uploader: User, file_id: UUID, *, session) -> File:
         """
@@ -66,4 +113,4 @@ class File(Base):
     @property
     def filepath(self) -> Path:
         """Path to local file"""
-        return quadrant_config.uploads / self.file_id / self.filename
+        return quadrant_config.uploads / str(self.file_id) / self.filename
@@ -4,11 +4,13 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, UniqueConstraint, select
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, UniqueConstraint, lambda_stmt, select
 from sqlalchemy.orm import relationship
 
 from Quadrant.models import users_package
 from Quadrant.models.db_init import Base
+from Quadrant.models.replicas import on_replica
+from Quadrant.models.utils.pagination import Keyset, KeysetPage
 
 BANS_PER_PAGE = 25
 
@@ -28,9 +30,11 @@ class GroupBan(Base):
 
     @staticmethod
     def get_ban_query(group_id: UUID, banned_user_id: users_package.User.id):
-        return select(GroupBan).filter(
-            GroupBan.group_id == group_id,
-            GroupBan.banned_user_id == banned_user_id
+        return lambda_stmt(
+            lambda: select(GroupBan).where(
+                GroupBan.group_id == group_id,
+                GroupBan.banned_user_id == banned_user_id
+            )
         )
 
     @classmethod
@@ -39,7 +43,7 @@ class GroupBan(Base):
             cls.get_ban_query(group_id, banned_user_id)
         )
 
-        return await query_result.scalar_one()
+        return query_result.scalar_one()
 
     @staticmethod
     async def is_user_banned(group_id: UUID, user_id: users_package.User.id, *, session) -> bool:
@@ -51,30 +55,55 @@ class GroupBan(Base):
         :param session: sqlalchemy session.
         :return: bool value, representing if user is banned.
         """
-        query = select(GroupBan.id).filter(
-            GroupBan.group_id == group_id,
-            GroupBan.banned_user_id == user_id
-        ).exists()
+        query = lambda_stmt(
+            lambda: select(
+                select(GroupBan.id).where(
+                    GroupBan.group_id == group_id,
+                    GroupBan.banned_user_id == user_id
+                ).exists()
+            )
+        )
         result = await session.execute(query)
-        return result.scalar() or True
+        return result.scalar() or False
 
     @staticmethod
-    async def get_bans_page(group_id: UUID, page: int = 0, *, session) -> List[GroupBan]:
+    async def get_bans_page(
+        group_id: UUID, page: int = 0, *,
+        after: Optional[str] = None, before: Optional[str] = None, session
+    ) -> KeysetPage:
         """
         Gives a page of bans in this specific group.
+        Pages are fetched by cursors, page number is kept for compatibility and must not be used with cursors.
 
         :param group_id: group from which we obtain page.
         :param page: what page we are looking for.
+        :param after: cursor of page that goes before requested one.
+        :param before: cursor of page that goes after requested one.
         :param session: sqlalchemy session.
-        :return: list of bans.
+        :return: list of bans with cursors of neighbour pages.
         """
         if page < 0:
             raise ValueError("Invalid page number")
 
-        query_result = await session.execute(
-            select(GroupBan).filter(GroupBan.group_id == group_id).order_by(
-                GroupBan.banned_user_id.desc()
-            ).limit(BANS_PER_PAGE).offset(page * BANS_PER_PAGE)
+        if page and (after is not None or before is not None):
+            raise ValueError("Page number can not be used with cursors")
+
+        # Ordering is covered by unique constraint index on group_id and banned_user_id
+        query = bans_keyset.paginate(
+            select(GroupBan).filter(GroupBan.group_id == group_id), BANS_PER_PAGE, after=after, before=before
         )
+        offset = page * BANS_PER_PAGE
+        if offset:
+            query = query.offset(offset)
+
+        query_result = await session.execute(on_replica(query))
+        return bans_keyset.make_page(
+            query_result.scalars().all(), BANS_PER_PAGE, after=after, before=before, offset=offset
+        )
+
 
-        return query_result.scalars().all()
+bans_keyset = Keyset(
+    (GroupBan.banned_user_id, True),
+    row_values=lambda ban: (ban.banned_user_id,),
+    casters=(UUID,)
+)
@@ -10,6 +10,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
 from Quadrant.models import Base, users_package
+from Quadrant.models.membership_index import membership_index
 from .group_ban import GroupBan
 from .group_invite import GroupInvite
 from .group_message import GroupMessage
@@ -185,13 +186,7 @@ class GroupMessagesChannel(Base):
 
     @staticmethod
     async def is_member(channel_id: UUID, user: users_package.User, *, session) -> bool:
-        exists_query = select(GroupParticipant).filter(
-            GroupParticipant.user_id == user.id,
-            GroupParticipant.channel_id == channel_id
-        ).exists()
-        exists_query_result = await session.execute(exists_query)
-
-        return (await exists_query_result.scalar()) or False
+        return await membership_index.is_member("group", channel_id, user.id, session=session)
 
     class exc:
         class AlreadyIsMemberError(PermissionError):
@@ -211,3 +206,7 @@ class GroupMessagesChannel(Base):
 
         class CanNotDeleteInviteError(PermissionError):
             pass
+
+
+membership_index.register("group", GroupParticipant.channel_id, GroupParticipant.user_id)
+membership_index.register_channels("group", GroupMessagesChannel, "channel_id", "owner_id")
@@ -9,6 +9,7 @@ from uuid import UUID
 from sqlalchemy import Column, DateTime, ForeignKey, ForeignKeyConstraint, Integer, String, not_, or_, select
 
 from Quadrant.models.db_init import Base
+from Quadrant.models.replicas import on_replica
 from .group_participant import GroupParticipant
 
 GROUP_INVITES_LIMIT = 25
@@ -117,7 +118,7 @@ class GroupInvite(Base):
         :return: list of alive invites.
         """
         query = cls.get_alive_invites_query_for_channel(group_channel_id)
-        query_result = await session.execute(query)
+        query_result = await session.execute(on_replica(query))
 
         return query_result.scalars().all()
 
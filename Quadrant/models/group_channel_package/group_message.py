@@ -7,6 +7,7 @@ from sqlalchemy.orm import declared_attr
 
 from Quadrant.models import users_package
 from Quadrant.models.abstract.message import ABCMessage
+from Quadrant.models.abstract.partitioning import messages_partitioning
 from .exceptions import AuthorIsBannedException
 from .group_ban import GroupBan
 
@@ -20,7 +21,7 @@ class GroupMessage(ABCMessage):
 
     @declared_attr
     def channel_id(self):
-        return Column(ForeignKey("group_channels.channel_id"), index=True, nullable=False)
+        return Column(ForeignKey("group_channels.channel_id"), nullable=False)
 
     @declared_attr
     def author_id(self):
@@ -41,11 +42,15 @@ class GroupMessage(ABCMessage):
         :param session: sqlalchemy session.
         :return: deleted message id.
         """
-        deleted_message_id = self.id
+        deleted_message_id = self.message_id
         if delete_by.id == channel.owner_id:
-            session.delete(self)
+            await session.delete(self)
             await session.commit()
+            self.notify_deleted()
             return deleted_message_id
 
         else:
             raise PermissionError("User isn't a text_channel owner so can not delete message")
+
+
+messages_partitioning.register(GroupMessage)
@@ -0,0 +1,244 @@
+from collections import defaultdict
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple, Type
+
+from sqlalchemy import event, inspect, lambda_stmt, select
+from sqlalchemy.orm import Session as SyncSession, object_session
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.utils.ttl_cache import TTLCache
+
+ChannelKey = Tuple[str, Hashable]
+# Change of membership that is applied to index once transaction is committed: channel, user id, is member
+MembershipChange = Tuple[ChannelKey, Optional[Hashable], bool]
+# Stored instead of members of channels that have too many members to be kept in memory
+TOO_MANY_MEMBERS = object()
+
+
+class MembershipIndex:
+    """
+    Per process index of channels members that lets membership checks skip database.
+    Members of channel are loaded at once on first check and updated when transactions that add or remove members
+    are committed. Channels with more than max_members members aren't kept and are checked in database.
+    """
+
+    def __init__(self, max_channels: int, max_members: int, ttl: float):
+        """
+        Initializes empty index.
+
+        :param max_channels: number of channels which members are kept (0 disables index).
+        :param max_members: max number of members of channel that is kept.
+        :param ttl: seconds after which members are loaded again.
+        """
+        self._channels = TTLCache(max_channels, ttl)
+        self.max_members = max_members
+        self._members_columns: Dict[str, Tuple[InstrumentedAttribute, InstrumentedAttribute]] = {}
+        # Channels that are being loaded and ones that changed while they were loaded
+        self._loading: Dict[ChannelKey, int] = defaultdict(int)
+        self._changed_while_loading: Set[ChannelKey] = set()
+        self._listeners: List[Callable[[ChannelKey, Optional[Hashable], bool], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self._channels.max_size > 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Part of membership checks that found channel in index."""
+        return self._channels.hit_rate
+
+    def register(
+        self, kind: str, channel_id_column: InstrumentedAttribute, user_id_column: InstrumentedAttribute
+    ) -> None:
+        """
+        Makes members of kind of channels to be indexed.
+
+        :param kind: name of channels kind (channels ids of different kinds may be same).
+        :param channel_id_column: column of members model with channel id.
+        :param user_id_column: column of members model with user id.
+        :return: nothing.
+        """
+        self._members_columns[kind] = (channel_id_column, user_id_column)
+        members_model = channel_id_column.class_
+
+        def member_added(mapper, connection, target) -> None:
+            key = (kind, getattr(target, channel_id_column.key))
+            _record_change(target, key, getattr(target, user_id_column.key), True)
+
+        def member_removed(mapper, connection, target) -> None:
+            key = (kind, getattr(target, channel_id_column.key))
+            _record_change(target, key, getattr(target, user_id_column.key), False)
+
+        event.listen(members_model, "after_insert", member_added)
+        event.listen(members_model, "after_delete", member_removed)
+
+    def register_channels(
+        self, kind: str, channel_model: Type, channel_id_attribute: str, *watched_attributes: str
+    ) -> None:
+        """
+        Makes indexed members of channel to be forgotten when channel is deleted or its watched attributes change.
+
+        :param kind: name of channels kind.
+        :param channel_model: mapped class of channels.
+        :param channel_id_attribute: attribute with channel id.
+        :param watched_attributes: attributes that affect membership (like owner id).
+        :return: nothing.
+        """
+        def channel_changed(mapper, connection, target) -> None:
+            state = inspect(target)
+            if any(state.attrs[attribute].history.has_changes() for attribute in watched_attributes):
+                _record_change(target, (kind, getattr(target, channel_id_attribute)), None, False)
+
+        def channel_deleted(mapper, connection, target) -> None:
+            _record_change(target, (kind, getattr(target, channel_id_attribute)), None, False)
+
+        if watched_attributes:
+            event.listen(channel_model, "after_update", channel_changed)
+
+        event.listen(channel_model, "after_delete", channel_deleted)
+
+    def add_listener(self, listener: Callable[[ChannelKey, Optional[Hashable], bool], None]) -> None:
+        """
+        Makes function to be called with channel, user id and membership flag of every committed change.
+
+        :param listener: function.
+        :return: nothing.
+        """
+        self._listeners.append(listener)
+
+    async def is_member(self, kind: str, channel_id: Hashable, user_id: Hashable, *, session) -> bool:
+        """
+        Checks if user is member of channel.
+
+        :param kind: name of channels kind.
+        :param channel_id: channel id.
+        :param user_id: user id.
+        :param session: sqlalchemy session.
+        :return: bool value representing if user is a member.
+        """
+        key: ChannelKey = (kind, channel_id)
+        members = self._channels.get(key)
+
+        if members is None:
+            members = await self._load_members(key, session=session)
+
+        if members is TOO_MANY_MEMBERS:
+            return await self._check_member(kind, channel_id, user_id, session=session)
+
+        return user_id in members
+
+    async def _load_members(self, key: ChannelKey, *, session):
+        kind, channel_id = key
+        if not self.enabled:
+            return TOO_MANY_MEMBERS
+
+        channel_id_column, user_id_column = self._members_columns[kind]
+        # One extra member tells that channel has too many members
+        limit = self.max_members + 1
+        members_query = lambda_stmt(
+            lambda: select(user_id_column).where(channel_id_column == channel_id).limit(limit)
+        )
+
+        self._loading[key] += 1
+        try:
+            query_result = await session.execute(members_query)
+            members_ids = query_result.scalars().all()
+
+        finally:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+
+        members = TOO_MANY_MEMBERS if len(members_ids) > self.max_members else set(members_ids)
+        # Members that were loaded before change was committed would be stale
+        if key in self._changed_while_loading:
+            if key not in self._loading:
+                self._changed_while_loading.discard(key)
+
+            return members
+
+        self._channels.set(key, members)
+        return members
+
+    async def _check_member(self, kind: str, channel_id: Hashable, user_id: Hashable, *, session) -> bool:
+        channel_id_column, user_id_column = self._members_columns[kind]
+        exists_query = lambda_stmt(
+            lambda: select(
+                select(user_id_column).where(user_id_column == user_id, channel_id_column == channel_id).exists()
+            )
+        )
+        exists_query_result = await session.execute(exists_query)
+        return exists_query_result.scalar() or False
+
+    def apply(self, changes: List[MembershipChange]) -> None:
+        """
+        Applies committed changes of membership.
+
+        :param changes: channels, users ids and flags if user became member (None user forgets whole channel).
+        :return: nothing.
+        """
+        for key, user_id, is_member in changes:
+            if key in self._loading:
+                self._changed_while_loading.add(key)
+
+            members = self._channels.peek(key)
+            if members is not None and members is not TOO_MANY_MEMBERS:
+                self._apply_to_members(key, members, user_id, is_member)
+
+            for listener in self._listeners:
+                listener(key, user_id, is_member)
+
+    def _apply_to_members(
+        self, key: ChannelKey, members: Set[Hashable], user_id: Optional[Hashable], is_member: bool
+    ) -> None:
+        if user_id is None:
+            self._channels.pop(key)
+
+        elif is_member:
+            if len(members) >= self.max_members:
+                self._channels.set(key, TOO_MANY_MEMBERS)
+
+            else:
+                members.add(user_id)
+
+        else:
+            members.discard(user_id)
+
+    def invalidate(self, kind: str, channel_id: Hashable) -> None:
+        """
+        Forgets members of channel.
+
+        :param kind: name of channels kind.
+        :param channel_id: channel id.
+        :return: nothing.
+        """
+        self._channels.pop((kind, channel_id))
+
+    def clear(self) -> None:
+        """Forgets everything."""
+        self._channels.clear()
+
+
+def _record_change(target, key: ChannelKey, user_id: Optional[Hashable], is_member: bool) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("membership_changes", []).append((key, user_id, is_member))
+
+
+@event.listens_for(SyncSession, "after_commit")
+def _apply_committed_changes(session: SyncSession) -> None:
+    changes = session.info.pop("membership_changes", None)
+    if changes:
+        membership_index.apply(changes)
+
+
+@event.listens_for(SyncSession, "after_rollback")
+def _forget_rolled_back_changes(session: SyncSession) -> None:
+    session.info.pop("membership_changes", None)
+
+
+membership_index = MembershipIndex(
+    max_channels=quadrant_config.CachingConfig.membership_cache_channels.value,
+    max_members=quadrant_config.CachingConfig.membership_cache_max_members.value,
+    ttl=quadrant_config.CachingConfig.membership_cache_ttl.value
+)
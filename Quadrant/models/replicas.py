@@ -0,0 +1,239 @@
+from collections import deque
+from itertools import count
+from time import monotonic
+from typing import Deque, Hashable, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session as SyncSession
+from sqlalchemy.sql.lambdas import LambdaElement, StatementLambdaElement
+from tornado.log import app_log
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.utils.ttl_cache import TTLCache
+
+# Execution option of statements that may be executed on replica
+USE_REPLICA = "use_replica"
+
+
+def on_replica(statement):
+    """
+    Marks read only statement as one that may be executed on replica.
+    Session still executes it on primary if it has written something or no replica is fresh enough.
+
+    :param statement: select statement or lambda statement.
+    :return: same statement with replica execution option.
+    """
+    if isinstance(statement, StatementLambdaElement):
+        # Options of lambda statement must be set inside of it, otherwise it's resolved with current parameters
+        return statement + (lambda query: query.execution_options(use_replica=True))
+
+    return statement.execution_options(**{USE_REPLICA: True})
+
+
+def wants_replica(statement) -> bool:
+    if isinstance(statement, LambdaElement):
+        statement = statement._resolved
+
+    return bool(statement._execution_options.get(USE_REPLICA))
+
+
+def parse_lsn(lsn: str) -> int:
+    """
+    Converts postgresql write-ahead log location (like 16/B374D848) to number.
+
+    :param lsn: text representation of location.
+    :return: location as number.
+    """
+    high, low = lsn.split("/")
+    return int(high, 16) << 32 | int(low, 16)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.available = False
+        self.replayed_lsn = 0
+        # Moment (in monotonic time) before which everything committed on primary is visible on replica
+        self.caught_up_at: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        pool = self.engine.sync_engine.pool
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "available": self.available,
+            "replayed_lsn": self.replayed_lsn,
+            "lag_ms": (monotonic() - self.caught_up_at) * 1000 if self.caught_up_at is not None else None,
+            "pool": pool.metrics.as_dict(pool),
+        }
+
+
+class ReplicaSet:
+    """
+    Keeps track of how far replicas lag behind primary and chooses fresh one for read queries.
+    Primary write-ahead log location is sampled every lag check, and replica that replayed sampled location
+    has every transaction committed before sample. So replica is fresh if it replayed sample that
+    is not older than max lag, and it can be used for reads of someone who wrote something
+    only if it replayed sample taken after the write.
+    """
+
+    def __init__(self, primary_engine: AsyncEngine, replicas_engines: List[AsyncEngine], max_lag: float):
+        """
+        Initializes replica set. Replicas aren't used until lag is checked.
+
+        :param primary_engine: engine of primary database.
+        :param replicas_engines: engines of replicas.
+        :param max_lag: max seconds replica may lag behind primary to be used.
+        """
+        self.primary_engine = primary_engine
+        self.replicas = [Replica(engine) for engine in replicas_engines]
+        self.max_lag = max_lag
+        self._primary_samples: Deque[Tuple[float, int]] = deque()
+        self._counter = count()
+        # Writes older than max lag are visible on every replica that can be used
+        self._last_writes = TTLCache(100000, max_lag)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def mark_write(self, consistency_key: Hashable) -> None:
+        """
+        Remembers when someone has committed changes, so his next reads go to replicas that have them.
+
+        :param consistency_key: key of someone who wrote (for example user id).
+        :return: nothing.
+        """
+        self._last_writes.set(consistency_key, monotonic())
+
+    def is_fresh(self, replica: Replica, consistency_key: Optional[Hashable] = None) -> bool:
+        if not replica.available or replica.caught_up_at is None:
+            return False
+
+        if monotonic() - replica.caught_up_at > self.max_lag:
+            return False
+
+        if consistency_key is not None:
+            written_at = self._last_writes.peek(consistency_key)
+            if written_at is not None and replica.caught_up_at < written_at:
+                return False
+
+        return True
+
+    def choose_replica(self, consistency_key: Optional[Hashable] = None) -> Optional[Replica]:
+        """
+        Gives fresh replica, rotating between them.
+
+        :param consistency_key: key of someone who reads, so his own writes are visible.
+        :return: replica or None if primary must be used.
+        """
+        fresh_replicas = [replica for replica in self.replicas if self.is_fresh(replica, consistency_key)]
+        if not fresh_replicas:
+            return None
+
+        return fresh_replicas[next(self._counter) % len(fresh_replicas)]
+
+    def _record_primary_lsn(self, lsn: int) -> None:
+        now = monotonic()
+        self._primary_samples.append((now, lsn))
+
+        # Only newest sample is kept from ones older than max lag, replicas that reached only them aren't used
+        while len(self._primary_samples) > 1 and now - self._primary_samples[1][0] > self.max_lag:
+            self._primary_samples.popleft()
+
+    def _record_replayed_lsn(self, replica: Replica, lsn: int) -> None:
+        replica.available = True
+        replica.replayed_lsn = lsn
+        replica.caught_up_at = None
+
+        for sampled_at, primary_lsn in reversed(self._primary_samples):
+            if primary_lsn <= lsn:
+                replica.caught_up_at = sampled_at
+                break
+
+    async def check_lag(self) -> None:
+        """
+        Samples primary write-ahead log location and updates how far every replica has replayed it.
+
+        :return: nothing.
+        """
+        if not self.enabled:
+            return
+
+        try:
+            async with self.primary_engine.connect() as connection:
+                lsn = await connection.scalar(text("SELECT pg_current_wal_lsn()::text"))
+
+        except (SQLAlchemyError, OSError) as err:
+            app_log.warning(f"Failed to check primary database wal location: {err!r}")
+            return
+
+        self._record_primary_lsn(parse_lsn(lsn))
+
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    lsn = await connection.scalar(text("SELECT pg_last_wal_replay_lsn()::text"))
+
+            except (SQLAlchemyError, OSError) as err:
+                app_log.warning(f"Replica {replica.engine.url!r} is unavailable: {err!r}")
+                replica.available = False
+                continue
+
+            if lsn is None:
+                app_log.warning(f"Database {replica.engine.url!r} is not a replica")
+                replica.available = False
+                continue
+
+            self._record_replayed_lsn(replica, parse_lsn(lsn))
+
+
+class RoutingSyncSession(SyncSession):
+    """
+    Session that executes statements marked with on_replica on fresh replica.
+    Once session has written anything, all its statements go to primary, and after commit
+    reads with same consistency key (session.info["consistency_key"]) go only to replicas that replayed the write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            replica_set.enabled and clause is not None and not self.info.get("has_writes")
+            and wants_replica(clause)
+        ):
+            consistency_key = self.info.get("consistency_key")
+            replica = self.info.get("replica")
+            if replica is None or not replica_set.is_fresh(replica, consistency_key):
+                replica = replica_set.choose_replica(consistency_key)
+
+            if replica is not None:
+                # Session keeps using same replica while it's fresh, so it doesn't hold connections to many
+                self.info["replica"] = replica
+                return replica.engine.sync_engine
+
+        return super().get_bind(mapper, clause, **kwargs)
+
+
+@event.listens_for(RoutingSyncSession, "after_flush")
+def _mark_flushed_writes(session: RoutingSyncSession, _) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(RoutingSyncSession, "do_orm_execute")
+def _mark_executed_writes(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(RoutingSyncSession, "after_commit")
+def _remember_committed_writes(session: RoutingSyncSession) -> None:
+    consistency_key = session.info.get("consistency_key")
+    if session.info.get("has_writes") and consistency_key is not None:
+        replica_set.mark_write(consistency_key)
+
+
+replica_set = ReplicaSet(
+    quadrant_config.DBConfig.async_base_engine,
+    quadrant_config.DBConfig.async_replicas_engines,
+    quadrant_config.DBConfig.replicas_max_lag_ms.value / 1000,
+)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .permissions import NO_PERMISSIONS, Permissions, apply_overwrite, compute_permissions
+
+
+class OverwriteMasks(NamedTuple):
+    allow: int
+    deny: int
+
+    def apply(self, permissions: Permissions) -> Permissions:
+        return apply_overwrite(permissions, self.allow, self.deny)
+
+
+class ChannelMembersPermissions:
+    """
+    Effective permissions of every member of server in one text channel, computed with same rules as
+    TextChannelsPermissionsProxy. Members that have same roles share one computation,
+    so only members with own overwrites are computed separately.
+    """
+
+    def __init__(
+        self, channel_permissions: int, roles: Iterable[Tuple[int, int, int]],
+        roles_overwrites: Iterable[Tuple[int, int, int]], members_overwrites: Iterable[Tuple[Hashable, int, int]],
+        members_roles: Iterable[Tuple[Hashable, Optional[int]]]
+    ):
+        """
+        Computes permissions from loaded rows.
+
+        :param channel_permissions: default permissions of channel.
+        :param roles: roles ids, positions and permissions.
+        :param roles_overwrites: roles ids with allow and deny masks of their overwrites in channel.
+        :param members_overwrites: members ids with allow and deny masks of their overwrites in channel.
+        :param members_roles: members ids with ids of their roles (None for members without roles).
+        """
+        roles_by_id = {role_id: (position, permissions) for role_id, position, permissions in roles}
+        overwrites_by_role = {role_id: OverwriteMasks(allow, deny) for role_id, allow, deny in roles_overwrites}
+        overwrites_by_member = {
+            member_id: OverwriteMasks(allow, deny) for member_id, allow, deny in members_overwrites
+        }
+
+        roles_of_members: Dict[Hashable, List[Optional[int]]] = defaultdict(list)
+        for member_id, role_id in members_roles:
+            roles_of_members[member_id].append(role_id)
+
+        members_by_roles: Dict[FrozenSet[Optional[int]], List[Hashable]] = defaultdict(list)
+        for member_id, member_roles in roles_of_members.items():
+            members_by_roles[frozenset(member_roles)].append(member_id)
+
+        # Kept as plain integers, since operations on flags create new enum members and are much slower
+        self.permissions: Dict[Hashable, int] = {}
+        for roles_set, members_ids in members_by_roles.items():
+            # Ordered same as RolesOverwrites.get_overwrites_by_roles does (roles without position first,
+            # then by position and id), since overwrites of higher roles are applied last
+            roles_ids = sorted(
+                (role_id for role_id in roles_set if role_id in roles_by_id),
+                key=lambda role: (roles_by_id[role][0] is not None, roles_by_id[role][0] or 0, role)
+            )
+            roles_permissions = [roles_by_id[role_id][1] for role_id in roles_ids]
+            roles_overwrites_masks = [
+                overwrites_by_role[role_id] for role_id in roles_ids if role_id in overwrites_by_role
+            ]
+            shared_permissions = int(
+                compute_permissions(channel_permissions, roles_permissions, roles_overwrites_masks)
+            )
+
+            for member_id in members_ids:
+                member_overwrite = overwrites_by_member.get(member_id)
+                if member_overwrite is None:
+                    self.permissions[member_id] = shared_permissions
+
+                else:
+                    self.permissions[member_id] = int(compute_permissions(
+                        channel_permissions, roles_permissions, roles_overwrites_masks, member_overwrite
+                    ))
+
+    def get(self, member_id: Hashable) -> Permissions:
+        """
+        Gives permissions of member.
+
+        :param member_id: id of server member.
+        :return: permissions (no permissions for users that aren't members).
+        """
+        return Permissions(self.permissions.get(member_id, NO_PERMISSIONS))
+
+    def members_with(self, permissions: Permissions) -> Set[Hashable]:
+        """
+        Gives members that have every one of permissions.
+
+        :param permissions: required permissions flags.
+        :return: set of members ids.
+        """
+        required = int(permissions)
+        return {
+            member_id for member_id, member_permissions in self.permissions.items()
+            if member_permissions & required == required
+        }
+
+    def readers(self) -> Set[Hashable]:
+        """Members that receive new messages of channel."""
+        return self.members_with(Permissions.read_messages)
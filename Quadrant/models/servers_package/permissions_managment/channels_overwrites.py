@@ -4,23 +4,19 @@ from typing import List, Optional
 from uuid import UUID
 
 from sqlalchemy import BigInteger, Column, ForeignKey, select
-from sqlalchemy.orm import relationship
 
 from Quadrant.models.db_init import Base
-from .permissions import RolesPermissionsOverwrites, UsersPermissionsOverwrites
+from .permissions import PermissionsOverwrite
+from .permissions_cache import permissions_cache
 from .roles import ServerRole
 
 
-class RolesOverwrites(Base):
+class RolesOverwrites(Base, PermissionsOverwrite):
     overwrite_id = Column(BigInteger, primary_key=True)
     channel_id = Column(ForeignKey("server_channels.id"), nullable=False)
     server_id = Column(ForeignKey("servers_package.id"), nullable=False)
     permissions_for_role_id = Column(ForeignKey('server_roles.id'), nullable=False)
-    permissions_id = Column(ForeignKey("roles_overwritten_permissions.member_id"), nullable=False)
 
-    permissions: RolesPermissionsOverwrites = relationship(
-        RolesPermissionsOverwrites, lazy='joined', cascade="all, delete-orphan", uselist=False
-    )
     __tablename__ = "roles_server_permissions_overwrites"
 
     @classmethod
@@ -35,32 +31,38 @@ class RolesOverwrites(Base):
             )
         )
 
-        return await query_result.one_or_none()
+        return query_result.scalar_one_or_none()
 
     @classmethod
-    async def get_permissions_overwrites_by_roles(
+    async def get_overwrites_by_roles(
         cls, server_id: UUID, channel_id: int, roles_ids: List[int], *, session
-    ) -> RolesOverwrites.permissions:
+    ) -> List[RolesOverwrites]:
+        """
+        Gives overwrites of roles in channel.
+
+        :param server_id: server id.
+        :param channel_id: channel id.
+        :param roles_ids: roles which overwrites we look for.
+        :param session: sqlalchemy session.
+        :return: overwrites ordered from lowest role to highest one (roles without position first and roles with
+            same position by id), so higher roles are applied last.
+        """
         query_result = await session.execute(
-            select(cls.permissions).filter(
+            select(cls).join(ServerRole, ServerRole.role_id == cls.permissions_for_role_id).filter(
                 cls.server_id == server_id,
                 cls.channel_id == channel_id,
                 cls.permissions_for_role_id.in_(roles_ids)
-                .join(ServerRole).order_by(ServerRole.role_position)
-            )
+            ).order_by(ServerRole.role_position.nullsfirst(), ServerRole.role_id)
         )
-        return await query_result.one_or_none()
+        return query_result.scalars().all()
 
 
-class UsersOverwrites(Base):
+class UsersOverwrites(Base, PermissionsOverwrite):
     overwrite_id = Column(BigInteger, primary_key=True)
     channel_id = Column(ForeignKey("server_channels.id"), nullable=False)
     server_id = Column(ForeignKey("servers_package.id"), nullable=False)
     permissions_for_members_id = Column(ForeignKey('server_members.id'), nullable=False)
 
-    permissions: UsersPermissionsOverwrites = relationship(
-        UsersPermissionsOverwrites, lazy='joined', cascade="all, delete-orphan", uselist=False,
-    )
     __tablename__ = "users_server_permissions_overwrites"
 
     @classmethod
@@ -73,4 +75,8 @@ class UsersOverwrites(Base):
             cls.permissions_for_members_id == member_id
         )
         query_result = await session.execute(query)
-        return await query_result.one_or_none()
+        return query_result.scalar_one_or_none()
+
+
+permissions_cache.watch(RolesOverwrites)
+permissions_cache.watch(UsersOverwrites, member_id_attribute="permissions_for_members_id")
@@ -1,47 +1,117 @@
-from sqlalchemy import Boolean, Column, ForeignKey
+from enum import IntFlag
+from typing import Iterable, Optional
 
-from Quadrant.models.db_init import Base
+from sqlalchemy import BigInteger, Column
+
+
+class Permissions(IntFlag):
+    """
+    Server permissions packed into one integer. Values of flags are stored in database, so they must never change.
+    """
+    manage_channels = 1 << 0
+    pin_messages = 1 << 1
+    delete_others_messages = 1 << 2
+    delete_messages = 1 << 3
+    use_bots = 1 << 4
+    send_links = 1 << 5
+    attach_files = 1 << 6
+    write_messages = 1 << 7
+    react_on_message = 1 << 8
+    read_messages = 1 << 9
+
+    administrator = 1 << 16
+    manage_server = 1 << 17
+    manage_roles = 1 << 18
+    deaf_others = 1 << 19
+    mute_others = 1 << 20
+    speak_in_voice_channel = 1 << 21
+    connect_to_voice_channel = 1 << 22
+
+
+NO_PERMISSIONS = Permissions(0)
+ALL_PERMISSIONS = Permissions(sum(Permissions))
+TEXT_CHANNEL_PERMISSIONS = (
+    Permissions.manage_channels | Permissions.pin_messages | Permissions.delete_others_messages
+    | Permissions.delete_messages | Permissions.use_bots | Permissions.send_links | Permissions.attach_files
+    | Permissions.write_messages | Permissions.react_on_message | Permissions.read_messages
+)
+DEFAULT_TEXT_CHANNEL_PERMISSIONS = (
+    Permissions.send_links | Permissions.attach_files | Permissions.write_messages
+    | Permissions.react_on_message | Permissions.read_messages
+)
+DEFAULT_PERMISSIONS = (
+    DEFAULT_TEXT_CHANNEL_PERMISSIONS | Permissions.speak_in_voice_channel | Permissions.connect_to_voice_channel
+)
+
+
+def permissions_by_names(*permissions_names: str) -> Permissions:
+    """
+    Gives flags of permissions with given names.
+
+    :param permissions_names: names of Permissions members.
+    :return: permissions (raises KeyError if some name is unknown).
+    """
+    permissions = NO_PERMISSIONS
+    for permission_name in permissions_names:
+        permissions |= Permissions[permission_name]
+
+    return permissions
+
+
+def apply_overwrite(permissions: Permissions, allow: int, deny: int) -> Permissions:
+    return Permissions((permissions & ~deny) | allow)
 
 
 class AbstractTextChannelPermissions:
-    manage_channels = Column(Boolean, default=False)
-    pin_messages = Column(Boolean, default=False)
-    delete_others_messages = Column(Boolean, default=False)
-    delete_messages = Column(Boolean, default=False)
-    use_bots = Column(Boolean, default=False)
-    send_links = Column(Boolean, default=True)
-    attach_files = Column(Boolean, default=True)
-    write_messages = Column(Boolean, default=True)
-    react_on_message = Column(Boolean, default=True)
-    read_messages = Column(Boolean, default=True)
+    """Text channel permissions stored as bitmask of Permissions."""
+    permissions = Column(BigInteger, default=int(DEFAULT_TEXT_CHANNEL_PERMISSIONS), nullable=False)
+
+    @property
+    def permissions_flags(self) -> Permissions:
+        return Permissions(self.permissions)
+
 
+class PermissionsSet(AbstractTextChannelPermissions):
+    """Server permissions stored as bitmask of Permissions."""
+    permissions = Column(BigInteger, default=int(DEFAULT_PERMISSIONS), nullable=False)
 
-class TextChannelPermissions(AbstractTextChannelPermissions):
-    channel_id = Column(ForeignKey("server_channels.channel_id"), primary_key=True)
 
+class PermissionsOverwrite:
+    """
+    Changes of permissions in exact channel: allowed permissions are added and denied are removed.
+    Permission that is neither allowed nor denied is inherited.
+    """
+    allow = Column(BigInteger, default=0, nullable=False)
+    deny = Column(BigInteger, default=0, nullable=False)
 
-class PermissionsSet(Base, AbstractTextChannelPermissions):
-    administrator = Column(Boolean, default=False)
-    manage_server = Column(Boolean, default=False)
-    manage_roles = Column(Boolean, default=False)
-    deaf_others = Column(Boolean, default=False)
-    mute_others = Column(Boolean, default=False)
-    speak_in_voice_channel = Column(Boolean, default=True)
-    connect_to_voice_channel = Column(Boolean, default=True)
+    def apply(self, permissions: Permissions) -> Permissions:
+        return apply_overwrite(permissions, self.allow, self.deny)
 
-    __abstract__ = True
 
+def compute_permissions(
+    channel_permissions: int, roles_permissions: Iterable[int],
+    roles_overwrites: Iterable[PermissionsOverwrite] = (), member_overwrite: Optional[PermissionsOverwrite] = None
+) -> Permissions:
+    """
+    Gives effective permissions of member in channel.
 
-class RolesPermissions(PermissionsSet):
-    role_id = Column(ForeignKey("server_roles.id"), primary_key=True)
-    __tablename__ = "roles_default_permissions"
+    :param channel_permissions: default permissions of channel.
+    :param roles_permissions: permissions of every member role.
+    :param roles_overwrites: channel overwrites of member roles ordered from lowest role to highest one.
+    :param member_overwrite: channel overwrite of member.
+    :return: permissions.
+    """
+    permissions = Permissions(channel_permissions)
+    for role_permissions in roles_permissions:
+        permissions |= role_permissions
 
+    if Permissions.administrator in permissions:
+        return ALL_PERMISSIONS
 
-class RolesPermissionsOverwrites(PermissionsSet):
-    overwrite_id = Column(ForeignKey("roles_server_permissions_overwrites.overwrite_id"), primary_key=True)
-    __tablename__ = "roles_overwritten_permissions"
+    for overwrite in roles_overwrites:
+        permissions = overwrite.apply(permissions)
 
+    if member_overwrite is not None:
+        permissions = member_overwrite.apply(permissions)
 
-class UsersPermissionsOverwrites(PermissionsSet):
-    overwrite_id = Column(ForeignKey("users_server_permissions_overwrites.overwrite_id"), primary_key=True)
-    __tablename__ = "users_overwritten_permissions"
+    return permissions
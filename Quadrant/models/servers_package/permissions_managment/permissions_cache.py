@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple, Type
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SyncSession, object_session
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.utils.ttl_cache import TTLCache
+from .permissions import Permissions
+
+MemberChannelKey = Tuple[Hashable, int]
+
+
+class PermissionsCache:
+    """
+    Per process cache of effective permissions of servers members in text channels.
+    Permissions are grouped by server, since changes of roles and overwrites affect many members of server at once.
+    Permissions of servers that were changed while they were computed aren't cached.
+    """
+
+    def __init__(self, max_servers: int, ttl: float):
+        """
+        Initializes empty cache.
+
+        :param max_servers: number of servers which members permissions are kept (0 disables cache).
+        :param ttl: seconds after which permissions are computed again.
+        """
+        self._servers = TTLCache(max_servers, ttl)
+        self.hits = 0
+        self.misses = 0
+        # Servers which permissions are being computed and ones that changed meanwhile
+        self._loading: Dict[UUID, int] = defaultdict(int)
+        self._changed_while_loading: Set[UUID] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self._servers.max_size > 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Part of permissions checks that were resolved without querying database."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / lookups
+
+    def get(self, server_id: UUID, member_id: Hashable, channel_id: int) -> Optional[Permissions]:
+        """
+        Gives cached permissions of member in channel.
+
+        :param server_id: server id.
+        :param member_id: id of server member.
+        :param channel_id: text channel id.
+        :return: permissions or None if they aren't cached.
+        """
+        members_permissions: Optional[Dict[MemberChannelKey, Permissions]] = self._servers.get(server_id)
+        permissions = members_permissions.get((member_id, channel_id)) if members_permissions is not None else None
+
+        if permissions is None:
+            self.misses += 1
+
+        else:
+            self.hits += 1
+
+        return permissions
+
+    def store(self, server_id: UUID, member_id: Hashable, channel_id: int, permissions: Permissions) -> None:
+        """
+        Caches computed permissions.
+
+        :param server_id: server id.
+        :param member_id: id of server member.
+        :param channel_id: text channel id.
+        :param permissions: effective permissions of member in channel.
+        :return: nothing.
+        """
+        if not self.enabled:
+            return
+
+        members_permissions = self._servers.peek(server_id)
+        if members_permissions is None:
+            members_permissions = {}
+            self._servers.set(server_id, members_permissions)
+
+        members_permissions[(member_id, channel_id)] = permissions
+
+    async def load(
+        self, server_id: UUID, member_id: Hashable, channel_id: int,
+        compute: Callable[[], Awaitable[Permissions]]
+    ) -> Permissions:
+        """
+        Gives cached permissions of member in channel or computes and caches them.
+        Permissions computed from rows read before concurrent change was committed are given but not cached.
+
+        :param server_id: server id.
+        :param member_id: id of server member.
+        :param channel_id: text channel id.
+        :param compute: coroutine function that computes permissions from database.
+        :return: permissions.
+        """
+        permissions = self.get(server_id, member_id, channel_id)
+        if permissions is not None:
+            return permissions
+
+        self._loading[server_id] += 1
+        try:
+            permissions = await compute()
+
+        finally:
+            self._loading[server_id] -= 1
+            if not self._loading[server_id]:
+                del self._loading[server_id]
+
+        if server_id in self._changed_while_loading:
+            if server_id not in self._loading:
+                self._changed_while_loading.discard(server_id)
+
+            return permissions
+
+        self.store(server_id, member_id, channel_id, permissions)
+        return permissions
+
+    def invalidate_server(self, server_id: UUID) -> None:
+        """
+        Forgets permissions of every member of server. Must be called when roles, overwrites or channels change.
+
+        :param server_id: server id.
+        :return: nothing.
+        """
+        self._servers.pop(server_id)
+
+    def invalidate_member(self, server_id: UUID, member_id: Hashable) -> None:
+        """
+        Forgets permissions of member in every channel. Must be called when member roles change.
+
+        :param server_id: server id.
+        :param member_id: id of server member.
+        :return: nothing.
+        """
+        members_permissions: Optional[Dict[MemberChannelKey, Permissions]] = self._servers.peek(server_id)
+        if members_permissions is None:
+            return
+
+        for key in [key for key in members_permissions if key[0] == member_id]:
+            del members_permissions[key]
+
+    def watch(self, model: Type, member_id_attribute: Optional[str] = None) -> None:
+        """
+        Makes changes of model rows invalidate cached permissions when transaction with them is committed.
+        Invalidating on flush would let requests cache permissions computed from rows that aren't committed yet.
+
+        :param model: mapped class with server_id attribute.
+        :param member_id_attribute: attribute with member id if rows affect only permissions of one member.
+        :return: nothing.
+        """
+        def row_changed(mapper, connection, target) -> None:
+            session = object_session(target)
+            if session is None:
+                return
+
+            member_id = getattr(target, member_id_attribute) if member_id_attribute is not None else None
+            session.info.setdefault("permissions_invalidations", []).append((self, target.server_id, member_id))
+
+        for event_name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, event_name, row_changed)
+
+    def invalidate(self, server_id: UUID, member_id: Optional[Hashable] = None) -> None:
+        """
+        Forgets permissions of member or of every member of server if member isn't given.
+
+        :param server_id: server id.
+        :param member_id: id of server member.
+        :return: nothing.
+        """
+        if server_id in self._loading:
+            self._changed_while_loading.add(server_id)
+
+        if member_id is None:
+            self.invalidate_server(server_id)
+
+        else:
+            self.invalidate_member(server_id, member_id)
+
+    def clear(self) -> None:
+        """Forgets everything."""
+        self._servers.clear()
+
+
+@event.listens_for(SyncSession, "after_commit")
+def _apply_committed_invalidations(session: SyncSession) -> None:
+    for cache, server_id, member_id in session.info.pop("permissions_invalidations", ()):
+        cache.invalidate(server_id, member_id)
+
+
+@event.listens_for(SyncSession, "after_rollback")
+def _forget_rolled_back_invalidations(session: SyncSession) -> None:
+    session.info.pop("permissions_invalidations", None)
+
+
+permissions_cache = PermissionsCache(
+    max_servers=quadrant_config.CachingConfig.permissions_cache_servers.value,
+    ttl=quadrant_config.CachingConfig.permissions_cache_ttl.value
+)
@@ -1,11 +1,18 @@
-from typing import List, TYPE_CHECKING, Union
+from __future__ import annotations
 
+from typing import Hashable, Set, TYPE_CHECKING
+
+from sqlalchemy import and_, select
+
+from Quadrant.models.servers_package.roles_to_members import RolesToMember
+from Quadrant.models.servers_package.server_member import ServerMember
+from .bulk_permissions import ChannelMembersPermissions
 from .channels_overwrites import RolesOverwrites, UsersOverwrites
-from .permissions import PermissionsSet, AbstractTextChannelPermissions
+from .permissions import Permissions, compute_permissions
+from .permissions_cache import permissions_cache
 from .roles import ServerRole
 
 if TYPE_CHECKING:
-    from Quadrant.models.servers_package.server_member import ServerMember
     from Quadrant.models.servers_package.server_channel import ServerChannel
 
 
@@ -17,40 +24,94 @@ class TextChannelsPermissionsProxy:
 
         self.session = session
 
-    async def get_permissions(self) -> Union[AbstractTextChannelPermissions, PermissionsSet]:
+    async def get_permissions(self) -> Permissions:
         """
-        Looking up for users_package permissions in order:
-        Is participant admin?
-        Does participant have any overwrites on that channel?
-        First found overwrite for role from those that participant has (ordered by roles position).
-        Default permissions.
+        Gives permissions of member in channel: channel defaults with permissions of all member roles added,
+        then changed by overwrites of member roles (ordered by roles position) and by overwrite of member.
+        Administrators have every permission.
+        Computed permissions are cached until roles, overwrites or member roles change.
 
-        :return: permissions set (has all fields of TextChannelPermissions).
+        :return: permissions flags.
         """
-        default_permission = self.text_channel.permissions
-        roles: List[ServerRole] = self.member.roles
+        return await permissions_cache.load(
+            self.server_id, self.member.member_id, self.text_channel.channel_id, self._compute_permissions
+        )
 
-        roles_ids = []
-        for role in roles:
-            # Looking for administrator permission since it's one of the most powerful
-            if role.permissions.administrator:
-                return role.permissions
+    async def _compute_permissions(self) -> Permissions:
+        member_id = self.member.member_id
+        roles = [assignment.role for assignment in self.member.roles_assignments]
+        roles_overwrites, member_overwrite = (), None
 
-            roles_ids.append(role.role_id)
+        if not any(Permissions.administrator & role.permissions for role in roles):
+            roles_overwrites = await RolesOverwrites.get_overwrites_by_roles(
+                self.server_id, self.text_channel.channel_id, [role.role_id for role in roles], session=self.session
+            )
+            member_overwrite = await UsersOverwrites.get_overwrites_for_channel(
+                self.server_id, self.text_channel.channel_id, member_id, session=self.session
+            )
 
-        users_overwrites = await UsersOverwrites.get_overwrites_for_channel(
-            self.server_id, self.text_channel.id, self.member.id, session=self.session
+        return compute_permissions(
+            self.text_channel.permissions, (role.permissions for role in roles), roles_overwrites, member_overwrite
         )
 
-        if users_overwrites:
-            return users_overwrites
+    async def has_permissions(self, permissions: Permissions) -> bool:
+        """
+        Checks if member has every one of permissions in channel.
+
+        :param permissions: required permissions flags.
+        :return: check result.
+        """
+        return permissions in await self.get_permissions()
+
+
+class ChannelMembersPermissionsProxy:
+    def __init__(self, text_channel: ServerChannel, session):
+        self.text_channel = text_channel
+        self.server_id = text_channel.server_id
+
+        self.session = session
 
-        permissions: PermissionsSet = await RolesOverwrites.get_permissions_overwrites_by_roles(
-            self.server_id, self.text_channel.channel_id, roles_ids, session=self.session
+    async def get_permissions(self) -> ChannelMembersPermissions:
+        """
+        Gives permissions of every server member in channel, loading channel overwrites,
+        server roles and members roles with four queries no matter how many members server has.
+
+        :return: permissions of members.
+        """
+        channel_id = self.text_channel.channel_id
+        roles = await self.session.execute(
+            select(ServerRole.role_id, ServerRole.role_position, ServerRole.permissions)
+            .filter(ServerRole.server_id == self.server_id)
+        )
+        roles_overwrites = await self.session.execute(
+            select(RolesOverwrites.permissions_for_role_id, RolesOverwrites.allow, RolesOverwrites.deny).filter(
+                RolesOverwrites.server_id == self.server_id, RolesOverwrites.channel_id == channel_id
+            )
+        )
+        members_overwrites = await self.session.execute(
+            select(UsersOverwrites.permissions_for_members_id, UsersOverwrites.allow, UsersOverwrites.deny).filter(
+                UsersOverwrites.server_id == self.server_id, UsersOverwrites.channel_id == channel_id
+            )
+        )
+        # Members without roles are joined with None, so they still get channel defaults
+        members_roles = await self.session.execute(
+            select(ServerMember.member_id, RolesToMember.role_id).outerjoin(
+                RolesToMember, and_(
+                    RolesToMember.member_id == ServerMember.member_id,
+                    RolesToMember.server_id == ServerMember.server_id
+                )
+            ).filter(ServerMember.server_id == self.server_id)
         )
 
-        if not permissions:
-            return default_permission
+        return ChannelMembersPermissions(
+            self.text_channel.permissions, roles.all(), roles_overwrites.all(),
+            members_overwrites.all(), members_roles.all()
+        )
 
-        else:
-            return permissions
+    async def readers(self) -> Set[Hashable]:
+        """
+        Gives members that receive new messages of channel.
+
+        :return: set of members ids.
+        """
+        return (await self.get_permissions()).readers()
@@ -1,56 +1,63 @@
 from uuid import UUID
 
-from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String, exc
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String, exc, select
 from sqlalchemy.orm import relationship
 
-from Quadrant.models.caching import FromCache
+from Quadrant.models.caching import FromCache, orm_cache
 from Quadrant.models.db_init import Base
-from .permissions import RolesPermissions
+from .permissions import Permissions, PermissionsSet, permissions_by_names
+from .permissions_cache import permissions_cache
 
-permissions_columns_names = {c.name for c in RolesPermissions.columns}
 
-
-class ServerRole(Base):
+class ServerRole(Base, PermissionsSet):
     role_id = Column(BigInteger, primary_key=True)
     server_id = Column(ForeignKey("servers_package.id"))
 
     role_name = Column(String(length=50), nullable=False)
     role_position = Column(Integer, default=0)
-    # TODO: replace placeholder for permissions
     color_code = Column(Integer, default=0xffffff)
 
-    permissions = relationship(
-        RolesPermissions, lazy='joined', cascade="all, delete-orphan", uselist=False
-    )
     # Used to define cascade deletes when role is deleted
     _role_assignments = relationship("RolesToMember", lazy="noload", cascade="all, delete-orphan")
     _role_overwrites = relationship("RolesOverwrites", lazy="noload", cascade="all, delete-orphan")
 
     __tablename__ = "server_roles"
 
+    @staticmethod
+    def get_role_query(server_id: UUID, role_id: int):
+        """
+        Gives cached query of exact role.
+
+        :param server_id: server id that role belongs to.
+        :param role_id: role id.
+        :return: sqlalchemy query.
+        """
+        return select(ServerRole).filter(
+            ServerRole.server_id == server_id,
+            ServerRole.role_id == role_id
+        ).options(FromCache("roles"))
+
     @classmethod
     async def get_role(cls, server_id: UUID, role_id: int, *, session):
         try:
-            return await session.query(ServerRole).options(FromCache("default")) \
-                .filter(cls.server_id == server_id).get(role_id)
+            query_result = await session.execute(cls.get_role_query(server_id, role_id))
+            return query_result.scalar_one()
 
         except (OverflowError, exc.NoResultFound):
             raise ValueError("No such role")
 
     # TODO: make safe method with permission checking so participant doesn't edits higher roles
     async def _edit_role_permissions(self, *permissions_names_to_change: str, session) -> None:
-        anything_changed = False
-        for permission_id in permissions_names_to_change:
-            if permission_id not in permissions_columns_names:
-                continue
+        changed_permissions = permissions_by_names(
+            *(name for name in permissions_names_to_change if name in Permissions.__members__)
+        )
+        if not changed_permissions:
+            raise KeyError("Nothing been changed (invalid keys provided)")
 
-            anything_changed = True
-            # Switching bool variables
-            previous_value = getattr(self.permissions, permission_id)
-            setattr(self.permissions, permission_id, not previous_value)
+        # Switching permissions flags
+        self.permissions = int(self.permissions_flags ^ changed_permissions)
+        await session.commit()
+        orm_cache.invalidate(self.get_role_query(self.server_id, self.role_id))
 
-        if anything_changed:
-            await session.commit()
 
-        else:
-            raise KeyError("Nothing been changed (invalid keys provided)")
+permissions_cache.watch(ServerRole)
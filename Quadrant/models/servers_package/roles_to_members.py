@@ -3,6 +3,7 @@ from sqlalchemy.orm import relationship
 
 from Quadrant.models.db_init import Base
 from .permissions_managment.roles import ServerRole
+from .permissions_managment.permissions_cache import permissions_cache
 
 
 class RolesToMember(Base):
@@ -16,3 +17,6 @@ class RolesToMember(Base):
         UniqueConstraint("member_id", "member_id", name="_unique_server_members_role"),
     )
     __tablename__ = "server_members_roles"
+
+
+permissions_cache.watch(RolesToMember, member_id_attribute="member_id")
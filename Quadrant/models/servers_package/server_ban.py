@@ -1,20 +1,23 @@
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, UniqueConstraint, select
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, UniqueConstraint, lambda_stmt, select
 from sqlalchemy.orm import relationship
 from sqlalchemy.exc import NoResultFound
 
-from Quadrant import models
+from Quadrant.models import users_package
 from Quadrant.models import Base
 from Quadrant.models.group_channel_package.group_ban import BANS_PER_PAGE
+from Quadrant.models.replicas import on_replica
+from Quadrant.models.utils.pagination import Keyset, KeysetPage
 
 
 class ServerBan(Base):
     id = Column(BigInteger, primary_key=True)
     server_id = Column(ForeignKey("servers_package.id"), nullable=False, index=True)
-    banned_user_id = Column(ForeignKey('users_package.id'), nullable=False)
-    banned_by_user_id = Column(ForeignKey("users_package.id"), nullable=False, index=True)
+    banned_user_id = Column(ForeignKey('users.id'), nullable=False)
+    banned_by_user_id = Column(ForeignKey("users.id"), nullable=False, index=True)
     banned_at = Column(DateTime, default=datetime.utcnow)
     reason = Column(String(2048), default="")
 
@@ -27,23 +30,26 @@ class ServerBan(Base):
     __table_args__ = (
         UniqueConstraint("server_id", "banned_user_id", name="_unique_ban_from_server"),
     )
+    __tablename__ = "server_bans"
 
     @staticmethod
-    def get_ban_query(server_id: UUID, banned_user_id: models.User.id):
-        return select(ServerBan).filter(
-            ServerBan.server_id == server_id,
-            ServerBan.banned_user_id == banned_user_id
+    def get_ban_query(server_id: UUID, banned_user_id: users_package.User.id):
+        return lambda_stmt(
+            lambda: select(ServerBan).where(
+                ServerBan.server_id == server_id,
+                ServerBan.banned_user_id == banned_user_id
+            )
         )
 
     @classmethod
-    async def get_ban(cls, server_id: UUID, banned_user_id: models.User.id, *, session):
+    async def get_ban(cls, server_id: UUID, banned_user_id: users_package.User.id, *, session):
         query_result = await session.execute(
             cls.get_ban_query(server_id, banned_user_id)
         )
         return query_result.scalar_one()
 
     @classmethod
-    async def is_user_banned(cls, server_id: UUID, banned_user_id: models.User.id, *, session) -> bool:
+    async def is_user_banned(cls, server_id: UUID, banned_user_id: users_package.User.id, *, session) -> bool:
         try:
             await cls.get_ban(server_id, banned_user_id, session=session)
 
@@ -53,15 +59,32 @@ class ServerBan(Base):
         return True
 
     @staticmethod
-    async def get_bans_page(server_id: UUID, page: int = 0, *, session):
+    async def get_bans_page(
+        server_id: UUID, page: int = 0, *,
+        after: Optional[str] = None, before: Optional[str] = None, session
+    ) -> KeysetPage:
         if page < 0:
             raise ValueError("Invalid page number")
 
-        query_result = await session.execute(
-            select(ServerBan)
-            .filter(ServerBan.server_id == server_id).order_by(
-                ServerBan.banned_user_id.desc()
-            ).limit(BANS_PER_PAGE).offset(page * BANS_PER_PAGE)
+        if page and (after is not None or before is not None):
+            raise ValueError("Page number can not be used with cursors")
+
+        # Ordering is covered by unique constraint index on server_id and banned_user_id
+        query = bans_keyset.paginate(
+            select(ServerBan).filter(ServerBan.server_id == server_id), BANS_PER_PAGE, after=after, before=before
         )
+        offset = page * BANS_PER_PAGE
+        if offset:
+            query = query.offset(offset)
+
+        query_result = await session.execute(on_replica(query))
+        return bans_keyset.make_page(
+            query_result.scalars().all(), BANS_PER_PAGE, after=after, before=before, offset=offset
+        )
+
 
-        return await query_result.all()
+bans_keyset = Keyset(
+    (ServerBan.banned_user_id, True),
+    row_values=lambda ban: (ban.banned_user_id,),
+    casters=(UUID,)
+)
@@ -3,7 +3,7 @@ from datetime import datetime
 from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, PrimaryKeyConstraint
 from sqlalchemy.orm import relationship
 
-from Quadrant import models
+from Quadrant.models import users_package
 from Quadrant.models.db_init import Base
 from .permissions_managment.roles import ServerRole
 from .roles_to_members import RolesToMember
@@ -41,7 +41,7 @@ class ServerMember(Base):
     )
     __tablename__ = "server_members"
 
-    async def assign_role(self, assigned_by: models.User, role: ServerRole, *, session) -> None:
+    async def assign_role(self, assigned_by: users_package.User, role: ServerRole, *, session) -> None:
         # TODO: check permissions to assign roles
 
         self.roles_assignments.append(RolesToMember(server_id=self.server_id, member_id=self.id, role=role))
@@ -10,8 +10,9 @@ from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import relationship
 
 import Quadrant.models.servers_package.server_invite
-from Quadrant import models
+from Quadrant.models import users_package
 from Quadrant.models.db_init import Base
+from Quadrant.models.membership_index import membership_index
 from .server_member import ServerMember
 from .server_ban import ServerBan
 from .server_invite import ServerInvite
@@ -32,7 +33,7 @@ class Server(Base):
     __tablename__ = "servers_package"
 
     @classmethod
-    async def create_server(cls, owner: models.User, name: str, *, session):
+    async def create_server(cls, owner: users_package.User, name: str, *, session):
         # TODO: validate server name
         new_server = cls(name=name, owner_id=owner)
         session.add(new_server)
@@ -41,21 +42,18 @@ class Server(Base):
         return new_server
 
     @staticmethod
-    async def is_member(server_id: UUID, user: models.User, *, session):
-        return await session.query(
-            session.query(Server).filter(
-                ServerMember.member_id == user.id,
-                Server.server_id == server_id
-            ).exists()
-        ).scalar() or False
-
-    async def update_name(self, new_name: str, update_by: models.User, *, session) -> None:
+    async def is_member(server_id: UUID, user: users_package.User, *, session) -> bool:
+        return await membership_index.is_member("server", server_id, user.id, session=session)
+
+    async def update_name(self, new_name: str, update_by: users_package.User, *, session) -> None:
         # TODO: validate name
         # TODO: check permissions
         self.name = new_name
         await session.commit()
 
-    async def transfer_ownership(self, from_user: models.User, to_user: models.User, *, session) -> None:
+    async def transfer_ownership(
+        self, from_user: users_package.User, to_user: users_package.User, *, session
+    ) -> None:
         if not (await self.is_member(self.id, to_user, session=session)):
             raise ValueError("User is not a member of this server")
 
@@ -65,7 +63,7 @@ class Server(Base):
         self.owner_id = to_user.id
         await session.commit()
 
-    async def delete_server(self, delete_by: models.User, *, session) -> bool:
+    async def delete_server(self, delete_by: users_package.User, *, session) -> bool:
         if delete_by.id != self.owner_id:
             raise PermissionError("You can not delete the server!")
 
@@ -73,3 +71,7 @@ class Server(Base):
         await session.commit()
 
         return True
+
+
+membership_index.register("server", ServerMember.server_id, ServerMember.member_id)
+membership_index.register_channels("server", Server, "server_id", "owner_id")
@@ -1,3 +1,6 @@
+from .authorization_cache import authorization_cache
+from .presence import PresenceService, presence_service
+from .relations_index import RelationsIndex, relations_index
 from .user_auth import UserInternalAuthorization, OauthUserAuthorization
 from .user import User
 from .relations_types import UsersRelationType
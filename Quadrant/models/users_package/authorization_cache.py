@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, TYPE_CHECKING, Tuple
+from uuid import UUID
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from .user_auth import UserInternalAuthorization
+    from .user_session import UserSession
+
+TokenKey = Tuple[str, bool]
+
+
+@dataclass
+class AuthorizationCacheEntry:
+    auth_user: UserInternalAuthorization
+    alive_sessions: Dict[int, UserSession] = field(default_factory=dict)
+
+
+class AuthorizationCache:
+    """
+    Per process cache of resolved tokens that lets authorization skip users_auth and users_sessions lookups.
+    Cached instances must be detached snapshots (see detached_snapshot), which are merged into requests session
+    before use.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries = TTLCache(max_size, ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._entries.max_size > 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Part of authorizations that were resolved without querying database."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / lookups
+
+    def get(
+        self, token: str, is_bot: bool, session_id: Optional[int] = None
+    ) -> Tuple[Optional[UserInternalAuthorization], Optional[UserSession]]:
+        """
+        Gives cached authorization for token.
+
+        :param token: user token.
+        :param is_bot: represents if token belongs to bot or normal user.
+        :param session_id: id of users session that must be alive (bots don't have sessions).
+        :return: cached authorization and session or Nones if anything required isn't cached.
+        """
+        entry: Optional[AuthorizationCacheEntry] = self._entries.get((token, is_bot))
+        if entry is None:
+            self.misses += 1
+            return None, None
+
+        if is_bot:
+            self.hits += 1
+            return entry.auth_user, None
+
+        user_session = entry.alive_sessions.get(session_id)
+        if user_session is None:
+            self.misses += 1
+            return None, None
+
+        self.hits += 1
+        return entry.auth_user, user_session
+
+    def store(
+        self, token: str, is_bot: bool,
+        auth_user: UserInternalAuthorization, user_session: Optional[UserSession] = None
+    ) -> None:
+        """
+        Caches resolved authorization.
+
+        :param token: user token.
+        :param is_bot: represents if token belongs to bot or normal user.
+        :param auth_user: authorization instance that was found by token.
+        :param user_session: alive users session that request used.
+        :return: nothing.
+        """
+        key: TokenKey = (token, is_bot)
+        entry: Optional[AuthorizationCacheEntry] = self._entries.get(key)
+
+        if entry is None or entry.auth_user.user_id != auth_user.user_id:
+            entry = AuthorizationCacheEntry(auth_user)
+
+        if user_session is not None:
+            entry.alive_sessions[user_session.session_id] = user_session
+
+        self._entries.set(key, entry)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """
+        Forgets every token of user. Must be called when account is banned, deleted, changed or token rotated.
+
+        :param user_id: id of user.
+        :return: nothing.
+        """
+        for key, entry in self._entries.items():
+            if entry.auth_user.user_id == user_id:
+                self._entries.pop(key)
+
+    def invalidate_session(self, user_id: UUID, session_id: int) -> None:
+        """
+        Forgets users session so next request with it will be checked in database.
+
+        :param user_id: id of user who owns session.
+        :param session_id: id of terminated session.
+        :return: nothing.
+        """
+        for _, entry in self._entries.items():
+            if entry.auth_user.user_id == user_id:
+                entry.alive_sessions.pop(session_id, None)
+
+    def resize(self, max_size: int) -> None:
+        """
+        Changes number of tokens cache keeps (0 disables cache).
+
+        :param max_size: new max number of cached tokens.
+        :return: nothing.
+        """
+        self._entries.resize(max_size)
+
+    def clear(self) -> None:
+        """Forgets everything."""
+        self._entries.clear()
+
+
+authorization_cache = AuthorizationCache(
+    max_size=quadrant_config.CachingConfig.auth_cache_size.value,
+    ttl=quadrant_config.CachingConfig.auth_cache_ttl.value
+)
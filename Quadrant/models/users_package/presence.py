@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Type
+from uuid import UUID
+
+from sqlalchemy import update
+from tornado.log import app_log
+
+from Quadrant.config import quadrant_config
+from Quadrant.events import EventType, events_hub, presence_topic
+from Quadrant.models.db_init import Session
+from .users_status import UsersStatus
+
+
+class PresenceEntry:
+    __slots__ = ("status", "text_status", "connections", "last_heartbeat", "expired_status")
+
+    def __init__(self, status: UsersStatus, text_status: str, last_heartbeat: float):
+        self.status = status
+        self.text_status = text_status
+        self.connections = 0
+        self.last_heartbeat = last_heartbeat
+        # Status that connected user had before his heartbeats stopped (None while he is alive)
+        self.expired_status: Optional[UsersStatus] = None
+
+
+class PresenceService:
+    """
+    Keeps statuses of users connected to this process in memory. Users that stop sending heartbeats become offline.
+    Changes of statuses are published right away, but written to database by periodic flush,
+    so many changes of same user are written once and all changes of one status are written with one update.
+    Database keeps statuses of users that aren't connected to this process.
+    """
+
+    def __init__(
+        self, heartbeat_timeout: float, session_factory=Session, clock: Callable[[], float] = monotonic
+    ):
+        """
+        Initializes presence service.
+
+        :param heartbeat_timeout: seconds without heartbeats after which user becomes offline.
+        :param session_factory: sqlalchemy async sessions maker.
+        :param clock: function giving current time in seconds.
+        """
+        self.heartbeat_timeout = heartbeat_timeout
+        self.session_factory = session_factory
+        self.clock = clock
+        self._users_model: Optional[Type] = None
+        self._listeners: List[Callable[[UUID, UsersStatus], None]] = []
+
+        self._entries: Dict[UUID, PresenceEntry] = {}
+        # Newest statuses that aren't written to database yet
+        self._unflushed: Dict[UUID, UsersStatus] = {}
+
+    def register(self, users_model: Type) -> None:
+        """
+        Sets model which status column is updated by flush.
+
+        :param users_model: mapped class with id and status columns.
+        :return: nothing.
+        """
+        self._users_model = users_model
+
+    def add_listener(self, listener: Callable[[UUID, UsersStatus], None]) -> None:
+        """
+        Makes function to be called with user id and new status every time status of user changes.
+
+        :param listener: function.
+        :return: nothing.
+        """
+        self._listeners.append(listener)
+
+    @property
+    def unflushed_count(self) -> int:
+        return len(self._unflushed)
+
+    def status_of(self, user_id: UUID, stored_status: UsersStatus) -> UsersStatus:
+        """
+        Gives current status of user.
+
+        :param user_id: user id.
+        :param stored_status: status that was loaded from database.
+        :return: status known to this process or stored one.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            return entry.status
+
+        return self._unflushed.get(user_id, stored_status)
+
+    def connect(self, user_id: UUID, stored_status: UsersStatus, text_status: str) -> None:
+        """
+        Registers new connection of user, offline user becomes online.
+
+        :param user_id: user id.
+        :param stored_status: status of user that was loaded from database.
+        :param text_status: text status of user.
+        :return: nothing.
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            status = self.status_of(user_id, stored_status)
+            entry = self._entries[user_id] = PresenceEntry(status, text_status, self.clock())
+            if status == UsersStatus.offline:
+                self._change(user_id, entry, UsersStatus.online)
+
+        entry.connections += 1
+        self._keep_alive(user_id, entry)
+
+    def heartbeat(self, user_id: UUID) -> None:
+        """
+        Marks user as alive, user that became offline without heartbeats gets his status back.
+
+        :param user_id: user id.
+        :return: nothing.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            self._keep_alive(user_id, entry)
+
+    def disconnect(self, user_id: UUID) -> None:
+        """
+        Forgets connection of user, user becomes offline when he has no connections left.
+
+        :param user_id: user id.
+        :return: nothing.
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+
+        entry.connections -= 1
+        if entry.connections <= 0:
+            del self._entries[user_id]
+            self._change(user_id, entry, UsersStatus.offline)
+
+    def set_status(self, user_id: UUID, status: UsersStatus, text_status: str) -> None:
+        """
+        Sets status chosen by user. Users without connections keep it until heartbeat timeout passes.
+
+        :param user_id: user id.
+        :param status: new status.
+        :param text_status: text status of user.
+        :return: nothing.
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            entry = PresenceEntry(status, text_status, self.clock())
+            if status != UsersStatus.offline:
+                self._entries[user_id] = entry
+
+        elif status == UsersStatus.offline and entry.connections <= 0:
+            del self._entries[user_id]
+
+        entry.text_status = text_status
+        entry.last_heartbeat = self.clock()
+        entry.expired_status = None
+        self._change(user_id, entry, status, force=True)
+
+    def expire(self) -> List[UUID]:
+        """
+        Makes users that didn't send heartbeats for heartbeat_timeout seconds offline.
+        Entries of users that still have connections are kept, so their next heartbeat brings them back.
+
+        :return: ids of users that became offline.
+        """
+        expire_before = self.clock() - self.heartbeat_timeout
+        expired = [
+            user_id for user_id, entry in self._entries.items()
+            if entry.last_heartbeat < expire_before and entry.expired_status is None
+        ]
+
+        for user_id in expired:
+            entry = self._entries[user_id]
+            if entry.connections > 0:
+                entry.expired_status = entry.status
+
+            else:
+                del self._entries[user_id]
+
+            self._change(user_id, entry, UsersStatus.offline)
+
+        return expired
+
+    async def flush(self) -> int:
+        """
+        Writes statuses that changed since last flush with one update per status.
+
+        :return: number of written statuses.
+        """
+        if not self._unflushed or self._users_model is None:
+            return 0
+
+        changes, self._unflushed = self._unflushed, {}
+        users_ids_by_status: Dict[UsersStatus, List[UUID]] = defaultdict(list)
+        for user_id, status in changes.items():
+            users_ids_by_status[status].append(user_id)
+
+        users_model = self._users_model
+        try:
+            async with self.session_factory() as session:
+                for status, users_ids in users_ids_by_status.items():
+                    await session.execute(
+                        update(users_model).where(users_model.id.in_(users_ids)).values(status=status)
+                        .execution_options(synchronize_session=False)
+                    )
+
+                await session.commit()
+
+        except Exception:
+            app_log.exception("Failed to write users statuses")
+            # Changes made during flush are newer than failed ones
+            for user_id, status in changes.items():
+                self._unflushed.setdefault(user_id, status)
+
+            return 0
+
+        return len(changes)
+
+    async def maintain(self) -> None:
+        """
+        Expires users without heartbeats and writes changed statuses.
+
+        :return: nothing.
+        """
+        self.expire()
+        await self.flush()
+
+    def _keep_alive(self, user_id: UUID, entry: PresenceEntry) -> None:
+        entry.last_heartbeat = self.clock()
+        if entry.expired_status is not None:
+            status, entry.expired_status = entry.expired_status, None
+            self._change(user_id, entry, status)
+
+    def _change(self, user_id: UUID, entry: PresenceEntry, status: UsersStatus, force: bool = False) -> None:
+        if entry.status == status and not force:
+            return
+
+        entry.status = status
+        self._unflushed[user_id] = status
+        for listener in self._listeners:
+            listener(user_id, status)
+
+        events_hub.publish(
+            presence_topic(user_id), EventType.user_status_updated,
+            {"user_id": user_id, "status": status.name, "text_status": entry.text_status}
+        )
+
+
+presence_service = PresenceService(quadrant_config.PresenceConfig.heartbeat_timeout.value)
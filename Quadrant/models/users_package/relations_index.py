@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.utils.ttl_cache import TTLCache
+from .presence import presence_service
+from .relations_types import UsersRelationType
+from .users_status import UsersStatus
+
+# Order in which users with different statuses are shown in relations pages
+USERS_STATUS_ORDER = {
+    UsersStatus.online: 0,
+    UsersStatus.do_not_disturb: 1,
+    UsersStatus.away: 2,
+    UsersStatus.asleep: 3,
+    UsersStatus.offline: 4,
+}
+STATUS_GROUPS = len(USERS_STATUS_ORDER) + 1
+RelationsKey = Tuple[UUID, UsersRelationType]
+OrderValues = Tuple[int, str, UUID]
+
+
+def status_group(status: UsersStatus) -> int:
+    return USERS_STATUS_ORDER.get(status, len(USERS_STATUS_ORDER))
+
+
+class RelatedUser:
+    """User with whom someone has relation, with values relations are ordered by."""
+    __slots__ = ("id", "username", "status")
+
+    def __init__(self, user_id: UUID, username: str, status: UsersStatus):
+        self.id = user_id
+        self.username = username
+        self.status = status
+
+    @property
+    def group(self) -> int:
+        return status_group(self.status)
+
+
+class RelationsList:
+    """
+    Users with whom user has relations of one type. Users are kept in sorted lists of usernames and ids,
+    one list for every status, so page is sliced from lists instead of sorting every relation.
+    """
+
+    def __init__(self, related_users: Iterable[Tuple[UUID, str, UsersStatus]] = ()):
+        """
+        Initializes list.
+
+        :param related_users: ids, usernames and statuses of related users.
+        """
+        self.users: Dict[UUID, RelatedUser] = {}
+        self.groups: List[List[Tuple[str, UUID]]] = [[] for _ in range(STATUS_GROUPS)]
+
+        for user_id, username, status in related_users:
+            related_user = self.users[user_id] = RelatedUser(user_id, username, status)
+            self.groups[related_user.group].append((username, user_id))
+
+        for group in self.groups:
+            group.sort()
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def __contains__(self, user_id: UUID) -> bool:
+        return user_id in self.users
+
+    def add(self, user_id: UUID, username: str, status: UsersStatus) -> None:
+        self.remove(user_id)
+        related_user = self.users[user_id] = RelatedUser(user_id, username, status)
+        insort(self.groups[related_user.group], (username, user_id))
+
+    def remove(self, user_id: UUID) -> Optional[RelatedUser]:
+        related_user = self.users.pop(user_id, None)
+        if related_user is not None:
+            group = self.groups[related_user.group]
+            del group[bisect_left(group, (related_user.username, user_id))]
+
+        return related_user
+
+    def update(self, user_id: UUID, *, username: Optional[str] = None, status: Optional[UsersStatus] = None) -> None:
+        related_user = self.users.get(user_id)
+        if related_user is None:
+            return
+
+        self.add(
+            user_id, related_user.username if username is None else username,
+            related_user.status if status is None else status
+        )
+
+    def page(self, limit: int, values: Optional[OrderValues] = None, forward: bool = True) -> List[RelatedUser]:
+        """
+        Gives users that go after or before ordering values.
+
+        :param limit: max number of users.
+        :param values: ordering values of row after or before which page starts (None gives first users).
+        :param forward: flag that shows if users go after values, otherwise they go before and in reverse order.
+        :return: related users in order they go from values.
+        """
+        users_ids: List[UUID] = []
+        if values is not None and not 0 <= values[0] < STATUS_GROUPS:
+            raise ValueError("Invalid cursor")
+
+        if forward:
+            first_group = 0 if values is None else values[0]
+            for group_index in range(first_group, STATUS_GROUPS):
+                group = self.groups[group_index]
+                start = bisect_right(group, values[1:]) if values is not None and group_index == first_group else 0
+                users_ids.extend(user_id for _, user_id in group[start:start + limit - len(users_ids)])
+                if len(users_ids) >= limit:
+                    break
+
+        else:
+            first_group = STATUS_GROUPS - 1 if values is None else values[0]
+            for group_index in range(first_group, -1, -1):
+                group = self.groups[group_index]
+                end = (
+                    bisect_left(group, values[1:]) if values is not None and group_index == first_group
+                    else len(group)
+                )
+                users_ids.extend(user_id for _, user_id in reversed(group[max(end - limit + len(users_ids), 0):end]))
+                if len(users_ids) >= limit:
+                    break
+
+        return [self.users[user_id] for user_id in users_ids]
+
+
+class RelationsIndex:
+    """
+    Per process index of users relations lists. List is loaded on first page request and updated
+    by relations changes made in this process, statuses changes from presence service and usernames changes.
+    Lists live at most ttl seconds, so changes made by other processes are seen after that.
+    """
+
+    def __init__(self, max_lists: int, ttl: float):
+        """
+        Initializes empty index.
+
+        :param max_lists: number of relations lists kept in memory (0 disables index).
+        :param ttl: seconds after which list is loaded again.
+        """
+        self._lists = TTLCache(max_lists, ttl, on_evict=self._forget_list)
+        # Keys of lists every user is in, so his status and username changes reach them
+        self._listed_in: Dict[UUID, Set[RelationsKey]] = defaultdict(set)
+        self._loading: Dict[UUID, int] = defaultdict(int)
+        self._changed_while_loading: Set[UUID] = set()
+
+    @property
+    def hit_rate(self) -> float:
+        """Part of relations pages that were served without loading relations."""
+        return self._lists.hit_rate
+
+    async def get_relations(
+        self, user_id: UUID, relation_type: UsersRelationType,
+        load_relations: Callable[[], Awaitable[Iterable[Tuple[UUID, str, UsersStatus]]]]
+    ) -> RelationsList:
+        """
+        Gives relations list of user, loading it if it isn't kept.
+
+        :param user_id: user id.
+        :param relation_type: type of relations.
+        :param load_relations: coroutine function giving ids, usernames and stored statuses of related users.
+        :return: relations list.
+        """
+        key = (user_id, relation_type)
+        relations_list: Optional[RelationsList] = self._lists.get(key)
+        if relations_list is not None:
+            return relations_list
+
+        self._loading[user_id] += 1
+        try:
+            related_users = await load_relations()
+
+        finally:
+            self._loading[user_id] -= 1
+            if not self._loading[user_id]:
+                del self._loading[user_id]
+
+        relations_list = RelationsList(
+            (related_user_id, username, presence_service.status_of(related_user_id, stored_status))
+            for related_user_id, username, stored_status in related_users
+        )
+        # List that was loaded before relations changed would be stale
+        if user_id in self._changed_while_loading:
+            if user_id not in self._loading:
+                self._changed_while_loading.discard(user_id)
+
+            return relations_list
+
+        self._lists.set(key, relations_list)
+        if key in self._lists:
+            for related_user_id in relations_list.users:
+                self._listed_in[related_user_id].add(key)
+
+        return relations_list
+
+    def relation_changed(
+        self, user_id: UUID, related_user_id: UUID, username: str, stored_status: UsersStatus,
+        relation_status: UsersRelationType
+    ) -> None:
+        """
+        Moves related user to list of new relation type after change is committed.
+
+        :param user_id: id of user whose relation changed.
+        :param related_user_id: id of user with whom relation changed.
+        :param username: username of related user.
+        :param stored_status: status of related user loaded from database.
+        :param relation_status: new relation type from user side.
+        :return: nothing.
+        """
+        if user_id in self._loading:
+            self._changed_while_loading.add(user_id)
+
+        status = presence_service.status_of(related_user_id, stored_status)
+        for relation_type in UsersRelationType:
+            key = (user_id, relation_type)
+            relations_list: Optional[RelationsList] = self._lists.peek(key)
+            if relations_list is None:
+                continue
+
+            if relation_type == relation_status:
+                relations_list.add(related_user_id, username, status)
+                self._listed_in[related_user_id].add(key)
+
+            elif relations_list.remove(related_user_id) is not None:
+                self._unlist(related_user_id, key)
+
+    def status_changed(self, user_id: UUID, status: UsersStatus) -> None:
+        for key in tuple(self._listed_in.get(user_id, ())):
+            relations_list: Optional[RelationsList] = self._lists.peek(key)
+            if relations_list is not None:
+                relations_list.update(user_id, status=status)
+
+    def username_changed(self, user_id: UUID, username: str) -> None:
+        for key in tuple(self._listed_in.get(user_id, ())):
+            relations_list: Optional[RelationsList] = self._lists.peek(key)
+            if relations_list is not None:
+                relations_list.update(user_id, username=username)
+
+    def clear(self) -> None:
+        """Forgets everything."""
+        self._lists.clear()
+        self._listed_in.clear()
+
+    def _forget_list(self, key: RelationsKey, relations_list: RelationsList) -> None:
+        for related_user_id in relations_list.users:
+            self._unlist(related_user_id, key)
+
+    def _unlist(self, related_user_id: UUID, key: RelationsKey) -> None:
+        lists_keys = self._listed_in.get(related_user_id)
+        if lists_keys is not None:
+            lists_keys.discard(key)
+            if not lists_keys:
+                del self._listed_in[related_user_id]
+
+
+relations_index = RelationsIndex(
+    max_lists=quadrant_config.CachingConfig.relations_cache_lists.value,
+    ttl=quadrant_config.CachingConfig.relations_cache_ttl.value
+)
+presence_service.add_listener(relations_index.status_changed)
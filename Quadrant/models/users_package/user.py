@@ -5,13 +5,21 @@ from typing import List
 from uuid import UUID, uuid4
 
 from tornado.log import gen_log
-from sqlalchemy import Boolean, Column, DateTime, Enum, Integer, String, ForeignKey, and_, select, UniqueConstraint
+from sqlalchemy import (
+    Boolean, Column, DateTime, Enum, FetchedValue, Integer, String, ForeignKey, and_, lambda_stmt, literal_column,
+    select, UniqueConstraint
+)
 from sqlalchemy.dialects.postgresql import UUID as db_UUID  # noqa
 from sqlalchemy.orm import relationship, noload
 
+from Quadrant.events import EventType, events_hub, presence_topic
 from Quadrant.models.db_init import Base
+from Quadrant.models.replicas import on_replica
 from Quadrant.models.users_package.settings import UsersAppSpecificSettings, UsersCommonSettings
 from Quadrant.models.utils import generate_random_color
+from .authorization_cache import authorization_cache
+from .presence import presence_service
+from .relations_index import relations_index
 from .users_status import UsersStatus
 
 MAX_OWNED_BOTS = 20
@@ -27,6 +35,11 @@ class User(Base):
 
     is_bot = Column(Boolean, nullable=False, default=False)
     is_banned = Column(Boolean, nullable=False, default=False)
+    # Changes with every update of row, so encoded representations of user can be cached until it does
+    version = Column(
+        Integer, nullable=False, default=1, server_default="0",
+        onupdate=literal_column("version") + 1, server_onupdate=FetchedValue()
+    )
 
     bot_owner_id = Column(ForeignKey("users.id"), nullable=True)
     users_common_settings: UsersCommonSettings = relationship(
@@ -37,6 +50,8 @@ class User(Base):
 
     __table_args__ = (UniqueConstraint('color_id', 'username', name='_unique_user_nick_and_color_id'),)
     __tablename__ = "users"
+    # Loads new version right after update, so it won't be lazy loaded later
+    __mapper_args__ = {"eager_defaults": True}
 
     async def set_username(self, username: str, *, session) -> None:
         """
@@ -48,12 +63,19 @@ class User(Base):
         """
         self.username = username
         await session.commit()
+        authorization_cache.invalidate_user(self.id)
+        relations_index.username_changed(self.id, username)
 
         gen_log.debug(f"User with id {self.id} has updated nickname to {username}")
 
+    @property
+    def presence_status(self) -> UsersStatus:
+        """Current status of participant, which may be newer than one that is stored in database."""
+        return presence_service.status_of(self.id, self.status)
+
     async def set_status(self, status: str, *, session) -> None:
         """
-        Sets participant a new status.
+        Sets participant a new status. Status is written to database later by presence service.
 
         :param status: one of string names from Quadrant.models.users_package.users_status.UsersStatus enum.
         :param session: sqlalchemy session.
@@ -61,8 +83,7 @@ class User(Base):
         """
         # Raises KeyError if there's no such status in enum
         status = UsersStatus[status]
-        self.status = status
-        await session.commit()
+        presence_service.set_status(self.id, status, self.text_status)
 
         gen_log.debug(f"{self.id} has updated status to {status}")
 
@@ -77,9 +98,32 @@ class User(Base):
         # TODO: add validations and clean up
         self.text_status = text_status
         await session.commit()
+        authorization_cache.invalidate_user(self.id)
+        self.publish_status_update()
 
         gen_log.debug(f"User with id {self.id} has updated text status to {text_status}")
 
+    def publish_status_update(self) -> None:
+        """Notifies friends and other connections of participant about status update."""
+        events_hub.publish(
+            presence_topic(self.id), EventType.user_status_updated,
+            {"user_id": self.id, "status": self.presence_status.name, "text_status": self.text_status}
+        )
+
+    async def set_banned(self, is_banned: bool, *, session) -> None:
+        """
+        Bans or unbans participant.
+
+        :param is_banned: new ban status.
+        :param session: sqlalchemy session.
+        :return: nothing.
+        """
+        self.is_banned = is_banned
+        await session.commit()
+        authorization_cache.invalidate_user(self.id)
+
+        gen_log.debug(f"User with id {self.id} has ban status set to {is_banned}")
+
     async def get_owned_bot(self, bot_id: UUID, *, session) -> User:
         """
         Gives specific bot that belongs to participant by bots id.
@@ -144,7 +188,7 @@ class User(Base):
             "id": self.id,
             "color_id": self.color_id,
             "username": self.username,
-            "status": self.status.name,
+            "status": self.presence_status.name,
             "text_status": self.text_status,
             "registered_at": self.registered_at,
             "is_bot": self.is_bot,
@@ -169,28 +213,29 @@ class User(Base):
         :param filter_bots: flag that shows if we must include bots.
         :return: participant instance.
         """
-        user_query = select(cls).filter(cls.id == user_id)
+        # Lambda statements are built and compiled once, next calls only bind new parameters
+        user_query = lambda_stmt(lambda: select(cls).where(cls.id == user_id))
 
         if filter_banned:
-            user_query = user_query.filter(cls.is_banned.is_(False))
+            user_query += lambda query: query.where(cls.is_banned.is_(False))
 
         if filter_bots:
-            user_query = user_query.filter(cls.is_bot.is_(False))
+            user_query += lambda query: query.where(cls.is_bot.is_(False))
 
         # TODO: maybe add option to not fetch users settings
-        result = await session.execute(user_query)
+        result = await session.execute(on_replica(user_query))
         user = result.scalar_one()
 
         return user
 
     @classmethod
     async def get_user_by_username_and_color_id(cls, username: str, color_id: int, *, session) -> User:
-        user_query = select(cls).filter(
+        user_query = lambda_stmt(lambda: select(cls).where(
             cls.username == username,
             cls.color_id == color_id,
             cls.is_bot.is_(False),
             cls.is_banned.is_(False)
-        )
+        ))
         result = await session.execute(user_query)
         user = result.scalar_one()
 
@@ -199,3 +244,6 @@ class User(Base):
     class exc:
         class UserIsBot(PermissionError):
             ...
+
+
+presence_service.register(User)
@@ -3,14 +3,20 @@ from __future__ import annotations
 from hmac import compare_digest
 from secrets import token_urlsafe
 
-from sqlalchemy import BigInteger, Column, ForeignKey, String, select
+from sqlalchemy import BigInteger, Column, ForeignKey, String, exc, lambda_stmt, select
 from sqlalchemy.orm import backref, relationship
 
+from Quadrant.config import quadrant_config
 from Quadrant.models.db_init import Base
 from Quadrant.models.utils import generate_internal_token
-from Quadrant.models.utils.hashing import hash_login, hash_password
+from Quadrant.models.utils.hashing import hash_login, hashing_executor
+from .authorization_cache import authorization_cache
 from .user import User, UsersCommonSettings
 
+# Salt of same length as users salts, passwords of unknown logins are hashed with it
+# so they are rejected after same time as wrong passwords of existing users
+DUMMY_SALT = token_urlsafe(30)
+
 
 class UserInternalAuthorization(Base):
     record_id = Column(BigInteger, primary_key=True)
@@ -20,6 +26,8 @@ class UserInternalAuthorization(Base):
     login = Column(String(64), nullable=True, unique=True, index=True)
     password = Column(String(64), nullable=True)
     salt = Column(String(40), nullable=True)
+    # Passwords are rehashed with configured scheme on login, so old rows keep scheme they were hashed with
+    password_scheme = Column(String(32), nullable=False, default="blake2b", server_default="blake2b")
 
     user: User = relationship(
         User, uselist=False, backref=backref('internal_auth', cascade="all, delete-orphan"),
@@ -46,15 +54,14 @@ class UserInternalAuthorization(Base):
         """
         login = hash_login(login)
         salt = token_urlsafe(30)
-        # Somehow without async loops it runs way faster than with
-        # When was ran locally through ProcessPoolExecutor 3 users were created in 4 seconds
-        # while in sync mode just 300ms
-        password = hash_password(password, salt)
+        # Executor workers are started with server, so hashing doesn't wait for pool startup
+        password_scheme = quadrant_config.Security.password_hashing_scheme.value
+        password = await hashing_executor.hash_password(password, salt, password_scheme)
         internal_token = generate_internal_token()
         user = User(username=username, users_common_settings=UsersCommonSettings())
         user_auth = UserInternalAuthorization(
             login=login, password=password, internal_token=internal_token,
-            salt=salt, user=user
+            salt=salt, password_scheme=password_scheme, user=user
         )
 
         session.add(user_auth)
@@ -71,12 +78,14 @@ class UserInternalAuthorization(Base):
         :param session: sqlalchemy session.
         :return: UserInternalAuthorization instance.
         """
-        query = select(UserInternalAuthorization) \
-            .join(User).filter(
+        # Flag is compared with "=" since "IS" can't take bound parameter
+        query = lambda_stmt(
+            lambda: select(UserInternalAuthorization).join(User).where(
                 UserInternalAuthorization.internal_token == token,
                 User.is_banned.is_(False),
-                User.is_bot.is_(is_bot)
+                User.is_bot == is_bot
             )
+        )
         query_result = await session.execute(query)
         return query_result.scalar_one()
 
@@ -91,24 +100,54 @@ class UserInternalAuthorization(Base):
         :return: UserInternalAuthorization instance.
         """
         login = hash_login(login)
-        query = select(cls).join(User).filter(
-            User.is_banned.is_(False),
-            UserInternalAuthorization.login == login,
+        query = lambda_stmt(
+            lambda: select(cls).join(User).where(
+                User.is_banned.is_(False),
+                UserInternalAuthorization.login == login,
+            )
         )
         query_result = await session.execute(query)
-        auth_user: UserInternalAuthorization = query_result.scalar_one()
-        password = hash_password(password, auth_user.salt)
+        try:
+            auth_user: UserInternalAuthorization = query_result.scalar_one()
+
+        except exc.NoResultFound:
+            await hashing_executor.hash_password(
+                password, DUMMY_SALT, quadrant_config.Security.password_hashing_scheme.value
+            )
+            raise
+
+        password_hash = await hashing_executor.hash_password(password, auth_user.salt, auth_user.password_scheme)
+
+        if compare_digest(password_hash, auth_user.password):
+            password_scheme = quadrant_config.Security.password_hashing_scheme.value
+            if auth_user.password_scheme != password_scheme:
+                auth_user.password = await hashing_executor.hash_password(password, auth_user.salt, password_scheme)
+                auth_user.password_scheme = password_scheme
+                await session.commit()
 
-        if compare_digest(password, auth_user.password):
             return auth_user
 
         else:
             raise ValueError(f"Invalid password for user")
 
+    async def regenerate_token(self, *, session) -> str:
+        """
+        Replaces users internal token, so everyone who had previous one loses access.
+
+        :param session: sqlalchemy session.
+        :return: new internal token.
+        """
+        self.internal_token = generate_internal_token()
+        await session.commit()
+        authorization_cache.invalidate_user(self.user_id)
+
+        return self.internal_token
+
     async def delete_account(self, *, session) -> bool:
         """Deletes user account."""
-        session.delete(self)
+        await session.delete(self)
         await session.commit()
+        authorization_cache.invalidate_user(self.user_id)
 
         return True
 
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import TYPE_CHECKING, Tuple
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, String, and_, select
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, Index, String, lambda_stmt, select
 from sqlalchemy.exc import IntegrityError
 
 from Quadrant.models.db_init import Base
+from Quadrant.models.utils.pagination import Keyset, KeysetPage
+from Quadrant.models.utils.snowflake import generate_snowflake
+from .authorization_cache import authorization_cache
 
 if TYPE_CHECKING:
     from .user import User
@@ -16,13 +19,17 @@ SESSIONS_PER_PAGE = 10
 
 
 class UserSession(Base):
-    session_id = Column(BigInteger, primary_key=True)
+    session_id = Column(BigInteger, primary_key=True, autoincrement=False, default=generate_snowflake)
     user_id = Column(ForeignKey("users.id"), index=True)
     started_at = Column(DateTime, default=datetime.utcnow)
     # Max length of IPv6 address as string
     ip_address = Column(String(45))
     is_alive = Column(Boolean, default=True)
 
+    __table_args__ = (
+        # Covers sessions pages ordering, so seeking to any page is one index range scan
+        Index("ix_users_sessions_user_id_is_alive_session_id", "user_id", "is_alive", "session_id"),
+    )
     __tablename__ = "users_sessions"
 
     @staticmethod
@@ -50,7 +57,7 @@ class UserSession(Base):
         """
         user_session = UserSession(user_id=user.id, ip_address=ip_address)
         session.add(user_session)
-        session.commit()
+        await session.commit()
 
         return user_session
 
@@ -66,7 +73,13 @@ class UserSession(Base):
         """
 
         try:
-            query = cls.user_session_query(user_id=user_id).filter(UserSession.session_id == session_id)
+            query = lambda_stmt(
+                lambda: select(UserSession).where(
+                    UserSession.user_id == user_id,
+                    UserSession.session_id == session_id,
+                    UserSession.is_alive.is_(True)
+                )
+            )
             query_result = await session.execute(query)
             return query_result.scalar_one()
 
@@ -85,8 +98,8 @@ class UserSession(Base):
         """
 
         try:
-            query = select(UserSession).filter(
-                and_(
+            query = lambda_stmt(
+                lambda: select(UserSession).where(
                     UserSession.user_id == user_id,
                     UserSession.session_id == session_id
                 )
@@ -98,25 +111,39 @@ class UserSession(Base):
             raise ValueError("No such session")
 
     @classmethod
-    async def get_user_sessions_page(cls, user_id: UUID, page: int, *, session) -> Tuple[UserSession]:
+    async def get_user_sessions_page(
+        cls, user_id: UUID, page: int = 0, *,
+        after: Optional[str] = None, before: Optional[str] = None, session
+    ) -> KeysetPage:
         """
         Gives one page of sessions or empty list.
+        Pages are fetched by cursors, page number is kept for compatibility and must not be used with cursors.
 
         :param user_id: participant id of one participant, whose sessions we must get.
         :param page: page of sessions.
+        :param after: cursor of page that goes before requested one.
+        :param before: cursor of page that goes after requested one.
         :param session: sqlalchemy session.
-        :return: session instances tuple.
+        :return: session instances list with cursors of neighbour pages.
         """
         if page < 0:
             raise ValueError("Invalid page")
 
+        if page and (after is not None or before is not None):
+            raise ValueError("Page number can not be used with cursors")
+
         try:
-            query = select(cls).filter(user_id=user_id, session=session) \
-                .limit(SESSIONS_PER_PAGE).offset(SESSIONS_PER_PAGE * page) \
-                .order_by(cls.is_alive.desc(), cls.session_id.desc())
+            query = sessions_keyset.paginate(
+                select(cls).filter(cls.user_id == user_id), SESSIONS_PER_PAGE, after=after, before=before
+            )
+            offset = SESSIONS_PER_PAGE * page
+            if offset:
+                query = query.offset(offset)
 
             query_result = await session.execute(query)
-            return query_result.scalars().all()
+            return sessions_keyset.make_page(
+                query_result.scalars().all(), SESSIONS_PER_PAGE, after=after, before=before, offset=offset
+            )
 
         except OverflowError:
             raise ValueError("No such sessions page")
@@ -134,23 +161,31 @@ class UserSession(Base):
         # TODO: Ensure that sessions are closed after this method
         users_sessions_query = await session.stream(UserSession.user_session_query(user_id))
         async for user_session in users_sessions_query.partitions(10):
-            # TODO: clear session from cache that will be added later
-            # TODO: add sessions cache
             user_session: UserSession
             user_session.is_alive = False
 
         await session.commit()
+        authorization_cache.invalidate_user(user_id)
         return True
 
     def as_dict(self):
         return {
-            "session_id": self.session_id,
+            # Ids are above 2^53, so they're given as strings that javascript clients don't round
+            "session_id": str(self.session_id),
             "ip_address": self.ip_address,
             "started_at": self.started_at,
             "is_alive": self.is_alive,
         }
 
     async def terminate_session(self, *, session) -> None:
-        """Kills all users sessions."""
+        """Kills this users session."""
         self.is_alive = False
         await session.commit()
+        authorization_cache.invalidate_session(self.user_id, self.session_id)
+
+
+sessions_keyset = Keyset(
+    (UserSession.is_alive, True), (UserSession.session_id, True),
+    row_values=lambda user_session: (user_session.is_alive, user_session.session_id),
+    casters=(bool, int)
+)
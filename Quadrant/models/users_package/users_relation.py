@@ -1,24 +1,38 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+from uuid import UUID
 
-from sqlalchemy import BigInteger, Column, Enum, ForeignKey, and_, or_, select, update, delete
+from sqlalchemy import (
+    BigInteger, Column, Enum, ForeignKey, Index, and_, case, lambda_stmt, or_, select, update, delete
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from Quadrant.events import EventType, events_hub, user_topic
 from Quadrant.models.db_init import Base
+from Quadrant.models.replicas import on_replica
+from Quadrant.models.utils.pagination import Keyset, KeysetPage
+from Quadrant.models.utils.snowflake import generate_snowflake
 from Quadrant.models.users_package.relations_types import UsersRelationType
-from Quadrant.models.users_package.users_status import UsersStatus
+from .presence import presence_service
+from .relations_index import USERS_STATUS_ORDER, relations_index, status_group
 from .user import User
 
 USERS_RELATIONS_PER_PAGE = 50
 
 
 class UsersRelations(Base):
-    relation_id = Column(BigInteger, primary_key=True)
-    initiator_id = Column(ForeignKey('users.id'), nullable=False, index=True)
+    relation_id = Column(BigInteger, primary_key=True, autoincrement=False, default=generate_snowflake)
+    initiator_id = Column(ForeignKey('users.id'), nullable=False)
     relation_with_id = Column(ForeignKey('users.id'), nullable=False, index=True)
     relation_status = Column(Enum(UsersRelationType), default=UsersRelationType.none, nullable=False)
 
+    __table_args__ = (
+        # Relations lists are read from index without visiting table
+        Index(
+            "ix_users_relations_initiator_id_relation_status", "initiator_id", "relation_status", "relation_with_id"
+        ),
+    )
     __tablename__ = "users_relations"
 
     @staticmethod
@@ -113,9 +127,11 @@ class UsersRelations(Base):
         :param session: sqlalchemy session.
         :return: one of UsersRelationType.
         """
-        query = select(UsersRelations.relation_status).filter(
-            UsersRelations.initiator_id == user_id,
-            UsersRelations.relation_with_id == with_user_id
+        query = lambda_stmt(
+            lambda: select(UsersRelations.relation_status).where(
+                UsersRelations.initiator_id == user_id,
+                UsersRelations.relation_with_id == with_user_id
+            )
         )
         query_result = await session.execute(query)
         relation = query_result.scalar_one_or_none()
@@ -125,43 +141,117 @@ class UsersRelations(Base):
 
         return relation
 
+    @staticmethod
+    async def get_friends_ids(user_id: User.id, *, session) -> List[UUID]:
+        """
+        Gives ids of every friend of user.
+
+        :param user_id: user id of someone whose friends we look for.
+        :param session: sqlalchemy session.
+        :return: list of friends ids.
+        """
+        query = select(UsersRelations.relation_with_id).filter(
+            UsersRelations.initiator_id == user_id,
+            UsersRelations.relation_status == UsersRelationType.friends
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
     @staticmethod
     async def get_relationships_page(
-        user: User, page: int, relationship_type: UsersRelationType, *, session
-    ) -> Tuple[Tuple[UsersRelations.relation_status, User]]:
+        user: User, page: int, relationship_type: UsersRelationType, *,
+        after: Optional[str] = None, before: Optional[str] = None, session
+    ) -> KeysetPage:
         """
-        Gives page of relationships ordered by username and users with who Users instances with whom has relations.
+        Gives page of relationships ordered by users status and username and Users instances with whom has relations.
+        Pages are fetched by cursors, page number is kept for compatibility and must not be used with cursors.
 
         :param user: user instance of someone who asks for this.
         :param page: page number.
         :param relationship_type: filter by type of requester to other user relation.
+        :param after: cursor of page that goes before requested one.
+        :param before: cursor of page that goes after requested one.
         :param session: sqlalchemy session.
-        :return: relationship status and User instance with whom we have it.
+        :return: list of relationship statuses and User instances with whom we have it with cursors of neighbour pages.
         """
         if page < 0:
             raise ValueError("Invalid page")
 
-        query = select(UsersRelations.relation_status, User).join(User, User.id != user.id) \
-            .filter(
-                UsersRelations.initiator_id == user.id,
-                UsersRelations.relation_status == relationship_type
-        ).limit(USERS_RELATIONS_PER_PAGE).offset(USERS_RELATIONS_PER_PAGE * page) \
-            .order_by(
-                User.status == UsersStatus.online,
-                User.status == UsersStatus.away,
-                User.status == UsersStatus.asleep,
-                User.status == UsersStatus.offline,
-                User.username
-            )
+        if page and (after is not None or before is not None):
+            raise ValueError("Page number can not be used with cursors")
 
-        result = await session.execute(query)
-        relations = result.all()
+        if after is not None and before is not None:
+            raise ValueError("Only one cursor can be used at once")
+
+        async def load_relations():
+            query = select(User.id, User.username, User.status) \
+                .join(UsersRelations, User.id == UsersRelations.relation_with_id) \
+                .filter(
+                    UsersRelations.initiator_id == user.id,
+                    UsersRelations.relation_status == relationship_type
+                )
+            result = await session.execute(on_replica(query))
+            return result.all()
+
+        # Relations are ordered by current statuses that only presence service knows,
+        # so they're sliced from relations list and only users on page are loaded
+        relations_list = await relations_index.get_relations(user.id, relationship_type, load_relations)
+        forward = before is None
+        cursor = after if forward else before
+        skipped = USERS_RELATIONS_PER_PAGE * page
+        related_users = relations_list.page(
+            skipped + USERS_RELATIONS_PER_PAGE + 1,
+            relations_keyset.decode_cursor(cursor) if cursor is not None else None,
+            forward
+        )[skipped:]
+        relations_page = relations_keyset.make_page(
+            [(relationship_type, related_user) for related_user in related_users],
+            USERS_RELATIONS_PER_PAGE, after=after, before=before
+        )
+
+        users = {}
+        if relations_page:
+            users_query = select(User).where(User.id.in_([related_user.id for _, related_user in relations_page]))
+            users_result = await session.execute(on_replica(users_query))
+            users = {related_user.id: related_user for related_user in users_result.scalars()}
+
+        return KeysetPage(
+            [
+                (relation_status, users[related_user.id]) for relation_status, related_user in relations_page
+                if related_user.id in users
+            ],
+            after=relations_page.after, before=relations_page.before
+        )
 
-        packed_relations = []
-        for relation, user in relations:
-            packed_relations.append((relation, user))
+    @staticmethod
+    def relation_changed(user_id: User.id, related_user: User, relation_status: UsersRelationType) -> None:
+        """
+        Updates relations lists of user and notifies his connections after relation change is committed.
+
+        :param user_id: user id of someone whose relation changed.
+        :param related_user: user with whom relation changed.
+        :param relation_status: new relation status from user side.
+        :return: nothing.
+        """
+        relations_index.relation_changed(
+            user_id, related_user.id, related_user.username, related_user.status, relation_status
+        )
+        UsersRelations.publish_relation_update(user_id, related_user.id, relation_status)
 
-        return relations
+    @staticmethod
+    def publish_relation_update(user_id: User.id, with_user_id: User.id, relation_status: UsersRelationType) -> None:
+        """
+        Notifies user connections that his relation with other user has changed.
+
+        :param user_id: user id of someone whose relation changed.
+        :param with_user_id: user id of someone with whom relation changed.
+        :param relation_status: new relation status from user side.
+        :return: nothing.
+        """
+        events_hub.publish(
+            user_topic(user_id), EventType.relation_updated,
+            {"user_id": with_user_id, "relation_status": relation_status.name}
+        )
 
     @staticmethod
     async def send_friend_request(request_sender: User, request_receiver: User, *, session) -> None:
@@ -196,6 +286,12 @@ class UsersRelations(Base):
 
             session.add_all([friend_request_outgoing, friend_request_incoming])
             await session.commit()
+            UsersRelations.relation_changed(
+                request_sender.id, request_receiver, UsersRelationType.friend_request_sender
+            )
+            UsersRelations.relation_changed(
+                request_receiver.id, request_sender, UsersRelationType.friend_request_receiver
+            )
 
         else:
             raise UsersRelations.exc.RelationshipsException("Invalid relationship type")
@@ -229,6 +325,8 @@ class UsersRelations(Base):
 
         await session.execute(query)
         await session.commit()
+        UsersRelations.relation_changed(canceller.id, friend_request_to, UsersRelationType.none)
+        UsersRelations.relation_changed(friend_request_to.id, canceller, UsersRelationType.none)
 
     @staticmethod
     async def respond_on_friend_request(
@@ -268,6 +366,9 @@ class UsersRelations(Base):
                 await session.execute(query)
 
             await session.commit()
+            new_status = UsersRelationType.friends if accept_request else UsersRelationType.none
+            UsersRelations.relation_changed(request_receiver.id, request_sender, new_status)
+            UsersRelations.relation_changed(request_sender.id, request_receiver, new_status)
 
         else:
             raise UsersRelations.exc.RelationshipsException("Invalid relationships to become friends")
@@ -297,6 +398,8 @@ class UsersRelations(Base):
 
             await session.execute(query)
             await session.commit()
+            UsersRelations.relation_changed(removed_by.id, friend, UsersRelationType.none)
+            UsersRelations.relation_changed(friend.id, removed_by, UsersRelationType.none)
 
         else:
             raise UsersRelations.exc.RelationshipsException("Invalid relationships to become friends")
@@ -339,13 +442,18 @@ class UsersRelations(Base):
         else:
             initialized_by_blocker.relation_status = UsersRelationType.blocked
 
-        if (
+        blocking_user_relation_removed = (
             (initialized_by_blocking_user is not None) and
             (initialized_by_blocking_user.relation_status != UsersRelationType.blocked)
-        ):
+        )
+        if blocking_user_relation_removed:
             await session.delete(initialized_by_blocking_user)
 
         await session.commit()
+        UsersRelations.relation_changed(blocking_by.id, blocking_user, UsersRelationType.blocked)
+        if blocking_user_relation_removed:
+            UsersRelations.relation_changed(blocking_user.id, blocking_by, UsersRelationType.none)
+
         return initialized_by_blocker
 
     @staticmethod
@@ -373,6 +481,7 @@ class UsersRelations(Base):
             )
         )
         await session.commit()
+        UsersRelations.relation_changed(user_unblock_initializer.id, unblocking_user, UsersRelationType.none)
 
     class exc:
         class RelationshipsException(Exception):
@@ -392,3 +501,23 @@ class UsersRelations(Base):
             Special exception that represents that user is already blocked
             """
             pass
+
+
+def relation_order_values(related_user) -> Tuple[int, str, UUID]:
+    """
+    Gives values relations are ordered by.
+
+    :param related_user: User or RelatedUser instance.
+    :return: order of users current status, username and id.
+    """
+    status = presence_service.status_of(related_user.id, related_user.status)
+    return status_group(status), related_user.username, related_user.id
+
+
+relations_keyset = Keyset(
+    (case(USERS_STATUS_ORDER, value=User.status, else_=len(USERS_STATUS_ORDER)), False),
+    (User.username, False),
+    (User.id, False),
+    row_values=lambda row: relation_order_values(row[1]),
+    casters=(int, str, UUID)
+)
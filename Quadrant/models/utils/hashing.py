@@ -1,4 +1,9 @@
-from hashlib import blake2b, sha256
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from hashlib import blake2b, scrypt, sha256
+from typing import Callable, Dict, Optional
+
+from Quadrant.config import quadrant_config
 
 
 def hash_login(login: str) -> str:
@@ -10,3 +15,125 @@ def hash_password(password: str, salt: str):
     hashing_algorithm = blake2b(digest_size=32, key=salt.encode('utf-8'))
     hashing_algorithm.update(password.encode('utf-8'))
     return hashing_algorithm.hexdigest()
+
+
+def hash_password_scrypt(password: str, salt: str, n: int, r: int, p: int) -> str:
+    # Memory hard function that needs 128 * n * r bytes of memory for every hash
+    return scrypt(
+        password.encode('utf-8'), salt=salt.encode('utf-8'), n=n, r=r, p=p,
+        maxmem=256 * n * r, dklen=32
+    ).hex()
+
+
+# Password hashing functions by scheme name, scheme parameters are passed after password and salt
+password_hashers: Dict[str, Callable[..., str]] = {
+    "blake2b": hash_password,
+    "scrypt": hash_password_scrypt,
+}
+
+
+def register_password_hasher(name: str, hasher: Callable[..., str]) -> None:
+    """
+    Makes password hashing function usable in config.
+
+    :param name: scheme name (can not contain ":").
+    :param hasher: module level function that accepts password, salt and integer scheme parameters.
+    :return: nothing.
+    """
+    if ":" in name:
+        raise ValueError("Scheme name can not contain ':'")
+
+    password_hashers[name] = hasher
+
+
+def hash_password_with_scheme(scheme: str, password: str, salt: str) -> str:
+    """
+    Hashes password with scheme stored with it, for example "scrypt:16384:8:1" or "blake2b".
+
+    :param scheme: scheme name with integer parameters separated by ":".
+    :param password: password.
+    :param salt: salt.
+    :return: 64 hex digits hash.
+    """
+    name, *parameters = scheme.split(":")
+    try:
+        hasher = password_hashers[name]
+
+    except KeyError:
+        raise ValueError(f"Unknown password hashing scheme {name}")
+
+    return hasher(password, salt, *map(int, parameters))
+
+
+def _warm_up_worker() -> None:
+    # Makes worker start and import this module before first real hash
+    return None
+
+
+class HashingExecutor:
+    """
+    Persistent pool that hashes passwords outside of event loop.
+    Thread pool suits hashlib functions since they release GIL while hashing,
+    process pool suits pure python hashers. Inline mode hashes on event loop and is meant for debugging.
+    """
+    executors_types = ("inline", "thread", "process")
+
+    def __init__(self, executor_type: str, workers: int):
+        """
+        Initializes executor without starting workers.
+
+        :param executor_type: one of inline, thread or process.
+        :param workers: number of hashing workers.
+        """
+        if executor_type not in self.executors_types:
+            raise ValueError(f"Unknown hashing executor type {executor_type}")
+
+        self.executor_type = executor_type
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        if self._executor is None and self.executor_type != "inline":
+            if self.executor_type == "thread":
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="quadrant_hashing")
+
+            else:
+                self._executor = ProcessPoolExecutor(self.workers)
+
+        return self._executor
+
+    def warm_up(self) -> None:
+        """Starts all workers, so first logins don't pay for pool startup."""
+        if self.executor is None:
+            return
+
+        for future in [self.executor.submit(_warm_up_worker) for _ in range(self.workers)]:
+            future.result()
+
+    async def hash_password(self, password: str, salt: str, scheme: str) -> str:
+        """
+        Hashes password in pool.
+
+        :param password: password.
+        :param salt: salt.
+        :param scheme: hashing scheme.
+        :return: 64 hex digits hash.
+        """
+        if self.executor is None:
+            return hash_password_with_scheme(scheme, password, salt)
+
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, hash_password_with_scheme, scheme, password, salt
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+hashing_executor = HashingExecutor(
+    quadrant_config.Security.hashing_executor.value,
+    quadrant_config.Security.hashing_workers.value,
+)
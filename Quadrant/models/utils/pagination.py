@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql import ColumnElement, Select
+
+
+class KeysetPage(list):
+    """
+    List of rows of one page with cursors pointing at neighbour pages.
+
+    after: cursor of the next page or None if there's nothing after this page.
+    before: cursor of the previous page or None if there's nothing before this page.
+    """
+
+    def __init__(self, rows: Sequence[Any], after: Optional[str] = None, before: Optional[str] = None):
+        super().__init__(rows)
+        self.after = after
+        self.before = before
+
+    def cursors(self) -> dict:
+        return {"after": self.after, "before": self.before}
+
+
+class Keyset:
+    """
+    Ordering of paginated query that gives pages by position of rows instead of offset,
+    so page fetching costs the same no matter how deep it is and pages don't shift when rows are added.
+    Ordering columns must identify row uniquely and should be covered by index.
+    """
+
+    def __init__(
+        self, *ordering: Tuple[ColumnElement, bool],
+        row_values: Callable[[Any], Tuple[Any, ...]], casters: Sequence[Callable[[Any], Any]]
+    ):
+        """
+        Initializes keyset.
+
+        :param ordering: pairs of columns and flags if column is sorted descending.
+        :param row_values: function that gives ordering values of result row.
+        :param casters: functions that restore values of ordering columns from json types.
+        """
+        if len(ordering) != len(casters):
+            raise ValueError("Every ordering column must have caster")
+
+        self.ordering = ordering
+        self.row_values = row_values
+        self.casters = casters
+
+    def encode_cursor(self, row: Any) -> str:
+        """
+        Gives opaque cursor pointing at row.
+
+        :param row: result row.
+        :return: url safe string.
+        """
+        values = [
+            value if isinstance(value, (bool, int, float, str)) or value is None else str(value)
+            for value in self.row_values(row)
+        ]
+        return urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor: str) -> Tuple[Any, ...]:
+        """
+        Restores ordering values from cursor.
+
+        :param cursor: cursor given by encode_cursor.
+        :return: ordering values.
+        """
+        try:
+            values = json.loads(urlsafe_b64decode(cursor.encode("ascii")))
+
+        except (binascii.Error, UnicodeError, json.JSONDecodeError):
+            raise ValueError("Invalid cursor")
+
+        if not isinstance(values, list) or len(values) != len(self.casters):
+            raise ValueError("Invalid cursor")
+
+        try:
+            return tuple(caster(value) for caster, value in zip(self.casters, values))
+
+        except (TypeError, AttributeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    def _seek_condition(self, values: Tuple[Any, ...], forward: bool):
+        descending_flags = {descending for _, descending in self.ordering}
+
+        if len(descending_flags) == 1:
+            # Row values comparison can be resolved with one index range scan
+            columns = tuple_(*(column for column, _ in self.ordering))
+            if descending_flags.pop() == forward:
+                return columns < tuple_(*values)
+
+            return columns > tuple_(*values)
+
+        conditions = []
+        for position, ((column, descending), value) in enumerate(zip(self.ordering, values)):
+            previous_equal = [
+                previous_column == previous_value
+                for (previous_column, _), previous_value in zip(self.ordering[:position], values)
+            ]
+            comparison = column < value if descending == forward else column > value
+            conditions.append(and_(*previous_equal, comparison))
+
+        return or_(*conditions)
+
+    def _order_by(self, forward: bool) -> List[ColumnElement]:
+        return [
+            column.desc() if descending == forward else column.asc()
+            for column, descending in self.ordering
+        ]
+
+    def paginate(self, query: Select, limit: int, after: Optional[str] = None, before: Optional[str] = None) -> Select:
+        """
+        Gives query of page that goes after or before cursor (or first page if no cursors given).
+        Query fetches one extra row to find out if there's more rows, so results must be passed to make_page.
+
+        :param query: filtered query without ordering and limits.
+        :param limit: number of rows on page.
+        :param after: cursor of row after which page starts.
+        :param before: cursor of row before which page ends.
+        :return: sqlalchemy query.
+        """
+        if after is not None and before is not None:
+            raise ValueError("Only one cursor can be used at once")
+
+        forward = before is None
+        cursor = after if forward else before
+
+        if cursor is not None:
+            query = query.filter(self._seek_condition(self.decode_cursor(cursor), forward))
+
+        return query.order_by(*self._order_by(forward)).limit(limit + 1)
+
+    def make_page(
+        self, rows: Sequence[Any], limit: int, after: Optional[str] = None, before: Optional[str] = None,
+        offset: int = 0
+    ) -> KeysetPage:
+        """
+        Builds page from results of query given by paginate.
+
+        :param rows: fetched rows.
+        :param limit: number of rows on page.
+        :param after: cursor page was fetched with.
+        :param before: cursor page was fetched with.
+        :param offset: number of rows query skipped before page, such pages have previous page.
+        :return: page of rows in keyset order with cursors.
+        """
+        has_more = len(rows) > limit
+        rows = list(rows[:limit])
+
+        if before is not None:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        has_next = has_more if before is None else True
+        has_previous = has_more if before is not None else (after is not None or offset > 0)
+
+        return KeysetPage(
+            rows,
+            after=self.encode_cursor(rows[-1]) if has_next else None,
+            before=self.encode_cursor(rows[0]) if has_previous else None
+        )
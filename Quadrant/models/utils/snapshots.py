@@ -0,0 +1,45 @@
+from typing import Dict, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+def detached_snapshot(instance, _copies: Optional[Dict[int, object]] = None):
+    """
+    Copies loaded attributes and loaded related instances into new instances that don't belong to any session.
+    Snapshot can be shared between requests and merged into their sessions with load=False,
+    because nothing that happens to session of original instance (like rollback expiring it) reaches snapshot.
+
+    :param instance: mapped instance which attributes are loaded.
+    :return: detached copy of instance.
+    """
+    copies = {} if _copies is None else _copies
+    if id(instance) in copies:
+        return copies[id(instance)]
+
+    state = inspect(instance)
+    mapper = state.mapper
+    loaded = state.dict
+    snapshot = copies[id(instance)] = mapper.class_manager.new_instance()
+
+    for column_attribute in mapper.column_attrs:
+        if column_attribute.key in loaded:
+            set_committed_value(snapshot, column_attribute.key, loaded[column_attribute.key])
+
+    for relationship in mapper.relationships:
+        if relationship.key not in loaded:
+            continue
+
+        value = loaded[relationship.key]
+        if value is not None:
+            if relationship.uselist:
+                value = [detached_snapshot(related, copies) for related in value]
+
+            else:
+                value = detached_snapshot(value, copies)
+
+        set_committed_value(snapshot, relationship.key, value)
+
+    make_transient_to_detached(snapshot)
+    return snapshot
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from threading import Lock
+from time import time
+
+from Quadrant.config import launch_args, quadrant_config
+
+TIMESTAMP_BITS = 41
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+TIMESTAMP_SHIFT = WORKER_ID_BITS + SEQUENCE_BITS
+
+
+class SnowflakeGenerator:
+    """
+    Generates 63 bit ids ordered by time without database: milliseconds since epoch, worker id and
+    number of id in that millisecond. Every process must have its own worker id, so ids never repeat.
+    """
+
+    class exc:
+        class ClockMovedBackwards(RuntimeError):
+            pass
+
+        class SequenceExhausted(RuntimeError):
+            pass
+
+    def __init__(self, worker_id: int, epoch: datetime, max_clock_drift_ms: int = 0):
+        """
+        Initializes generator.
+
+        :param worker_id: unique id of process from 0 to 1023.
+        :param epoch: moment from which timestamps in ids are counted (utc).
+        :param max_clock_drift_ms: milliseconds timestamps of ids may run ahead of clock.
+        """
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker id must be from 0 to {MAX_WORKER_ID}")
+
+        self.worker_id = worker_id
+        self.epoch = epoch
+        self.epoch_ms = to_unix_ms(epoch)
+        self.max_clock_drift_ms = max_clock_drift_ms
+        self._last_timestamp = -1
+        self._sequence = 0
+        self._lock = Lock()
+
+    def _current_timestamp(self) -> int:
+        return int(time() * 1000) - self.epoch_ms
+
+    def next_id(self) -> int:
+        """
+        Gives new id. Never waits for clock, since it's called from event loop: when clock moves backwards
+        or all ids of current millisecond are given, ids are given from last or next millisecond, as long as
+        they stay less than max_clock_drift_ms ahead of clock (otherwise id is refused with error).
+
+        :return: id that is greater than every id this generator gave before.
+        """
+        with self._lock:
+            now = self._current_timestamp()
+            timestamp, sequence = now, 0
+            sequence_exhausted = False
+
+            if now <= self._last_timestamp:
+                timestamp, sequence = self._last_timestamp, self._sequence + 1
+                if sequence > MAX_SEQUENCE:
+                    timestamp, sequence = timestamp + 1, 0
+                    sequence_exhausted = True
+
+            if timestamp - now > self.max_clock_drift_ms:
+                if sequence_exhausted:
+                    raise self.exc.SequenceExhausted("All ids of current millisecond are given")
+
+                raise self.exc.ClockMovedBackwards("System clock moved backwards, ids can't be generated")
+
+            self._last_timestamp, self._sequence = timestamp, sequence
+            return timestamp << TIMESTAMP_SHIFT | self.worker_id << SEQUENCE_BITS | sequence
+
+    def id_datetime(self, snowflake_id: int) -> datetime:
+        """
+        Gives moment when id was generated.
+
+        :param snowflake_id: id.
+        :return: utc datetime with milliseconds precision.
+        """
+        return self.epoch + timedelta(milliseconds=snowflake_id >> TIMESTAMP_SHIFT)
+
+    def lowest_id_at(self, moment: datetime) -> int:
+        """
+        Gives lowest id that could have been generated at moment, so rows of time range can be
+        selected by ids: lowest_id_at(since) <= id < lowest_id_at(until).
+
+        :param moment: utc datetime.
+        :return: id.
+        """
+        return max(to_unix_ms(moment) - self.epoch_ms, 0) << TIMESTAMP_SHIFT
+
+
+def to_unix_ms(moment: datetime) -> int:
+    # Naive datetimes of models are in utc
+    return int((moment - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+
+snowflake_generator = SnowflakeGenerator(
+    launch_args.worker_id if launch_args.worker_id is not None else quadrant_config.IdsConfig.worker_id.value,
+    quadrant_config.IdsConfig.epoch.value,
+    quadrant_config.IdsConfig.max_clock_drift_ms.value,
+)
+
+
+def generate_snowflake() -> int:
+    return snowflake_generator.next_id()
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Hashable, Iterator, Optional, Tuple
+
+_missing = object()
+
+
+class TTLCache:
+    """
+    Bounded in-memory mapping that evicts least recently used entries and forgets entries older than ttl.
+    Counts hits and misses so cache efficiency can be monitored.
+    """
+
+    def __init__(
+        self, max_size: int, ttl: Optional[float] = None, on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    ):
+        """
+        Initializes empty cache.
+
+        :param max_size: max number of entries kept in memory (0 disables caching).
+        :param ttl: seconds after which entry is considered expired (None means entries never expire).
+        :param on_evict: function called with key and value of entry that was evicted or expired.
+        """
+        if max_size < 0:
+            raise ValueError("Cache size can not be negative")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.on_evict = on_evict
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        """Part of lookups that were served from cache."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / lookups
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gives cached value and marks it as recently used.
+
+        :param key: cache key.
+        :param default: value returned if nothing is cached or entry expired.
+        :return: cached value or default.
+        """
+        entry = self._entries.get(key, _missing)
+        if entry is _missing:
+            self.misses += 1
+            return default
+
+        stored_at, value = entry
+        if self.ttl is not None and monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self._evicted(key, value)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Gives cached value without marking it as recently used and counting lookup.
+
+        :param key: cache key.
+        :param default: value returned if nothing is cached.
+        :return: cached value or default.
+        """
+        entry = self._entries.get(key, _missing)
+        if entry is _missing:
+            return default
+
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Caches value, evicting least recently used entries if cache is full.
+
+        :param key: cache key.
+        :param value: value to store.
+        :return: nothing.
+        """
+        if self.max_size == 0:
+            return
+
+        replaced = self._entries.get(key, _missing)
+        self._entries[key] = (monotonic(), value)
+        self._entries.move_to_end(key)
+        if replaced is not _missing and replaced[1] is not value:
+            self._evicted(key, replaced[1])
+
+        self._evict_overflow()
+
+    def resize(self, max_size: int) -> None:
+        """
+        Changes max number of entries, evicting least recently used ones if needed.
+
+        :param max_size: new max number of entries (0 disables caching).
+        :return: nothing.
+        """
+        if max_size < 0:
+            raise ValueError("Cache size can not be negative")
+
+        self.max_size = max_size
+        self._evict_overflow()
+
+    def _evict_overflow(self) -> None:
+        while len(self._entries) > self.max_size:
+            key, (_, value) = self._entries.popitem(last=False)
+            self._evicted(key, value)
+
+    def _evicted(self, key: Hashable, value: Any) -> None:
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Removes entry from cache.
+
+        :param key: cache key.
+        :param default: value returned if nothing was cached.
+        :return: removed value or default.
+        """
+        entry = self._entries.pop(key, _missing)
+        if entry is _missing:
+            return default
+
+        return entry[1]
+
+    def clear(self) -> None:
+        """Removes all entries from cache."""
+        self._entries.clear()
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        Gives snapshot of all cached entries including expired ones that weren't looked up yet.
+
+        :return: iterator over key and value pairs.
+        """
+        return iter([(key, value) for key, (_, value) in self._entries.items()])
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
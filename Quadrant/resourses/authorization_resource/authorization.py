@@ -100,7 +100,7 @@ class InternalAuthorizationHandler(QuadrantAPIHandler):
                 {
                     "authorized": True,
                     "user_data": user_data,
-                    "current_session_id": new_session.session_id
+                    "current_session_id": str(new_session.session_id)
                 }
             )
         )
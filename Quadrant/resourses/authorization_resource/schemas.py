@@ -5,4 +5,4 @@ from Quadrant.resourses.user_resource.schemas import UserPrivateSchema
 
 class UserLoginResponseSchema(UserPrivateSchema):
     authorized = fields.Boolean(default=True)
-    current_session_id = fields.Integer()
+    current_session_id = fields.String()
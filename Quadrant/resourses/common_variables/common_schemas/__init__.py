@@ -1,2 +1,3 @@
 from .success_schema import SuccessResponseSchema
 from .error_schema import APIErrorSchema, APIErrorWithNestedDataSchema
+from .page_cursor_schema import PageCursorSchema
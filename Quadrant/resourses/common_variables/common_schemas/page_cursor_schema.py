@@ -0,0 +1,6 @@
+from marshmallow import Schema, fields
+
+
+class PageCursorSchema(Schema):
+    after = fields.Str(allow_none=True)
+    before = fields.Str(allow_none=True)
@@ -0,0 +1,14 @@
+from Quadrant.config import quadrant_config
+from Quadrant.resourses.quadrant_app import QuadrantApp
+from .media_files import MediaFileHandler
+from .media_uploads import MediaUploadsHandler, UploadedFileHandler
+
+media_resource = QuadrantApp([
+    # Uploaded file content never changes, since every upload gets new file_id
+    (r"/media/uploads/(.*)", MediaFileHandler, {"path": str(quadrant_config.uploads), "immutable": True}),
+    (r"/media/profile_pictures/(.*)", MediaFileHandler, {"path": str(quadrant_config.profile_pictures)}),
+    (r"/api/v1/files", MediaUploadsHandler),
+    (r"/api/v1/files/([0-9a-fA-F-]+)", UploadedFileHandler),
+])
+
+__all__ = ("media_resource", )
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import stat
+from concurrent.futures import Future
+from typing import Optional
+
+from tornado.web import HTTPError, StaticFileHandler
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.general.blob_store import files_io_executor
+from Quadrant.models.utils.ttl_cache import TTLCache
+
+# Paths of served files that passed validation, so repeated downloads of same file don't resolve path again
+validated_paths_cache = TTLCache(
+    quadrant_config.FilesConfig.stat_cache_size.value, quadrant_config.FilesConfig.stat_cache_ttl.value
+)
+
+
+class FileChunks:
+    """
+    Part of opened file that is read chunk by chunk in files io threads. Next chunk is read while
+    previous one is sent, so only couple of chunks are in memory at once.
+    Iterating never blocks event loop: chunk that isn't read yet is given as empty bytes,
+    and sender waits for it with wait_read before asking for next one.
+    """
+
+    def __init__(self, fd: int, start: int, end: int, chunk_size: int = 64 * 1024):
+        """
+        Starts reading first chunk. File descriptor is closed by chunks once reading stops.
+
+        :param fd: file descriptor opened for reading.
+        :param start: offset of first byte.
+        :param end: offset after last byte.
+        :param chunk_size: max size of chunk.
+        """
+        self.fd = fd
+        self.position = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self._pending: Optional[Future] = None
+        self._read_next()
+
+    def _read_next(self) -> None:
+        if self.position < self.end:
+            self._pending = files_io_executor.submit(
+                os.pread, self.fd, min(self.chunk_size, self.end - self.position), self.position
+            )
+
+        else:
+            self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        if self._pending is None:
+            raise StopIteration
+
+        if not self._pending.done():
+            return b""
+
+        pending, self._pending = self._pending, None
+        try:
+            chunk = pending.result()
+
+        except OSError:
+            self.close()
+            raise
+
+        if not chunk:
+            # File was truncated
+            self.close()
+            raise StopIteration
+
+        self.position += len(chunk)
+        self._read_next()
+        return chunk
+
+    async def wait_read(self) -> None:
+        """Waits until next chunk is read (read errors are raised when chunk is taken)."""
+        if self._pending is not None:
+            await asyncio.wait([asyncio.wrap_future(self._pending)])
+
+    def close(self) -> None:
+        """Stops reading, file is closed once read in progress finishes."""
+        if self.fd is None:
+            return
+
+        fd, self.fd = self.fd, None
+        pending, self._pending = self._pending, None
+        if pending is not None and not pending.done():
+            pending.add_done_callback(lambda _: os.close(fd))
+
+        else:
+            os.close(fd)
+
+
+class MediaFileHandler(StaticFileHandler):
+    """
+    Serves uploaded files and profile pictures with support of range and conditional requests.
+    File is opened once per request and headers are made from stat of opened file, so they always describe
+    content that is sent even if file is replaced meanwhile. Content is sent in chunks read ahead in files io
+    threads, so big files are never read as a whole. Tornado streams can not send files with sendfile,
+    because all response data must pass through HTTP connection.
+    """
+
+    def initialize(self, path: str, immutable: bool = False, **kwargs) -> None:
+        """
+        Initializes handler.
+
+        :param path: directory with served files.
+        :param immutable: flag that shows that file content never changes under same url.
+        :return: nothing.
+        """
+        super().initialize(path, **kwargs)
+        self.immutable = immutable
+        self._fd: Optional[int] = None
+        self._chunks: Optional[FileChunks] = None
+
+    def validate_absolute_path(self, root: str, absolute_path: str) -> Optional[str]:
+        cache_key = (root, absolute_path)
+        validated_path = validated_paths_cache.get(cache_key)
+        if validated_path is None:
+            validated_path = super().validate_absolute_path(root, absolute_path)
+            if validated_path is None:
+                return None
+
+            validated_paths_cache.set(cache_key, validated_path)
+
+        try:
+            self._fd = os.open(validated_path, os.O_RDONLY)
+
+        except OSError:
+            validated_paths_cache.pop(cache_key)
+            raise HTTPError(404)
+
+        self._stat_result = os.fstat(self._fd)
+        if not stat.S_ISREG(self._stat_result.st_mode):
+            validated_paths_cache.pop(cache_key)
+            raise HTTPError(403, "%s is not a file", self.path)
+
+        return validated_path
+
+    def compute_etag(self) -> Optional[str]:
+        stat_result = self._stat()
+        return f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+    def get_cache_time(self, path: str, modified, mime_type: str) -> int:
+        if self.immutable:
+            return self.CACHE_MAX_AGE
+
+        return super().get_cache_time(path, modified, mime_type)
+
+    # Tornado calls it on handler, and content must be read from file that headers were made for
+    def get_content(self, abspath: str, start: Optional[int] = None, end: Optional[int] = None) -> FileChunks:
+        fd, self._fd = self._fd, None
+        self._chunks = FileChunks(fd, start or 0, self._stat().st_size if end is None else end)
+        return self._chunks
+
+    def flush(self, include_footers: bool = False) -> "asyncio.Future[None]":
+        flushed = super().flush(include_footers)
+        if self._chunks is None or include_footers:
+            return flushed
+
+        # Tornado waits for flush after every chunk, so next chunk is awaited here instead of in iteration
+        return asyncio.ensure_future(self._flush_and_wait_read(flushed))
+
+    async def _flush_and_wait_read(self, flushed: "asyncio.Future[None]") -> None:
+        await flushed
+        await self._chunks.wait_read()
+
+    def on_finish(self) -> None:
+        self._close_file()
+        super().on_finish()
+
+    def on_connection_close(self) -> None:
+        self._close_file()
+        super().on_connection_close()
+
+    def _close_file(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+        if self._chunks is not None:
+            self._chunks.close()
@@ -1,36 +1,134 @@
-from tornado.web import Finish, authenticated
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import exc
+from tornado.web import Finish, stream_request_body
 
 from Quadrant.config import quadrant_config
 from Quadrant.models import general
+from Quadrant.resourses.middlewares import rest_authenticated
 from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
 from Quadrant.resourses.utils import JsonHTTPError, JsonWrapper
+from .multipart_stream import MultipartStreamParser
+from .streamed_upload import StreamedUpload
+
+# Size caster gives size in bits
+MAX_UPLOAD_SIZE = quadrant_config.max_payload_size.value // 8
+# Space for multipart delimiters and parts headers
+MULTIPART_OVERHEAD = 64 * 1024
 
 
+@stream_request_body
 class MediaUploadsHandler(QuadrantAPIHandler):
-    @authenticated
+    """
+    Receives multipart/form-data body with file in "file" field.
+    Body is parsed as it's received, and file is written to disk in files io threads,
+    so memory used by upload doesn't depend on file size.
+    """
+    parser: MultipartStreamParser
+    upload: Optional[StreamedUpload]
+    upload_error: Optional[JsonHTTPError]
+
+    async def prepare(self):
+        self.upload = None
+        self.upload_error = None
+        self._receiving_file = False
+        self._filename: Optional[str] = None
+
+        await super().prepare()
+        if not self.current_user:
+            raise JsonHTTPError(403)
+
+        self.request.connection.set_max_body_size(MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD)
+
+        try:
+            self.parser = MultipartStreamParser.from_content_type(self.request.headers.get("Content-Type", ""))
+
+        except ValueError:
+            raise JsonHTTPError(status_code=400, reason="Files must be uploaded as multipart/form-data")
+
+    async def data_received(self, chunk: bytes) -> None:
+        if self.upload_error is not None:
+            return
+
+        try:
+            for event, value in self.parser.feed(chunk):
+                if event == "part":
+                    self._receiving_file = value.name == "file" and value.filename is not None and self.upload is None
+                    if self._receiving_file:
+                        self._filename = value.filename
+                        self.upload = StreamedUpload(quadrant_config.uploads, MAX_UPLOAD_SIZE)
+
+                elif event == "data" and self._receiving_file:
+                    await self.upload.write(value)
+
+                elif event == "end":
+                    self._receiving_file = False
+
+        except StreamedUpload.exc.UploadTooBig:
+            self.upload_error = JsonHTTPError(status_code=413, reason="Uploaded file is too big")
+            self.discard_upload()
+
+        except ValueError:
+            self.upload_error = JsonHTTPError(status_code=400, reason="Invalid multipart body")
+            self.discard_upload()
+
     async def post(self):
+        if self.upload_error is not None:
+            raise self.upload_error
+
         try:
-            file = self.request.files['file']
-            filename = file['filename']
-            content = file['body']
+            self.parser.finish()
+
+        except ValueError:
+            raise JsonHTTPError(status_code=400, reason="Invalid multipart body")
 
-        except KeyError:
+        if self.upload is None:
             raise JsonHTTPError(status_code=400, reason="No file was uploaded")
 
-        if len(content) < 1:
+        if self.upload.size < 1:
             raise JsonHTTPError(status_code=400, reason="Empty file uploaded")
 
+        # TODO: maybe make this optionally able to upload files anywhere else
         try:
-            new_file = await general.File.create_file(self.user, filename, session=self.session)
+            new_file = await general.File.create_file(
+                self.user, self._filename, self.upload.content_hash, self.upload.size,
+                lambda path: self.upload.save_to_blob_store(general.blob_store, path), session=self.session
+            )
 
         except ValueError:
             raise JsonHTTPError(status_code=400, reason="Invalid filename")
 
-        # TODO: maybe make this optionally able to upload files anywhere else
-        base_dir = quadrant_config.uploads
-        file_base_dir = base_dir / str(new_file.file_id)
-        file_base_dir.mkdir()
-        (file_base_dir / new_file.filename).write_bytes(content)
-
-        self.write(JsonWrapper.dumps({"file_id": new_file.file_id}))
+        self.write(JsonWrapper.dumps({"file_id": new_file.file_id, "sha256": self.upload.content_hash}))
         raise Finish()
+
+    def discard_upload(self) -> None:
+        if self.upload is not None:
+            self.upload.discard()
+
+    def on_connection_close(self) -> None:
+        self.discard_upload()
+        super().on_connection_close()
+
+    def on_finish(self) -> None:
+        self.discard_upload()
+        super().on_finish()
+
+
+class UploadedFileHandler(QuadrantAPIHandler):
+    @rest_authenticated
+    async def delete(self, file_id):
+        try:
+            uploaded_file = await general.File.get_file(self.user, UUID(file_id), session=self.session)
+
+        except (exc.NoResultFound, ValueError):
+            raise JsonHTTPError(status_code=404, reason="File with provided id not found")
+
+        try:
+            await uploaded_file.delete_file(session=self.session)
+
+        except exc.IntegrityError:
+            await self.session.rollback()
+            raise JsonHTTPError(status_code=400, reason="File is attached to messages")
+
+        self.write(JsonWrapper.dumps({"deleted_file_id": file_id}))
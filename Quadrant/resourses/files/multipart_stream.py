@@ -0,0 +1,142 @@
+from typing import Any, List, Optional, Tuple
+
+from tornado.httputil import HTTPHeaders, _parse_header
+
+# Parts headers bigger than that are considered malformed
+MAX_PART_HEADERS_SIZE = 16 * 1024
+
+
+class MultipartPart:
+    """Headers of one part of multipart/form-data body."""
+    __slots__ = ("headers", "name", "filename", "content_type")
+
+    def __init__(self, headers: HTTPHeaders):
+        self.headers = headers
+        disposition, disposition_params = _parse_header(headers.get("Content-Disposition", ""))
+        if disposition != "form-data" or "name" not in disposition_params:
+            raise ValueError("Invalid multipart part disposition")
+
+        self.name: str = disposition_params["name"]
+        self.filename: Optional[str] = disposition_params.get("filename")
+        self.content_type: str = headers.get("Content-Type", "application/octet-stream")
+
+
+class MultipartStreamParser:
+    """
+    Incremental multipart/form-data parser that keeps only small tail of body in memory,
+    so parts of any size can be streamed to wherever they must be stored.
+
+    Every fed chunk gives list of events:
+        ("part", MultipartPart) - new part started;
+        ("data", bytes) - next piece of current part body;
+        ("end", None) - current part body ended.
+    """
+    PREAMBLE, HEADERS, BODY, EPILOGUE = range(4)
+
+    def __init__(self, boundary: bytes):
+        """
+        Initializes parser.
+
+        :param boundary: boundary from Content-Type header without quotes.
+        """
+        if not boundary or len(boundary) > 70:
+            raise ValueError("Invalid multipart boundary")
+
+        # First delimiter has no leading line break, so it's added to make all delimiters look same
+        self._buffer = b"\r\n"
+        self._delimiter = b"\r\n--" + boundary
+        self._state = self.PREAMBLE
+
+    @classmethod
+    def from_content_type(cls, content_type: str) -> "MultipartStreamParser":
+        """
+        Creates parser for request with given Content-Type header.
+
+        :param content_type: Content-Type header value.
+        :return: parser instance.
+        """
+        content_type, params = _parse_header(content_type)
+        if content_type != "multipart/form-data" or "boundary" not in params:
+            raise ValueError("Request body isn't multipart/form-data")
+
+        return cls(params["boundary"].encode("latin1"))
+
+    @property
+    def finished(self) -> bool:
+        return self._state == self.EPILOGUE
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Any]]:
+        """
+        Parses next chunk of body.
+
+        :param chunk: bytes received from client.
+        :return: list of parsing events.
+        """
+        if self._state == self.EPILOGUE:
+            return []
+
+        self._buffer += chunk
+        events = []
+
+        while True:
+            if self._state in (self.PREAMBLE, self.BODY):
+                delimiter_at = self._buffer.find(self._delimiter)
+                if delimiter_at == -1:
+                    # Tail is kept since it might be start of delimiter
+                    keep = len(self._delimiter) - 1
+                    if self._state == self.BODY and len(self._buffer) > keep:
+                        events.append(("data", self._buffer[:-keep]))
+
+                    if len(self._buffer) > keep:
+                        self._buffer = self._buffer[-keep:]
+
+                    return events
+
+                delimiter_end = delimiter_at + len(self._delimiter)
+                if len(self._buffer) < delimiter_end + 2:
+                    # Can't tell yet if it's last delimiter
+                    if self._state == self.BODY and delimiter_at > 0:
+                        events.append(("data", self._buffer[:delimiter_at]))
+                        self._buffer = self._buffer[delimiter_at:]
+
+                    return events
+
+                if self._state == self.BODY:
+                    if delimiter_at > 0:
+                        events.append(("data", self._buffer[:delimiter_at]))
+
+                    events.append(("end", None))
+
+                ending = self._buffer[delimiter_end:delimiter_end + 2]
+                self._buffer = self._buffer[delimiter_end + 2:]
+
+                if ending == b"--":
+                    self._state = self.EPILOGUE
+                    self._buffer = b""
+                    return events
+
+                elif ending != b"\r\n":
+                    raise ValueError("Invalid multipart delimiter")
+
+                self._state = self.HEADERS
+
+            elif self._state == self.HEADERS:
+                if self._buffer.startswith(b"\r\n"):
+                    raise ValueError("Multipart part has no headers")
+
+                headers_end = self._buffer.find(b"\r\n\r\n")
+                if headers_end == -1:
+                    if len(self._buffer) > MAX_PART_HEADERS_SIZE:
+                        raise ValueError("Multipart part headers are too big")
+
+                    return events
+
+                headers = HTTPHeaders.parse(self._buffer[:headers_end].decode("utf-8"))
+                self._buffer = self._buffer[headers_end + 4:]
+                events.append(("part", MultipartPart(headers)))
+                self._state = self.BODY
+
+    def finish(self) -> None:
+        """Checks that whole body was parsed."""
+        if self._state != self.EPILOGUE:
+            raise ValueError("Multipart body ended unexpectedly")
@@ -0,0 +1,125 @@
+import asyncio
+import os
+from concurrent.futures import Future
+from hashlib import sha256
+from pathlib import Path
+from tempfile import mkstemp
+from typing import Optional
+
+from Quadrant.models.general.blob_store import BlobStore, files_io_executor
+
+
+class StreamedUpload:
+    """
+    Uploaded file that is written to temporary file piece by piece as it's received.
+    Disk writes and hashing run in files io threads, so event loop only waits for them.
+    """
+
+    class exc:
+        class UploadTooBig(ValueError):
+            pass
+
+    def __init__(self, directory: Path, max_size: int):
+        """
+        Initializes upload without creating temporary file.
+
+        :param directory: directory where temporary file is created (same filesystem as final location).
+        :param max_size: max number of bytes in file.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.size = 0
+        self.temp_path: Optional[Path] = None
+        self._fd: Optional[int] = None
+        self._hash = sha256()
+        # Last io operation, operations of one upload never run at same time
+        self._io_future: Optional[Future] = None
+
+    @property
+    def content_hash(self) -> str:
+        return self._hash.hexdigest()
+
+    async def _run_io(self, function, *args):
+        self._io_future = files_io_executor.submit(function, *args)
+        return await asyncio.wrap_future(self._io_future)
+
+    def _open(self) -> None:
+        fd, temp_path = mkstemp(prefix=".upload_", dir=self.directory)
+        self._fd, self.temp_path = fd, Path(temp_path)
+
+    def _write(self, data: bytes) -> None:
+        self._hash.update(data)
+        view = memoryview(data)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+
+    def _close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    async def write(self, data: bytes) -> None:
+        """
+        Appends data to file.
+
+        :param data: next piece of file.
+        :return: nothing.
+        """
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise self.exc.UploadTooBig("Uploaded file is too big")
+
+        if self._fd is None and self.temp_path is None:
+            await self._run_io(self._open)
+
+        await self._run_io(self._write, data)
+
+    async def save(self, path: Path) -> None:
+        """
+        Moves written file to its final location.
+
+        :param path: path to file.
+        :return: nothing.
+        """
+        def move():
+            self._close()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if self.temp_path is None:
+                path.touch()
+
+            else:
+                os.replace(self.temp_path, path)
+                self.temp_path = None
+
+        await self._run_io(move)
+
+    async def save_to_blob_store(self, store: BlobStore, path: Path) -> bool:
+        """
+        Places written file at path keeping single copy of its content in blob store.
+
+        :param store: blob store.
+        :param path: path to file.
+        :return: True if content wasn't stored before.
+        """
+        def move():
+            self._close()
+            is_new = store.store_file(self.temp_path, self.content_hash, path)
+            self.temp_path = None
+            return is_new
+
+        return await self._run_io(move)
+
+    def discard(self) -> None:
+        """Closes and removes temporary file without waiting for it."""
+        def remove():
+            self._close()
+            if self.temp_path is not None:
+                self.temp_path.unlink(missing_ok=True)
+                self.temp_path = None
+
+        if self._io_future is not None and not self._io_future.done():
+            self._io_future.add_done_callback(lambda _: files_io_executor.submit(remove))
+
+        else:
+            files_io_executor.submit(remove)
@@ -0,0 +1,14 @@
+from Quadrant.config import quadrant_config
+from Quadrant.resourses.quadrant_app import QuadrantApp
+from .gateway import GatewayHandler
+
+gateway_resource = QuadrantApp(
+    [
+        (r"/api/v1/gateway", GatewayHandler),
+    ],
+    # Answered pings count as heartbeats, so users stay online while their connections are alive
+    websocket_ping_interval=quadrant_config.PresenceConfig.heartbeat_timeout.value / 3,
+    websocket_ping_timeout=quadrant_config.PresenceConfig.heartbeat_timeout.value,
+)
+
+__all__ = ("gateway_resource", )
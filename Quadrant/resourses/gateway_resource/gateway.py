@@ -0,0 +1,205 @@
+from typing import Hashable, Optional, Tuple
+from uuid import UUID
+
+from rapidjson import JSONDecodeError
+from tornado.ioloop import IOLoop
+from tornado.web import HTTPError
+from tornado.websocket import WebSocketClosedError, WebSocketHandler
+
+from Quadrant.events import Event, EventType, channel_topic, events_hub, presence_topic, user_topic
+from Quadrant.models.db_init import ReadOnlySession, Session
+from Quadrant.models.dm_channel_package import DirectMessagesChannel
+from Quadrant.models.group_channel_package import GroupMessagesChannel
+from Quadrant.models.membership_index import membership_index
+from Quadrant.models.users_package import User, UsersRelations, UsersRelationType, presence_service
+from Quadrant.resourses.middlewares import authorization_middleware
+from Quadrant.resourses.utils import JsonWrapper
+
+# Channels classes that gateway can subscribe to by channel type name
+CHANNELS_TYPES = {
+    "dm": DirectMessagesChannel,
+    "group": GroupMessagesChannel,
+}
+
+
+class GatewayHandler(WebSocketHandler):
+    """
+    WebSocket connection that pushes events of users channels, friends statuses and relations changes.
+
+    Client can send ops:
+        {"op": "subscribe", "channel_type": "dm" | "group", "channel_id": "<uuid>"}
+        {"op": "unsubscribe", "channel_id": "<uuid>"}
+        {"op": "heartbeat"}
+    User stays online while connection sends heartbeats or answers pings.
+    Connections are unsubscribed from channels which users stop being members of.
+    Server sends events as {"event": "<event type>", "data": {...}}
+    and ops results as {"op": "<op>", "success": true | false, ...}.
+    """
+    user: Optional[User]
+    is_present: bool = False
+    # Connection may be closed while handler waits for database, so it must not subscribe after that
+    is_closed: bool = False
+
+    async def prepare(self):
+        async with ReadOnlySession() as session:
+            auth_user, _ = await authorization_middleware(self, lambda: session)
+
+        if auth_user is None:
+            raise HTTPError(403, reason="Unauthorized")
+
+        self.user = auth_user.user
+
+    async def open(self):
+        events_hub.subscribe(user_topic(self.user.id), self)
+        # Other connections of same user must know about status updates too
+        events_hub.subscribe(presence_topic(self.user.id), self)
+
+        async with Session() as session:
+            friends_ids = await UsersRelations.get_friends_ids(self.user.id, session=session)
+
+        if self.is_closed:
+            return
+
+        for friend_id in friends_ids:
+            events_hub.subscribe(presence_topic(friend_id), self)
+
+        presence_service.connect(self.user.id, self.user.status, self.user.text_status)
+        self.is_present = True
+
+    async def on_message(self, message):
+        try:
+            data = JsonWrapper.loads(message)
+            op = data["op"]
+            if op == "heartbeat":
+                presence_service.heartbeat(self.user.id)
+                self.send_op_result(op, True)
+                return
+
+            # JsonWrapper already decodes canonical uuids
+            channel_id = data["channel_id"]
+            if not isinstance(channel_id, UUID):
+                channel_id = UUID(channel_id)
+
+        except (AttributeError, JSONDecodeError, KeyError, TypeError, ValueError):
+            self.send_op_result("unknown", False, reason="Invalid op")
+            return
+
+        if op == "subscribe":
+            channel_class = CHANNELS_TYPES.get(data.get("channel_type"))
+            if channel_class is None:
+                self.send_op_result(op, False, reason="Unknown channel type", channel_id=channel_id)
+                return
+
+            async with Session() as session:
+                is_member = await channel_class.is_member(channel_id, self.user, session=session)
+
+            if self.is_closed:
+                return
+
+            if not is_member:
+                self.send_op_result(op, False, reason="You're not a member of chat", channel_id=channel_id)
+                return
+
+            events_hub.subscribe(channel_topic(channel_id), self)
+            self.send_op_result(op, True, channel_id=channel_id)
+
+        elif op == "unsubscribe":
+            events_hub.unsubscribe(channel_topic(channel_id), self)
+            self.send_op_result(op, True, channel_id=channel_id)
+
+        else:
+            self.send_op_result(op, False, reason="Unknown op", channel_id=channel_id)
+
+    def on_pong(self, data: bytes) -> None:
+        presence_service.heartbeat(self.user.id)
+
+    def on_close(self):
+        self.is_closed = True
+        events_hub.unsubscribe_all(self)
+        if self.is_present:
+            self.is_present = False
+            presence_service.disconnect(self.user.id)
+
+    def send_op_result(self, op: str, success: bool, **details) -> None:
+        self.write_to_client(JsonWrapper.dumps({"op": op, "success": success, **details}))
+
+    def revoke_subscription(self, channel_id: UUID) -> None:
+        """
+        Unsubscribes connection from channel which user isn't member of anymore and tells client about it.
+
+        :param channel_id: channel id.
+        :return: nothing.
+        """
+        events_hub.unsubscribe(channel_topic(channel_id), self)
+        self.send_op_result("unsubscribe", True, channel_id=channel_id, reason="You're not a member of chat")
+
+    def send_event(self, event: Event) -> None:
+        if event.event_type == EventType.relation_updated:
+            # Friends list changed, so statuses of other users must be followed or not anymore
+            friend_topic = presence_topic(event.payload["user_id"])
+            if event.payload["relation_status"] == UsersRelationType.friends.name:
+                events_hub.subscribe(friend_topic, self)
+
+            else:
+                events_hub.unsubscribe(friend_topic, self)
+
+        self.write_to_client(event.serialized)
+
+    def write_to_client(self, message: str) -> None:
+        try:
+            self.write_message(message)
+
+        except WebSocketClosedError:
+            events_hub.unsubscribe_all(self)
+
+
+def channel_subscribers(channel_id: UUID):
+    return [
+        subscriber for subscriber in events_hub.subscribers_of(channel_topic(channel_id))
+        if isinstance(subscriber, GatewayHandler)
+    ]
+
+
+async def recheck_subscriptions(channel_type: str, channel_id: UUID) -> None:
+    """
+    Revokes subscriptions of connections which users aren't members of channel anymore.
+
+    :param channel_type: channel type name.
+    :param channel_id: channel id.
+    :return: nothing.
+    """
+    subscribers = channel_subscribers(channel_id)
+    if not subscribers:
+        return
+
+    channel_class = CHANNELS_TYPES[channel_type]
+    async with Session() as session:
+        for subscriber in subscribers:
+            if not await channel_class.is_member(channel_id, subscriber.user, session=session):
+                subscriber.revoke_subscription(channel_id)
+
+
+def revoke_subscriptions(key: Tuple[str, Hashable], user_id: Optional[Hashable], is_member: bool) -> None:
+    """
+    Listener of membership changes that stops events of channels from reaching users who left them.
+
+    :param key: channel type name and channel id.
+    :param user_id: id of user whose membership changed (None if channel was deleted or its owner changed).
+    :param is_member: flag showing if user became member.
+    :return: nothing.
+    """
+    channel_type, channel_id = key
+    if is_member or channel_type not in CHANNELS_TYPES:
+        return
+
+    if user_id is None:
+        # Who is still member can be known only by checking every subscriber again
+        IOLoop.current().spawn_callback(recheck_subscriptions, channel_type, channel_id)
+        return
+
+    for subscriber in channel_subscribers(channel_id):
+        if subscriber.user.id == user_id:
+            subscriber.revoke_subscription(channel_id)
+
+
+membership_index.add_listener(revoke_subscriptions)
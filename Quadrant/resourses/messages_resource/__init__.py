@@ -0,0 +1,16 @@
+from Quadrant.resourses.quadrant_app import QuadrantAPIApp
+from .history import MessagesHistoryHandler
+from .search import MessagesSearchHandler
+
+messages_resource = QuadrantAPIApp([
+    (
+        r"/api/v1/channels/(?P<channel_type>dm|group)/(?P<channel_id>[0-9a-fA-F-]{36})/messages/search",
+        MessagesSearchHandler
+    ),
+    (
+        r"/api/v1/channels/(?P<channel_type>dm|group)/(?P<channel_id>[0-9a-fA-F-]{36})/messages",
+        MessagesHistoryHandler
+    ),
+])
+
+__all__ = ("messages_resource", )
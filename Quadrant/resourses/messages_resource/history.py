@@ -0,0 +1,107 @@
+from uuid import UUID
+
+from Quadrant.resourses.middlewares import rest_authenticated
+from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
+from Quadrant.resourses.utils import JsonHTTPError
+from Quadrant.resourses.utils.serializers import serializers
+from .search import CHANNELS_TYPES
+
+# Messages ids are bigint, so every message goes before this id
+NEWEST_MESSAGES_CURSOR = (1 << 63) - 1
+
+
+def parse_message_id(value: str) -> int:
+    """
+    Parses message id from query argument, raising ValueError for values that aren't valid bigint ids.
+
+    :param value: query argument value.
+    :return: message id.
+    """
+    message_id = int(value)
+    if not 0 <= message_id <= NEWEST_MESSAGES_CURSOR:
+        raise ValueError("Message id is out of range")
+
+    return message_id
+
+
+class MessagesHistoryHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
+    @rest_authenticated
+    async def get(self, channel_type, channel_id):
+        """
+        Gives page of channel history
+        ---
+        description: Gives messages that go before or after message with provided id, newest first.
+            Newest messages of channel are given if no message id is provided.
+        security:
+            - sessionID
+              cookieAuth
+
+        parameters:
+        - in: path
+            name: channel_type
+            type: string
+        - in: path
+            name: channel_id
+            type: string
+        - in: query
+            name: before
+            type: string
+        - in: query
+            name: after
+            type: string
+        - in: query
+            name: pinned
+            type: boolean
+
+        responses:
+            200:
+                description: Messages of channel.
+            400:
+                description: Invalid message id.
+                application/json:
+                    schema: APIErrorSchema
+            403:
+                description: Unauthorized.
+                application/json:
+                    schema: APIErrorSchema
+            404:
+                description: Channel not found.
+                application/json:
+                    schema: APIErrorSchema
+        """
+        channel_class, message_class = CHANNELS_TYPES[channel_type]
+        before = self.get_argument("before", default=None)
+        after = self.get_argument("after", default=None)
+        pinned_only = self.get_argument("pinned", default="false").lower() == "true"
+
+        try:
+            channel_id = UUID(channel_id)
+
+        except ValueError:
+            raise JsonHTTPError(status_code=404, reason="Channel not found")
+
+        if not await channel_class.is_member(channel_id, self.user, session=self.session):
+            # Channels user isn't member of are hidden
+            raise JsonHTTPError(status_code=404, reason="Channel not found")
+
+        try:
+            after = parse_message_id(after) if after is not None else None
+            before = parse_message_id(before) if before is not None else NEWEST_MESSAGES_CURSOR
+
+        except ValueError:
+            raise JsonHTTPError(status_code=400, reason="Invalid message id")
+
+        # Pages near newest messages are served from messages window of channel
+        if after is not None:
+            messages = await message_class.get_messages_after_as_dicts(
+                after, channel_id, pinned_only, session=self.session
+            )
+
+        else:
+            messages = await message_class.get_messages_before_as_dicts(
+                before, channel_id, pinned_only, session=self.session
+            )
+
+        self.write(serializers.dumps({"messages": messages}))
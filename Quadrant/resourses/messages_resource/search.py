@@ -0,0 +1,98 @@
+from uuid import UUID
+
+from Quadrant.models.dm_channel_package import DirectMessagesChannel, DM_Message
+from Quadrant.models.group_channel_package import GroupMessage, GroupMessagesChannel
+from Quadrant.resourses.middlewares import rest_authenticated
+from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
+from Quadrant.resourses.utils import JsonHTTPError
+from Quadrant.resourses.utils.serializers import serializers
+
+# Channels classes and their messages classes by channel type name
+CHANNELS_TYPES = {
+    "dm": (DirectMessagesChannel, DM_Message),
+    "group": (GroupMessagesChannel, GroupMessage),
+}
+
+
+class MessagesSearchHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
+    @rest_authenticated
+    async def get(self, channel_type, channel_id):
+        """
+        Searches messages of channel by text
+        ---
+        description: Gives page of channel messages matching search query, most relevant first.
+        security:
+            - sessionID
+              cookieAuth
+
+        parameters:
+        - in: path
+            name: channel_type
+            type: string
+        - in: path
+            name: channel_id
+            type: string
+        - in: query
+            name: q
+            type: string
+        - in: query
+            name: author_id
+            type: string
+        - in: query
+            name: after
+            type: string
+        - in: query
+            name: before
+            type: string
+
+        responses:
+            200:
+                description: Found messages with cursors of neighbour pages.
+            400:
+                description: Invalid query, author id or cursor.
+                application/json:
+                    schema: APIErrorSchema
+            403:
+                description: Unauthorized.
+                application/json:
+                    schema: APIErrorSchema
+            404:
+                description: Channel not found.
+                application/json:
+                    schema: APIErrorSchema
+        """
+        channel_class, message_class = CHANNELS_TYPES[channel_type]
+        search_query = self.get_argument("q", default="")
+        author_id = self.get_argument("author_id", default=None)
+        after = self.get_argument("after", default=None)
+        before = self.get_argument("before", default=None)
+
+        try:
+            channel_id = UUID(channel_id)
+
+        except ValueError:
+            raise JsonHTTPError(status_code=404, reason="Channel not found")
+
+        if not await channel_class.is_member(channel_id, self.user, session=self.session):
+            # Channels user isn't member of are hidden
+            raise JsonHTTPError(status_code=404, reason="Channel not found")
+
+        try:
+            if author_id is not None:
+                author_id = UUID(author_id)
+
+            messages_page = await message_class.search_messages(
+                search_query, channel_id, author_id, after=after, before=before, session=self.session
+            )
+
+        except ValueError:
+            raise JsonHTTPError(status_code=400, reason="Invalid search query, author id or cursor")
+
+        self.write(serializers.dumps(
+            {
+                "messages": [message.as_dict() for message in messages_page],
+                "cursor": messages_page.cursors()
+            }
+        ))
@@ -0,0 +1,8 @@
+from Quadrant.resourses.quadrant_app import QuadrantApp
+from .metrics import MetricsHandler
+
+metrics_resource = QuadrantApp([
+    (r"/internal/metrics", MetricsHandler),
+])
+
+__all__ = ("metrics_resource", )
@@ -0,0 +1,38 @@
+from ipaddress import ip_address
+
+from tornado.web import RequestHandler
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.abstract.messages_window import messages_window_cache
+from Quadrant.models.membership_index import membership_index
+from Quadrant.models.replicas import replica_set
+from Quadrant.models.servers_package.permissions_managment.permissions_cache import permissions_cache
+from Quadrant.models.users_package import authorization_cache, presence_service, relations_index
+from Quadrant.resourses.utils import JsonHTTPError, JsonWrapper
+from Quadrant.resourses.utils.image_pipeline import image_pipeline
+
+
+class MetricsHandler(RequestHandler):
+    """
+    Internal metrics of this process. Doesn't use database connections, so it can be polled
+    even when pool is exhausted. Available only from loopback addresses.
+    """
+
+    def prepare(self):
+        self.set_header("Content-Type", "application/json")
+        if not ip_address(self.request.remote_ip).is_loopback:
+            raise JsonHTTPError(403)
+
+    def get(self):
+        pool = quadrant_config.DBConfig.async_base_engine.sync_engine.pool
+        self.write(JsonWrapper.dumps({
+            "db_pool": pool.metrics.as_dict(pool),
+            "db_replicas": [replica.as_dict() for replica in replica_set.replicas],
+            "authorization_cache": {"hit_rate": authorization_cache.hit_rate},
+            "messages_window_cache": {"hit_rate": messages_window_cache.hit_rate},
+            "permissions_cache": {"hit_rate": permissions_cache.hit_rate},
+            "membership_index": {"hit_rate": membership_index.hit_rate},
+            "relations_index": {"hit_rate": relations_index.hit_rate},
+            "presence": {"unflushed_statuses": presence_service.unflushed_count},
+            "image_pipeline": {"queued": image_pipeline.queued, **image_pipeline.metrics.as_dict()},
+        }))
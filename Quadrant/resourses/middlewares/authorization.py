@@ -1,24 +1,35 @@
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 
 from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession
 from tornado.web import RequestHandler
 
-from Quadrant.models.users_package import UserInternalAuthorization, UserSession
+from Quadrant.models.users_package import UserInternalAuthorization, UserSession, authorization_cache
+from Quadrant.models.utils.snapshots import detached_snapshot
 
 
 async def authorization_middleware(
-    request_context: RequestHandler, session
+    request_context: RequestHandler, get_session: Callable[[], AsyncSession]
 ) -> Tuple[Optional[UserInternalAuthorization], Optional[UserSession]]:
+    """
+    Authorizes request by token and session_id.
+
+    :param request_context: handler of request.
+    :param get_session: function that gives database session, it's called only when session is needed.
+    :return: authorized user and his session or Nones.
+    """
     token = request_context.get_secure_cookie("token") or request_context.request.headers.get("token")
 
     if token is None:
         return None, None
 
     try:
-        token = str(token)
+        if isinstance(token, bytes):
+            token = token.decode("utf-8")
+
         token_type, token = token.split(' ', 1)
 
-    except ValueError:
+    except (ValueError, UnicodeDecodeError):
         return None, None
 
     if token_type == "Bearer":
@@ -31,26 +42,45 @@ async def authorization_middleware(
         # Not supported token type
         return None, None
 
-    auth_user = None
-    user_session = None
+    session_id = None
+    # We need to ensure that user owns this session, but bot shouldn't do that
+    if not is_bot:
+        try:
+            session_id = int(request_context.get_secure_cookie("session_id"))
+
+        except (TypeError, ValueError):
+            return None, None
 
+    session = get_session()
+    cached_auth_user, cached_user_session = authorization_cache.get(token, is_bot, session_id)
+    if cached_auth_user is not None:
+        # Cached snapshots are shared between requests, so each request works with its own copy
+        auth_user = await session.merge(cached_auth_user, load=False)
+        user_session = None
+        if cached_user_session is not None:
+            user_session = await session.merge(cached_user_session, load=False)
+
+        return auth_user, user_session
+
+    user_session = None
     try:
         auth_user = await UserInternalAuthorization.authorize_with_token(token, is_bot, session=session)
 
     except exc.NoResultFound:
-        return auth_user, user_session
+        return None, None
 
-    # We need to ensure that user owns this session, but bot shouldn't do that
     if not is_bot:
         try:
-            session_id = request_context.get_secure_cookie("session_id")
-            session_id = int(str(session_id))
-
-            user_session = UserSession.get_alive_user_session(
+            user_session = await UserSession.get_alive_user_session(
                 auth_user.user_id, session_id=session_id, session=session
             )
 
         except (exc.NoResultFound, ValueError):
             return None, None
 
+    # Instances of this request's session are expired by its rollback, so cache keeps copies not bound to it
+    authorization_cache.store(
+        token, is_bot, detached_snapshot(auth_user),
+        detached_snapshot(user_session) if user_session is not None else None
+    )
     return auth_user, user_session
@@ -1,21 +1,47 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 from rapidjson import JSONDecodeError
 from sqlalchemy.ext.asyncio import AsyncSession
+from tornado.ioloop import IOLoop
 from tornado.web import RequestHandler
 
-from Quadrant.models.db_init import Session
+from Quadrant.models.db_init import ReadOnlySession, Session
 from Quadrant.models.users_package import OauthUserAuthorization, User, UserInternalAuthorization, UserSession
 from Quadrant.resourses.middlewares import authorization_middleware
 from Quadrant.resourses.utils import JsonWrapper
 
 
 class QuadrantAPIHandler(RequestHandler):
-    session: AsyncSession
+    # HTTP methods of handler that only read from database, they get read only autocommit session
+    read_only_methods: Tuple[str, ...] = ()
+
     user: Optional[User]
     auth_user: Optional[Union[OauthUserAuthorization, UserInternalAuthorization]]
     user_session: Optional[UserSession]
     json_data: Optional[Dict[str, Any]]
+    _session: Optional[AsyncSession] = None
+
+    @property
+    def is_read_only(self) -> bool:
+        return self.request.method in self.read_only_methods
+
+    @property
+    def session(self) -> AsyncSession:
+        """
+        Database session of request. It's created on first use, and connection is taken
+        from pool only when first query is issued, so requests that don't query database never wait for it.
+        """
+        if self._session is None:
+            self._session = ReadOnlySession() if self.is_read_only else Session()
+            self.set_consistency_key()
+
+        return self._session
+
+    def set_consistency_key(self) -> None:
+        # Users reads go only to replicas that already have users own writes
+        user = getattr(self, 'user', None)
+        if self._session is not None and user is not None:
+            self._session.info["consistency_key"] = user.id
 
     def get_current_user(self) -> Optional[Union[UserInternalAuthorization, OauthUserAuthorization]]:
         return getattr(self, 'auth_user', None)
@@ -23,10 +49,14 @@ class QuadrantAPIHandler(RequestHandler):
     async def prepare(self):
         self.set_header("Content-Type", 'application/json')
 
-        self.session = Session()
-        self.auth_user, self.user_session = await authorization_middleware(self, self.session)
+        self.auth_user, self.user_session = await authorization_middleware(self, lambda: self.session)
         self.user = getattr(self.auth_user, 'user', None)
         self.json_data = None
+        self.set_consistency_key()
+
+        if self._session is not None and self.is_read_only:
+            # Returns connection used by authorization to pool until handler needs it
+            await self._session.commit()
 
         if self.request.headers.get("Content-Type") == "application/json":
             try:
@@ -35,5 +65,8 @@ class QuadrantAPIHandler(RequestHandler):
             except JSONDecodeError:
                 pass
 
-    async def on_finish(self) -> None:
-        await self.session.close()
+    def on_finish(self) -> None:
+        if self._session is not None:
+            # Tornado doesn't await on_finish, so session is closed in background
+            IOLoop.current().add_callback(self._session.close)
+            self._session = None
@@ -6,6 +6,7 @@ from Quadrant.models import users_package
 from Quadrant.resourses.middlewares import rest_authenticated
 from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
 from Quadrant.resourses.utils import JsonHTTPError, JsonWrapper
+from Quadrant.resourses.utils.serializers import serializers
 
 
 class BlockedRelationsHandler(QuadrantAPIHandler):
@@ -42,22 +43,27 @@ class BlockedRelationsHandler(QuadrantAPIHandler):
 
 
 class BlockedRelationsPageHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
     @rest_authenticated
     async def get(self):
         page = self.get_argument("page", default="0")
+        after = self.get_argument("after", default=None)
+        before = self.get_argument("before", default=None)
         try:
             page = int(page)
             relation_type = users_package.UsersRelationType.blocked
             relations_page = await users_package.UsersRelations.get_relationships_page(
-                self.user, page, relation_type, session=self.session
+                self.user, page, relation_type, after=after, before=before, session=self.session
             )
 
         except ValueError:
-            raise JsonHTTPError(status_code=400, reason="Invalid page number")
+            raise JsonHTTPError(status_code=400, reason="Invalid page number or cursor")
 
-        self.write(JsonWrapper.dumps(
+        self.write(serializers.dumps(
             {
                 "relation_status": relation_type,
-                "users": [user.as_dict() for _, user in relations_page]
+                "users": serializers.encode_rows(user for _, user in relations_page),
+                "cursor": relations_page.cursors()
             }
         ))
@@ -7,6 +7,8 @@ from Quadrant.resourses.utils import JsonHTTPError, JsonWrapper
 
 
 class RelationsCheckHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
     @rest_authenticated
     async def get(self, with_user_id):
         try:
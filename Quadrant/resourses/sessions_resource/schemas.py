@@ -1,10 +1,10 @@
 from marshmallow import Schema, fields
 
-from Quadrant.resourses.common_variables.common_schemas import SuccessResponseSchema
+from Quadrant.resourses.common_variables.common_schemas import PageCursorSchema, SuccessResponseSchema
 
 
 class UserSessionSchema(Schema):
-    session_id = fields.Int()
+    session_id = fields.Str()
     ip_address = fields.IP()
     started_at = fields.DateTime()
     is_alive = fields.Bool()
@@ -12,8 +12,9 @@ class UserSessionSchema(Schema):
 
 class UserSessionsPageSchema(Schema):
     sessions = fields.List(UserSessionSchema)
+    cursor = fields.Nested(PageCursorSchema)
 
 
 class SessionTerminationResponseSchema(SuccessResponseSchema):
     message = fields.Str()
-    terminated_session_id = fields.Int()
\ No newline at end of file
+    terminated_session_id = fields.Str()
\ No newline at end of file
@@ -5,9 +5,12 @@ from Quadrant.models.users_package import UserSession
 from Quadrant.resourses.middlewares import rest_authenticated
 from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
 from Quadrant.resourses.utils import JsonHTTPError, JsonWrapper
+from Quadrant.resourses.utils.serializers import serializers
 
 
 class UsersCurrentSessionHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
     @rest_authenticated
     async def get(self):
         """
@@ -71,13 +74,15 @@ class UsersCurrentSessionHandler(QuadrantAPIHandler):
             {
                 "success": True,
                 "message": "You've been successfully logged off",
-                "terminated_session_id": session_id
+                "terminated_session_id": str(session_id)
             }
         ))
         raise Finish()
 
 
 class UsersExactSessionHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
     @rest_authenticated
     async def get(self, session_id):
         """
@@ -148,7 +153,7 @@ class UsersExactSessionHandler(QuadrantAPIHandler):
             {
                 "success": True,
                 "message": "You've been successfully logged off on session specified session",
-                "terminated_session_id": session_id
+                "terminated_session_id": str(session_id)
             }
         ))
         raise Finish()
@@ -172,6 +177,8 @@ class UsersExactSessionHandler(QuadrantAPIHandler):
 
 
 class UsersSessionsHistoryHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
     @rest_authenticated
     async def get(self):
         """
@@ -181,6 +188,17 @@ class UsersSessionsHistoryHandler(QuadrantAPIHandler):
             - sessionID
               cookieAuth
 
+        parameters:
+        - in: query
+            name: after
+            type: string
+        - in: query
+            name: before
+            type: string
+        - in: query
+            name: page
+            type: integer
+
         requestBody:
             required: false
 
@@ -200,16 +218,21 @@ class UsersSessionsHistoryHandler(QuadrantAPIHandler):
                     schema: APIErrorSchema
         """
         page = self.get_argument("page", default="0")
+        after = self.get_argument("after", default=None)
+        before = self.get_argument("before", default=None)
         try:
             page = int(page)
-            sessions = await UserSession.get_user_sessions_page(self.user.id, page, session=self.session)
+            sessions = await UserSession.get_user_sessions_page(
+                self.user.id, page, after=after, before=before, session=self.session
+            )
 
         except ValueError:
             raise JsonHTTPError(404, reason="Invalid sessions page")
 
         self.write(
-            JsonWrapper.dumps({
-                "sessions": [session.as_dict() for session in sessions]
+            serializers.dumps({
+                "sessions": serializers.encode_rows(sessions),
+                "cursor": sessions.cursors()
             })
         )
 
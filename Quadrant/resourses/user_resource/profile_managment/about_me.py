@@ -6,6 +6,8 @@ from Quadrant.resourses.utils import JsonWrapper
 
 
 class AboutMeHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
     @rest_authenticated
     async def get(self):
         """
@@ -1,23 +1,20 @@
 import imghdr
-from asyncio import get_event_loop
-from io import BytesIO
-from pathlib import Path
-from typing import Optional
 
-from PIL import Image
 from tornado.web import authenticated
 
 from Quadrant.config import casters, quadrant_config
 from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
 from Quadrant.resourses.utils import JsonHTTPError, JsonWrapper
+from Quadrant.resourses.utils.image_pipeline import OUTPUT_FORMATS, ImagePipeline, image_pipeline
 
-MIN_IMAGE_SIZE = casters.file_size_caster("15k")
-MAX_IMAGE_SIZE = casters.file_size_caster("4M")
+# Size caster gives size in bits
+MIN_IMAGE_SIZE = casters.file_size_caster("15k") // 8
+MAX_IMAGE_SIZE = casters.file_size_caster("4M") // 8
+# Names and max width and height of profile picture images
+PROFILE_PICTURE_SIZES = (("image0", 1024), ("image1", 256), ("image2", 64))
 
 
 class ProfilePictureHandler(QuadrantAPIHandler):
-    profile_picture: Optional[bytes]
-
     @authenticated
     async def post(self):
         try:
@@ -34,30 +31,28 @@ class ProfilePictureHandler(QuadrantAPIHandler):
         if filetype not in {"jpeg", "png", "webp"}:
             raise JsonHTTPError(status_code=400, reason="Invalid file format")
 
-        self.profile_picture = content
+        # Images are saved in webp and jpeg formats of few sizes to save some traffic
+        try:
+            await image_pipeline.process(
+                content, quadrant_config.profile_pictures / str(self.user.id), PROFILE_PICTURE_SIZES
+            )
+
+        except ImagePipeline.exc.QueueFull:
+            raise JsonHTTPError(status_code=503, reason="Too many images are being processed, try again later")
+
+        except ImagePipeline.exc.WorkersCrashed:
+            raise JsonHTTPError(status_code=503, reason="Image can not be processed now, try again later")
+
+        except ImagePipeline.exc.InvalidImage:
+            raise JsonHTTPError(status_code=400, reason="Invalid image")
+
         self.write(JsonWrapper.dumps({"success": True}))
 
     @authenticated
     async def delete(self):
         base_path = quadrant_config.profile_pictures / str(self.user.id)
-        (base_path / "image0.jpg").unlink(missing_ok=True)
-        (base_path / "image0.webp").unlink(missing_ok=True)
+        for name, _ in PROFILE_PICTURE_SIZES:
+            for extension, _, _ in OUTPUT_FORMATS:
+                (base_path / f"{name}.{extension}").unlink(missing_ok=True)
 
         self.write(JsonWrapper.dumps({"success": True}))
-
-    def thumbnail_image(self, profile_pictures_path: Path):
-        """
-        Saves image in webp and jpeg formats to save some traffic and space on drive.
-        :param profile_pictures_path: path to pictures, saved on drive.
-        :return: nothing.
-        """
-        with Image.open(BytesIO(self.profile_picture)) as img:
-            img.thumbnail((1024, 1024))
-            img.save(profile_pictures_path / "image0.jpg", "JPEG")
-            img.save(profile_pictures_path / "image0.webp", "WEBP", method=3)
-
-    async def on_finish(self) -> None:
-        await super().on_finish()
-        if self.profile_picture is not None:
-            profile_pictures_path = quadrant_config.profile_pictures / str(self.user.id)
-            get_event_loop().run_in_executor(None, self.thumbnail_image, profile_pictures_path)
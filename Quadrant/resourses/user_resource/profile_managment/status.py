@@ -14,6 +14,6 @@ class UserStatusHandler(QuadrantAPIHandler):
         except KeyError:
             raise JsonHTTPError(status_code=400, reason="Invalid status name for user")
 
+        # Subscribers are notified about update by model
         self.write(JsonWrapper.dumps({"new_status": status}))
-        # TODO: send notification about update
         raise Finish()
@@ -5,11 +5,14 @@ from sqlalchemy import exc
 
 from Quadrant.models import users_package
 from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
-from Quadrant.resourses.utils import JsonHTTPError, JsonWrapper
+from Quadrant.resourses.utils import JsonHTTPError
+from Quadrant.resourses.utils.serializers import serializers
 from Quadrant.resourses.middlewares import rest_authenticated
 
 
 class UserResourceHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+
     @rest_authenticated
     async def get(self, user_id: str):
         """
@@ -49,7 +52,7 @@ class UserResourceHandler(QuadrantAPIHandler):
         except (exc.NoResultFound, ValueError):
             raise JsonHTTPError(404, reason="User with provided id not found")
 
-        self.write(JsonWrapper.dumps(user.as_dict()))
+        self.write(serializers.encode(user))
         raise Finish()
 
     # TODO: add ability to ban some user by admins
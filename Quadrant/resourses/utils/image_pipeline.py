@@ -0,0 +1,209 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from tempfile import mkstemp
+from time import perf_counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from PIL import Image, UnidentifiedImageError
+from tornado.log import app_log
+
+from Quadrant.config import quadrant_config
+
+STAGES = ("decode", "resize", "encode")
+# Image formats and save options of every generated file
+OUTPUT_FORMATS = (("jpg", "JPEG", {"quality": 85, "optimize": True}), ("webp", "WEBP", {"method": 3}))
+
+
+def process_image(
+    content: bytes, directory: str, sizes: Iterable[Tuple[str, int]], max_pixels: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Decodes image once and saves it downscaled to every size in jpeg and webp formats.
+    Runs in image pipeline processes.
+
+    :param content: image file content.
+    :param directory: directory where images are saved.
+    :param sizes: pairs of output name and max width and height, largest first.
+    :param max_pixels: max number of pixels of image (None means no limit).
+    :return: seconds spent on every stage.
+    """
+    sizes = sorted(sizes, key=lambda size: size[1], reverse=True)
+    timings = dict.fromkeys(STAGES, 0.0)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    started_at = perf_counter()
+    with Image.open(BytesIO(content)) as image:
+        # Size is read from header, and small file may declare image that takes gigabytes when decoded
+        if max_pixels is not None and image.width * image.height > max_pixels:
+            raise ImagePipeline.exc.InvalidImage(f"Image has more than {max_pixels} pixels")
+
+        # JPEG decoder can downscale by 2, 4 or 8 while decoding, which is much faster than decoding full image
+        image.draft("RGB", (sizes[0][1], sizes[0][1]))
+        image = image.convert("RGB")
+
+    timings["decode"] = perf_counter() - started_at
+
+    for name, max_size in sizes:
+        started_at = perf_counter()
+        # Every next size is made from previous one, so each resize works with smaller image
+        image.thumbnail((max_size, max_size))
+        timings["resize"] += perf_counter() - started_at
+
+        started_at = perf_counter()
+        for extension, image_format, save_options in OUTPUT_FORMATS:
+            _save_image(image, directory / f"{name}.{extension}", image_format, save_options)
+
+        timings["encode"] += perf_counter() - started_at
+
+    return timings
+
+
+def _save_image(image: Image.Image, path: Path, image_format: str, save_options: dict) -> None:
+    # Every save gets own temporary file, so concurrent uploads of same user don't write into one file,
+    # and clients never see partially written image
+    fd, temp_path = mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            image.save(temp_file, image_format, **save_options)
+
+        os.replace(temp_path, path)
+
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _warm_up_worker() -> None:
+    return None
+
+
+class ImagePipelineMetrics:
+    """Counters and total seconds spent on every stage of processed images."""
+
+    def __init__(self):
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.stages_seconds = dict.fromkeys(STAGES, 0.0)
+
+    def add_timings(self, timings: Dict[str, float]) -> None:
+        self.processed += 1
+        for stage, seconds in timings.items():
+            self.stages_seconds[stage] += seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "stages_avg_ms": {
+                stage: seconds / self.processed * 1000 if self.processed else 0.0
+                for stage, seconds in self.stages_seconds.items()
+            },
+        }
+
+
+class ImagePipeline:
+    """
+    Resizes images in dedicated processes. Number of images that are being processed or wait for it
+    is limited, so server rejects new images instead of piling them up in memory when it's overloaded.
+    """
+
+    class exc:
+        class QueueFull(Exception):
+            pass
+
+        class InvalidImage(ValueError):
+            pass
+
+        class WorkersCrashed(Exception):
+            pass
+
+    def __init__(self, workers: int, max_queue_size: int, max_pixels: Optional[int] = None):
+        """
+        Initializes pipeline without starting processes.
+
+        :param workers: number of processes (0 means one for every cpu).
+        :param max_queue_size: max number of images that are being processed at once.
+        :param max_pixels: max number of pixels of processed image (None means no limit).
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue_size = max_queue_size
+        self.max_pixels = max_pixels
+        self.queued = 0
+        self.metrics = ImagePipelineMetrics()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+
+        return self._executor
+
+    @property
+    def is_full(self) -> bool:
+        return self.queued >= self.max_queue_size
+
+    def warm_up(self) -> None:
+        """Starts all processes, so first images don't wait for them."""
+        for future in [self.executor.submit(_warm_up_worker) for _ in range(self.workers)]:
+            future.result()
+
+    async def process(self, content: bytes, directory: Path, sizes: Iterable[Tuple[str, int]]) -> Dict[str, float]:
+        """
+        Saves image in all sizes.
+
+        :param content: image file content.
+        :param directory: directory where images are saved.
+        :param sizes: pairs of output name and max width and height.
+        :return: seconds spent on every stage.
+        """
+        if self.is_full:
+            self.metrics.rejected += 1
+            raise self.exc.QueueFull("Image processing queue is full")
+
+        self.queued += 1
+        executor = self.executor
+        try:
+            timings = await asyncio.get_event_loop().run_in_executor(
+                executor, process_image, content, str(directory), tuple(sizes), self.max_pixels
+            )
+
+        except BrokenProcessPool as err:
+            # Killed process (like by out of memory killer) breaks whole pool, so next image starts new one
+            self.metrics.failed += 1
+            app_log.error(f"Image processing pool is broken: {err!r}")
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+
+            raise self.exc.WorkersCrashed("Image processing workers crashed") from err
+
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as err:
+            self.metrics.failed += 1
+            app_log.warning(f"Failed to process image: {err!r}")
+            raise self.exc.InvalidImage("Image can not be processed") from err
+
+        finally:
+            self.queued -= 1
+
+        self.metrics.add_timings(timings)
+        return timings
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+image_pipeline = ImagePipeline(
+    quadrant_config.FilesConfig.image_workers.value,
+    quadrant_config.FilesConfig.image_queue_size.value,
+    quadrant_config.FilesConfig.image_max_pixels.value,
+)
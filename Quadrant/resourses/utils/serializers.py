@@ -0,0 +1,155 @@
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Type
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.users_package import User, UserSession
+from Quadrant.models.utils.ttl_cache import TTLCache
+from .json_wrapper import JsonWrapper
+
+
+class EncodedJson(str):
+    """Json text that is inserted into responses as is instead of being encoded again."""
+
+
+class ModelSerializer:
+    """
+    Knows how to turn model instance into json. Instances that have version can keep their encoded json
+    in memory until their row changes.
+    """
+
+    def __init__(
+        self, to_dict: Callable[[Any], Dict[str, Any]],
+        cache_key: Optional[Callable[[Any], Hashable]] = None, version: Optional[Callable[[Any], Any]] = None,
+        cache_size: int = 0
+    ):
+        """
+        Initializes serializer.
+
+        :param to_dict: function that gives json serializable representation of instance.
+        :param cache_key: function that gives key that identifies row of instance.
+        :param version: function that gives row version which changes every time row is updated.
+        :param cache_size: max number of encoded instances kept in memory.
+        """
+        self.to_dict = to_dict
+        self.cache_key = cache_key
+        self.version = version
+        self._encoded = TTLCache(cache_size if cache_key is not None and version is not None else 0)
+
+    @property
+    def caches_encoded(self) -> bool:
+        return self._encoded.max_size > 0
+
+    def encode(self, instance: Any) -> EncodedJson:
+        """
+        Gives encoded instance, using cached json if row hasn't changed since it was encoded.
+
+        :param instance: model instance.
+        :return: json text.
+        """
+        if not self.caches_encoded:
+            return EncodedJson(JsonWrapper.dumps(self.to_dict(instance)))
+
+        key = self.cache_key(instance)
+        version = self.version(instance)
+        cached_version, encoded = self._encoded.get(key, (None, None))
+
+        if encoded is None or cached_version != version:
+            encoded = EncodedJson(JsonWrapper.dumps(self.to_dict(instance)))
+            self._encoded.set(key, (version, encoded))
+
+        return encoded
+
+
+class SerializersRegistry:
+    """
+    Registry of models serializers that lets handlers encode pages of rows without building
+    intermediate dicts for every row when encoded rows are cached.
+    """
+
+    def __init__(self):
+        self._serializers: Dict[Type, ModelSerializer] = {}
+
+    def register(self, model_class: Type, serializer: ModelSerializer) -> None:
+        self._serializers[model_class] = serializer
+
+    def serializer_of(self, model_class: Type) -> Optional[ModelSerializer]:
+        for base_class in model_class.__mro__:
+            serializer = self._serializers.get(base_class)
+            if serializer is not None:
+                return serializer
+
+        return None
+
+    def default(self, obj: Any) -> Any:
+        """
+        Turns objects, that rapidjson doesn't know, into json serializable ones.
+
+        :param obj: object that rapidjson can not encode by itself.
+        :return: json serializable representation.
+        """
+        if isinstance(obj, Enum):
+            return obj.name
+
+        serializer = self.serializer_of(type(obj))
+        if serializer is None:
+            raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+        return serializer.to_dict(obj)
+
+    def encode(self, instance: Any) -> EncodedJson:
+        """
+        Encodes one model instance.
+
+        :param instance: model instance of registered class.
+        :return: json text.
+        """
+        serializer = self.serializer_of(type(instance))
+        if serializer is None:
+            raise TypeError(f"{type(instance).__name__} has no registered serializer")
+
+        return serializer.encode(instance)
+
+    def encode_rows(self, rows: Iterable[Any]) -> EncodedJson:
+        """
+        Encodes list of model instances of one class.
+
+        :param rows: model instances.
+        :return: json array text.
+        """
+        rows = list(rows)
+        if not rows:
+            return EncodedJson("[]")
+
+        serializer = self.serializer_of(type(rows[0]))
+        if serializer is not None and serializer.caches_encoded:
+            return EncodedJson("[" + ",".join([serializer.encode(row) for row in rows]) + "]")
+
+        # Rows are turned into dicts by rapidjson while it writes output
+        return EncodedJson(JsonWrapper.dumps(rows, default=self.default))
+
+    def dumps(self, data: Dict[str, Any]) -> str:
+        """
+        Encodes response object which values may be already encoded with encode_rows.
+
+        :param data: response fields.
+        :return: json text.
+        """
+        fields = []
+        for key, value in data.items():
+            if not isinstance(value, EncodedJson):
+                value = JsonWrapper.dumps(value, default=self.default)
+
+            fields.append(JsonWrapper.dumps(key) + ":" + value)
+
+        return "{" + ",".join(fields) + "}"
+
+
+serializers = SerializersRegistry()
+serializers.register(
+    User, ModelSerializer(
+        # Status of user changes without changing row until presence service writes it
+        User.as_dict, cache_key=lambda user: user.id, version=lambda user: (user.version, user.presence_status),
+        cache_size=quadrant_config.CachingConfig.serialized_users_cache_size.value
+    )
+)
+serializers.register(UserSession, ModelSerializer(UserSession.as_dict))
@@ -0,0 +1,86 @@
+"""
+Measures authorized requests per second with and without authorization cache.
+Uses same database as tests, so run it only against disposable database:
+
+    python -m benchmarks.auth_cache_benchmark --requests 2000 --concurrency 50
+"""
+import asyncio
+from argparse import ArgumentParser
+from time import perf_counter
+
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.db_init import Session
+from Quadrant.models.users_package import UserSession, authorization_cache
+from Quadrant.resourses.middlewares import rest_authenticated
+from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
+from Quadrant.resourses.quadrant_app import QuadrantApp
+from Quadrant.resourses.utils import JsonWrapper
+from tests.datasets import async_drop_db, async_init_db, create_user
+
+parser = ArgumentParser()
+parser.add_argument("--requests", type=int, default=2000)
+parser.add_argument("--concurrency", type=int, default=50)
+args, _ = parser.parse_known_args()
+
+
+class WhoAmIHandler(QuadrantAPIHandler):
+    @rest_authenticated
+    async def get(self):
+        self.write(JsonWrapper.dumps({"id": self.user.id}))
+
+
+async def run_requests(url: str, headers: dict) -> float:
+    client = AsyncHTTPClient(max_clients=args.concurrency)
+    requests_left = iter(range(args.requests))
+
+    async def worker():
+        for _ in requests_left:
+            await client.fetch(url, headers=headers)
+
+    started_at = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return args.requests / (perf_counter() - started_at)
+
+
+async def main():
+    await async_init_db()
+    async with Session() as session:
+        auth_user = await create_user("Benchmark", "benchmark_login_1", "benchmark_password_1!", session=session)
+        user_session = await UserSession.new_session(auth_user.user, "127.0.0.1", session=session)
+
+    app = QuadrantApp([(r"/whoami", WhoAmIHandler)])
+    sockets = bind_sockets(0, "127.0.0.1")
+    server = HTTPServer(app)
+    server.add_sockets(sockets)
+    port = sockets[0].getsockname()[1]
+
+    headers = {
+        "Cookie": "; ".join((
+            f"token={app.create_signed_value('token', f'Bearer {auth_user.internal_token}').decode()}",
+            f"session_id={app.create_signed_value('session_id', str(user_session.session_id)).decode()}",
+        ))
+    }
+    url = f"http://127.0.0.1:{port}/whoami"
+
+    try:
+        authorization_cache.resize(0)
+        without_cache = await run_requests(url, headers)
+
+        authorization_cache.resize(quadrant_config.CachingConfig.auth_cache_size.value or 10000)
+        authorization_cache.hits = authorization_cache.misses = 0
+        with_cache = await run_requests(url, headers)
+
+    finally:
+        server.stop()
+        await async_drop_db()
+
+    print(f"Without cache: {without_cache:.1f} requests/sec")
+    print(f"With cache: {with_cache:.1f} requests/sec (cache hit rate {authorization_cache.hit_rate:.2%})")
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
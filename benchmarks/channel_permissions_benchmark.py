@@ -0,0 +1,102 @@
+"""
+Compares computing permissions of every member of server channel one member at a time
+(like TextChannelsPermissionsProxy does for each member) with ChannelMembersPermissions.
+Server is generated in memory, so only computation is measured; proxies would also make two queries per member
+while bulk resolver makes four queries in total:
+
+    python -m benchmarks.channel_permissions_benchmark --members 100000 --roles 200 --repeats 5
+"""
+import random
+from argparse import ArgumentParser
+from time import perf_counter
+
+from Quadrant.models.servers_package.permissions_managment.bulk_permissions import (
+    ChannelMembersPermissions, OverwriteMasks
+)
+from Quadrant.models.servers_package.permissions_managment.permissions import (
+    DEFAULT_TEXT_CHANNEL_PERMISSIONS, Permissions, compute_permissions
+)
+
+parser = ArgumentParser()
+parser.add_argument("--members", type=int, default=100_000)
+parser.add_argument("--roles", type=int, default=200)
+parser.add_argument("--max-member-roles", type=int, default=5)
+parser.add_argument("--overwrites", type=int, default=20, help="Number of roles with overwrites in channel")
+parser.add_argument("--members-overwrites", type=int, default=100)
+parser.add_argument("--repeats", type=int, default=5)
+args, _ = parser.parse_known_args()
+
+
+def generate_server(rng: random.Random):
+    flags = list(Permissions)
+    roles = [(role_id, rng.randrange(args.roles), rng.choice(flags)) for role_id in range(args.roles)]
+    roles_overwrites = [
+        (role_id, rng.choice(flags), rng.choice(flags)) for role_id in rng.sample(range(args.roles), args.overwrites)
+    ]
+    members_overwrites = [
+        (member_id, rng.choice(flags), rng.choice(flags))
+        for member_id in rng.sample(range(args.members), args.members_overwrites)
+    ]
+    # Most members of big servers have few common roles
+    common_roles = range(min(args.roles, 10))
+    members_roles = []
+    for member_id in range(args.members):
+        roles_count = rng.randrange(args.max_member_roles + 1)
+        if roles_count == 0:
+            members_roles.append((member_id, None))
+
+        for role_id in {rng.choice(common_roles) for _ in range(roles_count)}:
+            members_roles.append((member_id, role_id))
+
+    return roles, roles_overwrites, members_overwrites, members_roles
+
+
+def per_member(roles, roles_overwrites, members_overwrites, members_roles) -> int:
+    roles_by_id = {role_id: (position, permissions) for role_id, position, permissions in roles}
+    overwrites_by_role = {role_id: OverwriteMasks(allow, deny) for role_id, allow, deny in roles_overwrites}
+    overwrites_by_member = {member_id: OverwriteMasks(allow, deny) for member_id, allow, deny in members_overwrites}
+    roles_of_members = {}
+    for member_id, role_id in members_roles:
+        roles_of_members.setdefault(member_id, [])
+        if role_id is not None:
+            roles_of_members[member_id].append(role_id)
+
+    readers = 0
+    for member_id, member_roles in roles_of_members.items():
+        member_roles.sort(key=lambda role: (roles_by_id[role][0], role))
+        permissions = compute_permissions(
+            DEFAULT_TEXT_CHANNEL_PERMISSIONS, [roles_by_id[role_id][1] for role_id in member_roles],
+            [overwrites_by_role[role_id] for role_id in member_roles if role_id in overwrites_by_role],
+            overwrites_by_member.get(member_id)
+        )
+        readers += Permissions.read_messages in permissions
+
+    return readers
+
+
+def bulk(roles, roles_overwrites, members_overwrites, members_roles) -> int:
+    return len(ChannelMembersPermissions(
+        DEFAULT_TEXT_CHANNEL_PERMISSIONS, roles, roles_overwrites, members_overwrites, members_roles
+    ).readers())
+
+
+def measure(function, server) -> float:
+    started_at = perf_counter()
+    for _ in range(args.repeats):
+        function(*server)
+
+    return (perf_counter() - started_at) / args.repeats * 1000
+
+
+def main():
+    server = generate_server(random.Random(42))
+    if per_member(*server) != bulk(*server):
+        raise RuntimeError("Bulk resolver gave different readers")
+
+    print(f"{args.members} members, {args.roles} roles")
+    print(f"Per member: {measure(per_member, server):.1f} ms, {2 * args.members} queries")
+    print(f"Bulk: {measure(bulk, server):.1f} ms, 4 queries")
+
+
+if __name__ == '__main__':
+    main()
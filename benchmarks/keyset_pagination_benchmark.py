@@ -0,0 +1,83 @@
+"""
+Compares latency of fetching deep sessions pages by page number (OFFSET) and by cursor.
+Seeds users_sessions with a million rows of one user, so run it only against disposable database:
+
+    python -m benchmarks.keyset_pagination_benchmark --rows 1000000 --repeats 20
+"""
+import asyncio
+from argparse import ArgumentParser
+from time import perf_counter
+
+from sqlalchemy import select, text
+
+from Quadrant.models.db_init import Session
+from Quadrant.models.users_package import UserSession
+from Quadrant.models.users_package.user_session import SESSIONS_PER_PAGE, sessions_keyset
+from tests.datasets import async_drop_db, async_init_db, create_user
+
+parser = ArgumentParser()
+parser.add_argument("--rows", type=int, default=1_000_000)
+parser.add_argument("--repeats", type=int, default=20)
+args, _ = parser.parse_known_args()
+
+
+async def measure(coroutine_factory) -> float:
+    started_at = perf_counter()
+    for _ in range(args.repeats):
+        await coroutine_factory()
+
+    return (perf_counter() - started_at) / args.repeats * 1000
+
+
+async def main():
+    await async_init_db()
+    async with Session() as session:
+        auth_user = await create_user("Benchmark", "benchmark_login_1", "benchmark_password_1!", session=session)
+        user_id = auth_user.user_id
+
+        await session.execute(
+            text(
+                "INSERT INTO users_sessions (session_id, user_id, started_at, ip_address, is_alive) "
+                "SELECT n, :user_id, now(), '127.0.0.1', n % 10 = 0 FROM generate_series(1, :rows) AS n"
+            ),
+            {"user_id": user_id, "rows": args.rows}
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE users_sessions"))
+
+    pages_count = args.rows // SESSIONS_PER_PAGE
+    depths = sorted({
+        page for page in (1, pages_count // 100, pages_count // 10, pages_count // 2, pages_count - 1) if page > 0
+    })
+
+    try:
+        print(f"{'page':>10} {'offset, ms':>12} {'cursor, ms':>12}")
+        for page in depths:
+            async with Session() as session:
+                # Cursor pointing at last row of previous page is what client would have got from it
+                previous_page_last_row = await session.execute(
+                    select(UserSession).filter(UserSession.user_id == user_id)
+                    .order_by(UserSession.is_alive.desc(), UserSession.session_id.desc())
+                    .offset(page * SESSIONS_PER_PAGE - 1).limit(1)
+                )
+                cursor = sessions_keyset.encode_cursor(previous_page_last_row.scalar_one())
+
+                async def by_offset():
+                    await UserSession.get_user_sessions_page(user_id, page, session=session)
+                    session.expunge_all()
+
+                async def by_cursor():
+                    await UserSession.get_user_sessions_page(user_id, after=cursor, session=session)
+                    session.expunge_all()
+
+                offset_latency = await measure(by_offset)
+                cursor_latency = await measure(by_cursor)
+
+            print(f"{page:>10} {offset_latency:>12.2f} {cursor_latency:>12.2f}")
+
+    finally:
+        await async_drop_db()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,83 @@
+"""
+Measures login latency percentiles and event loop lag during burst of logins
+with password hashed on event loop and in hashing executor.
+Uses same database as tests, so run it only against disposable database:
+
+    python -m benchmarks.login_latency_benchmark --logins 200 --concurrency 50
+"""
+import asyncio
+from argparse import ArgumentParser
+from statistics import quantiles
+from time import perf_counter
+
+from Quadrant.models.db_init import Session
+from Quadrant.models.users_package import UserInternalAuthorization
+from Quadrant.models.utils.hashing import hashing_executor
+from tests.datasets import async_drop_db, async_init_db, create_user
+
+parser = ArgumentParser()
+parser.add_argument("--logins", type=int, default=200)
+parser.add_argument("--concurrency", type=int, default=50)
+parser.add_argument("--workers", type=int, default=hashing_executor.workers)
+args, _ = parser.parse_known_args()
+
+login = "benchmark_login_1"
+password = "benchmark_password_1!"
+
+
+async def measure_loop_lag(lags: list, stop: asyncio.Event) -> None:
+    interval = 0.005
+    while not stop.is_set():
+        started_at = perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(perf_counter() - started_at - interval)
+
+
+async def run_logins() -> tuple:
+    latencies = []
+    lags = []
+    logins_left = iter(range(args.logins))
+    stop = asyncio.Event()
+
+    async def worker():
+        for _ in logins_left:
+            started_at = perf_counter()
+            async with Session() as session:
+                await UserInternalAuthorization.authorize(login, password, session=session)
+
+            latencies.append(perf_counter() - started_at)
+
+    lag_task = asyncio.ensure_future(measure_loop_lag(lags, stop))
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    stop.set()
+    await lag_task
+
+    percentiles = quantiles(latencies, n=100)
+    return percentiles[49], percentiles[98], max(lags, default=0.0)
+
+
+async def main():
+    await async_init_db()
+    async with Session() as session:
+        await create_user("Benchmark", login, password, session=session)
+
+    try:
+        for executor_type in ("inline", "thread"):
+            hashing_executor.shutdown()
+            hashing_executor.executor_type = executor_type
+            hashing_executor.workers = args.workers
+            hashing_executor.warm_up()
+
+            p50, p99, max_lag = await run_logins()
+            print(
+                f"{executor_type}: p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms, "
+                f"max event loop lag {max_lag * 1000:.1f}ms"
+            )
+
+    finally:
+        hashing_executor.shutdown()
+        await async_drop_db()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,80 @@
+"""
+Compares messages/sec written with transaction per message and with batched ingestion.
+Both modes write group messages from many concurrent senders, like handlers do, but skip send_message
+validations which are same for both modes. Uses same database as tests, so run it only against disposable database:
+
+    python -m benchmarks.messages_ingestion_benchmark --messages 20000 --concurrency 200
+"""
+import asyncio
+from argparse import ArgumentParser
+from datetime import datetime
+from time import perf_counter
+
+from Quadrant.models.abstract.messages_batcher import MessagesBatcher
+from Quadrant.models.db_init import Session
+from Quadrant.models.group_channel_package import GroupMessage, GroupMessagesChannel, GroupParticipant
+from tests.datasets import async_drop_db, async_init_db, create_user
+
+parser = ArgumentParser()
+parser.add_argument("--messages", type=int, default=20000)
+parser.add_argument("--concurrency", type=int, default=200)
+parser.add_argument("--batch-size", type=int, default=500)
+parser.add_argument("--flush-interval-ms", type=int, default=5)
+args, _ = parser.parse_known_args()
+
+
+def new_message(channel_id, author_id, number: int) -> GroupMessage:
+    return GroupMessage(
+        channel_id=channel_id, author_id=author_id, text=f"Benchmark message #{number}",
+        created_at=datetime.utcnow(), pinned=False, edited=False
+    )
+
+
+async def run_senders(send) -> float:
+    messages_left = iter(range(args.messages))
+
+    async def sender():
+        for number in messages_left:
+            await send(number)
+
+    started_at = perf_counter()
+    await asyncio.gather(*(sender() for _ in range(args.concurrency)))
+    return args.messages / (perf_counter() - started_at)
+
+
+async def main():
+    await async_init_db()
+    async with Session() as session:
+        auth_user = await create_user("Benchmark", "benchmark_login_1", "benchmark_password_1!", session=session)
+        channel = GroupMessagesChannel(
+            channel_name="Benchmark", owner_id=auth_user.user_id,
+            members=[GroupParticipant(user_id=auth_user.user_id)]
+        )
+        session.add(channel)
+        await session.commit()
+        channel_id, author_id = channel.channel_id, auth_user.user_id
+
+    async def send_with_commit(number: int):
+        async with Session() as message_session:
+            message_session.add(new_message(channel_id, author_id, number))
+            await message_session.commit()
+
+    batcher = MessagesBatcher(args.batch_size, args.flush_interval_ms)
+
+    async def send_batched(number: int):
+        await batcher.submit(new_message(channel_id, author_id, number))
+
+    try:
+        with_commits = await run_senders(send_with_commit)
+        batched = await run_senders(send_batched)
+
+    finally:
+        await batcher.flush()
+        await async_drop_db()
+
+    print(f"Transaction per message: {with_commits:.1f} messages/sec")
+    print(f"Batched ingestion: {batched:.1f} messages/sec")
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,126 @@
+"""
+Measures latency of messages full text search on seeded corpus and compares it with substring scan.
+Seeds dm_messages with random texts, so run it only against disposable database:
+
+    python -m benchmarks.messages_search_benchmark --messages 10000000 --channels 100 --repeats 20
+"""
+import asyncio
+from argparse import ArgumentParser
+from datetime import datetime
+from time import perf_counter
+
+from sqlalchemy import select, text
+
+from Quadrant.models.db_init import Session
+from Quadrant.models.dm_channel_package import DirectMessagesChannel, DM_Message
+from Quadrant.models.utils.snowflake import snowflake_generator
+from tests.datasets import async_drop_db, async_init_db, create_user
+
+parser = ArgumentParser()
+parser.add_argument("--messages", type=int, default=10_000_000)
+parser.add_argument("--channels", type=int, default=100)
+parser.add_argument("--repeats", type=int, default=20)
+parser.add_argument("--chunk-size", type=int, default=500_000)
+args, _ = parser.parse_known_args()
+
+# Words frequencies in messages differ a lot, so searches of common and rare words are measured separately
+COMMON_WORDS = ("hello", "today", "work", "game", "good", "time", "please", "thanks", "later", "maybe")
+RARE_WORDS = tuple(f"word{number}" for number in range(5000))
+SEARCHES = {
+    "common word": "hello",
+    "rare word": "word42",
+    "two words": "hello word42",
+    "phrase": '"good time"',
+    "excluded word": "hello -game",
+}
+
+
+async def measure(coroutine_factory) -> float:
+    started_at = perf_counter()
+    for _ in range(args.repeats):
+        await coroutine_factory()
+
+    return (perf_counter() - started_at) / args.repeats * 1000
+
+
+async def seed_messages(channels_ids, author_id) -> None:
+    first_id = snowflake_generator.lowest_id_at(datetime.utcnow())
+    words = list(COMMON_WORDS * 50 + RARE_WORDS)
+
+    for chunk_start in range(0, args.messages, args.chunk_size):
+        async with Session() as session:
+            # Ids are taken right after ids of current moment, so messages go to current partition
+            await session.execute(
+                text(
+                    "INSERT INTO dm_messages "
+                    "(message_id, channel_id, author_id, text, created_at, pinned, edited) "
+                    "SELECT :first_id + n, (:channels_ids)[1 + n % :channels_count], :author_id, "
+                    "array_to_string(ARRAY("
+                    "SELECT (:words)[1 + floor(random() * :words_count)::int] "
+                    "FROM generate_series(1, 8 + n % 8)"
+                    "), ' '), now(), false, false "
+                    "FROM generate_series(:chunk_start, :chunk_end) AS n"
+                ),
+                {
+                    "first_id": first_id, "channels_ids": channels_ids, "channels_count": len(channels_ids),
+                    "author_id": author_id, "words": words, "words_count": len(words),
+                    "chunk_start": chunk_start, "chunk_end": min(chunk_start + args.chunk_size, args.messages) - 1,
+                }
+            )
+            await session.commit()
+
+    async with Session() as session:
+        await session.execute(text("ANALYZE dm_messages"))
+
+
+async def main():
+    await async_init_db()
+    async with Session() as session:
+        auth_user = await create_user("Benchmark", "benchmark_login_1", "benchmark_password_1!", session=session)
+        channels = [DirectMessagesChannel() for _ in range(args.channels)]
+        session.add_all(channels)
+        await session.commit()
+        channels_ids = [channel.channel_id for channel in channels]
+        author_id = auth_user.user_id
+
+    try:
+        await seed_messages(channels_ids, author_id)
+        channel_id = channels_ids[0]
+
+        print(f"{'search':>15} {'first page, ms':>15} {'next page, ms':>15} {'substring scan, ms':>19}")
+        for name, search_query in SEARCHES.items():
+            async with Session() as session:
+                first_page = await DM_Message.search_messages(search_query, channel_id, session=session)
+
+                async def by_search():
+                    await DM_Message.search_messages(search_query, channel_id, session=session)
+                    session.expunge_all()
+
+                async def next_page():
+                    await DM_Message.search_messages(
+                        search_query, channel_id, after=first_page.after, session=session
+                    )
+                    session.expunge_all()
+
+                async def by_substring():
+                    # What clients could do without search is looking up substring in every message of channel
+                    await session.execute(
+                        select(DM_Message).filter(
+                            DM_Message.channel_id == channel_id,
+                            DM_Message.text.ilike(f"%{search_query.split()[0].strip(chr(34))}%")
+                        ).order_by(DM_Message.message_id.desc()).limit(50)
+                    )
+                    session.expunge_all()
+
+                search_latency = await measure(by_search)
+                next_page_latency = await measure(next_page) if first_page.after is not None else float("nan")
+                substring_latency = await measure(by_substring)
+
+            print(f"{name:>15} {search_latency:>15.2f} {next_page_latency:>15.2f} {substring_latency:>19.2f}")
+
+    finally:
+        await async_drop_db()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
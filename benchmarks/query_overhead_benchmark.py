@@ -0,0 +1,106 @@
+"""
+Measures python side overhead of hot lookups built as new select() on every call
+and as lambda statements that are built and compiled once.
+Overhead is time spent in session.execute minus time spent by database driver.
+Uses same database as tests, so run it only against disposable database:
+
+    python -m benchmarks.query_overhead_benchmark --queries 2000
+"""
+import asyncio
+from argparse import ArgumentParser
+from time import perf_counter
+
+from sqlalchemy import event, select
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.db_init import Session
+from Quadrant.models.users_package import User, UserInternalAuthorization, UserSession, UsersRelations
+from tests.datasets import async_drop_db, async_init_db, create_user
+
+parser = ArgumentParser()
+parser.add_argument("--queries", type=int, default=2000)
+args, _ = parser.parse_known_args()
+
+
+class DriverTimer:
+    def __init__(self, engine):
+        self.seconds = 0.0
+        self._started_at = 0.0
+        event.listen(engine, "before_cursor_execute", self.before)
+        event.listen(engine, "after_cursor_execute", self.after)
+
+    def before(self, *_):
+        self._started_at = perf_counter()
+
+    def after(self, *_):
+        self.seconds += perf_counter() - self._started_at
+
+
+async def measure(timer: DriverTimer, lookup) -> float:
+    await lookup()
+    timer.seconds = 0.0
+    started_at = perf_counter()
+    for _ in range(args.queries):
+        await lookup()
+
+    total = perf_counter() - started_at
+    return (total - timer.seconds) / args.queries
+
+
+async def main():
+    await async_init_db()
+    timer = DriverTimer(quadrant_config.DBConfig.async_base_engine.sync_engine)
+
+    async with Session() as session:
+        auth_user = await create_user("Benchmark", "benchmark_login_1", "benchmark_password_1!", session=session)
+        user_session = await UserSession.new_session(auth_user.user, "127.0.0.1", session=session)
+        user_id, token, session_id = auth_user.user_id, auth_user.internal_token, user_session.session_id
+
+        lookups = {
+            "User.get_user": (
+                lambda: session.execute(select(User).filter(User.id == user_id).filter(User.is_banned.is_(False))),
+                lambda: User.get_user(user_id, session=session),
+            ),
+            "UserInternalAuthorization.authorize_with_token": (
+                lambda: session.execute(
+                    select(UserInternalAuthorization).join(User).filter(
+                        UserInternalAuthorization.internal_token == token,
+                        User.is_banned.is_(False),
+                        User.is_bot.is_(False)
+                    )
+                ),
+                lambda: UserInternalAuthorization.authorize_with_token(token, False, session=session),
+            ),
+            "UserSession.get_alive_user_session": (
+                lambda: session.execute(
+                    UserSession.user_session_query(user_id).filter(UserSession.session_id == session_id)
+                ),
+                lambda: UserSession.get_alive_user_session(user_id, session_id, session=session),
+            ),
+            "UsersRelations.get_exact_relationship_status": (
+                lambda: session.execute(
+                    select(UsersRelations.relation_status).filter(
+                        UsersRelations.initiator_id == user_id,
+                        UsersRelations.relation_with_id == user_id
+                    )
+                ),
+                lambda: UsersRelations.get_exact_relationship_status(user_id, user_id, session=session),
+            ),
+        }
+
+        try:
+            for name, (select_lookup, lambda_lookup) in lookups.items():
+                select_overhead = await measure(timer, select_lookup)
+                lambda_overhead = await measure(timer, lambda_lookup)
+                print(
+                    f"{name}: select() {select_overhead * 1e6:.1f}us, "
+                    f"lambda statement {lambda_overhead * 1e6:.1f}us python overhead per query"
+                )
+
+        finally:
+            await session.close()
+            await async_drop_db()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
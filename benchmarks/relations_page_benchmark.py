@@ -0,0 +1,72 @@
+"""
+Compares getting relations pages by ordering every relation of user for every page
+with slicing pages from RelationsList. Relations are generated in memory, so only ordering is measured:
+
+    python -m benchmarks.relations_page_benchmark --relations 100000 --pages 50
+"""
+import random
+from argparse import ArgumentParser
+from time import perf_counter
+from uuid import UUID
+
+from Quadrant.models.users_package import UsersStatus
+from Quadrant.models.users_package.relations_index import RelationsList
+from Quadrant.models.users_package.users_relation import USERS_RELATIONS_PER_PAGE, relations_keyset
+
+parser = ArgumentParser()
+parser.add_argument("--relations", type=int, default=100_000)
+parser.add_argument("--pages", type=int, default=50, help="Number of pages walked from first one")
+args, _ = parser.parse_known_args()
+
+
+def generate_relations(rng: random.Random):
+    # Most friends of user are offline
+    statuses = [UsersStatus.offline] * 8 + [UsersStatus.online, UsersStatus.away]
+    return [
+        (UUID(int=rng.getrandbits(128)), f"user {rng.randrange(args.relations)}", rng.choice(statuses))
+        for _ in range(args.relations)
+    ]
+
+
+def walk_sorting(relations_list: RelationsList) -> float:
+    rows = [(None, related_user) for related_user in relations_list.users.values()]
+    started_at = perf_counter()
+
+    after = None
+    for _ in range(args.pages):
+        ordered_rows = sorted(rows, key=relations_keyset.row_values)
+        if after is not None:
+            values = relations_keyset.decode_cursor(after)
+            ordered_rows = [row for row in ordered_rows if relations_keyset.row_values(row) > values]
+
+        page_rows = ordered_rows[:USERS_RELATIONS_PER_PAGE + 1]
+        after = relations_keyset.make_page(page_rows, USERS_RELATIONS_PER_PAGE, after=after).after
+
+    return perf_counter() - started_at
+
+
+def walk_list(relations_list: RelationsList) -> float:
+    started_at = perf_counter()
+
+    after = None
+    for _ in range(args.pages):
+        values = relations_keyset.decode_cursor(after) if after is not None else None
+        related_users = relations_list.page(USERS_RELATIONS_PER_PAGE + 1, values)
+        page_rows = [(None, related_user) for related_user in related_users]
+        after = relations_keyset.make_page(page_rows, USERS_RELATIONS_PER_PAGE, after=after).after
+
+    return perf_counter() - started_at
+
+
+def main():
+    relations_list = RelationsList(generate_relations(random.Random(356)))
+
+    sorting = walk_sorting(relations_list)
+    sliced = walk_list(relations_list)
+    print(f"{args.pages} pages of {args.relations} relations")
+    print(f"ordering every relation: {sorting * 1000 / args.pages:.3f} ms per page")
+    print(f"relations list:          {sliced * 1000 / args.pages:.3f} ms per page ({sorting / sliced:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
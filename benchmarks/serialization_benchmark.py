@@ -0,0 +1,57 @@
+"""
+Compares encoding relations pages by building dict of every user with encoding through serializers registry.
+Doesn't need database:
+
+    python -m benchmarks.serialization_benchmark --repeats 2000
+"""
+from argparse import ArgumentParser
+from datetime import datetime
+from timeit import timeit
+from uuid import uuid4
+
+from Quadrant.models.users_package import User, UsersRelationType, UsersStatus
+from Quadrant.resourses.utils import JsonWrapper
+from Quadrant.resourses.utils.serializers import serializers
+
+parser = ArgumentParser()
+parser.add_argument("--repeats", type=int, default=2000)
+args, _ = parser.parse_known_args()
+
+
+def make_users(count: int):
+    return [
+        User(
+            id=uuid4(), color_id=i, username=f"Benchmark user #{i}", status=UsersStatus.online,
+            text_status="Writing benchmarks", registered_at=datetime.utcnow(), is_bot=False, is_banned=False,
+            version=1
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    print(f"{'rows':>6} {'dicts, us':>12} {'registry, us':>14}")
+    for rows in (50, 100):
+        users = make_users(rows)
+
+        def with_dicts():
+            return JsonWrapper.dumps({
+                "relation_status": UsersRelationType.friends.name,
+                "users": [user.as_dict() for user in users],
+                "cursor": {"after": None, "before": None}
+            })
+
+        def with_registry():
+            return serializers.dumps({
+                "relation_status": UsersRelationType.friends,
+                "users": serializers.encode_rows(users),
+                "cursor": {"after": None, "before": None}
+            })
+
+        dicts_time = timeit(with_dicts, number=args.repeats) / args.repeats * 1_000_000
+        registry_time = timeit(with_registry, number=args.repeats) / args.repeats * 1_000_000
+        print(f"{rows:>6} {dicts_time:>12.1f} {registry_time:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Measures profile pictures thumbnails per second made by old serial thumbnailing in default executor
+and by image pipeline processes:
+
+    python -m benchmarks.thumbnails_benchmark --images 100 --width 3000 --height 2000
+"""
+import asyncio
+from argparse import ArgumentParser
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from PIL import Image
+
+from Quadrant.resourses.utils.image_pipeline import ImagePipeline
+
+parser = ArgumentParser()
+parser.add_argument("--images", type=int, default=100)
+parser.add_argument("--width", type=int, default=3000)
+parser.add_argument("--height", type=int, default=2000)
+parser.add_argument("--workers", type=int, default=0)
+args, _ = parser.parse_known_args()
+
+# Same as profile pictures sizes
+PROFILE_PICTURE_SIZES = (("image0", 1024), ("image1", 256), ("image2", 64))
+
+
+def make_photo() -> bytes:
+    image = Image.merge("RGB", [
+        Image.effect_noise((args.width, args.height), 64),
+        Image.linear_gradient("L").resize((args.width, args.height)),
+        Image.radial_gradient("L").resize((args.width, args.height)),
+    ])
+    output = BytesIO()
+    image.save(output, "JPEG", quality=90)
+    return output.getvalue()
+
+
+def old_thumbnail_image(content: bytes, directory: Path) -> None:
+    with Image.open(BytesIO(content)) as img:
+        img.thumbnail((1024, 1024))
+        img.save(directory / "image0.jpg", "JPEG")
+        img.save(directory / "image0.webp", "WEBP", method=3)
+
+
+async def main():
+    content = make_photo()
+    loop = asyncio.get_event_loop()
+
+    with TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        started_at = perf_counter()
+        await asyncio.gather(*(
+            loop.run_in_executor(None, old_thumbnail_image, content, directory) for _ in range(args.images)
+        ))
+        old_rate = args.images / (perf_counter() - started_at)
+
+        pipeline = ImagePipeline(args.workers, max_queue_size=args.images)
+        pipeline.warm_up()
+        try:
+            started_at = perf_counter()
+            await asyncio.gather(*(
+                pipeline.process(content, directory / str(n), PROFILE_PICTURE_SIZES) for n in range(args.images)
+            ))
+            pipeline_rate = args.images / (perf_counter() - started_at)
+
+        finally:
+            pipeline.shutdown()
+
+    print(f"Default executor (1 size, no draft): {old_rate:.1f} images/sec")
+    print(
+        f"Image pipeline ({len(PROFILE_PICTURE_SIZES)} sizes, {pipeline.workers} processes): "
+        f"{pipeline_rate:.1f} images/sec"
+    )
+    print(f"Stages: {pipeline.metrics.as_dict()['stages_avg_ms']}")
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
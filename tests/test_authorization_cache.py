@@ -0,0 +1,131 @@
+import unittest
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event, inspect
+from sqlalchemy.orm import Session, declarative_base, relationship
+
+from Quadrant.models.users_package.authorization_cache import AuthorizationCache
+from Quadrant.models.utils.snapshots import detached_snapshot
+from Quadrant.models.utils.ttl_cache import TTLCache
+
+SnapshotsBase = declarative_base()
+
+
+class Account(SnapshotsBase):
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    __tablename__ = "accounts"
+
+
+class Token(SnapshotsBase):
+    id = Column(Integer, primary_key=True)
+    account_id = Column(ForeignKey("accounts.id"))
+    account = relationship(Account, lazy="joined")
+    __tablename__ = "tokens"
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_expired_entries_are_misses(self):
+        cache = TTLCache(max_size=2, ttl=-1)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.misses, 1)
+
+    def test_evicted_entries_reported(self):
+        evicted = []
+        cache = TTLCache(max_size=1, on_evict=lambda key, value: evicted.append((key, value)))
+        cache.set("a", 1)
+        cache.set("a", 2)
+        cache.set("b", 3)
+        cache.pop("b")
+
+        self.assertEqual(evicted, [("a", 1), ("a", 2)])
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = TTLCache(max_size=0)
+        cache.set("a", 1)
+
+        self.assertEqual(len(cache), 0)
+
+
+class TestDetachedSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SnapshotsBase.metadata.create_all(self.engine)
+        with Session(self.engine) as session:
+            session.add(Token(id=1, account=Account(id=1, name="account")))
+            session.commit()
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: self.statements.append(args[2]))
+
+    def test_snapshot_survives_rollback_of_original_session(self):
+        with Session(self.engine) as session:
+            token = session.get(Token, 1)
+            snapshot = detached_snapshot(token)
+            session.rollback()
+
+            # Rollback expired original instances, but not snapshot
+            self.assertTrue(inspect(token).expired)
+            self.assertTrue(inspect(snapshot).detached)
+            self.assertEqual(snapshot.account.name, "account")
+
+    def test_snapshot_merged_without_queries(self):
+        with Session(self.engine) as session:
+            snapshot = detached_snapshot(session.get(Token, 1))
+
+        self.statements.clear()
+        with Session(self.engine) as session:
+            token = session.merge(snapshot, load=False)
+
+            self.assertEqual(token.account.name, "account")
+            self.assertIsNot(token, snapshot)
+            self.assertTrue(inspect(snapshot).detached)
+
+        self.assertEqual(self.statements, [])
+
+
+class TestAuthorizationCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = AuthorizationCache(max_size=10, ttl=60)
+        self.auth_user = SimpleNamespace(user_id=uuid4())
+        self.user_session = SimpleNamespace(session_id=1)
+
+    def test_cached_session_is_hit(self):
+        self.cache.store("token", False, self.auth_user, self.user_session)
+        auth_user, user_session = self.cache.get("token", False, 1)
+
+        self.assertIs(auth_user, self.auth_user)
+        self.assertIs(user_session, self.user_session)
+        self.assertEqual(self.cache.hit_rate, 1.0)
+
+    def test_other_session_is_miss(self):
+        self.cache.store("token", False, self.auth_user, self.user_session)
+
+        self.assertEqual(self.cache.get("token", False, 2), (None, None))
+        self.assertEqual(self.cache.get("token", True), (None, None))
+
+    def test_terminated_session_invalidated(self):
+        self.cache.store("token", False, self.auth_user, self.user_session)
+        self.cache.invalidate_session(self.auth_user.user_id, self.user_session.session_id)
+
+        self.assertEqual(self.cache.get("token", False, 1), (None, None))
+
+    def test_user_invalidated(self):
+        self.cache.store("token", True, self.auth_user)
+        self.cache.invalidate_user(self.auth_user.user_id)
+
+        self.assertEqual(self.cache.get("token", True), (None, None))
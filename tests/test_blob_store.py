@@ -0,0 +1,111 @@
+import unittest
+from hashlib import sha256
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.general import File
+from Quadrant.models.general.blob_store import BlobStore
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.store = BlobStore(self.directory / "blobs")
+        self.store.root.mkdir()
+
+    def upload(self, content: bytes, name: str) -> bool:
+        temp_path = self.directory / f".upload_{name}"
+        temp_path.write_bytes(content)
+        content_hash = sha256(content).hexdigest()
+
+        is_new = self.store.store_file(temp_path, content_hash, self.directory / "uploads" / name / "file.txt")
+        self.assertFalse(temp_path.exists())
+        return is_new
+
+    def test_same_content_is_stored_once(self):
+        self.assertTrue(self.upload(b"content", "first"))
+        self.assertFalse(self.upload(b"content", "second"))
+        self.assertTrue(self.upload(b"other content", "third"))
+
+        first = self.directory / "uploads" / "first" / "file.txt"
+        second = self.directory / "uploads" / "second" / "file.txt"
+        blob_path = self.store.blob_path(sha256(b"content").hexdigest())
+
+        self.assertEqual(second.read_bytes(), b"content")
+        self.assertEqual(first.stat().st_ino, second.stat().st_ino)
+        self.assertEqual(blob_path.stat().st_nlink, 3)
+
+    def test_removed_blob_is_stored_again(self):
+        content_hash = sha256(b"content").hexdigest()
+        self.upload(b"content", "first")
+        self.store.remove_blobs([content_hash])
+
+        self.assertFalse(self.store.blob_path(content_hash).exists())
+        self.assertEqual((self.directory / "uploads" / "first" / "file.txt").read_bytes(), b"content")
+        self.assertTrue(self.upload(b"content", "second"))
+        self.assertTrue(self.store.blob_path(content_hash).exists())
+
+    def test_removed_files_free_space_with_blob(self):
+        content_hash = sha256(b"content").hexdigest()
+        self.upload(b"content", "first")
+        self.upload(b"content", "second")
+        first = self.directory / "uploads" / "first" / "file.txt"
+
+        self.store.remove_file(first)
+        self.assertFalse(first.parent.exists())
+        self.assertEqual(self.store.blob_path(content_hash).stat().st_nlink, 2)
+
+        self.store.remove_file(self.directory / "uploads" / "second" / "file.txt")
+        self.store.remove_blobs([content_hash])
+        self.assertEqual(list((self.directory / "uploads").iterdir()), [])
+        self.assertEqual(list(self.store.blob_path(content_hash).parent.iterdir()), [])
+
+
+class TestCreateFile(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patch = mock.patch.object(quadrant_config, "uploads", Path(directory.name))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.session = mock.Mock(commit=mock.AsyncMock(), rollback=mock.AsyncMock())
+        self.saved_paths = []
+
+    async def save_content(self, path: Path) -> None:
+        # Record isn't added to session until content is saved
+        self.session.add.assert_not_called()
+        path.parent.mkdir()
+        path.write_bytes(b"content")
+        self.saved_paths.append(path)
+
+    async def test_content_saved_before_commit(self):
+        new_file = await File.create_file(
+            SimpleNamespace(id=uuid4()), "file.txt", save_content=self.save_content, session=self.session
+        )
+
+        self.assertEqual(self.saved_paths, [new_file.filepath])
+        self.session.add.assert_called_once_with(new_file)
+        self.session.commit.assert_awaited_once()
+
+    async def test_content_removed_if_not_committed(self):
+        self.session.commit.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            await File.create_file(
+                SimpleNamespace(id=uuid4()), "file.txt", save_content=self.save_content, session=self.session
+            )
+
+        self.session.rollback.assert_awaited_once()
+        self.assertFalse(self.saved_paths[0].parent.exists())
+        self.assertEqual(list(quadrant_config.uploads.iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
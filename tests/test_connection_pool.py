@@ -0,0 +1,87 @@
+import sqlite3
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from Quadrant.config.pool import AdaptiveOverflow, InstrumentedPoolMixin, PoolMetrics
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class TestInstrumentedPool(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01,
+            creator=lambda: sqlite3.connect(":memory:", check_same_thread=False)
+        )
+        self.addCleanup(self.engine.dispose)
+        self.engine.pool.metrics.listen(self.engine)
+
+    def test_counts_checkouts_and_connections(self):
+        for _ in range(3):
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+        metrics = self.engine.pool.metrics.as_dict(self.engine.pool)
+        self.assertEqual(metrics["checkouts"], 3)
+        self.assertEqual(metrics["connects"], 1)
+        self.assertEqual(sum(metrics["checkout_histogram_ms"].values()), 3)
+        self.assertEqual(metrics["idle"], 1)
+        self.assertEqual(metrics["in_use"], 0)
+
+    def test_counts_timeouts(self):
+        with self.engine.connect():
+            with self.assertRaises(exc.TimeoutError):
+                self.engine.connect()
+
+        self.assertEqual(self.engine.pool.metrics.timeouts, 1)
+
+    def test_metrics_survive_pool_recreation(self):
+        metrics = self.engine.pool.metrics
+        self.engine.dispose()
+
+        self.assertIs(self.engine.pool.metrics, metrics)
+
+
+class TestAdaptiveOverflow(unittest.TestCase):
+    def setUp(self):
+        self.pool = SimpleNamespace(max_overflow=10, metrics=PoolMetrics())
+        self.adaptive = AdaptiveOverflow(10, 20, wait_threshold_ms=10, interval=1)
+        self.now = self.adaptive._interval_started_at
+
+    def checkouts(self, wait_ms: float):
+        with patch("Quadrant.config.pool.monotonic", lambda: self.now):
+            for _ in range(5):
+                self.adaptive.record_checkout(self.pool, wait_ms / 1000)
+
+            self.now += 2
+            self.adaptive.record_checkout(self.pool, wait_ms / 1000)
+
+    def test_grows_while_checkouts_wait(self):
+        for _ in range(10):
+            self.checkouts(wait_ms=50)
+
+        self.assertEqual(self.pool.max_overflow, 20)
+
+    def test_shrinks_back_when_waits_are_short(self):
+        self.checkouts(wait_ms=50)
+        self.assertGreater(self.pool.max_overflow, 10)
+
+        for _ in range(10):
+            self.checkouts(wait_ms=0.1)
+
+        self.assertEqual(self.pool.max_overflow, 10)
+        self.assertGreater(self.pool.metrics.overflow_adjustments, 1)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            AdaptiveOverflow(10, 5, wait_threshold_ms=10, interval=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
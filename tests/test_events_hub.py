@@ -0,0 +1,61 @@
+import unittest
+from uuid import uuid4
+
+from Quadrant.events import Event, EventsHub, EventType, channel_topic
+
+
+class EventsRecorder:
+    def __init__(self):
+        self.events = []
+
+    def send_event(self, event: Event) -> None:
+        self.events.append(event)
+
+
+class TestEventsHub(unittest.TestCase):
+    def setUp(self) -> None:
+        self.hub = EventsHub()
+        self.topic = channel_topic(uuid4())
+
+    def test_event_delivered_to_subscribers(self):
+        first, second = EventsRecorder(), EventsRecorder()
+        self.hub.subscribe(self.topic, first)
+        self.hub.subscribe(self.topic, second)
+
+        delivered = self.hub.publish(self.topic, EventType.message_created, {"text": "hi"})
+
+        self.assertEqual(delivered, 2)
+        # Both subscribers get same event, so it is serialized only once
+        self.assertIs(first.events[0], second.events[0])
+        self.assertIn('"event":"message_created"', first.events[0].serialized)
+
+    def test_other_topics_not_delivered(self):
+        subscriber = EventsRecorder()
+        self.hub.subscribe(channel_topic(uuid4()), subscriber)
+
+        self.assertEqual(self.hub.publish(self.topic, EventType.message_created, {}), 0)
+        self.assertEqual(subscriber.events, [])
+
+    def test_unsubscribe_all(self):
+        subscriber = EventsRecorder()
+        other_topic = channel_topic(uuid4())
+        self.hub.subscribe(self.topic, subscriber)
+        self.hub.subscribe(other_topic, subscriber)
+
+        self.hub.unsubscribe_all(subscriber)
+
+        self.assertEqual(self.hub.subscribers_count(self.topic), 0)
+        self.assertEqual(self.hub.subscribers_count(other_topic), 0)
+
+    def test_broken_subscriber_does_not_stop_fan_out(self):
+        class BrokenSubscriber:
+            def send_event(self, event):
+                raise RuntimeError("connection is broken")
+
+        subscriber = EventsRecorder()
+        self.hub.subscribe(self.topic, BrokenSubscriber())
+        self.hub.subscribe(self.topic, subscriber)
+
+        self.hub.publish(self.topic, EventType.message_deleted, {})
+
+        self.assertEqual(len(subscriber.events), 1)
@@ -0,0 +1,215 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from uuid import UUID, uuid4
+
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application
+from tornado.websocket import websocket_connect
+
+from Quadrant.events import EventType, channel_topic, events_hub, presence_topic, user_topic
+from Quadrant.models.membership_index import membership_index
+from Quadrant.models.users_package import UsersRelations, UsersStatus, presence_service
+from Quadrant.resourses.gateway_resource import gateway
+from Quadrant.resourses.utils import JsonWrapper
+
+MEMBER_CHANNEL_ID = uuid4()
+OTHER_CHANNEL_ID = uuid4()
+
+
+class FakeChannel:
+    channels_ids = {MEMBER_CHANNEL_ID}
+
+    @classmethod
+    async def is_member(cls, channel_id: UUID, user, *, session) -> bool:
+        return channel_id in cls.channels_ids
+
+
+class AuthorizedGatewayHandler(gateway.GatewayHandler):
+    user_id = uuid4()
+    opened = []
+
+    async def prepare(self):
+        self.user = SimpleNamespace(id=self.user_id, status=UsersStatus.offline, text_status="")
+
+    async def open(self):
+        self.opened.append(self)
+        await super().open()
+
+
+class TestGatewayHandler(AsyncHTTPTestCase):
+    def setUp(self):
+        super().setUp()
+        patches = (
+            mock.patch.object(UsersRelations, "get_friends_ids", mock.AsyncMock(return_value=[])),
+            mock.patch.dict(gateway.CHANNELS_TYPES, {"dm": FakeChannel}),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.connections = []
+
+    def tearDown(self):
+        for connection in self.connections:
+            connection.close()
+
+        # Connections of stopped io loop are never closed by server
+        for handler in AuthorizedGatewayHandler.opened:
+            handler.on_close()
+
+        AuthorizedGatewayHandler.opened.clear()
+        super().tearDown()
+
+    def get_app(self):
+        return Application([(r"/gateway", AuthorizedGatewayHandler)])
+
+    async def connect(self):
+        connection = await websocket_connect(self.get_url("/gateway").replace("http", "ws"))
+        self.connections.append(connection)
+
+        # Connected user becomes online and his connections are told about it
+        event = JsonWrapper.loads(await connection.read_message())
+        self.assertEqual(event["event"], EventType.user_status_updated.value)
+        self.assertEqual(event["data"]["status"], UsersStatus.online.name)
+        return connection
+
+    @staticmethod
+    async def send_op(connection, **op):
+        await connection.write_message(JsonWrapper.dumps(op))
+        return JsonWrapper.loads(await connection.read_message())
+
+    @gen_test
+    async def test_subscribe(self):
+        connection = await self.connect()
+
+        result = await self.send_op(connection, op="subscribe", channel_type="dm", channel_id=MEMBER_CHANNEL_ID)
+        self.assertEqual(result, {"op": "subscribe", "success": True, "channel_id": MEMBER_CHANNEL_ID})
+        self.assertEqual(events_hub.subscribers_count(channel_topic(MEMBER_CHANNEL_ID)), 1)
+
+        events_hub.publish(channel_topic(MEMBER_CHANNEL_ID), EventType.message_deleted, {"message_id": "1"})
+        event = JsonWrapper.loads(await connection.read_message())
+        self.assertEqual(event, {"event": EventType.message_deleted.value, "data": {"message_id": "1"}})
+
+    @gen_test
+    async def test_subscribe_to_foreign_channel(self):
+        connection = await self.connect()
+
+        result = await self.send_op(connection, op="subscribe", channel_type="dm", channel_id=OTHER_CHANNEL_ID)
+        self.assertFalse(result["success"])
+        self.assertEqual(events_hub.subscribers_count(channel_topic(OTHER_CHANNEL_ID)), 0)
+
+        result = await self.send_op(connection, op="subscribe", channel_type="voice", channel_id=MEMBER_CHANNEL_ID)
+        self.assertEqual(result["reason"], "Unknown channel type")
+
+    @gen_test
+    async def test_unsubscribe(self):
+        connection = await self.connect()
+        await self.send_op(connection, op="subscribe", channel_type="dm", channel_id=MEMBER_CHANNEL_ID)
+
+        result = await self.send_op(connection, op="unsubscribe", channel_id=str(MEMBER_CHANNEL_ID))
+        self.assertEqual(result, {"op": "unsubscribe", "success": True, "channel_id": MEMBER_CHANNEL_ID})
+        self.assertEqual(events_hub.subscribers_count(channel_topic(MEMBER_CHANNEL_ID)), 0)
+
+    async def assert_subscription_revoked(self, connection):
+        result = JsonWrapper.loads(await connection.read_message())
+        self.assertEqual(result["op"], "unsubscribe")
+        self.assertEqual(result["channel_id"], MEMBER_CHANNEL_ID)
+        self.assertEqual(events_hub.subscribers_count(channel_topic(MEMBER_CHANNEL_ID)), 0)
+
+    @gen_test
+    async def test_subscription_revoked_when_user_leaves(self):
+        connection = await self.connect()
+        await self.send_op(connection, op="subscribe", channel_type="dm", channel_id=MEMBER_CHANNEL_ID)
+
+        membership_index.apply([(("dm", MEMBER_CHANNEL_ID), uuid4(), False)])
+        self.assertEqual(events_hub.subscribers_count(channel_topic(MEMBER_CHANNEL_ID)), 1)
+
+        membership_index.apply([(("dm", MEMBER_CHANNEL_ID), AuthorizedGatewayHandler.user_id, False)])
+        await self.assert_subscription_revoked(connection)
+
+    @gen_test
+    async def test_subscription_revoked_when_channel_deleted(self):
+        connection = await self.connect()
+        await self.send_op(connection, op="subscribe", channel_type="dm", channel_id=MEMBER_CHANNEL_ID)
+
+        with mock.patch.object(FakeChannel, "channels_ids", set()):
+            membership_index.apply([(("dm", MEMBER_CHANNEL_ID), None, False)])
+            await self.assert_subscription_revoked(connection)
+
+    @gen_test
+    async def test_connection_closed_while_opening(self):
+        friend_id = uuid4()
+        loading, release = asyncio.Event(), asyncio.Event()
+
+        async def get_friends_ids(user_id, *, session):
+            loading.set()
+            await release.wait()
+            return [friend_id]
+
+        with mock.patch.object(UsersRelations, "get_friends_ids", get_friends_ids):
+            connection = await websocket_connect(self.get_url("/gateway").replace("http", "ws"))
+            await loading.wait()
+            # Connection is lost (like after ping timeout) while handler waits for database
+            AuthorizedGatewayHandler.opened[0].on_connection_close()
+            connection.close()
+
+            release.set()
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(events_hub.subscribers_count(presence_topic(friend_id)), 0)
+        self.assertEqual(events_hub.subscribers_count(user_topic(AuthorizedGatewayHandler.user_id)), 0)
+        self.assertNotIn(AuthorizedGatewayHandler.user_id, presence_service._entries)
+
+    @gen_test
+    async def test_subscribe_closed_while_checking_membership(self):
+        connection = await self.connect()
+        checking, release = asyncio.Event(), asyncio.Event()
+
+        async def is_member(channel_id, user, *, session):
+            checking.set()
+            await release.wait()
+            return True
+
+        with mock.patch.object(FakeChannel, "is_member", is_member):
+            await connection.write_message(
+                JsonWrapper.dumps({"op": "subscribe", "channel_type": "dm", "channel_id": MEMBER_CHANNEL_ID})
+            )
+            await checking.wait()
+            # Connection is lost (like after ping timeout) while handler waits for database
+            AuthorizedGatewayHandler.opened[0].on_connection_close()
+            connection.close()
+
+            with mock.patch.object(events_hub, "subscribe") as subscribe:
+                release.set()
+                await asyncio.sleep(0.01)
+
+        subscribe.assert_not_called()
+        self.assertEqual(events_hub.subscribers_count(channel_topic(MEMBER_CHANNEL_ID)), 0)
+
+    @gen_test
+    async def test_heartbeat(self):
+        connection = await self.connect()
+        entry = presence_service._entries[AuthorizedGatewayHandler.user_id]
+        entry.last_heartbeat -= 10
+
+        result = await self.send_op(connection, op="heartbeat")
+        self.assertEqual(result, {"op": "heartbeat", "success": True})
+        self.assertGreater(entry.last_heartbeat, presence_service.clock() - 10)
+        self.assertEqual(
+            presence_service.status_of(AuthorizedGatewayHandler.user_id, UsersStatus.offline), UsersStatus.online
+        )
+
+    @gen_test
+    async def test_invalid_ops(self):
+        connection = await self.connect()
+
+        for message in ("not json", JsonWrapper.dumps({"op": "subscribe"}), JsonWrapper.dumps({"channel_id": 1})):
+            await connection.write_message(message)
+            result = JsonWrapper.loads(await connection.read_message())
+            self.assertEqual(result, {"op": "unknown", "success": False, "reason": "Invalid op"})
+
+
+if __name__ == '__main__':
+    unittest.main()
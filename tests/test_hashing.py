@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+from threading import current_thread
+
+from Quadrant.models.utils import hashing
+from Quadrant.models.utils.hashing import HashingExecutor, hash_password, hash_password_with_scheme
+
+
+class TestPasswordsSchemes(unittest.TestCase):
+    def test_blake2b_scheme_matches_old_hashes(self):
+        self.assertEqual(
+            hash_password_with_scheme("blake2b", "password", "salt"),
+            hash_password("password", "salt")
+        )
+
+    def test_scrypt_scheme_fits_password_column(self):
+        password_hash = hash_password_with_scheme("scrypt:1024:8:1", "password", "salt")
+
+        self.assertEqual(len(password_hash), 64)
+        self.assertNotEqual(password_hash, hash_password_with_scheme("scrypt:2048:8:1", "password", "salt"))
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            hash_password_with_scheme("md5", "password", "salt")
+
+    def test_registered_hasher(self):
+        hashing.register_password_hasher("reversed", lambda password, salt: (salt + password)[::-1])
+        self.addCleanup(hashing.password_hashers.pop, "reversed")
+
+        self.assertEqual(hash_password_with_scheme("reversed", "ab", "c"), "bac")
+
+
+class TestHashingExecutor(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_invalid_executor_type(self):
+        with self.assertRaises(ValueError):
+            HashingExecutor("fibers", 1)
+
+    def test_thread_executor_hashes_outside_of_loop_thread(self):
+        executor = HashingExecutor("thread", 2)
+        self.addCleanup(executor.shutdown)
+        executor.warm_up()
+        hashing_threads = []
+
+        def hasher(password, salt):
+            hashing_threads.append(current_thread())
+            return hash_password(password, salt)
+
+        hashing.register_password_hasher("recording", hasher)
+        self.addCleanup(hashing.password_hashers.pop, "recording")
+
+        password_hash = self.loop.run_until_complete(executor.hash_password("password", "salt", "recording"))
+
+        self.assertEqual(password_hash, hash_password("password", "salt"))
+        self.assertNotIn(current_thread(), hashing_threads)
+
+    def test_inline_executor(self):
+        executor = HashingExecutor("inline", 1)
+        executor.warm_up()
+
+        self.assertIsNone(executor.executor)
+        self.assertEqual(
+            self.loop.run_until_complete(executor.hash_password("password", "salt", "blake2b")),
+            hash_password("password", "salt")
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from PIL import Image
+
+from Quadrant.resourses.utils.image_pipeline import ImagePipeline, process_image
+
+sizes = (("image0", 256), ("image1", 64))
+
+
+def make_image(image_format: str, mode: str = "RGB") -> bytes:
+    output = BytesIO()
+    Image.new(mode, (800, 400), "red").save(output, image_format)
+    return output.getvalue()
+
+
+class TestProcessImage(unittest.TestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_makes_all_sizes_from_one_decode(self):
+        timings = process_image(make_image("JPEG"), str(self.directory), sizes)
+
+        self.assertEqual(set(timings), {"decode", "resize", "encode"})
+        self.assertEqual(
+            sorted(path.name for path in self.directory.iterdir()),
+            ["image0.jpg", "image0.webp", "image1.jpg", "image1.webp"]
+        )
+        with Image.open(self.directory / "image0.webp") as image:
+            self.assertEqual(image.size, (256, 128))
+
+        with Image.open(self.directory / "image1.jpg") as image:
+            self.assertEqual(image.size, (64, 32))
+
+    def test_concurrent_saves_to_same_directory(self):
+        content = make_image("JPEG")
+        with ThreadPoolExecutor(4) as executor:
+            for future in [executor.submit(process_image, content, str(self.directory), sizes) for _ in range(8)]:
+                future.result()
+
+        # Every save used own temporary file, and none of them is left
+        self.assertEqual(len(list(self.directory.iterdir())), 4)
+
+    def test_too_many_pixels(self):
+        with self.assertRaises(ImagePipeline.exc.InvalidImage):
+            process_image(make_image("PNG"), str(self.directory), sizes, max_pixels=800 * 400 - 1)
+
+        self.assertEqual(list(self.directory.iterdir()), [])
+        process_image(make_image("PNG"), str(self.directory), sizes, max_pixels=800 * 400)
+
+    def test_transparent_png(self):
+        process_image(make_image("PNG", "RGBA"), str(self.directory), sizes)
+
+        self.assertTrue((self.directory / "image0.jpg").is_file())
+
+
+class TestImagePipeline(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.pipeline = ImagePipeline(workers=1, max_queue_size=1)
+        self.addCleanup(self.pipeline.shutdown)
+
+    def test_rejects_images_when_queue_is_full(self):
+        content = make_image("JPEG")
+
+        async def process_images():
+            return await asyncio.gather(
+                self.pipeline.process(content, self.directory / "first", sizes),
+                self.pipeline.process(content, self.directory / "second", sizes),
+                return_exceptions=True
+            )
+
+        results = self.loop.run_until_complete(process_images())
+
+        self.assertIsInstance(results[0], dict)
+        self.assertIsInstance(results[1], ImagePipeline.exc.QueueFull)
+        self.assertEqual(self.pipeline.queued, 0)
+        self.assertEqual(self.pipeline.metrics.as_dict()["processed"], 1)
+        self.assertEqual(self.pipeline.metrics.as_dict()["rejected"], 1)
+
+    def test_invalid_image(self):
+        with self.assertRaises(ImagePipeline.exc.InvalidImage):
+            self.loop.run_until_complete(self.pipeline.process(b"not an image", self.directory, sizes))
+
+        self.assertEqual(self.pipeline.metrics.failed, 1)
+
+    def test_decompression_bomb(self):
+        # Limit is patched in this process only, so image is processed in thread
+        self.pipeline._executor = ThreadPoolExecutor(1)
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 1000):
+            with self.assertRaises(ImagePipeline.exc.InvalidImage):
+                self.loop.run_until_complete(self.pipeline.process(make_image("PNG"), self.directory, sizes))
+
+    def test_broken_pool_replaced(self):
+        broken_executor = self.pipeline.executor
+        # Process killed by system breaks pool just like process that exits
+        with self.assertRaises(BrokenProcessPool):
+            broken_executor.submit(os._exit, 1).result()
+
+        with self.assertRaises(ImagePipeline.exc.WorkersCrashed):
+            self.loop.run_until_complete(self.pipeline.process(make_image("JPEG"), self.directory, sizes))
+
+        self.assertIsNot(self.pipeline.executor, broken_executor)
+        self.loop.run_until_complete(self.pipeline.process(make_image("JPEG"), self.directory, sizes))
+        self.assertEqual(self.pipeline.metrics.processed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from sqlalchemy import Column, Integer, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from Quadrant.models.utils.pagination import Keyset
+
+PagedRecordsBase = declarative_base()
+PAGE_SIZE = 3
+
+
+class PagedRecord(PagedRecordsBase):
+    id = Column(Integer, primary_key=True)
+    group = Column(String(10))
+
+    __tablename__ = "paged_records"
+
+
+class TestKeysetPagination(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.engine = create_engine("sqlite://")
+        PagedRecordsBase.metadata.create_all(cls.engine)
+
+        with Session(cls.engine) as session:
+            session.add_all([PagedRecord(id=i, group="ab"[i % 2]) for i in range(1, 11)])
+            session.commit()
+
+    def get_page(self, keyset: Keyset, after=None, before=None, offset=0):
+        with Session(self.engine) as session:
+            query = keyset.paginate(select(PagedRecord), PAGE_SIZE, after=after, before=before).offset(offset)
+            rows = session.execute(query).scalars().all()
+            return keyset.make_page(rows, PAGE_SIZE, after=after, before=before, offset=offset)
+
+    def walk_forward(self, keyset: Keyset):
+        pages = [self.get_page(keyset)]
+        while pages[-1].after is not None:
+            pages.append(self.get_page(keyset, after=pages[-1].after))
+
+        return pages
+
+    def test_pages_by_single_column(self):
+        keyset = Keyset((PagedRecord.id, True), row_values=lambda r: (r.id,), casters=(int,))
+        pages = self.walk_forward(keyset)
+
+        self.assertEqual([[r.id for r in page] for page in pages], [[10, 9, 8], [7, 6, 5], [4, 3, 2], [1]])
+        self.assertIsNone(pages[0].before)
+
+    def test_pages_by_mixed_directions(self):
+        keyset = Keyset(
+            (PagedRecord.group, False), (PagedRecord.id, True),
+            row_values=lambda r: (r.group, r.id), casters=(str, int)
+        )
+        ids = [r.id for page in self.walk_forward(keyset) for r in page]
+
+        self.assertEqual(ids, [10, 8, 6, 4, 2, 9, 7, 5, 3, 1])
+
+    def test_going_back_gives_same_page(self):
+        keyset = Keyset((PagedRecord.id, True), row_values=lambda r: (r.id,), casters=(int,))
+        first_page = self.get_page(keyset)
+        second_page = self.get_page(keyset, after=first_page.after)
+        previous_page = self.get_page(keyset, before=second_page.before)
+
+        self.assertEqual([r.id for r in previous_page], [r.id for r in first_page])
+        self.assertIsNotNone(previous_page.after)
+
+    def test_page_by_offset_has_previous_page(self):
+        keyset = Keyset((PagedRecord.id, True), row_values=lambda r: (r.id,), casters=(int,))
+        second_page = self.get_page(keyset, offset=PAGE_SIZE)
+        previous_page = self.get_page(keyset, before=second_page.before)
+
+        self.assertEqual([r.id for r in second_page], [7, 6, 5])
+        self.assertEqual([r.id for r in previous_page], [10, 9, 8])
+
+    def test_invalid_cursor(self):
+        keyset = Keyset((PagedRecord.id, True), row_values=lambda r: (r.id,), casters=(int,))
+
+        with self.assertRaises(ValueError):
+            keyset.decode_cursor("not a cursor")
+
+        with self.assertRaises(ValueError):
+            keyset.decode_cursor(keyset.encode_cursor(PagedRecord(id=1)) + "x")
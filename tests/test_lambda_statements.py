@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from Quadrant.models.dm_channel_package import DirectMessagesChannel
+from Quadrant.models.users_package import User, UserInternalAuthorization, UserSession
+
+
+class StatementsRecorder:
+    """Session that records executed statements instead of running them."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalar_one(self):
+        return None
+
+    def scalar(self):
+        return None
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+class TestLambdaStatements(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def record(self, make_lookup):
+        session = StatementsRecorder()
+        for _ in range(2):
+            self.loop.run_until_complete(make_lookup(session))
+
+        return session.statements
+
+    def assert_reused_with_new_parameters(self, statements):
+        first, second = statements
+        first_key, second_key = first._generate_cache_key(), second._generate_cache_key()
+
+        self.assertEqual(first_key, second_key)
+        self.assertNotEqual(
+            first.compile(dialect=postgresql.dialect()).params,
+            second.compile(dialect=postgresql.dialect()).params
+        )
+
+    def test_get_user(self):
+        self.assert_reused_with_new_parameters(
+            self.record(lambda session: User.get_user(uuid4(), session=session))
+        )
+
+    def test_get_user_filters_make_different_statements(self):
+        session = StatementsRecorder()
+        self.loop.run_until_complete(User.get_user(uuid4(), session=session))
+        self.loop.run_until_complete(User.get_user(uuid4(), session=session, filter_bots=True))
+
+        first, second = session.statements
+        self.assertNotEqual(first._generate_cache_key(), second._generate_cache_key())
+
+    def test_authorize_with_token(self):
+        self.assert_reused_with_new_parameters(
+            self.record(
+                lambda session: UserInternalAuthorization.authorize_with_token(
+                    uuid4().hex, False, session=session
+                )
+            )
+        )
+
+    def test_get_alive_user_session(self):
+        self.assert_reused_with_new_parameters(
+            self.record(lambda session: UserSession.get_alive_user_session(uuid4(), 1, session=session))
+        )
+
+    def test_is_member(self):
+        user = User(id=uuid4())
+        self.assert_reused_with_new_parameters(
+            self.record(lambda session: DirectMessagesChannel.is_member(uuid4(), user, session=session))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
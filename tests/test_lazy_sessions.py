@@ -0,0 +1,73 @@
+import unittest
+
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+
+from Quadrant.models.db_init import ReadOnlySyncSession
+from Quadrant.resourses.quadrant_api_handler import QuadrantAPIHandler
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class PingHandler(QuadrantAPIHandler):
+    read_only_methods = ("GET", )
+    sessions = []
+
+    async def get(self):
+        self.sessions.append(self._session)
+        self.write({"read_only": self.is_read_only})
+
+    async def post(self):
+        self.sessions.append(self._session)
+        self.write({"read_only": self.is_read_only})
+
+
+class TestLazyRequestSession(AsyncHTTPTestCase):
+    def get_app(self):
+        PingHandler.sessions.clear()
+        return Application([(r"/ping", PingHandler)], cookie_secret="secret")
+
+    def test_unauthorized_requests_dont_open_session(self):
+        response = self.fetch("/ping")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(PingHandler.sessions, [None])
+
+    def test_invalid_token_doesnt_open_session(self):
+        self.fetch("/ping", headers={"token": "Unknown token"})
+
+        self.assertEqual(PingHandler.sessions, [None])
+
+    def test_read_only_methods(self):
+        self.assertIn(b"true", self.fetch("/ping").body)
+        self.assertIn(b"false", self.fetch("/ping", method="POST", body=b"").body)
+
+
+class TestReadOnlySession(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.addCleanup(self.engine.dispose)
+
+    def test_reads(self):
+        with ReadOnlySyncSession(self.engine) as session:
+            self.assertEqual(session.query(Item).all(), [])
+
+    def test_refuses_writes(self):
+        with ReadOnlySyncSession(self.engine) as session:
+            session.add(Item(name="item"))
+
+            with self.assertRaises(ReadOnlySyncSession.exc.ReadOnlySession):
+                session.flush()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+
+from Quadrant.resourses.files.media_files import FileChunks, MediaFileHandler, validated_paths_cache
+
+content = bytes(range(256)) * 1024
+
+
+class TestMediaFileHandler(AsyncHTTPTestCase):
+    def get_app(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        (self.directory / "file.bin").write_bytes(content)
+        validated_paths_cache.clear()
+
+        return Application([
+            (r"/uploads/(.*)", MediaFileHandler, {"path": str(self.directory), "immutable": True}),
+        ])
+
+    def read_chunks(self, start: int = 0, end: int = len(content)):
+        chunks = FileChunks(os.open(self.directory / "file.bin", os.O_RDONLY), start, end, chunk_size=1000)
+        read = []
+        for chunk in chunks:
+            if not chunk:
+                # Chunk isn't read yet, iteration must not wait for it
+                self.io_loop.run_sync(chunks.wait_read)
+
+            read.append(chunk)
+
+        self.assertIsNone(chunks.fd)
+        return [chunk for chunk in read if chunk]
+
+    def test_chunks(self):
+        self.assertEqual(b"".join(self.read_chunks()), content)
+        self.assertEqual(b"".join(self.read_chunks(10, 5000)), content[10:5000])
+        self.assertEqual(max(map(len, self.read_chunks())), 1000)
+
+    def test_full_download(self):
+        response = self.fetch("/uploads/file.bin")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.body, content)
+        self.assertIn("max-age", response.headers["Cache-Control"])
+
+    def test_range_request(self):
+        response = self.fetch("/uploads/file.bin", headers={"Range": "bytes=100-199"})
+
+        self.assertEqual(response.code, 206)
+        self.assertEqual(response.body, content[100:200])
+        self.assertEqual(response.headers["Content-Range"], f"bytes 100-199/{len(content)}")
+
+    def test_conditional_request(self):
+        etag = self.fetch("/uploads/file.bin").headers["Etag"]
+        response = self.fetch("/uploads/file.bin", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.code, 304)
+
+    def test_replaced_file(self):
+        self.fetch("/uploads/file.bin")
+        os.remove(self.directory / "file.bin")
+        (self.directory / "file.bin").write_bytes(content[:10])
+
+        # Headers are made from file that is sent even if path was validated before file was replaced
+        response = self.fetch("/uploads/file.bin")
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.body, content[:10])
+        self.assertEqual(response.headers["Content-Length"], "10")
+
+    def test_removed_file(self):
+        self.fetch("/uploads/file.bin")
+        os.remove(self.directory / "file.bin")
+
+        self.assertEqual(self.fetch("/uploads/file.bin").code, 404)
+
+    def test_missing_file(self):
+        self.assertEqual(self.fetch("/uploads/missing.bin").code, 404)
+        self.assertIn(self.fetch("/uploads/../file.bin").code, (403, 404))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from Quadrant.models.membership_index import MembershipIndex, TOO_MANY_MEMBERS, membership_index
+
+MembersBase = declarative_base()
+
+
+class ChannelMember(MembersBase):
+    id = Column(Integer, primary_key=True)
+    channel_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    __tablename__ = "channel_members"
+
+
+membership_index.register("test", ChannelMember.channel_id, ChannelMember.user_id)
+
+
+class CountingSession:
+    """Async facade of sync session that counts executed statements."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.executed = 0
+
+    async def execute(self, statement):
+        self.executed += 1
+        return self.session.execute(statement)
+
+
+class TestMembershipIndex(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        engine = create_engine("sqlite://")
+        MembersBase.metadata.create_all(engine)
+        self.session = Session(engine)
+        self.addCleanup(self.session.close)
+        self.session.add_all([ChannelMember(channel_id=1, user_id=user_id) for user_id in (1, 2, 3)])
+        self.session.commit()
+
+        self.index = MembershipIndex(max_channels=10, max_members=3, ttl=60)
+        self.index.register("members", ChannelMember.channel_id, ChannelMember.user_id)
+        membership_index.clear()
+        self.addCleanup(membership_index.clear)
+
+    def is_member(self, index: MembershipIndex, kind: str, channel_id: int, user_id: int, session) -> bool:
+        return self.loop.run_until_complete(index.is_member(kind, channel_id, user_id, session=session))
+
+    def test_members_loaded_once(self):
+        session = CountingSession(self.session)
+
+        self.assertTrue(self.is_member(self.index, "members", 1, 2, session))
+        self.assertFalse(self.is_member(self.index, "members", 1, 4, session))
+        self.assertTrue(self.is_member(self.index, "members", 1, 3, session))
+        self.assertEqual(session.executed, 1)
+
+    def test_large_channel_checked_in_database(self):
+        self.session.add(ChannelMember(channel_id=1, user_id=4))
+        self.session.commit()
+        session = CountingSession(self.session)
+
+        self.assertTrue(self.is_member(self.index, "members", 1, 4, session))
+        self.assertFalse(self.is_member(self.index, "members", 1, 5, session))
+        self.assertIs(self.index._channels.peek(("members", 1)), TOO_MANY_MEMBERS)
+        self.assertEqual(session.executed, 3)
+
+    def test_disabled_index_checks_database(self):
+        index = MembershipIndex(max_channels=0, max_members=3, ttl=60)
+        index.register("disabled", ChannelMember.channel_id, ChannelMember.user_id)
+        session = CountingSession(self.session)
+
+        self.assertTrue(self.is_member(index, "disabled", 1, 1, session))
+        self.assertTrue(self.is_member(index, "disabled", 1, 1, session))
+        self.assertEqual(session.executed, 2)
+
+    def test_committed_changes_applied(self):
+        session = CountingSession(self.session)
+        self.assertFalse(self.is_member(membership_index, "test", 1, 5, session))
+
+        self.session.add(ChannelMember(channel_id=1, user_id=5))
+        self.session.delete(self.session.query(ChannelMember).filter_by(user_id=1).one())
+        self.session.commit()
+
+        self.assertTrue(self.is_member(membership_index, "test", 1, 5, session))
+        self.assertFalse(self.is_member(membership_index, "test", 1, 1, session))
+        self.assertEqual(session.executed, 1)
+
+    def test_rolled_back_changes_discarded(self):
+        session = CountingSession(self.session)
+        self.assertFalse(self.is_member(membership_index, "test", 1, 5, session))
+
+        self.session.add(ChannelMember(channel_id=1, user_id=5))
+        self.session.flush()
+        self.session.rollback()
+        self.session.commit()
+
+        self.assertFalse(self.is_member(membership_index, "test", 1, 5, session))
+
+    def test_change_while_loading_not_cached(self):
+        self.index._loading[("members", 1)] += 1
+        self.index.apply([(("members", 1), 5, True)])
+        self.index._loading[("members", 1)] -= 1
+        session = CountingSession(self.session)
+
+        self.assertTrue(self.is_member(self.index, "members", 1, 1, session))
+        self.assertIsNone(self.index._channels.peek(("members", 1)))
+        self.assertTrue(self.is_member(self.index, "members", 1, 1, session))
+        self.assertEqual(session.executed, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from itertools import count
+from unittest import mock
+
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import declarative_base
+
+from Quadrant.models.abstract.messages_batcher import MessagesBatcher
+from Quadrant.models.replicas import replica_set
+from tests.utils import make_async_call
+
+BatchedMessagesBase = declarative_base()
+
+
+class BatchedMessage(BatchedMessagesBase):
+    message_id = Column(Integer, primary_key=True)
+    text = Column(String(2000))
+
+    __tablename__ = "batched_messages"
+
+
+class RecordingBatcher(MessagesBatcher):
+    """Batcher that keeps inserts in memory instead of database."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, id_generator=count(1).__next__, **kwargs)
+        self.inserts = []
+
+    async def _insert_rows(self, message_class, rows):
+        if any(row["text"] == "broken" for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("constraint violated"))
+
+        if any(row["text"] == "disconnected" for row in rows):
+            raise OperationalError("INSERT", {}, Exception("connection lost"))
+
+        self.inserts.append(rows)
+
+
+class TestMessagesBatcher(unittest.TestCase):
+    @make_async_call
+    async def test_messages_written_with_one_insert(self):
+        batcher = RecordingBatcher(max_batch_size=100, flush_interval_ms=1)
+        messages = [BatchedMessage(text=str(i)) for i in range(3)]
+
+        written = await asyncio.gather(*(batcher.submit(message) for message in messages))
+
+        self.assertEqual(len(batcher.inserts), 1)
+        self.assertEqual([message.message_id for message in written], [1, 2, 3])
+
+    @make_async_call
+    async def test_full_batch_written_without_waiting(self):
+        batcher = RecordingBatcher(max_batch_size=2, flush_interval_ms=60_000)
+        messages = [BatchedMessage(text=str(i)) for i in range(2)]
+
+        await asyncio.gather(*(batcher.submit(message) for message in messages))
+
+        self.assertEqual(len(batcher.inserts), 1)
+
+    @make_async_call
+    async def test_broken_message_fails_alone(self):
+        batcher = RecordingBatcher(max_batch_size=100, flush_interval_ms=1)
+        results = await asyncio.gather(
+            batcher.submit(BatchedMessage(text="fine")),
+            batcher.submit(BatchedMessage(text="broken")),
+            return_exceptions=True
+        )
+
+        self.assertIsInstance(results[0], BatchedMessage)
+        self.assertIsInstance(results[1], IntegrityError)
+
+    @make_async_call
+    async def test_operational_error_fails_whole_batch(self):
+        batcher = RecordingBatcher(max_batch_size=100, flush_interval_ms=1)
+        results = await asyncio.gather(
+            batcher.submit(BatchedMessage(text="fine")),
+            batcher.submit(BatchedMessage(text="disconnected")),
+            return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, OperationalError) for result in results))
+        self.assertEqual(batcher.inserts, [])
+
+    @make_async_call
+    async def test_authors_writes_marked(self):
+        batcher = RecordingBatcher(max_batch_size=100, flush_interval_ms=1)
+
+        with mock.patch.object(replica_set, "mark_write") as mark_write:
+            await asyncio.gather(
+                batcher.submit(BatchedMessage(text="first"), "author"),
+                batcher.submit(BatchedMessage(text="second"), "author"),
+                batcher.submit(BatchedMessage(text="anonymous")),
+            )
+            mark_write.assert_called_once_with("author")
+
+            await asyncio.gather(
+                batcher.submit(BatchedMessage(text="fine"), "author"),
+                batcher.submit(BatchedMessage(text="broken"), "other author"),
+                return_exceptions=True
+            )
+
+        # Author of message that wasn't written has nothing to wait for
+        self.assertEqual(mark_write.call_args_list, [mock.call("author")] * 2)
+
+    @make_async_call
+    async def test_given_ids_are_kept(self):
+        batcher = RecordingBatcher(max_batch_size=100, flush_interval_ms=1)
+        written = await batcher.submit(BatchedMessage(message_id=42, text="with id"))
+
+        self.assertEqual(written.message_id, 42)
+        self.assertEqual(batcher.inserts[0][0]["message_id"], 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
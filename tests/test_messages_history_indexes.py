@@ -0,0 +1,113 @@
+import json
+import unittest
+from datetime import datetime
+from typing import Iterator, Set
+
+from sqlalchemy import insert, text
+
+from Quadrant.config import quadrant_config
+from Quadrant.models.db_init import Session
+from Quadrant.models.dm_channel_package import DirectMessagesChannel, DM_Message
+from tests.datasets import async_drop_db, async_init_db, create_user
+from tests.utils import make_async_call
+
+CHANNELS = 10
+MESSAGES_PER_CHANNEL = 2000
+# Every hundredth message is pinned
+PINNED_EVERY = 100
+
+
+def plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for subplan in plan.get("Plans", ()):
+        yield from plan_nodes(subplan)
+
+
+class TestMessagesHistoryIndexes(unittest.TestCase):
+    @classmethod
+    @make_async_call
+    async def setUpClass(cls) -> None:
+        await async_init_db()
+
+        async with Session() as session:
+            author = (await create_user("History", "history_login", "history_password_1!", session=session)).user
+            channels = [DirectMessagesChannel() for _ in range(CHANNELS)]
+            session.add_all(channels)
+            await session.commit()
+
+            cls.channel_id = channels[0].channel_id
+            rows = [
+                {
+                    "channel_id": channel.channel_id, "author_id": author.id, "text": f"Message {number}",
+                    "created_at": datetime.utcnow(), "pinned": number % PINNED_EVERY == 0, "edited": False,
+                }
+                for number in range(MESSAGES_PER_CHANNEL) for channel in channels
+            ]
+            await session.execute(insert(DM_Message.__table__), rows)
+            await session.commit()
+
+        async with quadrant_config.DBConfig.async_base_engine.connect() as connection:
+            await connection.execute(text("ANALYZE dm_messages"))
+            await connection.commit()
+
+    @classmethod
+    @make_async_call
+    async def tearDownClass(cls) -> None:
+        await async_drop_db()
+
+    @staticmethod
+    async def explain(query) -> dict:
+        async with quadrant_config.DBConfig.async_base_engine.connect() as connection:
+            compiled = query.compile(dialect=connection.dialect)
+            parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", parameters)
+            plan = result.scalar_one()
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return plan[0]["Plan"]
+
+    @staticmethod
+    async def partitions_indexes(index_name: str) -> Set[str]:
+        async with quadrant_config.DBConfig.async_base_engine.connect() as connection:
+            result = await connection.execute(
+                text(
+                    "SELECT partition_index.relname FROM pg_inherits "
+                    "JOIN pg_class AS partition_index ON partition_index.oid = pg_inherits.inhrelid "
+                    "WHERE pg_inherits.inhparent = CAST(:index_name AS regclass)"
+                ),
+                {"index_name": index_name}
+            )
+            return {index_name, *result.scalars()}
+
+    async def assert_uses_index(self, query, index_name: str) -> None:
+        plan = await self.explain(query)
+        messages_scans = [
+            node for node in plan_nodes(plan) if node.get("Relation Name", "").startswith("dm_messages")
+        ]
+
+        self.assertTrue(messages_scans, plan)
+        for node in messages_scans:
+            self.assertIn(node["Node Type"], ("Index Scan", "Index Only Scan"), plan)
+            self.assertIn(node["Index Name"], await self.partitions_indexes(index_name), plan)
+
+    @make_async_call
+    async def test_history_uses_channel_index(self):
+        await self.assert_uses_index(
+            DM_Message.get_messages_before_query(2 ** 62, self.channel_id), "ix_dm_messages_channel_id_message_id"
+        )
+        await self.assert_uses_index(
+            DM_Message.get_messages_after_query(1, self.channel_id), "ix_dm_messages_channel_id_message_id"
+        )
+
+    @make_async_call
+    async def test_pinned_history_uses_partial_index(self):
+        await self.assert_uses_index(
+            DM_Message.get_messages_before_query(2 ** 62, self.channel_id, select_pinned_only=True),
+            "ix_dm_messages_pinned_channel_id_message_id"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from Quadrant.models.abstract import partitioning
+from Quadrant.models.abstract.partitioning import MessagesPartitioning
+from Quadrant.models.utils.snowflake import SnowflakeGenerator
+
+EPOCH = datetime(2021, 1, 1)
+
+
+class ScalarsResult:
+    def __init__(self, values):
+        self.values = values
+
+    def scalars(self):
+        return self.values
+
+
+class FakeConnection:
+    """Connection that answers partitions query with prepared names and records other statements."""
+
+    def __init__(self, partitions: list):
+        self.partitions = partitions
+        self.statements = []
+
+    async def execute(self, statement, parameters=None):
+        statement = str(statement)
+        if "pg_inherits" in statement:
+            return ScalarsResult(self.partitions + ["dm_messages_legacy_p0"])
+
+        self.statements.append(statement)
+        return None
+
+
+class FrozenDatetime(datetime):
+    now = EPOCH
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now
+
+
+class TestMessagesPartitioning(unittest.TestCase):
+    def setUp(self):
+        self.generator = SnowflakeGenerator(1, EPOCH)
+        self.partitioning = MessagesPartitioning(self.generator, timedelta(days=7), 2, retention=timedelta(days=30))
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        patcher = patch.object(partitioning, "datetime", FrozenDatetime)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Middle of partition 10
+        self.set_now(EPOCH + timedelta(days=73))
+
+    def set_now(self, moment: datetime):
+        FrozenDatetime.now = moment
+
+    def test_partition_bounds(self):
+        self.assertEqual(self.partitioning.partition_index(EPOCH + timedelta(days=6, hours=23)), 0)
+        self.assertEqual(self.partitioning.partition_index(EPOCH + timedelta(days=7)), 1)
+
+        lower_bound, upper_bound = self.partitioning.partition_bounds(2)
+        self.assertEqual(lower_bound, self.generator.lowest_id_at(EPOCH + timedelta(days=14)))
+        self.assertEqual(upper_bound, self.generator.lowest_id_at(EPOCH + timedelta(days=21)))
+        self.assertEqual(
+            str(self.partitioning.create_partition_statement("dm_messages", 2)),
+            "CREATE TABLE IF NOT EXISTS dm_messages_p2 PARTITION OF dm_messages "
+            f"FOR VALUES FROM ({lower_bound}) TO ({upper_bound})"
+        )
+
+    def test_ids_go_to_partition_of_their_time(self):
+        message_id = self.generator.next_id()
+        index = self.partitioning.partition_index(self.generator.id_datetime(message_id))
+        lower_bound, upper_bound = self.partitioning.partition_bounds(index)
+
+        self.assertTrue(lower_bound <= message_id < upper_bound)
+
+    def test_creates_missing_partitions_ahead(self):
+        connection = FakeConnection(["dm_messages_p9", "dm_messages_p10", "dm_messages_p11"])
+
+        created = self.loop.run_until_complete(self.partitioning.create_partitions(connection, "dm_messages"))
+
+        self.assertEqual(created, [12])
+        self.assertEqual(len(connection.statements), 1)
+        self.assertIn("dm_messages_p12 PARTITION OF", connection.statements[0])
+
+    def test_drops_only_expired_partitions(self):
+        connection = FakeConnection([f"dm_messages_p{index}" for index in range(13)])
+
+        dropped = self.loop.run_until_complete(
+            self.partitioning.drop_expired_partitions(connection, "dm_messages")
+        )
+
+        # Partition 5 ends at day 42, which is 31 days ago
+        self.assertEqual(dropped, [0, 1, 2, 3, 4, 5])
+        self.assertIn("DROP TABLE dm_messages_p5", connection.statements)
+        self.assertNotIn("DROP TABLE dm_messages_legacy_p0", connection.statements)
+
+    def test_keeps_recent_partitions(self):
+        self.set_now(EPOCH + timedelta(days=20))
+        connection = FakeConnection(["dm_messages_p0", "dm_messages_p1", "dm_messages_p2"])
+
+        dropped = self.loop.run_until_complete(
+            self.partitioning.drop_expired_partitions(connection, "dm_messages")
+        )
+
+        self.assertEqual(dropped, [])
+
+    def test_retention_is_optional(self):
+        partitioning = MessagesPartitioning(self.generator, timedelta(days=7), 2)
+        connection = FakeConnection(["dm_messages_p0"])
+
+        self.assertEqual(
+            self.loop.run_until_complete(partitioning.drop_expired_partitions(connection, "dm_messages")), []
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import insert
+
+from Quadrant.models.db_init import Session
+from Quadrant.models.dm_channel_package import DirectMessagesChannel, DM_Message
+from Quadrant.models.utils.snowflake import generate_snowflake
+from tests.datasets import async_drop_db, async_init_db, create_user
+from tests.utils import make_async_call
+
+TEXTS = (
+    "Hello there, are we playing today?",
+    "Sure, today works for me",
+    "Playing chess or go?",
+    "Chess today, go tomorrow",
+    "Nothing to see here",
+)
+
+
+class TestMessagesSearch(unittest.TestCase):
+    @classmethod
+    @make_async_call
+    async def setUpClass(cls) -> None:
+        await async_init_db()
+
+        async with Session() as session:
+            first = (await create_user("Searcher", "searcher_login", "searcher_password_1!", session=session)).user
+            second = (await create_user("Other", "other_login", "other_password_1!", session=session)).user
+            channel, other_channel = DirectMessagesChannel(), DirectMessagesChannel()
+            session.add_all([channel, other_channel])
+            await session.commit()
+
+            cls.channel_id, cls.first_id, cls.second_id = channel.channel_id, first.id, second.id
+            rows = [
+                {
+                    "message_id": generate_snowflake(), "channel_id": channel_id,
+                    "author_id": (first.id, second.id)[number % 2], "text": message_text,
+                    "pinned": False, "edited": False,
+                }
+                for channel_id in (channel.channel_id, other_channel.channel_id)
+                for number, message_text in enumerate(TEXTS)
+            ]
+            await session.execute(insert(DM_Message.__table__), rows)
+            await session.commit()
+
+    @classmethod
+    @make_async_call
+    async def tearDownClass(cls) -> None:
+        await async_drop_db()
+
+    async def search(self, search_query: str, **kwargs):
+        async with Session() as session:
+            return await DM_Message.search_messages(search_query, self.channel_id, session=session, **kwargs)
+
+    @make_async_call
+    async def test_finds_messages_of_channel(self):
+        found = await self.search("today")
+
+        self.assertEqual({message.text for message in found}, {TEXTS[0], TEXTS[1], TEXTS[3]})
+        self.assertTrue(all(message.channel_id == self.channel_id for message in found))
+
+    @make_async_call
+    async def test_search_syntax(self):
+        self.assertEqual([message.text for message in await self.search("chess -tomorrow")], [TEXTS[2]])
+        self.assertEqual([message.text for message in await self.search('"today works"')], [TEXTS[1]])
+
+    @make_async_call
+    async def test_author_filter(self):
+        found = await self.search("today", author_id=self.second_id)
+
+        self.assertEqual([message.text for message in found], [TEXTS[1]])
+
+    @make_async_call
+    async def test_empty_query(self):
+        with self.assertRaises(ValueError):
+            await self.search("  ")
+
+    @make_async_call
+    async def test_pages_by_cursor(self):
+        with patch("Quadrant.models.abstract.message.SEARCH_RESULTS_PER_PAGE", 2):
+            first_page = await self.search("today")
+            second_page = await self.search("today", after=first_page.after)
+            previous_page = await self.search("today", before=second_page.before)
+
+        self.assertEqual(len(first_page), 2)
+        self.assertEqual(len(second_page), 1)
+        self.assertIsNone(second_page.after)
+        self.assertEqual(
+            [message.message_id for message in previous_page], [message.message_id for message in first_page]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
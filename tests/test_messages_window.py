@@ -0,0 +1,105 @@
+import unittest
+from uuid import uuid4
+
+from Quadrant.models.abstract.messages_window import MessagesWindow, MessagesWindowCache
+from Quadrant.resourses.messages_resource.history import NEWEST_MESSAGES_CURSOR, parse_message_id
+
+
+def serialized(message_id: int, text: str = "") -> dict:
+    return {"message_id": message_id, "text": text}
+
+
+class WindowMessage:
+    __tablename__ = "window_messages"
+
+    def __init__(self, channel_id, message_id: int, text: str = ""):
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.text = text
+
+    def as_dict(self) -> dict:
+        return serialized(self.message_id, self.text)
+
+
+class TestMessagesWindow(unittest.TestCase):
+    def test_before_served_when_window_has_enough_messages(self):
+        window = MessagesWindow([serialized(i) for i in range(1, 11)], capacity=10, covers_start=False)
+
+        self.assertEqual([m["message_id"] for m in window.before(11, 3)], [10, 9, 8])
+        self.assertIsNone(window.before(3, 3))
+
+    def test_window_covering_start_answers_everything(self):
+        window = MessagesWindow([serialized(i) for i in range(1, 4)], capacity=10, covers_start=True)
+
+        self.assertEqual([m["message_id"] for m in window.before(3, 100)], [2, 1])
+        self.assertEqual([m["message_id"] for m in window.after(0, 100)], [3, 2, 1])
+
+    def test_after_not_served_when_range_starts_before_window(self):
+        window = MessagesWindow([serialized(i) for i in range(5, 11)], capacity=6, covers_start=False)
+
+        self.assertIsNone(window.after(3, 100))
+        self.assertEqual([m["message_id"] for m in window.after(8, 100)], [10, 9])
+        self.assertEqual([m["message_id"] for m in window.after(5, 2)], [10, 9])
+
+    def test_adding_over_capacity_drops_oldest(self):
+        window = MessagesWindow([serialized(i) for i in range(1, 4)], capacity=3, covers_start=True)
+        window.add(serialized(4))
+
+        self.assertEqual(window.ids, [2, 3, 4])
+        self.assertFalse(window.covers_start)
+        # Message older than window can't be placed when older messages aren't known
+        window.add(serialized(1))
+        self.assertEqual(window.ids, [2, 3, 4])
+
+    def test_serialized_string_ids_are_ordered_as_numbers(self):
+        window = MessagesWindow([{"message_id": str(i)} for i in (9, 10)], capacity=10, covers_start=True)
+        window.add({"message_id": "11"})
+        window.remove(9)
+
+        self.assertEqual(window.ids, [10, 11])
+        self.assertEqual(window.before(11, 100), [{"message_id": "10"}])
+
+
+class TestMessagesWindowCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = MessagesWindowCache(max_channels=2, window_size=3, ttl=60)
+        self.channel_id = uuid4()
+        self.window = MessagesWindow([serialized(1), serialized(2)], capacity=3, covers_start=True)
+        self.cache._windows.set(("window_messages", self.channel_id), self.window)
+
+    def test_window_follows_messages_changes(self):
+        self.cache.message_added(WindowMessage(self.channel_id, 3))
+        self.cache.message_changed(WindowMessage(self.channel_id, 1, "edited"))
+        self.cache.message_removed(WindowMessage(self.channel_id, 2))
+
+        self.assertEqual(self.window.messages, [serialized(1, "edited"), serialized(3)])
+
+    def test_windows_expire(self):
+        cache = MessagesWindowCache(max_channels=2, window_size=3, ttl=-1)
+        cache._windows.set(("window_messages", self.channel_id), self.window)
+
+        # Window may miss messages of other processes, so it's loaded again
+        self.assertIsNone(cache._windows.get(("window_messages", self.channel_id)))
+
+    def test_other_channels_not_changed(self):
+        self.cache.message_added(WindowMessage(uuid4(), 3))
+
+        self.assertEqual(self.window.ids, [1, 2])
+
+    def test_changes_while_loading_are_not_lost(self):
+        key = ("window_messages", self.channel_id)
+        self.cache._loading[key] = False
+        self.cache.message_added(WindowMessage(self.channel_id, 3))
+
+        self.assertTrue(self.cache._loading[key])
+
+
+class TestHistoryCursors(unittest.TestCase):
+    def test_valid_ids(self):
+        self.assertEqual(parse_message_id("0"), 0)
+        self.assertEqual(parse_message_id(str(NEWEST_MESSAGES_CURSOR)), NEWEST_MESSAGES_CURSOR)
+
+    def test_ids_out_of_bigint_range(self):
+        for value in ("-1", str(1 << 63), "not an id"):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_message_id(value)
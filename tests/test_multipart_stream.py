@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from hashlib import sha256
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import sleep
+
+from Quadrant.resourses.files.multipart_stream import MultipartStreamParser
+from Quadrant.resourses.files.streamed_upload import StreamedUpload
+
+boundary = b"----QuadrantBoundary1234"
+file_content = b"\r\n--" + b"line of file\r\n" * 500 + b"\r\n----QuadrantBoundary"
+body = (
+    b"preamble\r\n"
+    b"--" + boundary + b"\r\n"
+    b'Content-Disposition: form-data; name="comment"\r\n\r\n'
+    b"hello\r\n"
+    b"--" + boundary + b"\r\n"
+    b'Content-Disposition: form-data; name="file"; filename="notes.txt"\r\n'
+    b"Content-Type: text/plain\r\n\r\n" + file_content + b"\r\n"
+    b"--" + boundary + b"--\r\n"
+    b"epilogue"
+)
+
+
+def parse(chunk_size: int) -> list:
+    parser = MultipartStreamParser(boundary)
+    parts = []
+    for start in range(0, len(body), chunk_size):
+        for event, value in parser.feed(body[start:start + chunk_size]):
+            if event == "part":
+                parts.append([value, b""])
+
+            elif event == "data":
+                parts[-1][1] += value
+
+    parser.finish()
+    return parts
+
+
+class TestMultipartStreamParser(unittest.TestCase):
+    def test_parses_body_split_into_any_chunks(self):
+        for chunk_size in (1, 2, 7, 29, 1024, len(body)):
+            with self.subTest(chunk_size=chunk_size):
+                (comment, comment_body), (file, file_body) = parse(chunk_size)
+
+                self.assertEqual(comment.name, "comment")
+                self.assertIsNone(comment.filename)
+                self.assertEqual(comment_body, b"hello")
+                self.assertEqual(file.filename, "notes.txt")
+                self.assertEqual(file.content_type, "text/plain")
+                self.assertEqual(file_body, file_content)
+
+    def test_boundary_from_content_type(self):
+        parser = MultipartStreamParser.from_content_type(
+            f'multipart/form-data; boundary="{boundary.decode()}"'
+        )
+        parser.feed(body)
+
+        self.assertTrue(parser.finished)
+
+    def test_not_multipart_content_type(self):
+        with self.assertRaises(ValueError):
+            MultipartStreamParser.from_content_type("application/json")
+
+    def test_truncated_body(self):
+        parser = MultipartStreamParser(boundary)
+        parser.feed(body[:len(body) // 2])
+
+        with self.assertRaises(ValueError):
+            parser.finish()
+
+    def test_part_without_disposition(self):
+        parser = MultipartStreamParser(boundary)
+
+        with self.assertRaises(ValueError):
+            parser.feed(b"--" + boundary + b"\r\nContent-Type: text/plain\r\n\r\n")
+
+
+class TestStreamedUpload(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_writes_and_hashes_file(self):
+        upload = StreamedUpload(self.directory, max_size=len(file_content))
+        destination = self.directory / "file_id" / "notes.txt"
+
+        async def upload_file():
+            for start in range(0, len(file_content), 100):
+                await upload.write(file_content[start:start + 100])
+
+            await upload.save(destination)
+
+        self.loop.run_until_complete(upload_file())
+
+        self.assertEqual(destination.read_bytes(), file_content)
+        self.assertEqual(upload.content_hash, sha256(file_content).hexdigest())
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["file_id"])
+
+    def test_size_limit(self):
+        upload = StreamedUpload(self.directory, max_size=10)
+
+        async def upload_file():
+            await upload.write(b"0" * 6)
+            await upload.write(b"0" * 6)
+
+        with self.assertRaises(StreamedUpload.exc.UploadTooBig):
+            self.loop.run_until_complete(upload_file())
+
+        upload.discard()
+        for _ in range(100):
+            if not any(self.directory.iterdir()):
+                break
+
+            sleep(0.01)
+
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+import asyncio
+import random
+import unittest
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from Quadrant.models.servers_package.permissions_managment.bulk_permissions import (
+    ChannelMembersPermissions, OverwriteMasks
+)
+from Quadrant.models.servers_package.permissions_managment.permissions import (
+    ALL_PERMISSIONS, DEFAULT_TEXT_CHANNEL_PERMISSIONS, Permissions, compute_permissions, permissions_by_names
+)
+from Quadrant.models.servers_package.permissions_managment.permissions_cache import PermissionsCache
+from tests.utils import make_async_call
+
+WatchedBase = declarative_base()
+
+
+class WatchedRow(WatchedBase):
+    id = Column(Integer, primary_key=True)
+    server_id = Column(Integer)
+    member_id = Column(Integer)
+    __tablename__ = "watched_rows"
+
+
+def overwrite(allow: Permissions = Permissions(0), deny: Permissions = Permissions(0)):
+    return SimpleNamespace(apply=lambda permissions: Permissions((permissions & ~deny) | allow))
+
+
+class TestComputePermissions(unittest.TestCase):
+    def test_roles_permissions_are_added(self):
+        permissions = compute_permissions(
+            DEFAULT_TEXT_CHANNEL_PERMISSIONS, [Permissions.pin_messages, Permissions.manage_roles]
+        )
+
+        self.assertIn(Permissions.pin_messages | Permissions.manage_roles | Permissions.read_messages, permissions)
+        self.assertNotIn(Permissions.manage_channels, permissions)
+
+    def test_administrator_has_everything(self):
+        permissions = compute_permissions(
+            Permissions(0), [Permissions.administrator], [overwrite(deny=ALL_PERMISSIONS)]
+        )
+
+        self.assertEqual(permissions, ALL_PERMISSIONS)
+
+    def test_overwrites_applied_in_order(self):
+        permissions = compute_permissions(
+            DEFAULT_TEXT_CHANNEL_PERMISSIONS, [],
+            [overwrite(deny=Permissions.write_messages), overwrite(allow=Permissions.pin_messages)],
+            overwrite(allow=Permissions.write_messages, deny=Permissions.attach_files)
+        )
+
+        self.assertIn(Permissions.write_messages | Permissions.pin_messages, permissions)
+        self.assertNotIn(Permissions.attach_files, permissions)
+
+    def test_higher_role_overwrite_wins(self):
+        permissions = compute_permissions(
+            DEFAULT_TEXT_CHANNEL_PERMISSIONS, [],
+            [overwrite(allow=Permissions.write_messages), overwrite(deny=Permissions.write_messages)]
+        )
+
+        self.assertNotIn(Permissions.write_messages, permissions)
+
+    def test_permissions_by_names(self):
+        self.assertEqual(
+            permissions_by_names("pin_messages", "read_messages"), Permissions.pin_messages | Permissions.read_messages
+        )
+        with self.assertRaises(KeyError):
+            permissions_by_names("fly")
+
+
+class TestPermissionsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = PermissionsCache(max_servers=10, ttl=60)
+        self.server_id = uuid4()
+
+    def test_stores_permissions(self):
+        self.assertIsNone(self.cache.get(self.server_id, 1, 1))
+        self.cache.store(self.server_id, 1, 1, Permissions(0))
+
+        self.assertEqual(self.cache.get(self.server_id, 1, 1), Permissions(0))
+        self.assertEqual(self.cache.hit_rate, 0.5)
+
+    def test_invalidates_server(self):
+        self.cache.store(self.server_id, 1, 1, Permissions.read_messages)
+        self.cache.store(self.server_id, 2, 1, Permissions.read_messages)
+        self.cache.invalidate_server(self.server_id)
+
+        self.assertIsNone(self.cache.get(self.server_id, 1, 1))
+        self.assertIsNone(self.cache.get(self.server_id, 2, 1))
+
+    def test_invalidates_member(self):
+        self.cache.store(self.server_id, 1, 1, Permissions.read_messages)
+        self.cache.store(self.server_id, 1, 2, Permissions.read_messages)
+        self.cache.store(self.server_id, 2, 1, Permissions.read_messages)
+        self.cache.invalidate_member(self.server_id, 1)
+
+        self.assertIsNone(self.cache.get(self.server_id, 1, 1))
+        self.assertIsNone(self.cache.get(self.server_id, 1, 2))
+        self.assertEqual(self.cache.get(self.server_id, 2, 1), Permissions.read_messages)
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = PermissionsCache(max_servers=0, ttl=60)
+        cache.store(self.server_id, 1, 1, Permissions.read_messages)
+
+        self.assertIsNone(cache.get(self.server_id, 1, 1))
+
+    def test_committed_changes_invalidate(self):
+        engine = create_engine("sqlite://")
+        WatchedBase.metadata.create_all(engine)
+        self.addCleanup(engine.dispose)
+        self.cache.watch(WatchedRow, member_id_attribute="member_id")
+
+        self.cache.store(1, 1, 1, Permissions.read_messages)
+        self.cache.store(1, 2, 1, Permissions.read_messages)
+        with Session(engine) as session:
+            session.add(WatchedRow(server_id=1, member_id=1))
+            session.flush()
+            # Uncommitted rows must not change permissions yet
+            self.assertEqual(self.cache.get(1, 1, 1), Permissions.read_messages)
+            session.commit()
+
+        self.assertIsNone(self.cache.get(1, 1, 1))
+        self.assertEqual(self.cache.get(1, 2, 1), Permissions.read_messages)
+
+    def test_rolled_back_changes_dont_invalidate(self):
+        engine = create_engine("sqlite://")
+        WatchedBase.metadata.create_all(engine)
+        self.addCleanup(engine.dispose)
+        self.cache.watch(WatchedRow)
+
+        self.cache.store(1, 1, 1, Permissions.read_messages)
+        with Session(engine) as session:
+            session.add(WatchedRow(server_id=1, member_id=1))
+            session.flush()
+            session.rollback()
+            session.commit()
+
+        self.assertEqual(self.cache.get(1, 1, 1), Permissions.read_messages)
+
+    @make_async_call
+    async def test_load_caches_computed_permissions(self):
+        computed = []
+
+        async def compute():
+            computed.append(True)
+            return Permissions.read_messages
+
+        for _ in range(2):
+            self.assertEqual(await self.cache.load(self.server_id, 1, 1, compute), Permissions.read_messages)
+
+        self.assertEqual(len(computed), 1)
+
+    @make_async_call
+    async def test_permissions_changed_while_loading_not_cached(self):
+        loading, committed = asyncio.Event(), asyncio.Event()
+
+        async def compute():
+            loading.set()
+            # Rows were read before change was committed
+            await committed.wait()
+            return Permissions.read_messages
+
+        async def commit_change():
+            await loading.wait()
+            self.cache.invalidate(self.server_id, 1)
+            committed.set()
+
+        permissions, _ = await asyncio.gather(self.cache.load(self.server_id, 1, 1, compute), commit_change())
+
+        self.assertEqual(permissions, Permissions.read_messages)
+        self.assertIsNone(self.cache.get(self.server_id, 1, 1))
+        # Next load isn't affected by change that is already committed
+        await self.cache.load(self.server_id, 1, 1, compute)
+        self.assertEqual(self.cache.get(self.server_id, 1, 1), Permissions.read_messages)
+
+
+
+class TestChannelMembersPermissions(unittest.TestCase):
+    def test_same_as_computed_for_each_member(self):
+        rng = random.Random(42)
+        roles = [(role_id, rng.randrange(10), rng.choice(list(Permissions))) for role_id in range(20)]
+        roles_overwrites = [
+            (role_id, rng.choice(list(Permissions)), rng.choice(list(Permissions))) for role_id in range(0, 20, 3)
+        ]
+        members_overwrites = [
+            (member_id, Permissions.read_messages, Permissions.write_messages) for member_id in (3, 7)
+        ]
+        members_roles = [(member_id, role_id) for member_id in range(50) for role_id in rng.sample(range(20), 3)]
+        members_roles.append((50, None))
+
+        bulk = ChannelMembersPermissions(
+            DEFAULT_TEXT_CHANNEL_PERMISSIONS, roles, roles_overwrites, members_overwrites, members_roles
+        )
+
+        roles_by_id = {role_id: (position, permissions) for role_id, position, permissions in roles}
+        overwrites_by_role = {role_id: OverwriteMasks(allow, deny) for role_id, allow, deny in roles_overwrites}
+        overwrites_by_member = {member: OverwriteMasks(allow, deny) for member, allow, deny in members_overwrites}
+        for member_id in range(51):
+            member_roles = sorted(
+                (role_id for member, role_id in members_roles if member == member_id and role_id is not None),
+                key=lambda role_id: (roles_by_id[role_id][0], role_id)
+            )
+            expected = compute_permissions(
+                DEFAULT_TEXT_CHANNEL_PERMISSIONS, [roles_by_id[role_id][1] for role_id in member_roles],
+                [overwrites_by_role[role_id] for role_id in member_roles if role_id in overwrites_by_role],
+                overwrites_by_member.get(member_id)
+            )
+            self.assertEqual(bulk.get(member_id), expected, member_id)
+
+    def test_overwrites_order_of_tied_positions(self):
+        roles = [(1, 5, Permissions(0)), (2, 5, Permissions(0)), (3, None, Permissions(0)), (4, -1, Permissions(0))]
+        roles_overwrites = [
+            (1, Permissions(0), Permissions.read_messages), (2, Permissions.read_messages, Permissions(0)),
+            (3, Permissions.write_messages, Permissions(0)), (4, Permissions(0), Permissions.write_messages)
+        ]
+        bulk = ChannelMembersPermissions(
+            DEFAULT_TEXT_CHANNEL_PERMISSIONS, roles, roles_overwrites, [],
+            [(1, role_id) for role_id in (2, 1, 4, 3)]
+        )
+
+        # Role 2 goes after role 1 of same position, role 3 without position goes before all roles
+        self.assertIn(Permissions.read_messages, bulk.get(1))
+        self.assertNotIn(Permissions.write_messages, bulk.get(1))
+
+    def test_readers(self):
+        bulk = ChannelMembersPermissions(
+            DEFAULT_TEXT_CHANNEL_PERMISSIONS, [(1, 0, Permissions(0)), (2, 1, Permissions.administrator)],
+            [(1, 0, Permissions.read_messages)], [(3, 0, Permissions.read_messages)],
+            [(1, 1), (2, 2), (3, None), (4, None)]
+        )
+
+        self.assertEqual(bulk.readers(), {2, 4})
+        self.assertEqual(bulk.get("not a member"), Permissions(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
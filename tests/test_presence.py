@@ -0,0 +1,199 @@
+import asyncio
+import unittest
+from uuid import UUID, uuid4
+
+from sqlalchemy import Column, Enum, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.types import CHAR, TypeDecorator
+
+from Quadrant.events import EventType, events_hub, presence_topic
+from Quadrant.models.users_package import PresenceService, UsersStatus
+
+PresenceBase = declarative_base()
+HEARTBEAT_TIMEOUT = 30
+
+
+class UUIDString(TypeDecorator):
+    impl = CHAR(36)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else str(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else UUID(value)
+
+
+class PresenceUser(PresenceBase):
+    id = Column(UUIDString, primary_key=True)
+    status = Column(Enum(UsersStatus), nullable=False)
+    __tablename__ = "presence_users"
+
+
+class StatementsCounter:
+    """Async facade of sync session that counts executed statements."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.executed = 0
+        self.fail = False
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        if self.fail:
+            raise ConnectionError("Database is unavailable")
+
+        self.session = Session(self.engine)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.session.close()
+
+    async def execute(self, statement):
+        self.executed += 1
+        return self.session.execute(statement)
+
+    async def commit(self):
+        self.session.commit()
+
+
+class EventsRecorder:
+    def __init__(self):
+        self.events = []
+
+    def send_event(self, event):
+        self.events.append(event)
+
+
+class TestPresenceService(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        self.engine = create_engine("sqlite://")
+        PresenceBase.metadata.create_all(self.engine)
+        self.users_ids = [uuid4() for _ in range(4)]
+        with Session(self.engine) as session:
+            session.add_all([PresenceUser(id=user_id, status=UsersStatus.offline) for user_id in self.users_ids])
+            session.commit()
+
+        self.now = 0.0
+        self.sessions = StatementsCounter(self.engine)
+        self.presence = PresenceService(HEARTBEAT_TIMEOUT, session_factory=self.sessions, clock=lambda: self.now)
+        self.presence.register(PresenceUser)
+
+    def stored_statuses(self):
+        with Session(self.engine) as session:
+            return dict(session.execute(select(PresenceUser.id, PresenceUser.status)).all())
+
+    def flush(self) -> int:
+        return self.loop.run_until_complete(self.presence.flush())
+
+    def test_connected_user_is_online(self):
+        user_id = self.users_ids[0]
+        subscriber = EventsRecorder()
+        events_hub.subscribe(presence_topic(user_id), subscriber)
+        self.addCleanup(events_hub.unsubscribe_all, subscriber)
+
+        self.presence.connect(user_id, UsersStatus.offline, "")
+
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.offline), UsersStatus.online)
+        self.assertEqual([event.event_type for event in subscriber.events], [EventType.user_status_updated])
+        self.assertEqual(subscriber.events[0].payload["status"], UsersStatus.online.name)
+
+    def test_chosen_status_kept_on_connect(self):
+        user_id = self.users_ids[0]
+        self.presence.connect(user_id, UsersStatus.do_not_disturb, "")
+
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.offline), UsersStatus.do_not_disturb)
+        self.assertEqual(self.presence.unflushed_count, 0)
+
+    def test_offline_after_last_connection_closed(self):
+        user_id = self.users_ids[0]
+        self.presence.connect(user_id, UsersStatus.offline, "")
+        self.presence.connect(user_id, UsersStatus.offline, "")
+
+        self.presence.disconnect(user_id)
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.offline), UsersStatus.online)
+
+        self.presence.disconnect(user_id)
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.online), UsersStatus.offline)
+
+    def test_offline_without_heartbeats(self):
+        alive_id, silent_id = self.users_ids[:2]
+        self.presence.connect(alive_id, UsersStatus.offline, "")
+        self.presence.connect(silent_id, UsersStatus.offline, "")
+
+        self.now += HEARTBEAT_TIMEOUT - 1
+        self.presence.heartbeat(alive_id)
+        self.now += 2
+
+        self.assertEqual(self.presence.expire(), [silent_id])
+        self.assertEqual(self.presence.status_of(alive_id, UsersStatus.offline), UsersStatus.online)
+        self.assertEqual(self.presence.status_of(silent_id, UsersStatus.online), UsersStatus.offline)
+        self.assertEqual(self.presence.expire(), [])
+
+    def test_heartbeat_after_expiry_restores_status(self):
+        user_id = self.users_ids[0]
+        self.presence.connect(user_id, UsersStatus.do_not_disturb, "")
+        self.now += HEARTBEAT_TIMEOUT + 1
+
+        self.assertEqual(self.presence.expire(), [user_id])
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.online), UsersStatus.offline)
+
+        self.presence.heartbeat(user_id)
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.offline), UsersStatus.do_not_disturb)
+
+        self.now += HEARTBEAT_TIMEOUT + 1
+        self.presence.expire()
+        self.presence.disconnect(user_id)
+        self.presence.heartbeat(user_id)
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.online), UsersStatus.offline)
+
+    def test_changes_coalesced_in_flush(self):
+        for user_id in self.users_ids:
+            self.presence.connect(user_id, UsersStatus.offline, "")
+
+        # Status flaps of one user are written once
+        for status in (UsersStatus.away, UsersStatus.asleep, UsersStatus.away):
+            self.presence.set_status(self.users_ids[0], status, "")
+
+        self.presence.disconnect(self.users_ids[1])
+
+        self.assertEqual(self.flush(), len(self.users_ids))
+        # One update for every status and commit isn't counted
+        self.assertEqual(self.sessions.executed, 3)
+        self.assertEqual(self.presence.unflushed_count, 0)
+        self.assertEqual(self.stored_statuses(), {
+            self.users_ids[0]: UsersStatus.away,
+            self.users_ids[1]: UsersStatus.offline,
+            self.users_ids[2]: UsersStatus.online,
+            self.users_ids[3]: UsersStatus.online,
+        })
+
+    def test_failed_flush_keeps_newer_changes(self):
+        user_id = self.users_ids[0]
+        self.presence.set_status(user_id, UsersStatus.away, "")
+        self.sessions.fail = True
+
+        self.assertEqual(self.flush(), 0)
+        self.presence.set_status(user_id, UsersStatus.asleep, "")
+        self.sessions.fail = False
+
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.stored_statuses()[user_id], UsersStatus.asleep)
+
+    def test_unflushed_status_shown_after_disconnect(self):
+        user_id = self.users_ids[0]
+        self.presence.connect(user_id, UsersStatus.offline, "")
+        self.flush()
+        self.presence.disconnect(user_id)
+
+        # Stored status is still online until next flush
+        self.assertEqual(self.presence.status_of(user_id, UsersStatus.online), UsersStatus.offline)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+from sqlalchemy import Column, Integer, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from Quadrant.models.caching import CacheRegion, FromCache, SharedMemoryBackend, orm_cache, regions, remove_region
+
+CachedRecordsBase = declarative_base()
+
+
+class CachedRecord(CachedRecordsBase):
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+    __tablename__ = "cached_records"
+
+
+class TestQueryCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.engine = create_engine("sqlite://")
+        CachedRecordsBase.metadata.create_all(cls.engine)
+        regions["tests"] = CacheRegion("tests", backend="memory", size=10, ttl=60)
+
+        with Session(cls.engine) as session:
+            session.add(CachedRecord(id=1, name="cached"))
+            session.commit()
+
+    @staticmethod
+    def record_query():
+        return select(CachedRecord).filter(CachedRecord.id == 1).options(FromCache("tests"))
+
+    def rename_record(self, name: str) -> None:
+        with Session(self.engine) as session:
+            session.get(CachedRecord, 1).name = name
+            session.commit()
+
+    def get_record_name(self) -> str:
+        with Session(self.engine) as session:
+            return session.execute(self.record_query()).scalar_one().name
+
+    def setUp(self) -> None:
+        self.rename_record("cached")
+        regions["tests"].invalidate()
+
+    def test_result_served_from_cache(self):
+        self.assertEqual(self.get_record_name(), "cached")
+        self.rename_record("changed")
+
+        self.assertEqual(self.get_record_name(), "cached")
+        self.assertEqual(regions["tests"].hits, 1)
+
+    def test_invalidated_result_loaded_again(self):
+        self.get_record_name()
+        self.rename_record("changed")
+        orm_cache.invalidate(self.record_query())
+
+        self.assertEqual(self.get_record_name(), "changed")
+
+    def test_shared_backend_keeps_regions_apart(self):
+        first = SharedMemoryBackend("first", max_size=2, ttl=60)
+        second = SharedMemoryBackend("second", max_size=2, ttl=60)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        first.set("key", 1)
+        second.set("key", 2)
+        first.clear()
+
+        self.assertIs(first.get("key"), SharedMemoryBackend.missing)
+        self.assertEqual(second.get("key"), 2)
+
+    def test_shared_backend_storage_freed_by_closed_regions(self):
+        storage_size = SharedMemoryBackend._storage.max_size
+        first = SharedMemoryBackend("first", max_size=2, ttl=60)
+        first.set("key", 1)
+
+        replacement = SharedMemoryBackend("first", max_size=3, ttl=60)
+        self.assertEqual(SharedMemoryBackend._storage.max_size, storage_size + 3)
+        self.assertIs(replacement.get("key"), SharedMemoryBackend.missing)
+
+        # Values of replaced region don't get into its replacement
+        first.set("key", 1)
+        first.close()
+        self.assertIs(replacement.get("key"), SharedMemoryBackend.missing)
+
+        replacement.set("key", 2)
+        replacement.close()
+        self.assertEqual(SharedMemoryBackend._storage.max_size, storage_size)
+        self.assertNotIn(("first", "key"), SharedMemoryBackend._storage)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        remove_region("tests")
+        cls.engine.dispose()
@@ -0,0 +1,139 @@
+import asyncio
+import random
+import unittest
+from uuid import UUID
+
+from Quadrant.models.users_package import RelationsIndex, UsersRelationType, UsersStatus
+from Quadrant.models.users_package.relations_index import RelationsList, status_group
+
+PAGE_SIZE = 7
+
+
+def order_values(related_user):
+    return status_group(related_user.status), related_user.username, related_user.id
+
+
+def make_users(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    statuses = list(UsersStatus)
+    return [
+        (UUID(int=rng.getrandbits(128)), rng.choice(("amy", "bob", "cid", "dan")), rng.choice(statuses))
+        for _ in range(count)
+    ]
+
+
+class TestRelationsList(unittest.TestCase):
+    def setUp(self):
+        self.users = make_users(100)
+        self.relations_list = RelationsList(self.users)
+        self.expected_order = sorted(
+            (status_group(status), username, user_id) for user_id, username, status in self.users
+        )
+
+    def walk(self, forward: bool):
+        pages = [self.relations_list.page(PAGE_SIZE, forward=forward)]
+        while len(pages[-1]) == PAGE_SIZE:
+            pages.append(self.relations_list.page(PAGE_SIZE, order_values(pages[-1][-1]), forward=forward))
+
+        return [order_values(related_user) for page in pages for related_user in page]
+
+    def test_pages_follow_status_and_username(self):
+        self.assertEqual(self.walk(forward=True), self.expected_order)
+
+    def test_pages_backward(self):
+        self.assertEqual(self.walk(forward=False), self.expected_order[::-1])
+
+    def test_changes_keep_order(self):
+        user_id, username, _ = self.users[0]
+        self.relations_list.update(user_id, status=UsersStatus.online)
+        self.relations_list.update(self.users[1][0], username="aaa")
+        self.relations_list.remove(self.users[2][0])
+        self.relations_list.add(UUID(int=1), "zed", UsersStatus.asleep)
+
+        walked = self.walk(forward=True)
+        self.assertEqual(walked, sorted(walked))
+        self.assertEqual(len(walked), len(self.users))
+        self.assertEqual(walked[0][0], status_group(UsersStatus.online))
+        self.assertIn((status_group(UsersStatus.online), username, user_id), walked)
+
+    def test_invalid_cursor_group(self):
+        with self.assertRaises(ValueError):
+            self.relations_list.page(PAGE_SIZE, (100, "amy", UUID(int=0)))
+
+
+class TestRelationsIndex(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        self.index = RelationsIndex(max_lists=2, ttl=60)
+        self.user_id = UUID(int=10)
+        self.friends = [(UUID(int=100 + number), f"friend {number}", UsersStatus.offline) for number in range(3)]
+        self.loads = 0
+
+    async def load_friends(self):
+        self.loads += 1
+        return self.friends
+
+    def get_relations(self, user_id=None, relation_type=UsersRelationType.friends, load_relations=None):
+        return self.loop.run_until_complete(
+            self.index.get_relations(user_id or self.user_id, relation_type, load_relations or self.load_friends)
+        )
+
+    def test_relations_loaded_once(self):
+        self.get_relations()
+        relations_list = self.get_relations()
+
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(len(relations_list), len(self.friends))
+        self.assertEqual(self.index.hit_rate, 0.5)
+
+    def test_relation_changes_move_users_between_lists(self):
+        friends = self.get_relations()
+        blocked = self.get_relations(relation_type=UsersRelationType.blocked, load_relations=self.load_nothing)
+        friend_id, username, status = self.friends[0]
+
+        self.index.relation_changed(self.user_id, friend_id, username, status, UsersRelationType.blocked)
+
+        self.assertNotIn(friend_id, friends)
+        self.assertIn(friend_id, blocked)
+        self.assertEqual(self.index._listed_in[friend_id], {(self.user_id, UsersRelationType.blocked)})
+
+    def test_status_and_username_changes_reach_lists(self):
+        friends = self.get_relations()
+        friend_id = self.friends[2][0]
+
+        self.index.status_changed(friend_id, UsersStatus.online)
+        self.index.username_changed(friend_id, "best friend")
+
+        first = friends.page(1)[0]
+        self.assertEqual((first.id, first.username, first.status), (friend_id, "best friend", UsersStatus.online))
+
+    def test_evicted_lists_forgotten(self):
+        self.get_relations()
+        self.get_relations(UUID(int=11))
+        self.get_relations(UUID(int=12))
+
+        self.assertEqual(
+            self.index._listed_in[self.friends[0][0]],
+            {(UUID(int=11), UsersRelationType.friends), (UUID(int=12), UsersRelationType.friends)}
+        )
+
+    def test_list_changed_while_loading_not_kept(self):
+        async def load_with_change():
+            friend_id, username, status = self.friends[0]
+            self.index.relation_changed(self.user_id, friend_id, username, status, UsersRelationType.none)
+            return await self.load_friends()
+
+        self.get_relations(load_relations=load_with_change)
+        self.get_relations()
+
+        self.assertEqual(self.loads, 2)
+
+    @staticmethod
+    async def load_nothing():
+        return []
+
+
+if __name__ == '__main__':
+    unittest.main()
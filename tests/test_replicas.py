@@ -0,0 +1,168 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import Column, Integer, String, create_engine, lambda_stmt, select
+from sqlalchemy.orm import declarative_base
+
+from Quadrant.config import quadrant_config
+from Quadrant.models import replicas
+from Quadrant.models.db_init import Session
+from Quadrant.models.replicas import ReplicaSet, RoutingSyncSession, on_replica, parse_lsn
+from tests.datasets import async_drop_db, async_init_db, create_user
+from tests.utils import make_async_call
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class TestReplicaSet(unittest.TestCase):
+    def setUp(self):
+        self.replica_set = ReplicaSet(None, [None, None], max_lag=1)
+        self.first, self.second = self.replica_set.replicas
+
+    def test_parse_lsn(self):
+        self.assertEqual(parse_lsn("0/0"), 0)
+        self.assertEqual(parse_lsn("16/B374D848"), 0x16 << 32 | 0xB374D848)
+
+    def test_replicas_are_unused_until_checked(self):
+        self.assertIsNone(self.replica_set.choose_replica())
+
+    def test_chooses_caught_up_replicas(self):
+        self.replica_set._record_primary_lsn(100)
+        self.replica_set._record_replayed_lsn(self.first, 100)
+        self.replica_set._record_replayed_lsn(self.second, 50)
+
+        self.assertIs(self.replica_set.choose_replica(), self.first)
+        self.assertIs(self.replica_set.choose_replica(), self.first)
+
+    def test_rotates_replicas(self):
+        self.replica_set._record_primary_lsn(100)
+        self.replica_set._record_replayed_lsn(self.first, 100)
+        self.replica_set._record_replayed_lsn(self.second, 120)
+
+        chosen = {self.replica_set.choose_replica() for _ in range(4)}
+        self.assertEqual(chosen, {self.first, self.second})
+
+    def test_lagging_replica_is_unused(self):
+        self.replica_set._record_primary_lsn(100)
+        self.replica_set._record_replayed_lsn(self.first, 100)
+        self.first.caught_up_at -= 2
+
+        self.assertIsNone(self.replica_set.choose_replica())
+
+    def test_own_writes_are_visible(self):
+        self.replica_set._record_primary_lsn(100)
+        self.replica_set._record_replayed_lsn(self.first, 100)
+        self.replica_set.mark_write("user")
+
+        self.assertIsNone(self.replica_set.choose_replica("user"))
+        self.assertIs(self.replica_set.choose_replica("other user"), self.first)
+
+        self.replica_set._record_primary_lsn(150)
+        self.replica_set._record_replayed_lsn(self.first, 150)
+        self.assertIs(self.replica_set.choose_replica("user"), self.first)
+
+
+class TestRoutingSession(unittest.TestCase):
+    def setUp(self):
+        self.primary = create_engine("sqlite://")
+        self.replica = create_engine("sqlite://")
+        for engine in (self.primary, self.replica):
+            Base.metadata.create_all(engine)
+            self.addCleanup(engine.dispose)
+
+        self.replica_set = ReplicaSet(None, [SimpleNamespace(sync_engine=self.replica)], max_lag=1)
+        self.replica_set._record_primary_lsn(100)
+        self.replica_set._record_replayed_lsn(self.replica_set.replicas[0], 100)
+
+        patcher = patch.object(replicas, "replica_set", self.replica_set)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.session = RoutingSyncSession(self.primary)
+        self.session.info["consistency_key"] = "user"
+        self.addCleanup(self.session.close)
+
+    def test_routes_marked_reads_to_replica(self):
+        self.assertIs(self.session.get_bind(clause=on_replica(select(Item))), self.replica)
+        self.assertIs(self.session.get_bind(clause=select(Item)), self.primary)
+
+    def test_routes_lambda_statements(self):
+        statement = on_replica(lambda_stmt(lambda: select(Item)))
+
+        self.assertIs(self.session.get_bind(clause=statement), self.replica)
+
+    def test_session_with_writes_uses_primary(self):
+        self.session.add(Item(name="item"))
+        self.session.flush()
+
+        self.assertIs(self.session.get_bind(clause=on_replica(select(Item))), self.primary)
+        self.assertEqual(len(self.session.execute(on_replica(select(Item))).all()), 1)
+
+    def test_committed_writes_wait_for_replica(self):
+        self.session.add(Item(name="item"))
+        self.session.commit()
+
+        with RoutingSyncSession(self.primary, info={"consistency_key": "user"}) as session:
+            self.assertIs(session.get_bind(clause=on_replica(select(Item))), self.primary)
+
+        with RoutingSyncSession(self.primary, info={"consistency_key": "other user"}) as session:
+            self.assertIs(session.get_bind(clause=on_replica(select(Item))), self.replica)
+
+
+@unittest.skipUnless(quadrant_config.DBConfig.replicas_uris.value, "No replicas are configured")
+class TestReplication(unittest.TestCase):
+    @classmethod
+    @make_async_call
+    async def setUpClass(cls) -> None:
+        await async_init_db()
+
+    @classmethod
+    @make_async_call
+    async def tearDownClass(cls) -> None:
+        await async_drop_db()
+
+    async def wait_for_replica(self, consistency_key=None):
+        for _ in range(50):
+            await replicas.replica_set.check_lag()
+            replica = replicas.replica_set.choose_replica(consistency_key)
+            if replica is not None:
+                return replica
+
+            await asyncio.sleep(0.1)
+
+        self.fail("Replica didn't catch up with primary")
+
+    @make_async_call
+    async def test_replicas_catch_up(self):
+        await self.wait_for_replica()
+
+        for replica in replicas.replica_set.replicas:
+            self.assertTrue(replica.available)
+
+    @make_async_call
+    async def test_reads_own_writes(self):
+        async with Session() as session:
+            auth_user = await create_user("Replicated", "replicated_login", "replicated_password_1!", session=session)
+
+        user_id = auth_user.user_id
+        replicas.replica_set.mark_write(user_id)
+        self.assertIsNone(replicas.replica_set.choose_replica(user_id))
+
+        await self.wait_for_replica(user_id)
+        async with Session(info={"consistency_key": user_id}) as session:
+            user = await auth_user.user.get_user(user_id, session=session)
+            self.assertIsNot(session.sync_session.info.get("replica"), None)
+
+        self.assertEqual(user.id, user_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from datetime import datetime
+from uuid import uuid4
+
+from Quadrant.models.users_package import User, UsersRelationType, UsersStatus, UserSession
+from Quadrant.resourses.utils import JsonWrapper
+from Quadrant.resourses.utils.serializers import ModelSerializer, SerializersRegistry, serializers
+
+
+def make_user(username: str = "Rud") -> User:
+    return User(
+        id=uuid4(), color_id=0xFFFFFF, username=username, status=UsersStatus.online, text_status="",
+        registered_at=datetime.utcnow(), is_bot=False, is_banned=False, version=1
+    )
+
+
+class TestSerializers(unittest.TestCase):
+    def test_page_same_as_building_dicts(self):
+        users = [make_user(f"user {i}") for i in range(5)]
+        expected = JsonWrapper.loads(JsonWrapper.dumps({"users": [user.as_dict() for user in users]}))
+
+        encoded = serializers.dumps({"users": serializers.encode_rows(users)})
+
+        self.assertEqual(JsonWrapper.loads(encoded), expected)
+
+    def test_not_cached_rows_encoded(self):
+        user_session = UserSession(session_id=1, ip_address="127.0.0.1", started_at=datetime.utcnow(), is_alive=True)
+        encoded = serializers.dumps({"sessions": serializers.encode_rows([user_session]), "cursor": None})
+
+        self.assertEqual(JsonWrapper.loads(encoded)["sessions"][0]["session_id"], "1")
+
+    def test_encoded_profile_changes_with_version(self):
+        registry = SerializersRegistry()
+        registry.register(
+            User, ModelSerializer(User.as_dict, cache_key=lambda u: u.id, version=lambda u: u.version, cache_size=10)
+        )
+        user = make_user()
+        first = registry.encode(user)
+
+        user.username = "Renamed"
+        self.assertIs(registry.encode(user), first)
+
+        user.version = 2
+        self.assertIn("Renamed", registry.encode(user))
+
+    def test_enums_encoded_by_name(self):
+        encoded = serializers.dumps({"relation_status": UsersRelationType.friends})
+
+        self.assertEqual(JsonWrapper.loads(encoded), {"relation_status": "friends"})
@@ -0,0 +1,114 @@
+import unittest
+from datetime import datetime, timedelta
+from threading import Thread
+from unittest.mock import patch
+
+from Quadrant.models.utils import snowflake
+from Quadrant.models.utils.snowflake import SnowflakeGenerator
+
+EPOCH = datetime(2021, 1, 1)
+
+
+class TestSnowflakeGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = SnowflakeGenerator(5, EPOCH)
+
+    def test_worker_id_is_validated(self):
+        with self.assertRaises(ValueError):
+            SnowflakeGenerator(1024, EPOCH)
+
+        with self.assertRaises(ValueError):
+            SnowflakeGenerator(-1, EPOCH)
+
+    def test_ids_are_increasing(self):
+        ids = [self.generator.next_id() for _ in range(10_000)]
+
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertLess(ids[-1], 2 ** 63)
+
+    def test_ids_are_unique_between_threads(self):
+        ids = []
+
+        def generate():
+            ids.extend(self.generator.next_id() for _ in range(2000))
+
+        threads = [Thread(target=generate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(ids)), 8000)
+
+    def test_workers_give_different_ids(self):
+        other_generator = SnowflakeGenerator(6, EPOCH)
+
+        with patch.object(snowflake, "time", return_value=1_700_000_000):
+            self.assertNotEqual(self.generator.next_id(), other_generator.next_id())
+
+    def test_id_datetime(self):
+        before = datetime.utcnow() - timedelta(milliseconds=1)
+        moment = self.generator.id_datetime(self.generator.next_id())
+
+        self.assertTrue(before <= moment <= datetime.utcnow())
+
+    def test_time_range_bounds(self):
+        moment = datetime(2023, 5, 1, 12, 30)
+
+        with patch.object(snowflake, "time", return_value=snowflake.to_unix_ms(moment) / 1000):
+            message_id = self.generator.next_id()
+
+        self.assertEqual(self.generator.id_datetime(message_id), moment)
+        self.assertLessEqual(self.generator.lowest_id_at(moment), message_id)
+        self.assertLess(message_id, self.generator.lowest_id_at(moment + timedelta(milliseconds=1)))
+        self.assertEqual(self.generator.lowest_id_at(EPOCH - timedelta(days=1)), 0)
+
+    def test_clock_moved_backwards(self):
+        with patch.object(snowflake, "time", return_value=1_700_000_000):
+            self.generator.next_id()
+
+        with patch.object(snowflake, "time", return_value=1_699_999_999.999):
+            with self.assertRaises(SnowflakeGenerator.exc.ClockMovedBackwards):
+                self.generator.next_id()
+
+    def test_sequence_exhausted(self):
+        with patch.object(snowflake, "time", return_value=1_700_000_000):
+            ids = [self.generator.next_id() for _ in range(snowflake.MAX_SEQUENCE + 1)]
+
+            with self.assertRaises(SnowflakeGenerator.exc.SequenceExhausted):
+                self.generator.next_id()
+
+        self.assertEqual(len(set(ids)), snowflake.MAX_SEQUENCE + 1)
+        with patch.object(snowflake, "time", return_value=1_700_000_000.001):
+            self.assertGreater(self.generator.next_id(), ids[-1])
+
+    def test_small_clock_regression_tolerated(self):
+        generator = SnowflakeGenerator(5, EPOCH, max_clock_drift_ms=1000)
+        with patch.object(snowflake, "time", return_value=1_700_000_000):
+            first_id = generator.next_id()
+
+        with patch.object(snowflake, "time", return_value=1_699_999_999.5):
+            regressed_ids = [generator.next_id() for _ in range(3)]
+
+        self.assertEqual(regressed_ids, sorted(set(regressed_ids)))
+        self.assertGreater(regressed_ids[0], first_id)
+
+        with patch.object(snowflake, "time", return_value=1_699_999_998.5):
+            with self.assertRaises(SnowflakeGenerator.exc.ClockMovedBackwards):
+                generator.next_id()
+
+    def test_next_milliseconds_borrowed_when_sequence_exhausted(self):
+        generator = SnowflakeGenerator(5, EPOCH, max_clock_drift_ms=1)
+        with patch.object(snowflake, "time", return_value=1_700_000_000):
+            ids = [generator.next_id() for _ in range(2 * (snowflake.MAX_SEQUENCE + 1))]
+
+            with self.assertRaises(SnowflakeGenerator.exc.SequenceExhausted):
+                generator.next_id()
+
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertEqual(generator.id_datetime(ids[-1]) - generator.id_datetime(ids[0]), timedelta(milliseconds=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,10 @@
 import unittest
 from uuid import UUID
 
-from sqlalchemy import exc
+from sqlalchemy import exc, select
 
 from Quadrant.models.db_init import Session
+from Quadrant.models.users_package import User, UsersStatus, presence_service
 from Quadrant.models.utils.common_settings_validators import DEFAULT_COMMON_SETTINGS_DICT
 from tests.datasets import create_user, async_init_db, async_drop_db
 from tests.utils import clean_tests_folders, make_async_call
@@ -51,9 +52,11 @@ class TestUsersFunctionality(unittest.TestCase):
     @make_async_call
     async def test_setting_status(self):
         await self.test_user.set_status("offline", session=self.session)
-        got_user = await self.test_user.get_user(self.test_user.id, session=self.session)
+        self.assertEqual(self.test_user.presence_status, UsersStatus.offline)
 
-        self.assertEqual(got_user.status, self.test_user.status)
+        await presence_service.flush()
+        result = await self.session.execute(select(User.status).where(User.id == self.test_user.id))
+        self.assertEqual(result.scalar_one(), UsersStatus.offline)
 
     @make_async_call
     async def test_setting_invalid_status(self):